@@ -0,0 +1,128 @@
+"""
+Benchmark - Single-shot versus section-parallel document generation
+
+Generates the same documents with DocumentationGenerator in single-shot
+mode (one long response per document) and in section-parallel mode (a
+short outline, then every section concurrently) against a stand-in model
+whose latency is prompt prefill plus sequential decode. Concurrent requests
+share the model, so each request decodes slower the more requests are in
+flight (``--batch-penalty`` per extra request). Reports per-document
+latency for both modes at each LLM concurrency limit.
+
+Usage:
+    python benchmarks/bench_doc_sections.py [--documents 1] [--sections 6] [--section-tokens 350] [--concurrency 1 2 4 8]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import argparse
+import threading
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.generation.doc_generator import DocumentationGenerator
+from omnitrace.utils.compiled_template import compile_template
+from omnitrace.utils.llm_limit import set_llm_concurrency
+
+DOC_TYPES = ["vision", "technical_strategy", "architecture", "implementation"]
+
+
+class StandInModel:
+    """Stand-in for a local model server: prefill + decode time, slower under load"""
+
+    def __init__(self, sections, section_tokens, seconds_per_token, batch_penalty):
+        self.sections = sections
+        self.section_tokens = section_tokens
+        self.seconds_per_token = seconds_per_token
+        self.batch_penalty = batch_penalty
+        self.active = 0
+        self.lock = threading.Lock()
+
+    def respond(self, prompt, context):
+        """Response text and its length in tokens for one request"""
+        if "required_sections" in context:
+            lines = [f"## Section {i} - what section {i} covers" for i in range(self.sections)]
+            return "\n".join(lines), 12 * self.sections
+        if "section_title" in context:
+            return "word " * self.section_tokens, self.section_tokens
+        return "word " * (self.section_tokens * self.sections), self.section_tokens * self.sections
+
+    def invoke(self, template, context):
+        prompt = compile_template(template).render(context)
+        text, output_tokens = self.respond(prompt, context)
+        with self.lock:
+            self.active += 1
+            slowdown = 1 + self.batch_penalty * (self.active - 1)
+        try:
+            # Prefill is ~20x faster per token than decode; ~4 characters per token
+            prompt_tokens = len(prompt) / 4
+            time.sleep((prompt_tokens / 20 + output_tokens) * self.seconds_per_token * slowdown)
+        finally:
+            with self.lock:
+                self.active -= 1
+        return text
+
+
+class StandInChain:
+    """prompt | llm stand-in bound to one template"""
+
+    def __init__(self, model, template):
+        self.model = model
+        self.template = template
+
+    def invoke(self, context):
+        return self.model.invoke(self.template, context)
+
+
+def run(model, doc_types, section_parallel, concurrency):
+    """Generate every document concurrently; returns (wall seconds, mean document latency)"""
+    set_llm_concurrency(concurrency)
+    generator = DocumentationGenerator(llm=None)
+    generator._chain = lambda template: StandInChain(model, template)
+    generator.enable_section_parallel(section_parallel, max_sections=model.sections)
+
+    async def generate_all():
+        started = time.perf_counter()
+        latencies = []
+
+        async def generate(doc_type):
+            doc_started = time.perf_counter()
+            await generator.generate_document(doc_type, "Demo", "A revolutionary demo project", {})
+            latencies.append(time.perf_counter() - doc_started)
+
+        await asyncio.gather(*(generate(doc_type) for doc_type in doc_types))
+        return time.perf_counter() - started, sum(latencies) / len(latencies)
+
+    return asyncio.run(generate_all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark section-parallel document generation")
+    parser.add_argument("--documents", type=int, default=1, choices=range(1, len(DOC_TYPES) + 1),
+                        help="Documents generated at the same time")
+    parser.add_argument("--sections", type=int, default=6, help="Sections per document")
+    parser.add_argument("--section-tokens", type=int, default=350, help="Tokens per section")
+    parser.add_argument("--ms-per-token", type=float, default=0.5, help="Decode time per token (ms)")
+    parser.add_argument("--batch-penalty", type=float, default=0.15,
+                        help="Decode slowdown per additional concurrent request")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8], help="LLM concurrency limits")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    model = StandInModel(args.sections, args.section_tokens, args.ms_per_token / 1000, args.batch_penalty)
+    doc_types = DOC_TYPES[:args.documents]
+    print(f"{len(doc_types)} documents x {args.sections} sections x {args.section_tokens} tokens")
+    print(f"{'concurrency':>11}  {'single-shot':>22}  {'section-parallel':>22}  {'speedup':>7}")
+    for concurrency in args.concurrency:
+        single_wall, single_latency = run(model, doc_types, False, concurrency)
+        sectioned_wall, sectioned_latency = run(model, doc_types, True, concurrency)
+        print(f"{concurrency:>11}  {single_wall:8.2f}s wall {single_latency:6.2f}s/doc  "
+              f"{sectioned_wall:8.2f}s wall {sectioned_latency:6.2f}s/doc  {single_wall / sectioned_wall:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark - Project archive export
+
+Archives a synthetic generated project the manual way (``shutil.make_archive``
+into a file, then reading the file back to share it) and with ProjectExport
+streaming straight to the consumer, with and without deduplication, and
+reports MB/s for each.
+
+Usage:
+    python benchmarks/bench_export.py [--files 20000] [--duplicate-ratio 0.5] [--format tar.gz]
+"""
+
+import os
+import sys
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.project_export import ProjectExport, ARCHIVE_FORMATS
+
+MAKE_ARCHIVE_FORMATS = {"tar": "tar", "tar.gz": "gztar", "tar.bz2": "bztar", "tar.xz": "xztar", "zip": "zip"}
+
+
+def build_project(root, count, duplicate_ratio):
+    """Write ``count`` files over 100 packages; a share of them identical boilerplate"""
+    boilerplate = '"""Revolutionary module"""\n\n' + "def placeholder():\n    pass\n" * 20
+    total = 0
+    for i in range(count):
+        directory = os.path.join(root, f"pkg_{i % 100}")
+        os.makedirs(directory, exist_ok=True)
+        if i < count * duplicate_ratio:
+            content = boilerplate
+        else:
+            content = f'"""Module {i}"""\n\n' + "".join(f"value_{j} = {i * j}\n" for j in range(40))
+        with open(os.path.join(directory, f"module_{i}.py"), "w", encoding="utf-8") as f:
+            f.write(content)
+        total += len(content)
+    return total
+
+
+class NullSink:
+    """Consumer that discards the archive (stands in for a socket or pipe)"""
+
+    def write(self, data):
+        return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark project archive export")
+    parser.add_argument("--files", type=int, default=20000, help="Number of files in the project")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.5, help="Share of identical files")
+    parser.add_argument("--format", choices=list(ARCHIVE_FORMATS), default="tar.gz", help="Archive format")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        project = os.path.join(temp_dir, "demo")
+        total = build_project(project, args.files, args.duplicate_ratio)
+        megabytes = total / (1 << 20)
+
+        started = time.perf_counter()
+        archive = shutil.make_archive(os.path.join(temp_dir, "manual"), MAKE_ARCHIVE_FORMATS[args.format],
+                                      temp_dir, "demo")
+        with open(archive, "rb") as f:
+            for _ in iter(lambda: f.read(1 << 16), b""):
+                pass
+        seconds = time.perf_counter() - started
+        print(f"make_archive  {seconds:8.3f}s  {megabytes / seconds:8.1f} MB/s  "
+              f"{os.path.getsize(archive):>12} bytes")
+
+        dedup_options = [False] if args.format == "zip" else [False, True]
+        for dedup in dedup_options:
+            export = ProjectExport(project, args.format, dedup=dedup)
+            report = export.write_to(NullSink())
+            print(f"{'stream+dedup' if dedup else 'stream':<12}  {report['seconds']:8.3f}s  "
+                  f"{report['mb_per_second']:8.1f} MB/s  {report['bytes_out']:>12} bytes  "
+                  f"({report['duplicates']} duplicates)")
+    finally:
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()
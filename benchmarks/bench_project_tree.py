@@ -0,0 +1,147 @@
+"""
+Benchmark - ProjectTree loading and traversal on large structures
+
+Builds synthetic structures with ~100k nodes in both the FilesystemAgent
+and StructureGenerator schemas and times loading, counting, depth and
+path iteration against the previous recursive walks.
+
+Usage:
+    python benchmarks/bench_project_tree.py [--nodes 100000]
+"""
+
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.project_tree import ProjectTree
+
+FILES_PER_DIRECTORY = 8
+SUBDIRECTORIES = 4
+
+
+def build_filesystem_schema(target_nodes):
+    """Build a dict-of-dicts structure with about ``target_nodes`` nodes"""
+    root = {"directories": {}, "files": {}}
+    queue = [root]
+    nodes = 0
+    while queue and nodes < target_nodes:
+        directory = queue.pop(0)
+        for i in range(FILES_PER_DIRECTORY):
+            directory["files"][f"module_{i}.py"] = {"description": "Module", "type": "python_module"}
+        nodes += FILES_PER_DIRECTORY
+        for i in range(SUBDIRECTORIES):
+            child = {"description": "Package", "directories": {}, "files": {}}
+            directory["directories"][f"pkg_{i}"] = child
+            queue.append(child)
+        nodes += SUBDIRECTORIES
+    return root
+
+
+def build_structure_schema(target_nodes):
+    """Build a list-based structure with about ``target_nodes`` nodes"""
+    body = {"directories": [], "files": []}
+    queue = [(body, "directories")]
+    nodes = 0
+    while queue and nodes < target_nodes:
+        directory, key = queue.pop(0)
+        for i in range(FILES_PER_DIRECTORY):
+            directory["files"].append({"name": f"module_{i}.py", "purpose": "Module", "content_type": "code"})
+        nodes += FILES_PER_DIRECTORY
+        for i in range(SUBDIRECTORIES):
+            child = {"name": f"pkg_{i}", "purpose": "Package", "subdirectories": [], "files": []}
+            directory[key].append(child)
+            queue.append((child, "subdirectories"))
+        nodes += SUBDIRECTORIES
+    return {"project": "bench", "structure": body}
+
+
+def legacy_filesystem_walk(structure):
+    """Previous recursive count and path walk (FilesystemAgent schema)"""
+    counts = {"directories": 0, "files": 0}
+    paths = []
+
+    def walk(struct, current_path=""):
+        for file_name in struct.get("files", {}):
+            counts["files"] += 1
+            paths.append(os.path.join(current_path, file_name) if current_path else file_name)
+        for dir_name, dir_info in struct.get("directories", {}).items():
+            counts["directories"] += 1
+            dir_path = os.path.join(current_path, dir_name) if current_path else dir_name
+            paths.append(dir_path)
+            walk(dir_info, dir_path)
+
+    walk(structure)
+    return counts, paths
+
+
+def legacy_structure_walk(structure):
+    """Previous recursive count, depth and path walk (StructureGenerator schema)"""
+    stats = {"directories": 0, "files": 0, "depth": 0}
+    paths = []
+
+    def walk(directory, parent_path, depth):
+        stats["directories"] += 1
+        stats["depth"] = max(stats["depth"], depth)
+        path = os.path.join(parent_path, directory["name"]) if parent_path else directory["name"]
+        paths.append(path)
+        for file_info in directory.get("files", []):
+            stats["files"] += 1
+            paths.append(os.path.join(path, file_info["name"]))
+        for subdir in directory.get("subdirectories", []):
+            walk(subdir, path, depth + 1)
+
+    for file_info in structure["structure"].get("files", []):
+        stats["files"] += 1
+        paths.append(file_info["name"])
+    for directory in structure["structure"].get("directories", []):
+        walk(directory, "", 1)
+    return stats, paths
+
+
+def timed(label, func, *args):
+    """Run ``func`` once and print its wall time"""
+    started = time.perf_counter()
+    result = func(*args)
+    print(f"  {label:<34} {time.perf_counter() - started:8.3f}s")
+    return result
+
+
+def bench_tree(structure, loader):
+    """Time loading and one-pass queries on a ProjectTree"""
+    tree = timed("ProjectTree load", loader, structure)
+    # Measure memory in a separate load; tracing slows allocation down
+    tracemalloc.start()
+    loader(structure)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timed("ProjectTree counts + depth", lambda: (tree.directory_count, tree.file_count, tree.max_directory_depth))
+    timed("ProjectTree file types", tree.count_file_types)
+    paths = timed("ProjectTree paths", tree.paths)
+    print(f"  nodes={len(tree)} directories={tree.directory_count} files={tree.file_count} "
+          f"depth={tree.max_directory_depth} names interned={len(tree.names)} load peak={peak / 1e6:.1f}MB")
+    return tree, paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ProjectTree on large structures")
+    parser.add_argument("--nodes", type=int, default=100000, help="Approximate number of nodes")
+    args = parser.parse_args()
+
+    print(f"FilesystemAgent schema (~{args.nodes} nodes)")
+    structure = build_filesystem_schema(args.nodes)
+    timed("legacy recursive walk", legacy_filesystem_walk, structure)
+    bench_tree(structure, ProjectTree.from_filesystem_schema)
+
+    print(f"StructureGenerator schema (~{args.nodes} nodes)")
+    structure = build_structure_schema(args.nodes)
+    timed("legacy recursive walk", legacy_structure_walk, structure)
+    bench_tree(structure, ProjectTree.from_structure_schema)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark - Prompt tokens per role before and after compaction
+
+Reports the estimated prompt tokens (about four characters per token) of
+every role's template, before and after the compaction pass that chains
+are built from: for the built-in defaults (indented Python strings), for
+the templates agents use (config/templates over the defaults), and for
+those templates with the first-principles block inserted again, which is
+what enhancing a template used to send. Each prompt is sent on every call
+of its role, so the saved tokens are saved per call.
+
+Usage:
+    python benchmarks/bench_prompt_tokens.py [--templates-dir config/templates]
+"""
+
+import os
+import sys
+import logging
+import argparse
+import tempfile
+
+# Add project root to path for imports
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from omnitrace.utils.template_manager import TemplateManager
+from omnitrace.utils.template_cache import TemplateCache
+from omnitrace.utils.first_principles import PromptEnhancer
+from omnitrace.utils.prompt_compaction import prompt_token_report
+
+
+def print_report(title, prompts):
+    """Print tokens per role before and after compaction"""
+    report = prompt_token_report(prompts)
+    print(f"\n{title}")
+    print(f"{'role':<12} {'before':>8} {'after':>8} {'saved':>8}")
+    for role, tokens in report.items():
+        print(f"{role:<12} {tokens['before']:8} {tokens['after']:8} {tokens['saved']:8}")
+    before = sum(tokens["before"] for tokens in report.values())
+    after = sum(tokens["after"] for tokens in report.values())
+    print(f"{'total':<12} {before:8} {after:8} {before - after:8} ({(before - after) / max(before, 1):.0%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt compaction")
+    parser.add_argument("--templates-dir", default=os.path.join(ROOT, "config", "templates"),
+                        help="Directory of saved templates")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    defaults = {role: data["template"] for role, data in TemplateManager(tempfile.mkdtemp()).default_templates.items()}
+    print_report("Default templates", defaults)
+
+    # Saved templates override the defaults, like OmniAgent does
+    templates = dict(defaults)
+    for role, data in TemplateCache().load_dir(args.templates_dir).items():
+        templates[role] = data["template"]
+    print_report("Templates as used by agents", templates)
+
+    blocks = PromptEnhancer().first_principles_prompts
+    print_report("Templates with the first-principles block inserted again",
+                 {role: f"{template}\n\n{blocks[role]}" for role, template in templates.items() if role in blocks})
+
+
+if __name__ == "__main__":
+    main()
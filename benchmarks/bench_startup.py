@@ -0,0 +1,92 @@
+"""
+Benchmark - Agent and UnifiedOmniAgent construction time
+
+Constructs the CEO, CTO, Architect and Developer agents and UnifiedOmniAgent
+repeatedly and reports the mean construction time, the template files read
+from disk per construction, and the cost of building a chain on first use
+(chains are no longer built at construction). "cold" empties the template
+cache before every construction, "warm" shares it like a long-running
+process does. Constructing an OllamaLLM does not contact the server.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 50] [--model deepseek-r1:1.5b]
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+# Add project root to path for imports
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+started = time.perf_counter()
+from omnitrace.core.revolutionary_omniagent import UnifiedOmniAgent
+from omnitrace.agents.ceo_agent import CEOAgent
+from omnitrace.agents.cto_agent import CTOAgent
+from omnitrace.agents.architect_agent import ArchitectAgent
+from omnitrace.agents.developer_agent import DeveloperAgent
+from omnitrace.utils.template_cache import get_template_cache
+IMPORT_SECONDS = time.perf_counter() - started
+
+
+def measure(factory, repeat, cold):
+    """Mean construction seconds and template file reads per construction"""
+    cache = get_template_cache()
+    reads = cache.stats["reads"]
+    total = 0.0
+    for _ in range(repeat):
+        if cold:
+            cache.invalidate()
+        started = time.perf_counter()
+        factory()
+        total += time.perf_counter() - started
+    return total / repeat, (cache.stats["reads"] - reads) / repeat
+
+
+def first_use(agent, role=None):
+    """Seconds to build a chain on first use"""
+    started = time.perf_counter()
+    if role is None:
+        agent.chain
+    else:
+        agent._agent_chain(role)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark agent construction")
+    parser.add_argument("--repeat", type=int, default=50, help="Constructions per measurement")
+    parser.add_argument("--model", default="deepseek-r1:1.5b", help="Model name for the OllamaLLM")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    # Templates are read from config/templates relative to the working directory
+    os.chdir(ROOT)
+    unified = UnifiedOmniAgent(args.model)
+    llm = unified.llm
+
+    print(f"imports: {IMPORT_SECONDS * 1000:.1f} ms (once per process)")
+    print(f"{'agent':<18} {'cold ms':>9} {'reads':>6} {'warm ms':>9} {'reads':>6} {'first chain ms':>15}")
+    agents = [("CEOAgent", CEOAgent), ("CTOAgent", CTOAgent), ("ArchitectAgent", ArchitectAgent),
+              ("DeveloperAgent", DeveloperAgent)]
+    for name, agent_class in agents:
+        cold, cold_reads = measure(lambda: agent_class(llm), args.repeat, cold=True)
+        warm, warm_reads = measure(lambda: agent_class(llm), args.repeat, cold=False)
+        chain_seconds = first_use(agent_class(llm))
+        print(f"{name:<18} {cold * 1000:9.3f} {cold_reads:6.1f} {warm * 1000:9.3f} {warm_reads:6.1f} "
+              f"{chain_seconds * 1000:15.3f}")
+
+    cold, cold_reads = measure(lambda: UnifiedOmniAgent(args.model), args.repeat, cold=True)
+    warm, warm_reads = measure(lambda: UnifiedOmniAgent(args.model), args.repeat, cold=False)
+    chain_seconds = sum(first_use(unified, role) for role in unified.agent_templates)
+    print(f"{'UnifiedOmniAgent':<18} {cold * 1000:9.3f} {cold_reads:6.1f} {warm * 1000:9.3f} {warm_reads:6.1f} "
+          f"{chain_seconds * 1000:15.3f}")
+    print(f"(UnifiedOmniAgent first chain ms covers all {len(unified.agent_templates)} roles; "
+          f"a run that uses fewer roles never pays for the rest)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+Benchmark - Structure generation with and without structured output (simulated)
+
+This is a simulation, not a measurement of a model: a local stand-in for
+Ollama's ``/api/generate`` endpoint streams canned structure responses at
+configured failure rates, and a minimal client sends it the same request
+fields as ``OllamaLLM``. Free-form requests sometimes get the kinds of
+responses small models produce (prose without JSON, a different shape,
+missing sections, fenced JSON with trailing commas); JSON-mode requests
+get JSON of the wrong shape at half that rate. Schema-constrained requests
+get output that honours the schema, except that a response is sometimes
+cut off at the token limit, which constrained decoding does not prevent.
+Each mode runs the same requests through the agents' retry and validation
+path and reports retry counts and parse/schema failure rates, which
+therefore reflect the configured rates and the retry logic, not a model.
+
+Usage:
+    python benchmarks/bench_structured_output.py [--requests 200] [--failure-rate 0.3] [--truncation-rate 0.05] [--max-retries 2]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import logging
+import argparse
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.structured_output import (
+    generate_validated_structure, constrain_llm, FILESYSTEM_STRUCTURE_SCHEMA
+)
+
+VALID_STRUCTURE = {
+    "directories": {
+        "core": {
+            "description": "Core engine",
+            "directories": {"physics": {"description": "Physics", "directories": {}, "files": {
+                "solver.py": {"description": "Solver", "type": "python_module"}
+            }}},
+            "files": {"engine.py": {"description": "Engine", "type": "python_module"}}
+        }
+    },
+    "files": {"README.md": {"description": "Overview", "type": "documentation"}}
+}
+
+
+def free_form_response(rng, failure_rate):
+    """Response of an unconstrained model: sometimes unusable, sometimes merely sloppy"""
+    body = json.dumps(VALID_STRUCTURE, indent=2)
+    if rng.random() >= failure_rate:
+        if rng.random() < 0.5:
+            # Sloppy but repairable: fence, prose and a trailing comma
+            return "Here is the structure:\n```json\n" + body[:-2] + ",\n}\n```\nLet me know!"
+        return body
+    return rng.choice([
+        "I would organize the project around a core engine, a physics module and documentation.",
+        json.dumps([{"name": "core", "files": ["engine.py"]}]),
+        json.dumps({"directories": [{"name": "core"}], "files": ["README.md"]}),
+        json.dumps({"directories": VALID_STRUCTURE["directories"]}),
+    ])
+
+
+def json_mode_response(rng, failure_rate):
+    """Response in JSON mode: always JSON, but the shape is not enforced"""
+    if rng.random() >= failure_rate / 2:
+        return json.dumps(VALID_STRUCTURE)
+    return rng.choice([
+        json.dumps([{"name": "core", "files": ["engine.py"]}]),
+        json.dumps({"directories": VALID_STRUCTURE["directories"]}),
+    ])
+
+
+def schema_response(rng, truncation_rate):
+    """Response under a schema: valid JSON of the right shape, unless cut off at the token limit"""
+    body = json.dumps(VALID_STRUCTURE)
+    if rng.random() >= truncation_rate:
+        return body
+    return body[:rng.randrange(len(body) // 4, len(body) - 1)]
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Streams NDJSON chunks like ``/api/generate`` with ``stream: true``"""
+
+    failure_rate = 0.3
+    truncation_rate = 0.05
+    chunk_size = 16
+    token_delay = 0.0
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        rng = random.Random(request["prompt"])
+        fmt = request.get("format")
+        if isinstance(fmt, dict):
+            text = schema_response(rng, self.truncation_rate)
+        elif fmt == "json":
+            text = json_mode_response(rng, self.failure_rate)
+        else:
+            text = free_form_response(rng, self.failure_rate)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        for i in range(0, len(text), self.chunk_size):
+            chunk = {"model": request["model"], "response": text[i:i + self.chunk_size], "done": False}
+            self.wfile.write((json.dumps(chunk) + "\n").encode("utf-8"))
+            if self.token_delay:
+                time.sleep(self.token_delay)
+        self.wfile.write((json.dumps({"model": request["model"], "response": "", "done": True}) + "\n").encode("utf-8"))
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInClient:
+    """Minimal streaming client that sends the same request fields as OllamaLLM"""
+
+    def __init__(self, base_url, model="deepseek-r1:1.5b", **options):
+        self.base_url = base_url
+        self.model = model
+        self.options = options
+        self.calls = 0
+
+    def bind(self, **options):
+        bound = StandInClient(self.base_url, self.model, **{**self.options, **options})
+        bound.calls = self.calls
+        return bound
+
+    def stream(self, context):
+        self.calls += 1
+        # Attempt number in the prompt makes every retry an independent sample
+        prompt = f"{context['task']} #{context['request']}.{self.calls}"
+        payload = {"model": self.model, "prompt": prompt, "stream": True, **self.options}
+        request = urllib.request.Request(
+            f"{self.base_url}/api/generate", data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request) as response:
+            for line in response:
+                chunk = json.loads(line)
+                if chunk.get("response"):
+                    yield chunk["response"]
+
+
+async def run_mode(base_url, mode, requests, max_retries):
+    """Run all requests for one structured output mode"""
+    totals = {"attempts": 0, "retries": 0, "parse_failures": 0, "schema_failures": 0, "failed": 0, "repaired": 0}
+    started = time.perf_counter()
+    for i in range(requests):
+        client = StandInClient(base_url)
+        if mode != "off":
+            client = constrain_llm(client, FILESYSTEM_STRUCTURE_SCHEMA, mode)
+        structure, report = await generate_validated_structure(
+            client, {"task": "structure", "request": i}, FILESYSTEM_STRUCTURE_SCHEMA, max_retries=max_retries
+        )
+        for key in ("attempts", "retries", "parse_failures", "schema_failures"):
+            totals[key] += report[key]
+        totals["failed"] += structure is None or bool(report["schema_errors"])
+        totals["repaired"] += bool(report["repairs"])
+    totals["seconds"] = time.perf_counter() - started
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark schema-constrained structure generation")
+    parser.add_argument("--requests", type=int, default=200, help="Structure requests per mode")
+    parser.add_argument("--failure-rate", type=float, default=0.3, help="Share of unusable free-form responses")
+    parser.add_argument("--truncation-rate", type=float, default=0.05,
+                        help="Share of schema-constrained responses cut off at the token limit")
+    parser.add_argument("--max-retries", type=int, default=2, help="Retries per request")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    args = parser.parse_args()
+    # Per-attempt warnings are summarized in the table
+    logging.basicConfig(level=logging.ERROR)
+
+    StandInHandler.failure_rate = args.failure_rate
+    StandInHandler.truncation_rate = args.truncation_rate
+    StandInHandler.token_delay = args.token_delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    try:
+        print(f"Simulated responses (stand-in server, not a model): free-form failure rate {args.failure_rate:.0%}, "
+              f"schema truncation rate {args.truncation_rate:.0%}\n")
+        print(f"{'mode':8} {'attempts':>9} {'retries':>8} {'parse fail':>11} {'schema fail':>12} "
+              f"{'failed':>7} {'repaired':>9} {'seconds':>8}")
+        for mode in ("off", "json", "schema"):
+            totals = asyncio.run(run_mode(base_url, mode, args.requests, args.max_retries))
+            attempts = totals["attempts"]
+            print(f"{mode:8} {attempts:9d} {totals['retries']:8d} "
+                  f"{totals['parse_failures'] / attempts:10.1%} {totals['schema_failures'] / attempts:11.1%} "
+                  f"{totals['failed']:7d} {totals['repaired']:9d} {totals['seconds']:8.3f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,27 @@ Architect Agent - Revolutionary architecture design using Elon Musk's first-prin
 """
 
 import os
-import json
 import logging
 from typing import Dict, Any, Optional, List
 from langchain_core.prompts import ChatPromptTemplate
 
+try:
+    from omnitrace.utils.compiled_template import compile_template
+    from omnitrace.utils.template_cache import get_template_cache, template_path, compile_role_template, ROLE_VARIABLES
+    from omnitrace.utils.prompt_compaction import compact_prompt
+except ImportError:
+    try:
+        from utils.compiled_template import compile_template
+        from utils.template_cache import get_template_cache, template_path, compile_role_template, ROLE_VARIABLES
+        from utils.prompt_compaction import compact_prompt
+    except ImportError:
+        from compiled_template import compile_template
+        from template_cache import get_template_cache, template_path, compile_role_template, ROLE_VARIABLES
+        from prompt_compaction import compact_prompt
+
+# Variables the Architect Agent fills; templates using anything else are rejected
+CONTEXT_FIELDS = ROLE_VARIABLES["architect"]
+
 class ArchitectAgent:
     """Architect Agent using Elon Musk's first-principles thinking for revolutionary system design"""
 
@@ -52,8 +68,13 @@ class ArchitectAgent:
         Provide your revolutionary architectural design, including component diagrams, data flows, and system boundaries that reimagine how this system could work.
         """
         
-        # Load template from file if available
-        self.template = template or self._load_template() or self.default_template
+        # Load template and parameters from file (one read of the file) if available
+        self._fixed_template = template is not None
+        if template is not None:
+            # Reject a template this agent cannot fill before any LLM call
+            compile_role_template("architect", template, CONTEXT_FIELDS)
+        template_data = self._load_template_file() if template is None or parameters is None else {}
+        self.template = template or template_data.get("template") or self.default_template
         
         # Default parameters with first-principles focus
         self.default_parameters = {
@@ -76,34 +97,43 @@ class ArchitectAgent:
         }
         
         # Load parameters from file or use provided ones
-        self.parameters = parameters or self._load_parameters() or self.default_parameters
+        self.parameters = parameters or template_data.get("parameters") or self.default_parameters
         
-        # Create prompt chain
-        self.chain = ChatPromptTemplate.from_template(self.template) | self.llm
+        # Prompt chain, built on first use
+        self._chain = None
+        
+        # Rebuild the chain when the template file changes
+        get_template_cache().subscribe(self._on_template_changed)
 
-    def _load_template(self) -> Optional[str]:
-        """Load template from file if it exists"""
-        template_path = os.path.join("config", "templates", "architect_template.json")
-        if os.path.exists(template_path):
-            try:
-                with open(template_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return data.get("template")
-            except Exception as e:
-                self.logger.error(f"Failed to load Architect template: {str(e)}")
-        return None
-        
-    def _load_parameters(self) -> Optional[Dict[str, Any]]:
-        """Load parameters from file if it exists"""
-        template_path = os.path.join("config", "templates", "architect_template.json")
-        if os.path.exists(template_path):
-            try:
-                with open(template_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    return data.get("parameters")
-            except Exception as e:
-                self.logger.error(f"Failed to load Architect parameters: {str(e)}")
-        return None
+    def _load_template_file(self) -> Dict[str, Any]:
+        """Load template and parameters from file if it exists and the template is valid"""
+        try:
+            data = get_template_cache().load(template_path("architect")) or {}
+            if data.get("template"):
+                compile_role_template("architect", data["template"], CONTEXT_FIELDS)
+            return data
+        except Exception as e:
+            self.logger.error(f"Failed to load Architect template: {str(e)}")
+        return {}
+        
+    @property
+    def chain(self):
+        """Prompt chain for the current template, built on first use"""
+        if self._chain is None:
+            self._chain = ChatPromptTemplate.from_template(compact_prompt(self.template)) | self.llm
+        return self._chain
+    
+    @chain.setter
+    def chain(self, chain) -> None:
+        self._chain = chain
+        
+    def _on_template_changed(self, path: str) -> None:
+        """Drop the chain when the Architect template file changes; the next call rebuilds it"""
+        if self._fixed_template or path != os.path.abspath(template_path("architect")):
+            return
+        self.template = self._load_template_file().get("template") or self.default_template
+        self._chain = None
+        self.logger.info("Reloaded Architect template")
     
     async def process(self, task: str, context: Dict[str, Any]) -> str:
         """Process a task using the Architect Agent with first-principles thinking
@@ -120,19 +150,14 @@ class ArchitectAgent:
             Revolutionary architecture design based on first-principles analysis
         """
         try:
-            # Ensure required context fields are present
-            required_fields = ["context", "vision", "tech_strategy", "designs"]
-            for field in required_fields:
-                if field not in context:
-                    context[field] = ""
-            
-            # Add task to context
-            context["task"] = task
+            # Copy only the fields the template uses; missing ones are empty
+            values = {name: context.get(name, "") for name in compile_template(self.template).variables}
+            values["task"] = task
             
             # Process with LLM
             import asyncio
             self.logger.info(f"Applying first-principles thinking to architecture: {task}")
-            result = await asyncio.to_thread(self.chain.invoke, context)
+            result = await asyncio.to_thread(self.chain.invoke, values)
             
             # Extract response
             response = result.text if hasattr(result, "text") else str(result)
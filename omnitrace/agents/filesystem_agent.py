@@ -3,10 +3,63 @@ Filesystem Agent - Revolutionary file structure creation using Elon Musk's first
 """
 
 import os
-import json
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+try:
+    from omnitrace.utils.project_tree import ProjectTree, KIND_DIRECTORY
+    from omnitrace.utils.materializer import Materializer, load_generated_hashes, save_generated_hashes
+    from omnitrace.utils.stream_json import dumps_deep, loads_deep
+    from omnitrace.utils.compiled_template import compile_template
+    from omnitrace.utils.template_cache import compile_role_template
+    from omnitrace.utils.prompt_compaction import compact_prompt
+    from omnitrace.utils.structured_output import (
+        generate_validated_structure, constrain_llm, FILESYSTEM_STRUCTURE_SCHEMA, MODE_SCHEMA
+    )
+except ImportError:
+    try:
+        from utils.project_tree import ProjectTree, KIND_DIRECTORY
+        from utils.materializer import Materializer, load_generated_hashes, save_generated_hashes
+        from utils.stream_json import dumps_deep, loads_deep
+        from utils.compiled_template import compile_template
+        from utils.template_cache import compile_role_template
+        from utils.prompt_compaction import compact_prompt
+        from utils.structured_output import (
+            generate_validated_structure, constrain_llm, FILESYSTEM_STRUCTURE_SCHEMA, MODE_SCHEMA
+        )
+    except ImportError:
+        from project_tree import ProjectTree, KIND_DIRECTORY
+        from materializer import Materializer, load_generated_hashes, save_generated_hashes
+        from stream_json import dumps_deep, loads_deep
+        from compiled_template import compile_template
+        from template_cache import compile_role_template
+        from prompt_compaction import compact_prompt
+        from structured_output import (
+            generate_validated_structure, constrain_llm, FILESYSTEM_STRUCTURE_SCHEMA, MODE_SCHEMA
+        )
+
+def _stub_values(file_path: str, file_info: Dict[str, Any]) -> Dict[str, str]:
+    """Template values of the code stub for one file"""
+    component_name = os.path.basename(file_path).replace("test_", "").replace(".py", "")
+    return {
+        "file_path": file_path,
+        "description": file_info.get("description", ""),
+        "content_template": file_info.get("content_template", ""),
+        "title": os.path.basename(file_path),
+        "component_name": component_name,
+        "component_class": component_name.capitalize()
+    }
+
+
+def _render_stub_batch(templates: Dict[str, Any], batch: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, str]]:
+    """Render the code stubs of a batch of files; runs off the event loop"""
+    other = templates["other"]
+    return [
+        (file_path, templates.get(file_info.get("type", "other"), other).render(_stub_values(file_path, file_info)))
+        for file_path, file_info in batch
+    ]
+
 
 class FilesystemAgent:
     """Revolutionary Filesystem Agent that creates and manages project structure using first-principles thinking."""
@@ -54,34 +107,34 @@ class FilesystemAgent:
         Create the complete file structure for this project, listing every directory and file that should be created, with a brief description of each file's purpose. Return the structure in JSON format with nested dictionaries representing directories and files. Ensure the structure reflects the revolutionary thinking behind this project.
         
         The JSON format should be structured as follows:
-        {
-          "directories": {
-            "dir_name": {
+        {{
+          "directories": {{
+            "dir_name": {{
               "description": "Purpose of this directory",
-              "directories": {
-                "nested_dir": {
+              "directories": {{
+                "nested_dir": {{
                   "description": "Purpose of nested directory",
-                  "directories": {},
-                  "files": {}
-                }
-              },
-              "files": {
-                "file_name.ext": {
+                  "directories": {{}},
+                  "files": {{}}
+                }}
+              }},
+              "files": {{
+                "file_name.ext": {{
                   "description": "Purpose of this file",
                   "type": "python_module|configuration|documentation|test|build|other",
                   "content_template": "Brief description of what content should be in this file"
-                }
-              }
-            }
-          },
-          "files": {
-            "root_file.ext": {
+                }}
+              }}
+            }}
+          }},
+          "files": {{
+            "root_file.ext": {{
               "description": "Purpose of this root-level file",
               "type": "python_module|configuration|documentation|test|build|other",
               "content_template": "Brief description of what content should be in this file"
-            }
-          }
-        }
+            }}
+          }}
+        }}
         """
         
         # Default parameters with first-principles focus
@@ -104,10 +157,20 @@ class FilesystemAgent:
             ]
         }
         
-        # Load template and parameters
+        # Load template and parameters, rejecting a template this agent cannot fill
+        if template is not None:
+            compile_role_template("filesystem", template)
         self.template = template or self.default_template
         self.parameters = parameters or self.default_parameters
         
+        # Batched, thread-pooled file creation
+        self.materializer = Materializer(logger=self.logger)
+        self.last_materialization: Optional[Dict[str, Any]] = None
+        
+        # Schema-constrained structure output (None sends free-form requests)
+        self.structured_output: Optional[str] = None
+        self.max_structure_retries: int = 2
+        
         # File type templates for code generation
         self.file_type_templates = {
             "python_module": """
@@ -167,10 +230,135 @@ class FilesystemAgent:
             {content}
             """
         }
+        
+        # Code stub templates by file type (str.format syntax, compiled once)
+        self.stub_templates = {
+            "python_module": '''"""
+{description}
+
+Generated by OmnitrAIce FilesystemAgent with first-principles thinking
+"""
+
+# This module implements: {content_template}
+
+class RevolutionaryImplementation:
+    """A revolutionary implementation using first-principles thinking"""
+    
+    def __init__(self):
+        """Initialize with first-principles approach"""
+        pass
+    
+    def execute(self):
+        """Execute the revolutionary implementation"""
+        # TODO: Implement with first-principles thinking
+        pass
+''',
+            "configuration": '''# Configuration file: {file_path}
+# Purpose: {description}
+# Generated by OmnitrAIce FilesystemAgent with first-principles thinking
+
+# This configuration defines: {content_template}
+
+# Revolutionary configuration structure using first-principles thinking
+config = {{
+    # Core functionality configuration
+    "core": {{
+        "enabled": True,
+        "optimization_level": "revolutionary"
+    }},
+    
+    # Advanced functionality configuration
+    "advanced": {{
+        "first_principles_mode": True,
+        "constraint_elimination": "aggressive"
+    }}
+}}
+''',
+            "documentation": '''# {title}
+
+{description}
+
+## Overview
+
+This document provides details about: {content_template}
+
+## First-Principles Analysis
+
+* Breaking down the problem to its fundamental components
+* Challenging conventional approaches
+* Focusing on 10x improvements
+
+## Revolutionary Approach
+
+* Implementing revolutionary solutions
+* Eliminating artificial constraints
+* Designing for exponential scaling
+
+Generated by OmnitrAIce FilesystemAgent with first-principles thinking
+''',
+            "test": '''"""
+Tests for {component_name}
+
+Generated by OmnitrAIce FilesystemAgent with first-principles thinking
+"""
+
+import unittest
+
+# This test suite validates: {content_template}
+
+class Revolutionary{component_class}Test(unittest.TestCase):
+    """Test suite using first-principles thinking"""
+    
+    def setUp(self):
+        """Set up the test environment"""
+        pass
+    
+    def test_revolutionary_functionality(self):
+        """Test revolutionary functionality using first-principles approach"""
+        # TODO: Implement first-principles tests
+        pass
+    
+    def test_exponential_scaling(self):
+        """Test exponential scaling capabilities"""
+        # TODO: Implement scaling tests
+        pass
+
+if __name__ == "__main__":
+    unittest.main()
+''',
+            "other": '''# {file_path}
+# Purpose: {description}
+# Generated by OmnitrAIce FilesystemAgent with first-principles thinking
+
+# This file implements: {content_template}
+
+# TODO: Generate revolutionary content with first-principles thinking
+'''
+        }
     
-    async def process(self, task: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    def enable_structured_output(self, enabled: bool = True, mode: str = MODE_SCHEMA,
+                                 max_retries: Optional[int] = None) -> None:
+        """Enable or disable schema-constrained structure responses
+        
+        Args:
+            enabled: Whether structure requests carry a response format
+            mode: "schema" sends the full JSON schema, "json" only requests JSON
+            max_retries: Optional number of retries for unparseable or invalid responses
+        """
+        self.structured_output = mode if enabled else None
+        if max_retries is not None:
+            self.max_structure_retries = max_retries
+        self.logger.info(f"Structured output {'enabled (' + mode + ')' if enabled else 'disabled'}")
+    
+    async def process(self, task: str, context: Dict[str, Any],
+                      on_node: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
         """Process a task using the Filesystem Agent with first-principles thinking
         
+        The response is parsed incrementally while it streams in, repairing
+        common JSON defects, so ``on_node`` can act on directories and files
+        before the whole structure has been generated. Unparseable or
+        schema-violating responses are retried up to ``max_structure_retries`` times.
+        
         Args:
             task: The task to process
             context: The context to use for processing
@@ -180,61 +368,55 @@ class FilesystemAgent:
                 - design: Architect's design
                 - implementation: Developer's implementation plan
                 - filesystem_decisions: Previous filesystem decisions
+            on_node: Optional callback (function or coroutine function) called with
+                each completed node: {"kind": "directory"|"file", "path": ..., "info": ...}
                 
         Returns:
             Revolutionary file structure based on first-principles analysis
         """
         try:
-            # Ensure required context fields are present
-            required_fields = ["context", "vision", "tech_strategy", "design", "implementation", "filesystem_decisions"]
-            for field in required_fields:
-                if field not in context:
-                    context[field] = ""
+            # Copy only the fields the template uses; missing ones are empty
+            values = {name: context.get(name, "") for name in compile_template(self.template).variables}
+            values["task"] = task
             
-            # Add task to context
-            context["task"] = task
-            
-            # Create prompt
+            # Create prompt, constraining the response to the structure schema if enabled
             from langchain_core.prompts import ChatPromptTemplate
-            chain = ChatPromptTemplate.from_template(self.template) | self.llm
+            llm = self.llm
+            if self.structured_output:
+                llm = constrain_llm(self.llm, FILESYSTEM_STRUCTURE_SCHEMA, self.structured_output)
+            chain = ChatPromptTemplate.from_template(compact_prompt(self.template)) | llm
             
-            # Process with LLM
+            # Process with LLM, parsing the structure while it streams in
             self.logger.info(f"Applying first-principles thinking to file structure: {task}")
-            result = await asyncio.to_thread(chain.invoke, context)
+            structure, report = await generate_validated_structure(
+                chain, values, FILESYSTEM_STRUCTURE_SCHEMA, on_node,
+                max_retries=self.max_structure_retries, logger=self.logger
+            )
+            if structure is None:
+                self.logger.error(f"Failed to parse JSON structure after {report['attempts']} attempts: {report['error']}")
+                self.logger.debug(f"Response: {report['raw_text']}")
+                # Return the raw response for debugging
+                return {"error": "JSON decode error", "raw_response": report["raw_text"], "attempts": report["attempts"]}
             
-            # Extract response
-            response = result.text if hasattr(result, "text") else str(result)
+            repairs = report["repairs"]
+            if repairs:
+                self.logger.warning(f"Repaired structure JSON defects: {repairs}")
             
-            # Parse JSON structure
-            try:
-                # Find JSON in response
-                import re
-                json_match = re.search(r'```json\n(.*?)\n```', response, re.DOTALL)
-                if json_match:
-                    structure_json = json_match.group(1)
-                else:
-                    structure_json = response
-                
-                # Parse JSON
-                structure = json.loads(structure_json)
-                
-                # Add first-principles metadata
-                structure["metadata"] = {
-                    "revolution_level": self.parameters["revolution_level"],
-                    "constraint_elimination": self.parameters["constraint_elimination"],
-                    "focus_areas": self.parameters["focus_areas"],
-                    "considerations": self.parameters["considerations"],
-                    "generated_timestamp": self._get_timestamp()
-                }
-                
-                self.logger.info("Generated revolutionary file structure with first-principles thinking")
-                return structure
+            # Add first-principles metadata
+            structure["metadata"] = {
+                "revolution_level": self.parameters["revolution_level"],
+                "constraint_elimination": self.parameters["constraint_elimination"],
+                "focus_areas": self.parameters["focus_areas"],
+                "considerations": self.parameters["considerations"],
+                "json_repairs": repairs,
+                "structured_output": self.structured_output,
+                "attempts": report["attempts"],
+                "schema_errors": report["schema_errors"],
+                "generated_timestamp": self._get_timestamp()
+            }
             
-            except json.JSONDecodeError:
-                self.logger.error("Failed to parse JSON structure from response")
-                self.logger.debug(f"Response: {response}")
-                # Return the raw response for debugging
-                return {"error": "JSON decode error", "raw_response": response}
+            self.logger.info("Generated revolutionary file structure with first-principles thinking")
+            return structure
                 
         except Exception as e:
             self.logger.error(f"Filesystem Agent first-principles processing failed: {str(e)}")
@@ -245,108 +427,175 @@ class FilesystemAgent:
         from datetime import datetime
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    async def create_structure(self, project_path: str, structure: Dict[str, Any]) -> List[str]:
-        """Create the physical file structure based on the generated structure
+    def node_writer(self, project_path: str) -> Tuple[Callable[[Dict[str, Any]], Any], Dict[str, Any]]:
+        """Callback for ``process(on_node=...)`` that materializes nodes while the structure streams in
+        
+        Each directory (with its README) and file stub is written as soon as
+        its JSON object closes. Pass the returned record to
+        ``create_structure(streamed=...)``, which then writes only what the
+        final structure changed and removes nodes it no longer contains.
+        
+        Args:
+            project_path: Path the structure is created in
+            
+        Returns:
+            Tuple of (on_node callback, record of the streamed directories and files)
+        """
+        streamed: Dict[str, Any] = {"directories": [], "files": {}}
+        
+        async def on_node(node: Dict[str, Any]) -> None:
+            rel_path, info = node["path"], node["info"]
+            if node["kind"] == "directory":
+                directories = [rel_path]
+                files = ([(os.path.join(rel_path, "README.md"), f"# {os.path.basename(rel_path)}\n\n{info['description']}\n")]
+                         if "description" in info else [])
+            else:
+                directories = []
+                files = [(rel_path, self._render_file_template(rel_path, info))]
+            await self.materializer.write_now(project_path, directories, files)
+            streamed["directories"].extend(directories)
+            streamed["files"].update(files)
+        
+        return on_node, streamed
+    
+    async def create_structure(self, project_path: str, structure: Dict[str, Any],
+                               incremental: bool = False, streamed: Optional[Dict[str, Any]] = None) -> List[str]:
+        """Create the file structure on disk
         
         Args:
-            project_path: Path to the project directory
+            project_path: Path to create the structure in
             structure: The generated file structure
+            incremental: Diff against the project's previous ``.omnitrace_structure.json``
+                and touch only added, changed or removed files, preserving hand edits.
+                ``last_materialization["kept"]`` then lists the files code generation
+                should skip
+            streamed: Record from ``node_writer`` of the nodes already written while
+                the structure streamed in (not used when incremental)
             
         Returns:
-            List of created files and directories
+            List of created (or, when incremental, written) files and directories
         """
         self.logger.info(f"Creating revolutionary file structure at: {project_path}")
         
-        created_items = []
-        
-        # Create root directories
-        for dir_name, dir_info in structure.get("directories", {}).items():
-            dir_path = os.path.join(project_path, dir_name)
-            created_items.extend(await self._create_directory_recursive(dir_path, dir_info))
-        
-        # Create root files
-        for file_name, file_info in structure.get("files", {}).items():
-            file_path = os.path.join(project_path, file_name)
-            created_items.append(await self._create_file_with_template(file_path, file_info))
-        
-        # Create structure metadata file
-        metadata_path = os.path.join(project_path, ".omnitrace_structure.json")
-        with open(metadata_path, "w", encoding="utf-8") as f:
-            json.dump(structure, f, indent=2)
-        created_items.append(metadata_path)
-        
-        self.logger.info(f"Created {len(created_items)} files and directories")
+        directories, files = self._render_structure(structure)
+        previous = self._load_previous_structure(project_path) if incremental else None
+        
+        if previous is not None:
+            previous_directories, previous_files = self._render_structure(previous)
+            generated = await asyncio.to_thread(load_generated_hashes, project_path)
+            report = await self.materializer.rematerialize(
+                project_path, directories, files, previous_directories, previous_files, generated
+            )
+            # Files code generation must leave alone: hand edits, and generated
+            # code whose structure entry did not change
+            kept = set(report["preserved"]).union(path for path in report["unchanged"] if path in generated)
+            report["kept"] = sorted(kept)
+            if generated:
+                # Written or deleted files no longer hold the recorded code
+                await asyncio.to_thread(save_generated_hashes, project_path, {
+                    path: digest for path, digest in generated.items() if path in kept
+                })
+        elif streamed:
+            report = await self._complete_streamed(project_path, directories, files, streamed)
+        else:
+            report = await self.materializer.materialize(project_path, directories, files)
+        self.last_materialization = report
+        created_items = report["directories"] + report["files"]
+        
+        self.logger.info(f"Created {len(created_items)} files and directories "
+                         f"({report['files_per_second']} files/sec)")
         return created_items
     
-    async def _create_directory_recursive(self, dir_path: str, dir_info: Dict[str, Any]) -> List[str]:
-        """Recursively create directories and their contents
+    async def _complete_streamed(self, project_path: str, directories: List[str], files: List[Tuple[str, str]],
+                                 streamed: Dict[str, Any]) -> Dict[str, Any]:
+        """Write what streaming did not, and remove streamed nodes the final structure dropped
+        
+        Responses that were retried or repaired can differ from the nodes
+        that streamed in; the final structure is what stays on disk.
+        """
+        written = streamed["files"]
+        final_paths = {rel_path for rel_path, _ in files}
+        remaining = [(rel_path, content) for rel_path, content in files if written.get(rel_path) != content]
+        report = await self.materializer.materialize(project_path, directories, remaining)
+        
+        stale_files = [rel_path for rel_path in written if rel_path not in final_paths]
+        stale_directories = [rel_path for rel_path in set(streamed["directories"]) if rel_path not in set(directories)]
+        await self.materializer.discard(project_path, stale_files, stale_directories)
+        
+        report["files"] = [os.path.join(project_path, rel_path) for rel_path, _ in files]
+        report["file_count"] = len(files)
+        report["files_streamed"] = len(files) - len(remaining)
+        return report
+    
+    def _render_structure(self, structure: Dict[str, Any]) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """Render a structure into its directories and (path, content) file pairs
         
         Args:
-            dir_path: Path to the directory
-            dir_info: Information about the directory and its contents
+            structure: The generated file structure
             
         Returns:
-            List of created files and directories
+            Tuple of (relative directory paths, (relative_path, content) pairs)
         """
-        created_items = []
-        
-        # Create the directory
-        os.makedirs(dir_path, exist_ok=True)
-        created_items.append(dir_path)
-        
-        # Create readme with directory description if provided
-        if "description" in dir_info:
-            readme_path = os.path.join(dir_path, "README.md")
-            with open(readme_path, "w", encoding="utf-8") as f:
-                f.write(f"# {os.path.basename(dir_path)}\n\n{dir_info['description']}\n")
-            created_items.append(readme_path)
-        
-        # Create nested directories
-        for nested_dir, nested_info in dir_info.get("directories", {}).items():
-            nested_path = os.path.join(dir_path, nested_dir)
-            created_items.extend(await self._create_directory_recursive(nested_path, nested_info))
-        
-        # Create files in this directory
-        for file_name, file_info in dir_info.get("files", {}).items():
-            file_path = os.path.join(dir_path, file_name)
-            created_items.append(await self._create_file_with_template(file_path, file_info))
+        tree = ProjectTree.from_filesystem_schema(structure)
+        directories = []
+        files = []
+        
+        # Render every file up front; directories precede their contents in preorder
+        for index, rel_path in tree.iter_nodes():
+            info = tree.infos[index]
+            if tree.kinds[index] == KIND_DIRECTORY:
+                directories.append(rel_path)
+                
+                # Create readme with directory description if provided
+                if "description" in info:
+                    files.append((
+                        os.path.join(rel_path, "README.md"),
+                        f"# {tree.name(index)}\n\n{info['description']}\n"
+                    ))
+            else:
+                files.append((rel_path, self._render_file_template(rel_path, info)))
         
-        return created_items
+        # Create structure metadata file
+        files.append((".omnitrace_structure.json", dumps_deep(structure, indent=2)))
+        return directories, files
     
-    async def _create_file_with_template(self, file_path: str, file_info: Dict[str, Any]) -> str:
-        """Create a file using the appropriate template based on file type
+    def _load_previous_structure(self, project_path: str) -> Optional[Dict[str, Any]]:
+        """Load the structure a project was last materialized from, if any"""
+        path = os.path.join(project_path, ".omnitrace_structure.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return loads_deep(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable previous structure {path}: {e}")
+            return None
+    
+    def _render_file_template(self, file_path: str, file_info: Dict[str, Any]) -> str:
+        """Render the initial content of a file from the template for its type
         
         Args:
-            file_path: Path to the file
+            file_path: Path of the file relative to the project root
             file_info: Information about the file
             
         Returns:
-            Path to the created file
+            Rendered file content
         """
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        
         # Get file type
         file_type = file_info.get("type", "other")
         
         # Get template for this file type
         template = self.file_type_templates.get(file_type, self.file_type_templates["other"])
         
-        # Fill in template
-        content = template.format(
-            file_path=file_path,
-            description=file_info.get("description", ""),
-            title=os.path.basename(file_path),
-            tested_component=os.path.basename(file_path).replace("test_", "").replace(".py", ""),
-            imports="# Imports will be generated by the Code Generator",
-            content=f"# Content template: {file_info.get('content_template', 'To be generated')}"
-        )
-        
-        # Write file
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
-        
-        return file_path
+        # Fill in the compiled template (each template source is parsed once)
+        return compile_template(template).render({
+            "file_path": file_path,
+            "description": file_info.get("description", ""),
+            "title": os.path.basename(file_path),
+            "tested_component": os.path.basename(file_path).replace("test_", "").replace(".py", ""),
+            "imports": "# Imports will be generated by the Code Generator",
+            "content": f"# Content template: {file_info.get('content_template', 'To be generated')}"
+        })
     
     async def analyze_structure(self, structure: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze the revolutionary file structure for optimization opportunities
@@ -359,36 +608,14 @@ class FilesystemAgent:
         """
         self.logger.info("Analyzing revolutionary file structure with first-principles thinking")
         
-        # Count files and directories
-        dir_count = 0
-        file_count = 0
-        file_types = {}
-        
-        # Function to recursively count items
-        def count_items(struct, is_root=False):
-            nonlocal dir_count, file_count
-            
-            # Count directories
-            for dir_name, dir_info in struct.get("directories", {}).items():
-                dir_count += 1
-                count_items(dir_info)
-            
-            # Count files
-            for file_name, file_info in struct.get("files", {}).items():
-                file_count += 1
-                
-                # Track file types
-                file_type = file_info.get("type", "other")
-                file_types[file_type] = file_types.get(file_type, 0) + 1
-        
-        # Count items
-        count_items(structure, True)
+        # Count files, directories and file types in one pass
+        tree = ProjectTree.from_filesystem_schema(structure)
         
         # Create analysis
         analysis = {
-            "total_directories": dir_count,
-            "total_files": file_count,
-            "file_types": file_types,
+            "total_directories": tree.directory_count,
+            "total_files": tree.file_count,
+            "file_types": tree.count_file_types(),
             "revolutionary_metrics": {
                 "complexity_score": self._calculate_complexity_score(structure),
                 "innovation_score": self._calculate_innovation_score(structure),
@@ -443,163 +670,29 @@ class FilesystemAgent:
         
         return opportunities
     
-    async def generate_code_stubs(self, structure: Dict[str, Any]) -> Dict[str, str]:
+    async def generate_code_stubs(self, structure: Dict[str, Any], batch_size: int = 512) -> Dict[str, str]:
         """Generate code stubs for the files in the structure
         
+        Stubs are rendered from compiled per-type templates, one batch at a
+        time in a worker thread, so large structures never block the event
+        loop. Rendering is pure Python and holds the GIL, so batches run one
+        after another rather than on a pool.
+        
         Args:
             structure: The generated file structure
+            batch_size: Number of stubs rendered per worker-thread call
             
         Returns:
             Dictionary mapping file paths to generated code stubs
         """
         self.logger.info("Generating code stubs with first-principles thinking")
         
+        files = list(ProjectTree.from_filesystem_schema(structure).iter_files())
+        templates = {file_type: compile_template(source) for file_type, source in self.stub_templates.items()}
         stubs = {}
         
-        # Function to recursively process files
-        async def process_files(struct, current_path=""):
-            # Process files in this directory
-            for file_name, file_info in struct.get("files", {}).items():
-                file_path = os.path.join(current_path, file_name) if current_path else file_name
-                
-                # Generate stub based on file type and purpose
-                stub = await self._generate_stub_for_file(file_path, file_info)
-                stubs[file_path] = stub
-            
-            # Process nested directories
-            for dir_name, dir_info in struct.get("directories", {}).items():
-                dir_path = os.path.join(current_path, dir_name) if current_path else dir_name
-                await process_files(dir_info, dir_path)
-        
-        # Start processing
-        await process_files(structure)
+        for i in range(0, len(files), batch_size):
+            stubs.update(await asyncio.to_thread(_render_stub_batch, templates, files[i:i + batch_size]))
         
         self.logger.info(f"Generated {len(stubs)} code stubs")
         return stubs
-    
-    async def _generate_stub_for_file(self, file_path: str, file_info: Dict[str, Any]) -> str:
-        """Generate a code stub for a specific file
-        
-        Args:
-            file_path: Path to the file
-            file_info: Information about the file
-            
-        Returns:
-            Generated code stub
-        """
-        file_type = file_info.get("type", "other")
-        description = file_info.get("description", "")
-        content_template = file_info.get("content_template", "")
-        
-        # Basic templates for different file types
-        if file_type == "python_module":
-            return f'''"""
-{description}
-
-Generated by OmnitrAIce FilesystemAgent with first-principles thinking
-"""
-
-# This module implements: {content_template}
-
-class RevolutionaryImplementation:
-    """A revolutionary implementation using first-principles thinking"""
-    
-    def __init__(self):
-        """Initialize with first-principles approach"""
-        pass
-    
-    def execute(self):
-        """Execute the revolutionary implementation"""
-        # TODO: Implement with first-principles thinking
-        pass
-'''
-        
-        elif file_type == "configuration":
-            return f'''# Configuration file: {file_path}
-# Purpose: {description}
-# Generated by OmnitrAIce FilesystemAgent with first-principles thinking
-
-# This configuration defines: {content_template}
-
-# Revolutionary configuration structure using first-principles thinking
-config = {{
-    # Core functionality configuration
-    "core": {{
-        "enabled": True,
-        "optimization_level": "revolutionary"
-    }},
-    
-    # Advanced functionality configuration
-    "advanced": {{
-        "first_principles_mode": True,
-        "constraint_elimination": "aggressive"
-    }}
-}}
-'''
-        
-        elif file_type == "documentation":
-            return f'''# {os.path.basename(file_path)}
-
-{description}
-
-## Overview
-
-This document provides details about: {content_template}
-
-## First-Principles Analysis
-
-* Breaking down the problem to its fundamental components
-* Challenging conventional approaches
-* Focusing on 10x improvements
-
-## Revolutionary Approach
-
-* Implementing revolutionary solutions
-* Eliminating artificial constraints
-* Designing for exponential scaling
-
-Generated by OmnitrAIce FilesystemAgent with first-principles thinking
-'''
-        
-        elif file_type == "test":
-            component_name = os.path.basename(file_path).replace("test_", "").replace(".py", "")
-            return f'''"""
-Tests for {component_name}
-
-Generated by OmnitrAIce FilesystemAgent with first-principles thinking
-"""
-
-import unittest
-
-# This test suite validates: {content_template}
-
-class Revolutionary{component_name.capitalize()}Test(unittest.TestCase):
-    """Test suite using first-principles thinking"""
-    
-    def setUp(self):
-        """Set up the test environment"""
-        pass
-    
-    def test_revolutionary_functionality(self):
-        """Test revolutionary functionality using first-principles approach"""
-        # TODO: Implement first-principles tests
-        pass
-    
-    def test_exponential_scaling(self):
-        """Test exponential scaling capabilities"""
-        # TODO: Implement scaling tests
-        pass
-
-if __name__ == "__main__":
-    unittest.main()
-'''
-        
-        else:  # Other file types
-            return f'''# {file_path}
-# Purpose: {description}
-# Generated by OmnitrAIce FilesystemAgent with first-principles thinking
-
-# This file implements: {content_template}
-
-# TODO: Generate revolutionary content with first-principles thinking
-'''
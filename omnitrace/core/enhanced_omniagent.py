@@ -4,18 +4,23 @@ Enhanced OmniAgent - Extends core agent with customization capabilities
 
 import asyncio
 import os
-import json
 import logging
 from typing import Dict, Any, List, Optional
 
 # Import from new structure, with fallbacks for compatibility
 try:
     from omnitrace.core.omniagent import OmniAgent
+    from omnitrace.utils.template_cache import get_template_cache, template_path, compile_role_template, TEMPLATES_DIR
+    from omnitrace.utils.template_versions import TemplateVersionStore, SHORT_HASH
 except ImportError:
     try:
         from core.omniagent import OmniAgent
+        from utils.template_cache import get_template_cache, template_path, compile_role_template, TEMPLATES_DIR
+        from utils.template_versions import TemplateVersionStore, SHORT_HASH
     except ImportError:
         from omniagent import OmniAgent
+        from template_cache import get_template_cache, template_path, compile_role_template, TEMPLATES_DIR
+        from template_versions import TemplateVersionStore, SHORT_HASH
 
 class EnhancedOmniAgent(OmniAgent):
     """Enhanced OmniAgent with customizable agent interface"""
@@ -31,30 +36,25 @@ class EnhancedOmniAgent(OmniAgent):
 
     def _load_custom_templates(self):
         """Load saved custom templates"""
-        templates_dir = os.path.join("config", "templates")
-        if os.path.exists(templates_dir):
-            for file_name in os.listdir(templates_dir):
-                if file_name.endswith(".json"):
-                    role = file_name.split("_")[0]  
-                    file_path = os.path.join(templates_dir, file_name)
-                    try:
-                        with open(file_path, "r", encoding="utf-8") as f:
-                            template = json.load(f)
-                        self.custom_templates[role] = template
-                        self.logger.info(f"Loaded custom template for {role} from {file_path}")
-                    except Exception as e:
-                        self.logger.error(f"Failed to load custom template from {file_path}: {str(e)}")
+        self.custom_templates = get_template_cache().load_dir(TEMPLATES_DIR, suffix=".json")
+        for role in self.custom_templates:
+            self.logger.info(f"Loaded custom template for {role}")
+
+    def _on_template_changed(self, path: str) -> None:
+        """Refresh the custom template and the role's chain when a template file changes"""
+        super()._on_template_changed(path)
+        if hasattr(self, "custom_templates") and os.path.dirname(path) == os.path.abspath(TEMPLATES_DIR):
+            self._load_custom_templates()
 
     def save_custom_template(self, role: str, template: str):
         """Save a custom template for an agent role"""
-        templates_dir = os.path.join("config", "templates")
-        os.makedirs(templates_dir, exist_ok=True)
-
-        file_path = os.path.join(templates_dir, f"{role}_template.json")
         try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump({"template": template}, f, ensure_ascii=False, indent=2)
-            self.custom_templates[role] = template
+            # Reject unknown variables now rather than at the next LLM call
+            compile_role_template(role, template)
+            # Subscribers (this agent's chain included) rebuild from the saved template
+            get_template_cache().write(template_path(role), {"template": template})
+            version = TemplateVersionStore(logger=self.logger).put(role, template)
+            self.logger.info(f"Saved custom template for {role} (version {version[:SHORT_HASH]})")
             return True
         except Exception as e:
             self.logger.error(f"Failed to save custom template for {role}: {str(e)}")
@@ -25,6 +25,36 @@ except ImportError:
             # For backwards compatibility, CTO agent might not be available
             CTOAgent = None
 
+# Staged, atomic project output, the shared template cache and template versions
+try:
+    from omnitrace.utils.staging import ProjectStaging, PROJECTS_ROOT
+    from omnitrace.utils.template_cache import get_template_cache, template_path, compile_role_template
+    from omnitrace.utils.prompt_compaction import compact_prompt
+    from omnitrace.utils.template_versions import TemplateVersionStore
+except ImportError:
+    try:
+        from utils.staging import ProjectStaging, PROJECTS_ROOT
+        from utils.template_cache import get_template_cache, template_path, compile_role_template
+        from utils.prompt_compaction import compact_prompt
+        from utils.template_versions import TemplateVersionStore
+    except ImportError:
+        from staging import ProjectStaging, PROJECTS_ROOT
+        from template_cache import get_template_cache, template_path, compile_role_template
+        from prompt_compaction import compact_prompt
+        from template_versions import TemplateVersionStore
+
+# Template variable -> project state field it is filled from
+STATE_VARIABLES = {
+    "context": "context",
+    "decisions": "decisions",
+    "technical_decisions": "technical_decisions",
+    "designs": "designs",
+    "work": "work",
+    "vision": "decisions",  # CEO's decisions as vision
+    "design": "designs",  # Architect's designs
+    "tech_strategy": "technical_decisions"  # CTO's technical strategy
+}
+
 class OmniAgent:
     """Main OmniAgent system for revolutionary project generation using first-principles thinking"""
 
@@ -37,11 +67,14 @@ class OmniAgent:
         # Load agent templates from files if available
         self.agent_templates = self._load_agent_templates()
         
-        # Initialize agent chains
-        self.agent_chains = {
-            role: ChatPromptTemplate.from_template(template) | self.llm
-            for role, template in self.agent_templates.items()
-        }
+        # Agent chains, built on first use of each role
+        self.agent_chains = {}
+        
+        # Roles pinned to a stored template version; file changes leave them alone
+        self.pinned_roles = set()
+        
+        # Rebuild a role's chain when its template file changes
+        get_template_cache().subscribe(self._on_template_changed)
         
         # Project state
         self.project_state = {
@@ -62,14 +95,6 @@ class OmniAgent:
     
     def _load_agent_templates(self) -> Dict[str, str]:
         """Load agent templates from files if available, otherwise use defaults"""
-        templates_dir = os.path.join("config", "templates")
-        template_files = {
-            "ceo": os.path.join(templates_dir, "ceo_template.json"),
-            "cto": os.path.join(templates_dir, "cto_template.json"),
-            "architect": os.path.join(templates_dir, "architect_template.json"),
-            "developer": os.path.join(templates_dir, "developer_template.json")
-        }
-        
         # Default templates with first-principles thinking
         default_templates = {
             "ceo": """
@@ -158,21 +183,111 @@ class OmniAgent:
             """
         }
         
+        self._default_templates = default_templates
+        
         # Load templates from files if they exist
-        templates = {}
-        for role, file_path in template_files.items():
-            if os.path.exists(file_path):
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        data = json.load(f)
-                        templates[role] = data.get("template", default_templates[role])
-                except Exception as e:
-                    self.logger.error(f"Failed to load template for {role}: {str(e)}")
-                    templates[role] = default_templates[role]
-            else:
-                templates[role] = default_templates[role]
+        return {role: self._load_agent_template(role) for role in default_templates}
+    
+    def _load_agent_template(self, role: str) -> str:
+        """Load one role's template through the template cache, falling back to its default
+        
+        A template that uses variables the role never fills is rejected here,
+        before any LLM call, like a file that is not valid JSON.
+        """
+        try:
+            data = get_template_cache().load(template_path(role)) or {}
+            if "template" in data:
+                compile_role_template(role, data["template"])
+        except Exception as e:
+            self.logger.error(f"Failed to load template for {role}: {str(e)}")
+            data = {}
+        return data.get("template", self._default_templates[role])
+    
+    def validate_templates(self) -> Dict[str, List[str]]:
+        """Check every role's template before a run makes its first LLM call
+        
+        Returns:
+            Variables each role's template uses
+            
+        Raises:
+            ValueError: If a template has unbalanced braces or unknown variables
+        """
+        return {
+            role: sorted(compile_role_template(role, template).variables)
+            for role, template in self.agent_templates.items()
+        }
+    
+    def _run_templates(self) -> Dict[str, str]:
+        """Template text of every role a run uses"""
+        return dict(self.agent_templates)
+    
+    def template_versions(self, store: Optional[TemplateVersionStore] = None,
+                          templates: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Content hashes of the templates a run uses, each kept in a version store
+        
+        The hashes identify the exact prompts behind a run's results: record
+        them with the run and key any cache of agent output on them.
+        
+        Args:
+            store: Version store to keep them in, e.g. the project's
+                (default: the one next to the templates)
+            templates: Templates captured when the run started (default: the current ones)
+        
+        Returns:
+            Mapping of role to template hash
+        """
+        store = store or TemplateVersionStore(logger=self.logger)
+        templates = self._run_templates() if templates is None else templates
+        return {role: store.put(role, template) for role, template in templates.items()}
+    
+    def use_template_versions(self, versions: Dict[str, str], store: Optional[TemplateVersionStore] = None) -> None:
+        """Run with stored template versions instead of the current templates
         
-        return templates
+        Args:
+            versions: Mapping of role to template hash (or unique hash prefix),
+                as recorded by ``template_versions()``
+            store: Version store to look them up in first, e.g. the project's;
+                the one next to the templates is always searched as well
+                
+        Raises:
+            ValueError: If a version is not stored or does not fit its role
+        """
+        stores = [store] if store else []
+        stores.append(TemplateVersionStore(logger=self.logger))
+        for role, digest in versions.items():
+            record = None
+            for candidate in stores:
+                record = candidate.get(digest)
+                if record is not None:
+                    break
+            if record is None:
+                raise ValueError(f"Template version {digest} for {role} is not stored")
+            compile_role_template(role, record["template"])
+            self._use_template(role, record["template"])
+            self.logger.info(f"Using {role} template version {digest}")
+    
+    def _use_template(self, role: str, template: str) -> None:
+        """Replace a role's template; its chain is rebuilt on next use"""
+        if role in self.agent_templates:
+            self.agent_templates[role] = template
+            self.agent_chains.pop(role, None)
+            self.pinned_roles.add(role)
+    
+    def _agent_chain(self, role: str):
+        """Prompt chain of a role, built on first use"""
+        chain = self.agent_chains.get(role)
+        if chain is None:
+            chain = ChatPromptTemplate.from_template(compact_prompt(self.agent_templates[role])) | self.llm
+            self.agent_chains[role] = chain
+        return chain
+    
+    def _on_template_changed(self, path: str) -> None:
+        """Reload the template of the role whose file changed; its chain is rebuilt on next use"""
+        for role in self._default_templates:
+            if role not in self.pinned_roles and path == os.path.abspath(template_path(role)):
+                self.agent_templates[role] = self._load_agent_template(role)
+                self.agent_chains.pop(role, None)
+                self.logger.info(f"Reloaded template for {role}")
     
     def _save_file_with_encoding(self, file_path: str, content: str) -> bool:
         """Save file with UTF-8 encoding to handle special characters"""
@@ -196,26 +311,20 @@ class OmniAgent:
         to their fundamental components and reason up from there.
         """
         try:
-            # Prepare context
-            context = {
-                "context": self.project_state["context"],
-                "task": task,
-                "decisions": self.project_state["decisions"],
-                "technical_decisions": self.project_state["technical_decisions"],
-                "designs": self.project_state["designs"],
-                "work": self.project_state["work"],
-                "vision": self.project_state["decisions"],  # CEO's decisions as vision
-                "design": self.project_state["designs"],  # Architect's designs
-                "tech_strategy": self.project_state["technical_decisions"]  # CTO's technical strategy
-            }
+            # Prepare only the context the template uses (checked before the call)
+            variables = compile_role_template(role, self.agent_templates[role]).variables
+            context = {name: self.project_state[STATE_VARIABLES[name]] for name in variables if name in STATE_VARIABLES}
+            context["task"] = task
             
-            # Add any additional context
+            # Add any additional context the template uses
             if additional_context:
-                context.update(additional_context)
+                context.update((name, value) for name, value in additional_context.items() if name in variables)
+            for name in variables - context.keys():
+                context[name] = ""
             
             # Process with agent
             self.logger.info(f"Applying first-principles thinking with {role.upper()} agent to: {task}")
-            chain = self.agent_chains[role]
+            chain = self._agent_chain(role)
             result = await asyncio.to_thread(chain.invoke, context)
             
             # Extract response
@@ -241,7 +350,11 @@ class OmniAgent:
 
     async def create_project(self, name: str, description: str) -> Dict[str, Any]:
         """Create revolutionary project using first-principles thinking and agent collaboration"""
+        staging = None
         try:
+            # Fail on a broken template before the first LLM call
+            self.validate_templates()
+            
             # Reset project state
             self.project_state = {key: "" for key in self.project_state}
             
@@ -282,8 +395,11 @@ class OmniAgent:
             # Create project structure
             # Strip whitespace from project name to avoid path issues
             safe_name = name.strip()
-            output_dir = os.path.join("projects", safe_name)
-            os.makedirs(output_dir, exist_ok=True)
+            
+            # Write everything to a private staging directory; it is renamed
+            # into projects/<name> only once all outputs are complete
+            staging = ProjectStaging(PROJECTS_ROOT, safe_name, logger=self.logger)
+            output_dir = staging.begin()
             
             # Save project documentation
             docs_dir = os.path.join(output_dir, "docs")
@@ -369,6 +485,9 @@ This revolutionary project was generated by OmnitrAIce using first-principles th
 """
             self._save_file_with_encoding(os.path.join(output_dir, "README.md"), summary_content)
             
+            # Rename the complete project into place
+            output_dir = await asyncio.to_thread(staging.commit)
+            
             return {
                 "status": "success",
                 "output_dir": output_dir,
@@ -385,6 +504,8 @@ This revolutionary project was generated by OmnitrAIce using first-principles th
             
         except Exception as e:
             self.logger.error(f"Project creation failed: {str(e)}")
+            if staging is not None:
+                staging.abort()
             return {"status": "error", "error": str(e)}
 
     async def run(self):
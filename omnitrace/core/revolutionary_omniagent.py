@@ -39,21 +39,70 @@ except ImportError:
 # Import revolutionary capabilities with fallbacks
 try:
     from omnitrace.generation.code_generator import RevolutionaryCodeGenerator
+    from omnitrace.generation.doc_generator import DocumentationGenerator
+    from omnitrace.generation.doc_pipeline import (
+        DocumentPipeline, DEFERRABLE_DOC_TYPES, save_document_inputs, document_links, project_template_versions,
+        structure_analysis_inputs, code_analysis_inputs
+    )
+    from omnitrace.generation.test_runner import GeneratedTestRunner
     from omnitrace.utils.first_principles import FirstPrinciplesAnalyzer, RevolutionaryApproach, PromptEnhancer
 except ImportError:
     try:
         from generation.code_generator import RevolutionaryCodeGenerator
+        from generation.doc_generator import DocumentationGenerator
+        from generation.doc_pipeline import (
+            DocumentPipeline, DEFERRABLE_DOC_TYPES, save_document_inputs, document_links, project_template_versions,
+            structure_analysis_inputs, code_analysis_inputs
+        )
+        from generation.test_runner import GeneratedTestRunner
         from utils.first_principles import FirstPrinciplesAnalyzer, RevolutionaryApproach, PromptEnhancer
     except ImportError:
         try:
             from code_generator import RevolutionaryCodeGenerator
+            from doc_generator import DocumentationGenerator
+            from doc_pipeline import (
+                DocumentPipeline, DEFERRABLE_DOC_TYPES, save_document_inputs, document_links, project_template_versions,
+                structure_analysis_inputs, code_analysis_inputs
+            )
+            from test_runner import GeneratedTestRunner
             from first_principles import FirstPrinciplesAnalyzer, RevolutionaryApproach, PromptEnhancer
         except ImportError:
             RevolutionaryCodeGenerator = None
+            DocumentationGenerator = None
+            DocumentPipeline = None
+            DEFERRABLE_DOC_TYPES = []
+            save_document_inputs = None
+            document_links = None
+            project_template_versions = None
+            structure_analysis_inputs = None
+            code_analysis_inputs = None
+            GeneratedTestRunner = None
             FirstPrinciplesAnalyzer = None
             RevolutionaryApproach = None
             PromptEnhancer = None
 
+# Staged, atomic project output, cross-project deduplication, the stage event log
+# the baseline hashes of generated code and the template versions of each run
+try:
+    from omnitrace.utils.staging import ProjectStaging, PROJECTS_ROOT
+    from omnitrace.utils.blob_store import BlobStore
+    from omnitrace.utils.project_history import ProjectHistory
+    from omnitrace.utils.materializer import record_generated_hashes
+    from omnitrace.utils.template_versions import TemplateVersionStore
+except ImportError:
+    try:
+        from utils.staging import ProjectStaging, PROJECTS_ROOT
+        from utils.blob_store import BlobStore
+        from utils.project_history import ProjectHistory
+        from utils.materializer import record_generated_hashes
+        from utils.template_versions import TemplateVersionStore
+    except ImportError:
+        from staging import ProjectStaging, PROJECTS_ROOT
+        from blob_store import BlobStore
+        from project_history import ProjectHistory
+        from materializer import record_generated_hashes
+        from template_versions import TemplateVersionStore
+
 class UnifiedOmniAgent(EnhancedOmniAgent):
     """
     Unified OmniAgent that integrates all revolutionary capabilities:
@@ -80,13 +129,21 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
         
         # Initialize revolutionary capabilities if available
         self.code_generator = RevolutionaryCodeGenerator(self.llm) if RevolutionaryCodeGenerator else None
+        self.doc_generator = DocumentationGenerator(self.llm) if DocumentationGenerator else None
         self.first_principles = FirstPrinciplesAnalyzer() if FirstPrinciplesAnalyzer else None
         self.revolutionary_approach = RevolutionaryApproach() if RevolutionaryApproach else None
         self.prompt_enhancer = PromptEnhancer() if PromptEnhancer else None
         
         # Configuration flags
         self.enable_code_gen: bool = True
+        self.stream_code_to_disk: bool = False
+        self.max_repair_attempts: int = 2
+        self.run_generated_tests: bool = False
+        self.test_timeout: float = 30.0
         self.enable_file_structure: bool = True
+        self.incremental_structure: bool = False
+        self.lazy_docs: bool = False
+        self.dedup_link_mode: Optional[str] = None
         self.revolution_level: str = "maximum"
         self.constraint_elimination: str = "aggressive"
         
@@ -147,6 +204,66 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
         self.enable_code_gen = enabled
         self.logger.info(f"Code generation {'enabled' if enabled else 'disabled'}")
         
+    def enable_code_streaming(self, enabled: bool = True) -> None:
+        """Enable or disable streaming generated code straight to disk.
+        
+        When enabled, each file is written as completion chunks arrive and
+        code analysis reads the files back from disk, so generated code is
+        never held in memory for the whole project.
+        
+        Args:
+            enabled: Whether code streaming is enabled
+        """
+        self.stream_code_to_disk = enabled
+        self.logger.info(f"Code streaming {'enabled' if enabled else 'disabled'}")
+        
+    def enable_test_execution(self, enabled: bool = True, timeout: Optional[float] = None) -> None:
+        """Enable or disable running the generated test files.
+        
+        Each generated test file runs in its own subprocess with a timeout.
+        Results are cached by the content of the test and the code under
+        test, so unchanged tests are not re-run.
+        
+        Args:
+            enabled: Whether generated tests are executed
+            timeout: Optional per-test timeout in seconds
+        """
+        self.run_generated_tests = enabled
+        if timeout is not None:
+            self.test_timeout = timeout
+        self.logger.info(f"Generated test execution {'enabled' if enabled else 'disabled'}")
+        
+    def enable_structured_output(self, enabled: bool = True, mode: str = "schema",
+                                 max_retries: Optional[int] = None) -> None:
+        """Enable or disable schema-constrained file structure responses.
+        
+        Structure requests then carry the structure's JSON schema ("schema")
+        or Ollama's JSON format mode ("json"), so the response is valid JSON
+        by construction instead of being repaired or retried after the fact.
+        
+        Args:
+            enabled: Whether structure requests carry a response format
+            mode: "schema" or "json"
+            max_retries: Optional number of retries for unparseable or invalid responses
+        """
+        if hasattr(self.filesystem_agent, "enable_structured_output"):
+            self.filesystem_agent.enable_structured_output(enabled, mode=mode, max_retries=max_retries)
+        self.logger.info(f"Structured output {'enabled (' + mode + ')' if enabled else 'disabled'}")
+        
+    def enable_section_parallel_docs(self, enabled: bool = True) -> None:
+        """Enable or disable section-parallel generation of LLM-written documents.
+        
+        Documents that cannot be derived from a stage output are generated as
+        a short outline followed by all sections concurrently, instead of one
+        long sequential response.
+        
+        Args:
+            enabled: Whether documents are generated section by section
+        """
+        if hasattr(self.doc_generator, "enable_section_parallel"):
+            self.doc_generator.enable_section_parallel(enabled)
+        self.logger.info(f"Section-parallel documents {'enabled' if enabled else 'disabled'}")
+        
     def to_enhanced_agent(self):
         """Convert this UnifiedOmniAgent to an EnhancedOmniAgent for backward compatibility.
         
@@ -190,6 +307,48 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
         self.enable_file_structure = enabled
         self.logger.info(f"File structure generation {'enabled' if enabled else 'disabled'}")
         
+    def enable_incremental_structure(self, enabled: bool = True) -> None:
+        """Enable or disable incremental re-materialization of existing projects.
+        
+        When enabled, regenerating a project starts from its current files and
+        the new structure is diffed against the previous one: only added,
+        changed or removed files are touched, unchanged files are skipped by
+        content hash, and hand-edited files are preserved.
+        
+        Args:
+            enabled: Whether file structures are applied incrementally
+        """
+        self.incremental_structure = enabled
+        self.logger.info(f"Incremental structure {'enabled' if enabled else 'disabled'}")
+        
+    def enable_lazy_docs(self, enabled: bool = True) -> None:
+        """Enable or disable on-demand rendering of analysis documents.
+        
+        When enabled, structure_analysis.md, code_analysis.md and
+        project_history.md are not written during generation; their inputs
+        are stored compressed in the project and each document is rendered
+        (without LLM calls) the first time it is shown.
+        
+        Args:
+            enabled: Whether analysis documents are deferred
+        """
+        self.lazy_docs = enabled
+        self.logger.info(f"Lazy documents {'enabled' if enabled else 'disabled'}")
+        
+    def enable_artifact_dedup(self, enabled: bool = True, link_mode: str = "reflink") -> None:
+        """Enable or disable deduplication of project files in the blob store.
+        
+        Before a project is committed, each of its files is replaced by a
+        reflink or hard link to a content-addressed blob under
+        ``projects/.blobs``, so identical files across projects are stored once.
+        
+        Args:
+            enabled: Whether generated projects are deduplicated
+            link_mode: "reflink" (copy-on-write, where supported) or "hardlink"
+        """
+        self.dedup_link_mode = link_mode if enabled else None
+        self.logger.info(f"Artifact deduplication {'enabled (' + link_mode + ')' if enabled else 'disabled'}")
+        
     def get_available_agents(self) -> List[str]:
         """Get a list of all available agents in the system.
         
@@ -218,7 +377,14 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
             "revolution_level": self.revolution_level,
             "constraint_elimination": self.constraint_elimination,
             "code_generation": self.enable_code_gen,
+            "code_streaming": self.stream_code_to_disk,
+            "test_execution": self.run_generated_tests,
+            "structured_output": getattr(self.filesystem_agent, "structured_output", None),
+            "section_parallel_docs": getattr(self.doc_generator, "section_parallel", False),
             "file_structure_generation": self.enable_file_structure,
+            "incremental_structure": self.incremental_structure,
+            "lazy_docs": self.lazy_docs,
+            "artifact_dedup": self.dedup_link_mode,
             "first_principles_metrics": {
                 "innovation_score": 0.85,  # Placeholder, would be calculated dynamically
                 "disruption_factor": 0.90, # Placeholder
@@ -228,6 +394,43 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
         
         return metrics
         
+    def use_project_templates(self, project_dir: str) -> Dict[str, str]:
+        """Run with the template versions an earlier project was generated with
+        
+        Args:
+            project_dir: Directory of the earlier project
+            
+        Returns:
+            Mapping of role to template hash now in use
+            
+        Raises:
+            ValueError: If the project recorded no template versions, or one is not stored
+        """
+        versions = project_template_versions(project_dir)
+        if not versions:
+            raise ValueError(f"No template versions recorded for project: {os.path.basename(project_dir)}")
+        self.use_template_versions(versions, TemplateVersionStore.in_project(project_dir, self.logger))
+        return versions
+    
+    def _run_templates(self) -> Dict[str, str]:
+        """Template text of every role a run uses, the specialized agents' included"""
+        templates = super()._run_templates()
+        if self.cto_agent:
+            templates["cto"] = self.cto_agent.template
+        if self.enable_file_structure and self.filesystem_agent:
+            templates["filesystem"] = self.filesystem_agent.template
+        return templates
+    
+    def _use_template(self, role: str, template: str) -> None:
+        """Replace a role's template on the agent that runs the role"""
+        super()._use_template(role, template)
+        if role == "cto" and self.cto_agent:
+            self.cto_agent.template = template
+            self.cto_agent.chain = None
+            self.cto_agent._fixed_template = True
+        elif role == "filesystem" and self.filesystem_agent:
+            self.filesystem_agent.template = template
+    
     async def create_project(self, name: str, description: str) -> Dict[str, Any]:
         """Create revolutionary project using the unified agent system.
         
@@ -248,14 +451,23 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
         self.logger.info(f"Using revolution level: {self.revolution_level}")
         self.logger.info(f"Using constraint elimination: {self.constraint_elimination}")
         
+        staging = None
         try:
+            # Fail on a broken template before the first LLM call
+            self.validate_templates()
+            
             # Apply first-principles analysis to the project description
             fp_analysis = None
             revolutionary_analysis = None
             
+            history = ProjectHistory()
+            # The exact templates behind this run's outputs, stored with the project below
+            run_templates = self._run_templates()
             if self.first_principles and self.revolutionary_approach:
+                started = history.start()
                 fp_analysis = self.first_principles.apply_first_principles(description)
                 revolutionary_analysis = self.revolutionary_approach.apply_revolutionary_approach(fp_analysis)
+                history.record("first_principles", started, doc="docs/vision.md")
             
             # Reset project state
             self.project_state = {key: "" for key in self.project_state}
@@ -269,14 +481,17 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
             if revolutionary_analysis:
                 additional_context["first_principles_analysis"] = revolutionary_analysis
                 
+            started = history.start()
             vision = await self.process_with_agent(
                 "ceo",
                 f"Create a revolutionary vision for {name} using first-principles thinking: {description}",
                 additional_context
             )
+            history.record("vision", started, role="ceo", output=vision, doc="docs/vision.md")
             
             # Step 2: CTO Agent - Revolutionary Technical Strategy
             self.logger.info("CTO Agent: Developing revolutionary technical strategy with first-principles thinking...")
+            started = history.start()
             if self.cto_agent:
                 # Use specialized CTO agent if available
                 tech_strategy = await self.cto_agent.process(
@@ -293,6 +508,7 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
                     f"Develop revolutionary technical strategy for {name} using first-principles thinking",
                     {"vision": vision, "first_principles_analysis": revolutionary_analysis} if revolutionary_analysis else {"vision": vision}
                 )
+            history.record("tech_strategy", started, role="cto", output=tech_strategy, doc="docs/technical_strategy.md")
             
             # Step 3: Architect Agent - Revolutionary Technical Design
             self.logger.info("Architect Agent: Creating revolutionary technical design with first-principles thinking...")
@@ -300,11 +516,13 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
             if revolutionary_analysis:
                 architect_context["first_principles_analysis"] = revolutionary_analysis
                 
+            started = history.start()
             design = await self.process_with_agent(
                 "architect",
                 f"Create revolutionary technical design for {name} using first-principles thinking",
                 architect_context
             )
+            history.record("design", started, role="architect", output=design, doc="docs/architecture.md")
             
             # Step 4: Developer Agent - Revolutionary Implementation Plan
             self.logger.info("Developer Agent: Planning revolutionary implementation with first-principles thinking...")
@@ -312,17 +530,26 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
             if revolutionary_analysis:
                 developer_context["first_principles_analysis"] = revolutionary_analysis
                 
+            started = history.start()
             implementation = await self.process_with_agent(
                 "developer",
                 f"Plan revolutionary implementation for {name} using first-principles thinking",
                 developer_context
             )
+            history.record("implementation", started, role="developer", output=implementation,
+                           doc="docs/implementation.md")
             
             # Create project structure
             # Strip whitespace from project name to avoid path issues
             safe_name = name.strip().replace(" ", "_")
-            output_dir = os.path.join("projects", safe_name)
-            os.makedirs(output_dir, exist_ok=True)
+            
+            # Write everything to a private staging directory; it is renamed
+            # into projects/<name> only once all outputs are complete
+            staging = ProjectStaging(PROJECTS_ROOT, safe_name, logger=self.logger)
+            output_dir = staging.begin(seed=self.incremental_structure)
+            history.templates = await asyncio.to_thread(
+                self.template_versions, TemplateVersionStore.in_project(output_dir, self.logger), run_templates
+            )
             
             # Track generated files
             generated_files = []
@@ -332,77 +559,46 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
             os.makedirs(docs_dir, exist_ok=True)
             generated_files.append(docs_dir)
             
-            # Save vision document with metadata
-            vision_content = f"""# Revolutionary Project Vision
-
-## Project Details
-- Name: {safe_name}
-- Description: {description}
-- Generated: {timestamp}
-- Revolution Level: {self.revolution_level}
-- Constraint Elimination: {self.constraint_elimination}
-
-## First-Principles Vision Analysis
-{vision}
-"""
-            if revolutionary_analysis:
-                vision_content += "\n## Revolutionary Analysis Summary\n"
-                vision_content += json.dumps(revolutionary_analysis, indent=2)
-                
-            vision_path = os.path.join(docs_dir, "vision.md")
-            self._save_file_with_encoding(vision_path, vision_content)
-            generated_files.append(vision_path)
-            
-            # Save architecture document with metadata
-            arch_content = f"""# Revolutionary Technical Architecture
-
-## Project Details
-- Name: {safe_name}
-- Generated: {timestamp}
-- Revolution Level: {self.revolution_level}
-
-## First-Principles Architecture Analysis
-{design}
-"""
-            arch_path = os.path.join(docs_dir, "architecture.md")
-            self._save_file_with_encoding(arch_path, arch_content)
-            generated_files.append(arch_path)
-            
-            # Save technical strategy document with metadata
-            tech_content = f"""# Revolutionary Technical Strategy
-
-## Project Details
-- Name: {safe_name}
-- Generated: {timestamp}
-- Revolution Level: {self.revolution_level}
-
-## First-Principles Technical Strategy
-{tech_strategy}
-"""
-            tech_path = os.path.join(docs_dir, "technical_strategy.md")
-            self._save_file_with_encoding(tech_path, tech_content)
-            generated_files.append(tech_path)
+            # The stage outputs above already are the vision, strategy, architecture
+            # and implementation documents: render them instead of regenerating them,
+            # and only spend an LLM call on a stage that produced nothing
+            doc_meta = {
+                "name": safe_name,
+                "description": description,
+                "generated": timestamp,
+                "revolution_level": self.revolution_level,
+                "constraint_elimination": self.constraint_elimination,
+                "revolutionary_analysis": revolutionary_analysis,
+                "generator": f"UnifiedOmniAgent v{self.version}"
+            }
+            stage_outputs = {
+                "vision": vision,
+                "tech_strategy": tech_strategy,
+                "design": design,
+                "implementation": implementation
+            }
+            doc_pipeline = DocumentPipeline(self.doc_generator, logger=self.logger)
+            doc_paths = await doc_pipeline.build(
+                ["vision", "technical_strategy", "architecture", "implementation"],
+                doc_meta, stage_outputs, output_dir
+            )
+            generated_files.extend(doc_paths.values())
             
-            # Save implementation document with metadata
-            impl_content = f"""# Revolutionary Implementation Plan
-
-## Project Details
-- Name: {safe_name}
-- Generated: {timestamp}
-- Revolution Level: {self.revolution_level}
-
-## First-Principles Implementation Details
-{implementation}
-"""
-            impl_path = os.path.join(docs_dir, "implementation.md")
-            self._save_file_with_encoding(impl_path, impl_content)
-            generated_files.append(impl_path)
+            # Inputs of the analysis documents, rendered at the end or on first request
+            analysis_inputs = {}
             
             # Step 5: Create file structure (if enabled)
             file_structure = None
+            # Files an incremental run keeps as they are (hand edits, unchanged generated code)
+            kept_paths = []
             if self.enable_file_structure and self.filesystem_agent:
                 self.logger.info("Filesystem Agent: Creating revolutionary file structure...")
+                started = history.start()
                 try:
+                    # Write each node as it streams in; incremental runs diff the
+                    # finished structure against the previous one instead
+                    on_node, streamed = (None, None) if self.incremental_structure else \
+                        self.filesystem_agent.node_writer(output_dir)
                     file_structure = await self.filesystem_agent.process(
                         f"Create revolutionary file structure for {name} using first-principles thinking",
                         {
@@ -412,38 +608,26 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
                             "design": design,
                             "implementation": implementation,
                             "filesystem_decisions": ""
-                        }
+                        },
+                        on_node=on_node
                     )
                     
                     # Create the actual files and directories
                     if file_structure:
                         self.logger.info(f"Creating file structure in {output_dir}...")
-                        created_files = await self.filesystem_agent.create_structure(output_dir, file_structure)
+                        created_files = await self.filesystem_agent.create_structure(
+                            output_dir, file_structure, incremental=self.incremental_structure, streamed=streamed
+                        )
                         generated_files.extend(created_files)
+                        kept_paths = (self.filesystem_agent.last_materialization or {}).get("kept", [])
                         
-                        # Save structure analysis
+                        # Structure analysis document inputs
                         structure_analysis = await self.filesystem_agent.analyze_structure(file_structure)
-                        structure_analysis_path = os.path.join(docs_dir, "structure_analysis.md")
-                        structure_analysis_content = f"""# Revolutionary File Structure Analysis
-
-## Project: {safe_name}
-- Generated: {timestamp}
-- Revolution Level: {self.revolution_level}
-- Constraint Elimination: {self.constraint_elimination}
-
-## Structure Metrics
-- Total Directories: {structure_analysis.get('total_directories', 0)}
-- Total Files: {structure_analysis.get('total_files', 0)}
-- Complexity Score: {structure_analysis.get('revolutionary_metrics', {}).get('complexity_score', 0)}
-- Innovation Score: {structure_analysis.get('revolutionary_metrics', {}).get('innovation_score', 0)}
-- Maintainability Score: {structure_analysis.get('revolutionary_metrics', {}).get('maintainability_score', 0)}
-- Revolutionary Impact: {structure_analysis.get('revolutionary_metrics', {}).get('revolutionary_impact', 0)}
-
-## Optimization Opportunities
-{json.dumps(structure_analysis.get('optimization_opportunities', []), indent=2)}
-"""
-                        self._save_file_with_encoding(structure_analysis_path, structure_analysis_content)
-                        generated_files.append(structure_analysis_path)
+                        analysis_inputs["structure_analysis"] = structure_analysis_inputs(
+                            structure_analysis, self.filesystem_agent.last_materialization or {}
+                        )
+                        history.record("file_structure", started, role="filesystem", doc="docs/structure_analysis.md",
+                                       files=len(created_files))
                 except Exception as e:
                     self.logger.error(f"Error creating file structure: {str(e)}")
                     # Continue with the rest of the project creation
@@ -452,6 +636,7 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
             code_analysis = None
             if self.enable_code_gen and self.code_generator and file_structure:
                 self.logger.info("Code Generator: Generating revolutionary code...")
+                started = history.start()
                 try:
                     # Prepare project context for code generation
                     project_context = {
@@ -461,117 +646,133 @@ class UnifiedOmniAgent(EnhancedOmniAgent):
                         "implementation": implementation
                     }
                     
-                    # Generate code for the project structure
-                    generated_code = await self.code_generator.generate_project_code(
-                        file_structure,
-                        project_context,
-                        output_dir
-                    )
+                    if self.stream_code_to_disk:
+                        # Stream each file to disk and analyze the files from disk
+                        generated_paths = await self.code_generator.stream_project_code(
+                            file_structure,
+                            project_context,
+                            output_dir,
+                            skip_paths=kept_paths
+                        )
+                        
+                        # Regenerate only the files that fail validation
+                        validation_report = await self.code_generator.validate_and_repair(
+                            file_structure,
+                            project_context,
+                            output_dir,
+                            rel_paths=generated_paths,
+                            max_retries=self.max_repair_attempts,
+                            stream=True
+                        )
+                        code_analysis = await self.code_generator.analyze_generated_paths(output_dir, generated_paths)
+                        generated_rel_paths = generated_paths
+                    else:
+                        # Generate code for the project structure
+                        generated_code = await self.code_generator.generate_project_code(
+                            file_structure,
+                            project_context,
+                            output_dir,
+                            skip_paths=kept_paths
+                        )
+                        
+                        # Regenerate only the files that fail validation
+                        validation_report = await self.code_generator.validate_and_repair(
+                            file_structure,
+                            project_context,
+                            output_dir,
+                            generated_files=generated_code,
+                            max_retries=self.max_repair_attempts
+                        )
+                        
+                        # Analyze the generated code
+                        code_analysis = await self.code_generator.analyze_generated_code(generated_code)
+                        generated_rel_paths = list(generated_code)
                     
-                    # Analyze the generated code
-                    code_analysis = await self.code_generator.analyze_generated_code(generated_code)
+                    # The generated (and repaired) code, not the structure's stubs, is
+                    # what the next incremental run compares the files on disk with
+                    await asyncio.to_thread(record_generated_hashes, output_dir, generated_rel_paths)
                     
-                    # Save code analysis
-                    code_analysis_path = os.path.join(docs_dir, "code_analysis.md")
-                    code_analysis_content = f"""# Revolutionary Code Analysis
-
-## Project: {safe_name}
-- Generated: {timestamp}
-- Revolution Level: {self.revolution_level}
-- Constraint Elimination: {self.constraint_elimination}
-
-## Code Metrics
-- Total Files: {code_analysis.get('total_files', 0)}
-- Total Lines: {code_analysis.get('total_lines', 0)}
-- Languages: {json.dumps(code_analysis.get('languages', {}), indent=2)}
-- Average Complexity: {code_analysis.get('average_complexity', 0)}
-
-## Revolutionary Metrics
-- Conventional Patterns: {code_analysis.get('revolutionary_metrics', {}).get('conventional_patterns', 0)}
-- Revolutionary Patterns: {code_analysis.get('revolutionary_metrics', {}).get('revolutionary_patterns', 0)}
-- Innovation Score: {code_analysis.get('revolutionary_metrics', {}).get('innovation_score', 0)}
-- Disruption Factor: {code_analysis.get('revolutionary_metrics', {}).get('disruption_factor', 0)}
-- 10x Improvement Score: {code_analysis.get('revolutionary_metrics', {}).get('10x_improvement_score', 0)}
-
-## Optimization Opportunities
-{json.dumps(code_analysis.get('optimization_opportunities', []), indent=2)}
-"""
-                    self._save_file_with_encoding(code_analysis_path, code_analysis_content)
-                    generated_files.append(code_analysis_path)
+                    # Run the generated tests (optional)
+                    test_report = None
+                    if self.run_generated_tests and GeneratedTestRunner:
+                        test_runner = GeneratedTestRunner(
+                            timeout=self.test_timeout,
+                            cache_path=os.path.join(PROJECTS_ROOT, ".omnitrace_cache", "test_results.json")
+                        )
+                        test_report = await asyncio.to_thread(
+                            test_runner.run,
+                            output_dir,
+                            generated_rel_paths + [path for path in kept_paths if path not in generated_rel_paths],
+                            staging.final_path(output_dir)
+                        )
+                    
+                    # Code analysis document inputs
+                    analysis_inputs["code_analysis"] = code_analysis_inputs(code_analysis, validation_report, test_report)
+                    history.record("code_generation", started, doc="docs/code_analysis.md",
+                                   files=len(generated_rel_paths))
                 except Exception as e:
                     self.logger.error(f"Error generating code: {str(e)}")
                     # Continue with the rest of the project creation
             
-            # Save project history with timestamps
-            history_content = f"""# Revolutionary Project Development History
-Generated: {timestamp}
-
-## Project Details
-- Name: {safe_name}
-- Description: {description}
-- Revolution Level: {self.revolution_level}
-- Constraint Elimination: {self.constraint_elimination}
-"""
-
-            if revolutionary_analysis:
-                history_content += "\n## First-Principles Analysis\n"
-                history_content += json.dumps(revolutionary_analysis, indent=2)
+            # Project history: the stage event log, linking the documents above
+            # instead of repeating the running context they were written from
+            analysis_inputs["history"] = history.to_dict()
             
-            history_content += f"\n\n## Development Timeline using First-Principles Thinking\n{self.project_state['context']}\n"
+            # Analysis documents are pure renderings: write them now, or with lazy
+            # documents store their inputs compactly and render each one the first
+            # time it is shown
+            analysis_docs = [doc_type for doc_type in DEFERRABLE_DOC_TYPES if doc_type in analysis_inputs]
+            deferred_docs = analysis_docs if self.lazy_docs else []
+            eager_docs = [doc_type for doc_type in analysis_docs if doc_type not in deferred_docs]
+            if eager_docs:
+                analysis_paths = await doc_pipeline.build(eager_docs, doc_meta, analysis_inputs, output_dir)
+                generated_files.extend(analysis_paths.values())
+            inputs_path = await asyncio.to_thread(
+                save_document_inputs, output_dir, doc_meta, analysis_inputs, deferred_docs
+            )
+            generated_files.append(inputs_path)
+            doc_pipeline.report["deferred"] = deferred_docs
             
-            history_path = os.path.join(output_dir, "project_history.md")
-            self._save_file_with_encoding(history_path, history_content)
-            generated_files.append(history_path)
+            # Create a project summary, linking the analyses that were written
+            doc_meta["extra_docs"] = document_links(eager_docs)
+            readme_paths = await doc_pipeline.build(["readme"], doc_meta, stage_outputs, output_dir)
+            generated_files.append(readme_paths["readme"])
             
-            # Create a project summary
-            summary_content = f"""# {safe_name} - Revolutionary Project
-
-## Project Overview
-This project was created using Elon Musk's first-principles thinking approach to break down the problem to its fundamental components and reason up from there: {description}
-
-## Documentation
-- [Revolutionary Project Vision](docs/vision.md)
-- [Revolutionary Technical Strategy](docs/technical_strategy.md)
-- [Revolutionary Technical Architecture](docs/architecture.md)
-- [Revolutionary Implementation Plan](docs/implementation.md)
-- [Development History](project_history.md)
-
-## Revolutionary Metrics
-- Revolution Level: {self.revolution_level}
-- Constraint Elimination: {self.constraint_elimination}
-"""
-
-            # Add file structure and code analysis if available
-            if file_structure:
-                summary_content += "- [File Structure Analysis](docs/structure_analysis.md)\n"
-            if code_analysis:
-                summary_content += "- [Code Analysis](docs/code_analysis.md)\n"
-                
-            summary_content += f"""
-## Generated
-This revolutionary project was generated by UnifiedOmniAgent v{self.version} using first-principles thinking on {timestamp}.
-"""
-            readme_path = os.path.join(output_dir, "README.md")
-            self._save_file_with_encoding(readme_path, summary_content)
-            generated_files.append(readme_path)
+            # Share identical files with other projects once every output is written
+            dedup_report = None
+            if self.dedup_link_mode:
+                blob_store = BlobStore(PROJECTS_ROOT, self.dedup_link_mode, logger=self.logger)
+                dedup_report = await asyncio.to_thread(blob_store.ingest_tree, output_dir)
+            
+            # Rename the complete project into place
+            output_dir = await asyncio.to_thread(staging.commit)
+            generated_files = [staging.final_path(path) for path in generated_files]
+            
+            # The history is an artifact only once it is written; deferred
+            # documents are listed under "documentation"
+            artifacts = {
+                "readme": "README.md",
+                "vision": "docs/vision.md",
+                "technical_strategy": "docs/technical_strategy.md",
+                "architecture": "docs/architecture.md",
+                "implementation": "docs/implementation.md"
+            }
+            if "history" in eager_docs:
+                artifacts["history"] = "project_history.md"
             
             return {
                 "status": "success",
                 "output_dir": output_dir,
                 "timestamp": timestamp,
-                "artifacts": {
-                    "readme": "README.md",
-                    "vision": "docs/vision.md",
-                    "technical_strategy": "docs/technical_strategy.md",
-                    "architecture": "docs/architecture.md",
-                    "implementation": "docs/implementation.md",
-                    "history": "project_history.md"
-                },
+                "artifacts": artifacts,
                 "revolutionary_metrics": self.get_revolutionary_metrics(),
                 "enhanced_capabilities": {
                     "file_structure": file_structure is not None,
                     "code_generation": code_analysis is not None
                 },
+                "template_versions": history.templates,
+                "artifact_dedup": dedup_report,
+                "documentation": {key: value for key, value in doc_pipeline.report.items() if key != "timings"},
                 "generated_files": generated_files
             }
             
@@ -579,4 +780,6 @@ This revolutionary project was generated by UnifiedOmniAgent v{self.version} usi
             self.logger.error(f"Project creation failed: {str(e)}")
             import traceback
             self.logger.error(traceback.format_exc())
+            if staging is not None:
+                staging.abort()
             return {"status": "error", "error": str(e)}
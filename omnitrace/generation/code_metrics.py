@@ -0,0 +1,452 @@
+"""
+Code Metrics - Real static metrics for generated code
+
+Computes line counts, AST-based cyclomatic complexity, function/class counts
+and import graphs for generated files. Large projects are analyzed in a
+process pool, and per-file results are cached by content hash so that
+re-analyzing a regenerated project only parses the files that changed.
+"""
+
+import os
+import ast
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+# Language detection by file extension
+LANGUAGE_MAP = {
+    ".py": "Python",
+    ".md": "Markdown",
+    ".json": "JSON",
+    ".yaml": "YAML",
+    ".yml": "YAML",
+    ".toml": "TOML",
+    ".ini": "INI",
+    ".sh": "Shell",
+    ".bat": "Batch",
+    ".js": "JavaScript",
+    ".html": "HTML",
+    ".css": "CSS",
+    ".sql": "SQL"
+}
+
+# AST nodes that add a branch to the control flow graph
+_DECISION_NODES = (
+    ast.If, ast.For, ast.AsyncFor, ast.While, ast.IfExp,
+    ast.ExceptHandler, ast.Assert, ast.comprehension
+)
+
+# Conventional design patterns recognised from class names
+_CONVENTIONAL_PATTERN_SUFFIXES = {
+    "Singleton": "Singleton pattern",
+    "Factory": "Factory pattern",
+    "Observer": "Observer pattern",
+    "Builder": "Builder pattern",
+    "Adapter": "Adapter pattern",
+    "Decorator": "Decorator pattern",
+    "Strategy": "Strategy pattern",
+    "Visitor": "Visitor pattern",
+    "Manager": "Manager class",
+    "Helper": "Helper class",
+}
+
+# Functions above this cyclomatic complexity are reported as optimization targets
+HIGH_COMPLEXITY_THRESHOLD = 10
+
+
+def content_hash(data: bytes) -> str:
+    """Return the SHA-256 hex digest of raw file content"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_hash(file_path: str, chunk_size: int = 1 << 16) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def count_lines(text: str) -> int:
+    """Count lines in text without splitting it into a list of copies"""
+    if not text:
+        return 0
+    return text.count("\n") + (0 if text.endswith("\n") else 1)
+
+
+def detect_language(file_path: str) -> str:
+    """Map a file path to a language name based on its extension"""
+    return LANGUAGE_MAP.get(os.path.splitext(file_path)[1].lower(), "Other")
+
+
+def module_name_for_path(file_path: str) -> str:
+    """Convert a relative Python file path to a dotted module name"""
+    module_path = os.path.splitext(file_path)[0].replace("\\", "/")
+    parts = [part for part in module_path.split("/") if part]
+    if parts and parts[-1] == "__init__":
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+def _cyclomatic_complexity(node: ast.AST) -> int:
+    """Calculate McCabe cyclomatic complexity for a function or module body
+
+    Nested function and class definitions are measured separately and are
+    not counted towards the enclosing scope.
+    """
+    complexity = 1
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            continue
+        if isinstance(child, _DECISION_NODES):
+            complexity += 1
+            if isinstance(child, ast.comprehension):
+                complexity += len(child.ifs)
+        elif isinstance(child, ast.BoolOp):
+            complexity += len(child.values) - 1
+        elif hasattr(ast, "match_case") and isinstance(child, ast.match_case):
+            complexity += 1
+        stack.extend(ast.iter_child_nodes(child))
+    return complexity
+
+
+def _resolve_import_from(module_name: str, node: ast.ImportFrom, is_package: bool) -> str:
+    """Resolve a (possibly relative) ``from ... import`` to an absolute module name"""
+    if not node.level:
+        return node.module or ""
+    package_parts = module_name.split(".") if module_name else []
+    if not is_package and package_parts:
+        package_parts = package_parts[:-1]
+    if node.level > 1:
+        package_parts = package_parts[:len(package_parts) - (node.level - 1)]
+    if node.module:
+        package_parts.append(node.module)
+    return ".".join(package_parts)
+
+
+def analyze_python_source(file_path: str, source: str) -> Dict[str, Any]:
+    """Compute AST-based metrics for a single Python source file
+
+    Args:
+        file_path: Relative path of the file (used to resolve relative imports)
+        source: Python source code
+
+    Returns:
+        Dictionary with function/class counts, complexity and imports.
+        ``syntax_error`` is set when the file cannot be parsed.
+    """
+    metrics = {
+        "functions": 0,
+        "classes": 0,
+        "function_complexities": {},
+        "module_complexity": 1,
+        "max_complexity": 0,
+        "imports": [],
+        "conventional_patterns": [],
+        "async_functions": 0,
+        "dataclasses": 0,
+        "syntax_error": None
+    }
+
+    try:
+        tree = ast.parse(source, filename=file_path)
+    except (SyntaxError, ValueError) as e:
+        metrics["syntax_error"] = str(e)
+        return metrics
+
+    module_name = module_name_for_path(file_path)
+    is_package = os.path.basename(file_path) == "__init__.py"
+    imports = set()
+    patterns = set()
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            metrics["functions"] += 1
+            if isinstance(node, ast.AsyncFunctionDef):
+                metrics["async_functions"] += 1
+            complexity = _cyclomatic_complexity(node)
+            key = f"{node.name}:{node.lineno}"
+            metrics["function_complexities"][key] = complexity
+            metrics["max_complexity"] = max(metrics["max_complexity"], complexity)
+        elif isinstance(node, ast.ClassDef):
+            metrics["classes"] += 1
+            for suffix, pattern in _CONVENTIONAL_PATTERN_SUFFIXES.items():
+                if node.name.endswith(suffix):
+                    patterns.add(pattern)
+            for decorator in node.decorator_list:
+                target = decorator.func if isinstance(decorator, ast.Call) else decorator
+                name = target.attr if isinstance(target, ast.Attribute) else getattr(target, "id", "")
+                if name == "dataclass":
+                    metrics["dataclasses"] += 1
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                imports.add(alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            resolved = _resolve_import_from(module_name, node, is_package)
+            # Imported names may be submodules; the summary resolves the longest match
+            for alias in node.names:
+                if alias.name == "*" or not resolved:
+                    imports.add(resolved or alias.name)
+                else:
+                    imports.add(f"{resolved}.{alias.name}")
+
+    metrics["module_complexity"] = _cyclomatic_complexity(tree)
+    metrics["imports"] = sorted(imports)
+    metrics["conventional_patterns"] = sorted(patterns)
+    return metrics
+
+
+def analyze_source(file_path: str, source: str) -> Dict[str, Any]:
+    """Compute metrics for one file of any language
+
+    Args:
+        file_path: Relative path of the file
+        source: File content
+
+    Returns:
+        Dictionary of per-file metrics
+    """
+    language = detect_language(file_path)
+    metrics = {
+        "path": file_path,
+        "language": language,
+        "lines": count_lines(source),
+        "bytes": len(source.encode("utf-8"))
+    }
+    if language == "Python":
+        metrics["python"] = analyze_python_source(file_path, source)
+    return metrics
+
+
+def analyze_file(file_path: str, abs_path: str) -> Dict[str, Any]:
+    """Compute metrics for one file on disk
+
+    Args:
+        file_path: Relative path of the file
+        abs_path: Absolute path to read the content from
+
+    Returns:
+        Dictionary of per-file metrics
+    """
+    with open(abs_path, "r", encoding="utf-8", errors="replace") as f:
+        return analyze_source(file_path, f.read())
+
+
+def _analyze_source_task(args: Tuple[str, str]) -> Dict[str, Any]:
+    """Process pool entry point for analyze_source"""
+    return analyze_source(*args)
+
+
+def _analyze_file_task(args: Tuple[str, str]) -> Dict[str, Any]:
+    """Process pool entry point for analyze_file"""
+    return analyze_file(*args)
+
+
+class CodeMetricsAnalyzer:
+    """Computes per-file metrics in parallel with a content-hash cache"""
+
+    def __init__(self, max_workers: Optional[int] = None, parallel_threshold: int = 32,
+                 cache_size: int = 4096, logger=None):
+        """Initialize the analyzer.
+
+        Args:
+            max_workers: Process pool size (default: CPU count)
+            parallel_threshold: Minimum number of uncached files before a process pool is used
+            cache_size: Maximum number of cached per-file results
+            logger: Optional logger instance
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _cache_key(self, file_path: str, digest: str) -> str:
+        """Cache key combining content hash and path (paths affect relative imports)"""
+        return f"{digest}:{file_path}"
+
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            metrics = self._cache.get(key)
+            if metrics is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+            return metrics
+
+    def _cache_put(self, key: str, metrics: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[key] = metrics
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def analyze_sources(self, sources: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """Compute metrics for in-memory sources
+
+        Args:
+            sources: Dictionary mapping relative file paths to content
+
+        Returns:
+            Dictionary mapping relative file paths to per-file metrics
+        """
+        results = {}
+        pending = []
+        for file_path, source in sources.items():
+            key = self._cache_key(file_path, content_hash(source.encode("utf-8")))
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[file_path] = cached
+            else:
+                pending.append((key, (file_path, source)))
+
+        self._compute(pending, _analyze_source_task, results)
+        return results
+
+    def analyze_paths(self, base_dir: str, rel_paths: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Compute metrics for files on disk
+
+        Files are hashed in chunks for the cache lookup and only re-read by
+        the worker that analyzes them, so memory use does not grow with the
+        size of the project.
+
+        Args:
+            base_dir: Directory the relative paths are resolved against
+            rel_paths: Relative paths of the files to analyze
+
+        Returns:
+            Dictionary mapping relative file paths to per-file metrics
+        """
+        results = {}
+        pending = []
+        for file_path in rel_paths:
+            abs_path = os.path.join(base_dir, file_path)
+            try:
+                key = self._cache_key(file_path, file_hash(abs_path))
+            except OSError as e:
+                self.logger.warning(f"Skipping unreadable file {abs_path}: {e}")
+                continue
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[file_path] = cached
+            else:
+                pending.append((key, (file_path, abs_path)))
+
+        self._compute(pending, _analyze_file_task, results)
+        return results
+
+    def _compute(self, pending: List[Tuple[str, Tuple[str, str]]], task, results: Dict[str, Dict[str, Any]]) -> None:
+        """Run ``task`` for each pending (cache_key, args) pair and store the results"""
+        if len(pending) >= self.parallel_threshold:
+            self.logger.info(f"Analyzing {len(pending)} files in a process pool")
+            workers = self.max_workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                computed = executor.map(
+                    task,
+                    [args for _, args in pending],
+                    chunksize=max(1, len(pending) // (4 * workers))
+                )
+                for (key, args), metrics in zip(pending, computed):
+                    self._cache_put(key, metrics)
+                    results[args[0]] = metrics
+        else:
+            for key, args in pending:
+                metrics = task(args)
+                self._cache_put(key, metrics)
+                results[args[0]] = metrics
+
+    @staticmethod
+    def summarize(file_metrics: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Aggregate per-file metrics into project-level metrics
+
+        Args:
+            file_metrics: Dictionary mapping relative file paths to per-file metrics
+
+        Returns:
+            Project-level totals, complexity statistics and the internal import graph
+        """
+        total_lines = 0
+        languages = {}
+        functions = 0
+        classes = 0
+        async_functions = 0
+        dataclasses = 0
+        complexities = []
+        complex_functions = []
+        syntax_errors = {}
+        conventional_patterns = set()
+        external_imports = {}
+        python_modules = {}
+
+        for file_path, metrics in file_metrics.items():
+            total_lines += metrics["lines"]
+            languages[metrics["language"]] = languages.get(metrics["language"], 0) + 1
+            python = metrics.get("python")
+            if not python:
+                continue
+            python_modules[module_name_for_path(file_path)] = file_path
+            if python["syntax_error"]:
+                syntax_errors[file_path] = python["syntax_error"]
+                continue
+            functions += python["functions"]
+            classes += python["classes"]
+            async_functions += python["async_functions"]
+            dataclasses += python["dataclasses"]
+            conventional_patterns.update(python["conventional_patterns"])
+            for name, complexity in python["function_complexities"].items():
+                complexities.append(complexity)
+                if complexity > HIGH_COMPLEXITY_THRESHOLD:
+                    complex_functions.append({"file": file_path, "function": name, "complexity": complexity})
+
+        # Build the import graph between generated modules
+        import_graph = {}
+        for module, file_path in python_modules.items():
+            python = file_metrics[file_path]["python"]
+            internal = set()
+            external = set()
+            for imported in python["imports"]:
+                # Match the longest generated module that prefixes the import
+                candidate = imported
+                while candidate and candidate not in python_modules:
+                    candidate = candidate.rpartition(".")[0]
+                if candidate and candidate != module:
+                    internal.add(candidate)
+                elif not candidate:
+                    external.add(imported.split(".")[0])
+            for top_level in external:
+                external_imports[top_level] = external_imports.get(top_level, 0) + 1
+            import_graph[module or "__init__"] = sorted(internal)
+
+        average_complexity = round(sum(complexities) / len(complexities), 2) if complexities else 0.0
+        low_complexity_ratio = (
+            sum(1 for c in complexities if c <= 5) / len(complexities) if complexities else 1.0
+        )
+
+        return {
+            "total_files": len(file_metrics),
+            "total_lines": total_lines,
+            "languages": languages,
+            "python_files": len(python_modules),
+            "functions": functions,
+            "classes": classes,
+            "async_functions": async_functions,
+            "dataclasses": dataclasses,
+            "average_complexity": average_complexity,
+            "max_complexity": max(complexities) if complexities else 0,
+            "low_complexity_ratio": round(low_complexity_ratio, 2),
+            "complex_functions": sorted(complex_functions, key=lambda f: -f["complexity"]),
+            "syntax_errors": syntax_errors,
+            "conventional_patterns": sorted(conventional_patterns),
+            "import_graph": import_graph,
+            "external_imports": dict(sorted(external_imports.items(), key=lambda item: -item[1]))
+        }
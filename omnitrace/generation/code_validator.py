@@ -0,0 +1,148 @@
+"""
+Code Validator - Syntax validation for generated files
+
+Syntax-checks generated Python files and parses JSON, YAML and TOML
+outputs so broken files can be regenerated individually instead of
+regenerating the whole project.
+"""
+
+import os
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+# Optional parsers for configuration formats
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# File extensions that can be validated
+VALIDATED_EXTENSIONS = {".py", ".json", ".yaml", ".yml", ".toml"}
+
+
+def is_validatable(file_path: str) -> bool:
+    """Check whether a file type is covered by validation"""
+    return os.path.splitext(file_path)[1].lower() in VALIDATED_EXTENSIONS
+
+
+def validate_content(file_path: str, content: str) -> Optional[str]:
+    """Validate the syntax of a single file
+
+    Args:
+        file_path: Path of the file (its extension selects the parser)
+        content: File content
+
+    Returns:
+        Error message, or None if the file is valid or its type is not validated
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        if ext == ".py":
+            compile(content, file_path, "exec", dont_inherit=True)
+        elif ext == ".json":
+            json.loads(content)
+        elif ext in (".yaml", ".yml") and yaml is not None:
+            # Generated YAML may legitimately contain several documents
+            for _ in yaml.safe_load_all(content):
+                pass
+        elif ext == ".toml" and tomllib is not None:
+            tomllib.loads(content)
+    except SyntaxError as e:
+        return f"SyntaxError: {e.msg} (line {e.lineno})"
+    except json.JSONDecodeError as e:
+        return f"JSONDecodeError: {e.msg} (line {e.lineno}, column {e.colno})"
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return None
+
+
+def validate_file(file_path: str, abs_path: str) -> Optional[str]:
+    """Validate the syntax of a file on disk
+
+    Args:
+        file_path: Relative path of the file
+        abs_path: Absolute path to read the content from
+
+    Returns:
+        Error message, or None if the file is valid
+    """
+    try:
+        with open(abs_path, "r", encoding="utf-8") as f:
+            return validate_content(file_path, f.read())
+    except (OSError, UnicodeDecodeError) as e:
+        return f"{type(e).__name__}: {e}"
+
+
+def _validate_content_task(args: Tuple[str, str]) -> Optional[str]:
+    """Process pool entry point for validate_content"""
+    return validate_content(*args)
+
+
+def _validate_file_task(args: Tuple[str, str]) -> Optional[str]:
+    """Process pool entry point for validate_file"""
+    return validate_file(*args)
+
+
+class CodeValidator:
+    """Validates generated files in parallel"""
+
+    def __init__(self, max_workers: Optional[int] = None, parallel_threshold: int = 32, logger=None):
+        """Initialize the validator.
+
+        Args:
+            max_workers: Process pool size (default: CPU count)
+            parallel_threshold: Minimum number of files before a process pool is used
+            logger: Optional logger instance
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.parallel_threshold = parallel_threshold
+
+    def validate_sources(self, sources: Dict[str, str]) -> Dict[str, str]:
+        """Validate in-memory sources
+
+        Args:
+            sources: Dictionary mapping relative file paths to content
+
+        Returns:
+            Dictionary mapping failing file paths to error messages
+        """
+        tasks = [(file_path, content) for file_path, content in sources.items() if is_validatable(file_path)]
+        return self._run(tasks, _validate_content_task)
+
+    def validate_paths(self, base_dir: str, rel_paths: List[str]) -> Dict[str, str]:
+        """Validate files on disk
+
+        Args:
+            base_dir: Directory the relative paths are resolved against
+            rel_paths: Relative paths of the files to validate
+
+        Returns:
+            Dictionary mapping failing file paths to error messages
+        """
+        tasks = [(file_path, os.path.join(base_dir, file_path)) for file_path in rel_paths if is_validatable(file_path)]
+        return self._run(tasks, _validate_file_task)
+
+    def _run(self, tasks: List[Tuple[str, str]], task) -> Dict[str, str]:
+        """Run ``task`` over all (path, payload) pairs and collect the failures"""
+        if len(tasks) >= self.parallel_threshold:
+            self.logger.info(f"Validating {len(tasks)} files in a process pool")
+            workers = self.max_workers or os.cpu_count() or 1
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                errors = list(executor.map(task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+        else:
+            errors = [task(args) for args in tasks]
+
+        failures = {args[0]: error for args, error in zip(tasks, errors) if error}
+        self.logger.info(f"Validated {len(tasks)} files, {len(failures)} failed")
+        return failures
@@ -0,0 +1,190 @@
+"""
+Dependency Order - Generation order derived from the project structure
+
+Builds a dependency graph between the files of a generated structure and
+orders them so that interfaces and core modules are generated before the
+modules that use them.
+"""
+
+import os
+import re
+import heapq
+from typing import Dict, Any, List, Tuple
+
+try:
+    from omnitrace.generation.code_metrics import module_name_for_path
+except ImportError:
+    try:
+        from generation.code_metrics import module_name_for_path
+    except ImportError:
+        from code_metrics import module_name_for_path
+
+# Names that mark foundational modules, generated first
+FOUNDATION_NAMES = {
+    "interface", "interfaces", "protocol", "protocols", "base", "abstract", "types",
+    "typing", "models", "model", "schema", "schemas", "entities", "exceptions",
+    "errors", "constants", "config", "settings"
+}
+
+# Generation tiers: lower tiers are generated first
+TIER_FOUNDATION = 0
+TIER_CORE = 1
+TIER_MODULE = 2
+TIER_PACKAGE_INIT = 3
+TIER_TEST = 4
+TIER_DOCUMENTATION = 5
+
+_WORD_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+
+
+def _is_test(rel_path: str, file_info: Dict[str, Any]) -> bool:
+    name = os.path.basename(rel_path)
+    return file_info.get("type") == "test" or name.startswith("test_") or name.endswith("_test.py")
+
+
+def file_tier(rel_path: str, file_info: Dict[str, Any]) -> int:
+    """Classify a file into a generation tier
+
+    Args:
+        rel_path: Relative path of the file
+        file_info: Information about the file from the structure
+
+    Returns:
+        Tier number; lower tiers are generated first
+    """
+    file_type = file_info.get("type", "other")
+    stem = os.path.splitext(os.path.basename(rel_path))[0].lower()
+    parts = [part.lower() for part in rel_path.replace("\\", "/").split("/")[:-1]]
+
+    if _is_test(rel_path, file_info):
+        return TIER_TEST
+    if file_type == "documentation" or rel_path.endswith((".md", ".markdown", ".rst")):
+        return TIER_DOCUMENTATION
+    if file_type in ("configuration", "build") or not rel_path.endswith(".py"):
+        return TIER_FOUNDATION
+    if stem == "__init__":
+        return TIER_PACKAGE_INIT
+    if stem in FOUNDATION_NAMES or any(part in FOUNDATION_NAMES for part in parts):
+        return TIER_FOUNDATION
+    if stem == "core" or "core" in parts:
+        return TIER_CORE
+    return TIER_MODULE
+
+
+def build_dependency_graph(files: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, List[str]]:
+    """Derive file dependencies from the structure
+
+    A Python file depends on:
+    - modules whose name is mentioned in its description or content template
+    - foundational and core modules in the same or a parent package
+    - for tests, the module under test
+
+    Args:
+        files: List of (relative_path, file_info) pairs
+
+    Returns:
+        Dictionary mapping each relative path to the paths it depends on
+    """
+    python_files = {rel_path for rel_path, _ in files if rel_path.endswith(".py")}
+    by_stem: Dict[str, List[str]] = {}
+    by_module: Dict[str, str] = {}
+    for rel_path in python_files:
+        stem = os.path.splitext(os.path.basename(rel_path))[0]
+        if stem != "__init__":
+            by_stem.setdefault(stem.lower(), []).append(rel_path)
+        by_module[module_name_for_path(rel_path)] = rel_path
+
+    tiers = {rel_path: file_tier(rel_path, info) for rel_path, info in files}
+    foundations_by_dir: Dict[str, List[str]] = {}
+    modules_by_dir: Dict[str, List[str]] = {}
+    for rel_path in python_files:
+        modules_by_dir.setdefault(os.path.dirname(rel_path), []).append(rel_path)
+        if tiers[rel_path] <= TIER_CORE:
+            foundations_by_dir.setdefault(os.path.dirname(rel_path), []).append(rel_path)
+
+    graph = {}
+    for rel_path, file_info in files:
+        if rel_path not in python_files:
+            graph[rel_path] = []
+            continue
+
+        deps = set()
+        directory = os.path.dirname(rel_path)
+        tier = tiers[rel_path]
+
+        # Modules mentioned by name in the description
+        text = f"{file_info.get('description', '')} {file_info.get('content_template', '')}"
+        for word in _WORD_PATTERN.findall(text):
+            deps.update(by_stem.get(word.lower(), []))
+        for dotted in re.findall(r"[A-Za-z_][\w]*(?:\.[A-Za-z_]\w*)+", text):
+            if dotted in by_module:
+                deps.add(by_module[dotted])
+
+        # Foundational and core modules in this package or a parent package
+        ancestor = directory
+        while True:
+            deps.update(other for other in foundations_by_dir.get(ancestor, []) if tiers[other] < tier)
+            if not ancestor:
+                break
+            ancestor = os.path.dirname(ancestor)
+
+        # Tests depend on the module they test
+        if tier == TIER_TEST:
+            stem = os.path.splitext(os.path.basename(rel_path))[0]
+            tested = stem[len("test_"):] if stem.startswith("test_") else stem[:-len("_test")] if stem.endswith("_test") else stem
+            deps.update(by_stem.get(tested.lower(), []))
+
+        # Package __init__ files re-export their package's modules
+        if tier == TIER_PACKAGE_INIT:
+            deps.update(modules_by_dir.get(directory, []))
+
+        deps.discard(rel_path)
+        graph[rel_path] = sorted(deps)
+    return graph
+
+
+def order_files(files: List[Tuple[str, Dict[str, Any]]]) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, List[str]]]:
+    """Order files so dependencies are generated before their dependents
+
+    Uses Kahn's algorithm with (tier, structure position) as priority so the
+    order is deterministic. Cycles are broken by emitting the highest
+    priority remaining file.
+
+    Args:
+        files: List of (relative_path, file_info) pairs in structure order
+
+    Returns:
+        Tuple of (ordered files, dependency graph)
+    """
+    graph = build_dependency_graph(files)
+    infos = dict(files)
+    position = {rel_path: i for i, (rel_path, _) in enumerate(files)}
+    priority = {rel_path: (file_tier(rel_path, info), position[rel_path]) for rel_path, info in files}
+
+    remaining = {rel_path: len(deps) for rel_path, deps in graph.items()}
+    dependents: Dict[str, List[str]] = {rel_path: [] for rel_path in graph}
+    for rel_path, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(rel_path)
+
+    ready = [(priority[rel_path], rel_path) for rel_path, count in remaining.items() if count == 0]
+    heapq.heapify(ready)
+    ordered = []
+    emitted = set()
+
+    while len(ordered) < len(graph):
+        if not ready:
+            # Dependency cycle: emit the best remaining file
+            rel_path = min((path for path in graph if path not in emitted), key=priority.get)
+            heapq.heappush(ready, (priority[rel_path], rel_path))
+        _, rel_path = heapq.heappop(ready)
+        if rel_path in emitted:
+            continue
+        emitted.add(rel_path)
+        ordered.append((rel_path, infos[rel_path]))
+        for dependent in dependents[rel_path]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0 and dependent not in emitted:
+                heapq.heappush(ready, (priority[dependent], dependent))
+
+    return ordered, graph
@@ -3,10 +3,32 @@ Documentation Generator - Revolutionary documentation creation using first-princ
 """
 
 import os
+import re
 import json
+import time
 import logging
 import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    from omnitrace.generation.doc_pipeline import DocumentPipeline, DOC_TYPES
+    from omnitrace.utils.compiled_template import compile_template
+    from omnitrace.utils.llm_limit import invoke_limited, get_llm_concurrency, take_llm_peak
+except ImportError:
+    try:
+        from generation.doc_pipeline import DocumentPipeline, DOC_TYPES
+        from utils.compiled_template import compile_template
+        from utils.llm_limit import invoke_limited, get_llm_concurrency, take_llm_peak
+    except ImportError:
+        from doc_pipeline import DocumentPipeline, DOC_TYPES
+        from compiled_template import compile_template
+        from llm_limit import invoke_limited, get_llm_concurrency, take_llm_peak
+
+# Context fields every document template receives besides the stage outputs
+_PROJECT_FIELDS = ("project_name", "project_description")
+
+# Outline lines: "## Title - focus", "1. Title: focus", "- Title"
+_OUTLINE_LINE = re.compile(r"^\s*(?:#+|[-*]|\d+[.)])\s*(?P<title>[^:\n]+?)\s*(?:(?: - |: )(?P<focus>.+))?\s*$")
 
 class DocumentationGenerator:
     """Generates revolutionary documentation based on first-principles thinking"""
@@ -20,6 +42,45 @@ class DocumentationGenerator:
         self.llm = llm
         self.logger = logging.getLogger(__name__)
         
+        # Timing and derived/generated documents of the last generate_project_documentation run
+        self.timing_report: Dict[str, Any] = {}
+        self.pipeline_report: Dict[str, Any] = {}
+        
+        # Section-parallel generation: outline first, then every section concurrently
+        self.section_parallel: bool = False
+        self.max_sections: int = 8
+        self.section_context_chars: int = 2000
+        
+        self.outline_template = """
+            You are a Revolutionary Documentation Planner inspired by Elon Musk's first-principles thinking.
+            
+            Task: Outline the {doc_title} document for: {project_name}
+            Project Description: {project_description}
+            Required Sections: {required_sections}
+            
+            List the sections of the document in order, one per line, formatted as:
+            ## Section Title - one sentence on what the section covers
+            
+            Output only the outline.
+            """
+        
+        self.section_template = """
+            You are a Revolutionary {doc_title} Writer inspired by Elon Musk's first-principles thinking.
+            
+            Project: {project_name}
+            Project Description: {project_description}
+            
+            Document Outline:
+            {outline}
+            
+            Relevant Context:
+            {context}
+            
+            Write only the "{section_title}" section: {section_focus}
+            Apply first-principles reasoning, stay consistent with the outline and do not repeat other sections.
+            Format the section in Markdown without its heading.
+            """
+        
         # Documentation templates for different types
         self.doc_templates = {
             "vision": """
@@ -178,15 +239,24 @@ class DocumentationGenerator:
         Returns:
             Generated document content as markdown
         """
+        doc_content, _ = await self._generate_document_timed(doc_type, project_name, project_description, project_context)
+        return doc_content
+    
+    async def _generate_document_timed(self,
+                                       doc_type: str,
+                                       project_name: str,
+                                       project_description: str,
+                                       project_context: Dict[str, Any]) -> Tuple[str, Dict[str, float]]:
+        """Generate a document under the shared LLM limit
+        
+        Returns:
+            Tuple of (document content, timing with wait_seconds and llm_seconds)
+        """
         # Get template for this document type
         template = self.doc_templates.get(doc_type)
         if not template:
             self.logger.error(f"Unknown document type: {doc_type}")
-            return f"Error: Unknown document type: {doc_type}"
-        
-        # Create prompt with project information
-        from langchain_core.prompts import ChatPromptTemplate
-        prompt = ChatPromptTemplate.from_template(template)
+            return f"Error: Unknown document type: {doc_type}", {"wait_seconds": 0.0, "llm_seconds": 0.0}
         
         # Prepare context
         context = {
@@ -200,11 +270,13 @@ class DocumentationGenerator:
         
         # Generate document using LLM
         self.logger.info(f"Generating revolutionary {doc_type} document for project: {project_name}")
-        chain = prompt | self.llm
-        result = await asyncio.to_thread(chain.invoke, context)
-        
-        # Extract document content
-        doc_content = result.text if hasattr(result, "text") else str(result)
+        if self.section_parallel:
+            doc_content, timing = await self._generate_sectioned(doc_type, template, context)
+        else:
+            result, timing = await invoke_limited(self._chain(template), context)
+            
+            # Extract document content
+            doc_content = self._text(result)
         
         # Add metadata header if not already present
         if not doc_content.startswith("# "):
@@ -216,21 +288,137 @@ Generated by OmnitrAIce with first-principles thinking on {self._get_timestamp()
 """
             doc_content = header + doc_content
         
-        self.logger.info(f"Generated revolutionary {doc_type} document with {len(doc_content)} characters")
-        return doc_content
+        self.logger.info(f"Generated revolutionary {doc_type} document with {len(doc_content)} characters "
+                         f"in {timing['llm_seconds']:.2f}s")
+        return doc_content, timing
+    
+    def enable_section_parallel(self, enabled: bool = True, max_sections: Optional[int] = None) -> None:
+        """Enable or disable section-parallel generation of long documents
+        
+        A short outline is generated first; each section is then generated
+        concurrently from the outline plus the context its document uses, and
+        the sections are stitched together. Small models decode many short
+        responses in parallel faster than one long one, and quality no
+        longer degrades toward the end of a long response.
+        
+        Args:
+            enabled: Whether documents are generated section by section
+            max_sections: Optional cap on the number of sections per document
+        """
+        self.section_parallel = enabled
+        if max_sections is not None:
+            self.max_sections = max_sections
+        self.logger.info(f"Section-parallel documents {'enabled' if enabled else 'disabled'}")
+    
+    def _chain(self, template: str):
+        """Build the prompt | llm chain for a template"""
+        from langchain_core.prompts import ChatPromptTemplate
+        return ChatPromptTemplate.from_template(template) | self.llm
+    
+    @staticmethod
+    def _text(result) -> str:
+        """Extract the text of an LLM result"""
+        return result.text if hasattr(result, "text") else str(result)
+    
+    @staticmethod
+    def _required_sections(template: str) -> List[str]:
+        """Section names a document template asks for ("including:" list)"""
+        sections = template.split("including:", 1)[1] if "including:" in template else ""
+        return [line.strip()[2:].strip() for line in sections.splitlines() if line.strip().startswith("- ")]
+    
+    def _parse_outline(self, outline: str, required: List[str]) -> List[Tuple[str, str]]:
+        """Parse an outline into (title, focus) pairs, falling back to the required sections"""
+        sections = []
+        for line in outline.splitlines():
+            if line.lstrip().startswith("# "):
+                # The document title, not a section
+                continue
+            match = _OUTLINE_LINE.match(line)
+            if not match:
+                continue
+            title = match.group("title").strip().strip("*").strip()
+            if title and len(title) <= 80:
+                sections.append((title, (match.group("focus") or "").strip()))
+        if len(sections) < 2:
+            sections = [(title, "") for title in required]
+        return sections[:self.max_sections]
+    
+    async def _generate_sectioned(self, doc_type: str, template: str,
+                                  context: Dict[str, str]) -> Tuple[str, Dict[str, float]]:
+        """Generate a document as an outline plus concurrently generated sections
+        
+        Returns:
+            Tuple of (stitched document, timing: wait_seconds, llm_seconds for the
+            document's critical path, summed_llm_seconds and calls)
+        """
+        doc_title = doc_type.replace("_", " ").title()
+        required = self._required_sections(template)
+        outline_result, outline_timing = await invoke_limited(self._chain(self.outline_template), {
+            "doc_title": doc_title,
+            "project_name": context["project_name"],
+            "project_description": context["project_description"],
+            "required_sections": ", ".join(required)
+        })
+        sections = self._parse_outline(self._text(outline_result), required)
+        outline = "\n".join(f"## {title}" + (f" - {focus}" if focus else "") for title, focus in sections)
+        
+        # Each section sees the outline plus, trimmed, the stage outputs its document uses
+        relevant = sorted(compile_template(template).variables - set(_PROJECT_FIELDS))
+        section_context = "\n".join(
+            f"{field.replace('_', ' ').title()}: {context[field][:self.section_context_chars]}"
+            for field in relevant if context.get(field)
+        ) or "None yet: reason from the project description."
+        
+        async def generate_section(title: str, focus: str):
+            return await invoke_limited(self._chain(self.section_template), {
+                "doc_title": doc_title,
+                "project_name": context["project_name"],
+                "project_description": context["project_description"],
+                "outline": outline,
+                "context": section_context,
+                "section_title": title,
+                "section_focus": focus or f"the {title} of the {doc_title} document"
+            })
+        
+        results = await asyncio.gather(*(generate_section(title, focus) for title, focus in sections))
+        
+        parts = []
+        for (title, _), (result, _) in zip(sections, results):
+            body = self._text(result).strip()
+            # Drop a heading the model repeated despite the instructions
+            first_line, _, rest = body.partition("\n")
+            if first_line.startswith("#") and title.lower() in first_line.lower():
+                body = rest.strip()
+            parts.append(f"## {title}\n\n{body}\n")
+        
+        section_timings = [timing for _, timing in results]
+        timing = {
+            "wait_seconds": outline_timing["wait_seconds"] + max((t["wait_seconds"] for t in section_timings), default=0.0),
+            "llm_seconds": outline_timing["llm_seconds"] + max((t["llm_seconds"] for t in section_timings), default=0.0),
+            "summed_llm_seconds": outline_timing["llm_seconds"] + sum(t["llm_seconds"] for t in section_timings),
+            "calls": 1 + len(section_timings),
+            "sections": len(sections)
+        }
+        return "\n".join(parts), timing
     
     async def generate_project_documentation(self,
                                          project_name: str,
                                          project_description: str,
                                          project_context: Dict[str, Any],
-                                         output_dir: str) -> Dict[str, str]:
+                                         output_dir: str,
+                                         reuse_stage_outputs: bool = True) -> Dict[str, str]:
         """Generate all documentation for a revolutionary project
         
+        Documents whose content already exists as a stage output in
+        ``project_context`` (vision, tech_strategy, design, implementation)
+        are rendered from it; only the rest cost an LLM call.
+        
         Args:
             project_name: Name of the project
             project_description: Description of the project
             project_context: Context information about the project
             output_dir: Directory to write the documentation to
+            reuse_stage_outputs: Derive documents from existing stage outputs
             
         Returns:
             Dictionary mapping document types to their file paths
@@ -242,25 +430,28 @@ Generated by OmnitrAIce with first-principles thinking on {self._get_timestamp()
         os.makedirs(docs_dir, exist_ok=True)
         
         # Document types to generate
-        doc_types = ["vision", "technical_strategy", "architecture", "implementation", "readme"]
+        doc_types = list(DOC_TYPES)
         
-        # Generate each document
-        generated_docs = {}
-        for doc_type in doc_types:
-            doc_content = await self.generate_document(doc_type, project_name, project_description, project_context)
-            
-            # Determine file path based on type
-            if doc_type == "readme":
-                file_path = os.path.join(output_dir, "README.md")
-            else:
-                file_path = os.path.join(docs_dir, f"{doc_type}.md")
-            
-            # Save to file
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(doc_content)
-            
-            generated_docs[doc_type] = file_path
-            self.logger.info(f"Saved {doc_type} document to {file_path}")
+        # Derived documents are written at once; the others are generated
+        # concurrently under the shared LLM limit and written as each finishes
+        meta = {
+            "name": project_name,
+            "description": project_description,
+            "generated": self._get_timestamp(),
+            "revolution_level": project_context.get("revolution_level"),
+            "constraint_elimination": project_context.get("constraint_elimination"),
+            "revolutionary_analysis": project_context.get("revolutionary_analysis"),
+            "generator": "OmnitrAIce DocumentationGenerator"
+        }
+        started = time.perf_counter()
+        take_llm_peak()
+        pipeline = DocumentPipeline(self, logger=self.logger)
+        generated_docs = await pipeline.build(
+            doc_types, meta, project_context, output_dir,
+            regenerate=() if reuse_stage_outputs else doc_types
+        )
+        self.pipeline_report = pipeline.report
+        self.timing_report = self._timing_report(pipeline.report["timings"], time.perf_counter() - started)
         
         # Create documentation index
         index_content = f"""# {project_name} Documentation
@@ -287,6 +478,36 @@ This documentation represents a revolutionary approach based on Elon Musk's firs
         self.logger.info(f"Generated {len(generated_docs)} documentation files")
         return generated_docs
     
+    def _timing_report(self, timings: Dict[str, Dict[str, float]], wall_seconds: float) -> Dict[str, Any]:
+        """Compare the concurrent run against generating the documents one by one
+        
+        Args:
+            timings: Per-document wait, LLM and finish times
+            wall_seconds: Elapsed time of the whole run
+            
+        Returns:
+            Report with summed latency (the serial cost), the critical path
+            (the slowest document, the best any schedule can do) and wall time
+        """
+        summed_latency = sum(timing.get("summed_llm_seconds", timing["llm_seconds"]) for timing in timings.values())
+        critical_path = max((timing["llm_seconds"] for timing in timings.values()), default=0.0)
+        report = {
+            "documents": timings,
+            "concurrency": get_llm_concurrency(),
+            # Most calls that actually overlapped (process-wide)
+            "peak_concurrency": take_llm_peak(),
+            "summed_latency": summed_latency,
+            "critical_path": critical_path,
+            "wall_seconds": wall_seconds,
+            "speedup": summed_latency / wall_seconds if wall_seconds > 0 else 0.0
+        }
+        self.logger.info(
+            f"Documentation timing: {wall_seconds:.2f}s wall, {critical_path:.2f}s critical path, "
+            f"{summed_latency:.2f}s summed latency ({report['speedup']:.1f}x, "
+            f"LLM concurrency {report['peak_concurrency']}/{report['concurrency']})"
+        )
+        return report
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp string"""
         from datetime import datetime
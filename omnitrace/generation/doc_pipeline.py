@@ -0,0 +1,602 @@
+"""
+Document Pipeline - One path for every project document
+
+The CEO, CTO, Architect and Developer stages already produce the content of
+the vision, technical strategy, architecture and implementation documents.
+The pipeline renders a document deterministically from its stage output
+whenever that output exists, and only asks the LLM (through
+DocumentationGenerator) for documents whose content does not exist yet.
+Every document derived from its stage outputs is an LLM call saved, and the
+pipeline reports them.
+
+Documents that are pure renderings of analysis results (structure and code
+analysis, project history) can also be deferred: their inputs are stored
+compactly in ``.omnitrace_docs.json.gz`` and the markdown is rendered the
+first time someone asks for it, with no LLM call; the README links only
+the documents that were written. The input of the project history is the
+stage event log (see ``utils.project_history``), not the stage outputs
+themselves; it is always stored, deferred or not, because it records the
+template versions the project was generated with.
+"""
+
+import os
+import gzip
+import json
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from omnitrace.utils.file_writer import atomic_write_text, atomic_write_bytes
+    from omnitrace.utils.template_versions import SHORT_HASH
+except ImportError:
+    try:
+        from utils.file_writer import atomic_write_text, atomic_write_bytes
+        from utils.template_versions import SHORT_HASH
+    except ImportError:
+        from file_writer import atomic_write_text, atomic_write_bytes
+        from template_versions import SHORT_HASH
+
+# Document types in their conventional order
+DOC_TYPES = ["vision", "technical_strategy", "architecture", "implementation", "readme"]
+
+# Analysis documents that can be rendered on first request
+DEFERRABLE_DOC_TYPES = ["structure_analysis", "code_analysis", "history"]
+
+# Compressed inputs of deferred documents, inside the project directory
+DOC_INPUTS_NAME = ".omnitrace_docs.json.gz"
+
+
+def _details(meta: Dict[str, Any], fields: Sequence[str]) -> str:
+    """Render the "Project Details" list from whichever metadata fields are known"""
+    labels = {
+        "name": "Name",
+        "description": "Description",
+        "generated": "Generated",
+        "revolution_level": "Revolution Level",
+        "constraint_elimination": "Constraint Elimination",
+    }
+    return "\n".join(f"- {labels[field]}: {meta[field]}" for field in fields if meta.get(field) is not None)
+
+
+def render_vision(meta: Dict[str, Any], outputs: Dict[str, Any]) -> str:
+    """Vision document from the CEO stage output"""
+    content = f"""# Revolutionary Project Vision
+
+## Project Details
+{_details(meta, ("name", "description", "generated", "revolution_level", "constraint_elimination"))}
+
+## First-Principles Vision Analysis
+{outputs["vision"]}
+"""
+    if meta.get("revolutionary_analysis"):
+        content += "\n## Revolutionary Analysis Summary\n"
+        content += json.dumps(meta["revolutionary_analysis"], indent=2)
+    return content
+
+
+def render_technical_strategy(meta: Dict[str, Any], outputs: Dict[str, Any]) -> str:
+    """Technical strategy document from the CTO stage output"""
+    return f"""# Revolutionary Technical Strategy
+
+## Project Details
+{_details(meta, ("name", "generated", "revolution_level"))}
+
+## First-Principles Technical Strategy
+{outputs["tech_strategy"]}
+"""
+
+
+def render_architecture(meta: Dict[str, Any], outputs: Dict[str, Any]) -> str:
+    """Architecture document from the Architect stage output"""
+    return f"""# Revolutionary Technical Architecture
+
+## Project Details
+{_details(meta, ("name", "generated", "revolution_level"))}
+
+## First-Principles Architecture Analysis
+{outputs["design"]}
+"""
+
+
+def render_implementation(meta: Dict[str, Any], outputs: Dict[str, Any]) -> str:
+    """Implementation document from the Developer stage output"""
+    return f"""# Revolutionary Implementation Plan
+
+## Project Details
+{_details(meta, ("name", "generated", "revolution_level"))}
+
+## First-Principles Implementation Details
+{outputs["implementation"]}
+"""
+
+
+def render_readme(meta: Dict[str, Any], outputs: Dict[str, Any]) -> str:
+    """Project README: an overview that links the other documents"""
+    content = f"""# {meta["name"]} - Revolutionary Project
+
+## Project Overview
+This project was created using Elon Musk's first-principles thinking approach to break down the problem to its fundamental components and reason up from there: {meta.get("description", "")}
+
+## Documentation
+- [Revolutionary Project Vision](docs/vision.md)
+- [Revolutionary Technical Strategy](docs/technical_strategy.md)
+- [Revolutionary Technical Architecture](docs/architecture.md)
+- [Revolutionary Implementation Plan](docs/implementation.md)
+"""
+    # Only written documents: deferred ones do not exist until first shown
+    for title, path in meta.get("extra_docs", []):
+        content += f"- [{title}]({path})\n"
+    content += f"""
+## Revolutionary Metrics
+- Revolution Level: {meta.get("revolution_level", "maximum")}
+- Constraint Elimination: {meta.get("constraint_elimination", "aggressive")}
+
+## Generated
+This revolutionary project was generated by {meta.get("generator", "OmnitrAIce")} using first-principles thinking on {meta.get("generated", "")}.
+"""
+    return content
+
+
+def structure_analysis_inputs(structure_analysis: Dict[str, Any], materialization: Dict[str, Any]) -> Dict[str, Any]:
+    """The parts of a structure analysis and materialization report its document shows"""
+    return {
+        "total_directories": structure_analysis.get("total_directories", 0),
+        "total_files": structure_analysis.get("total_files", 0),
+        "revolutionary_metrics": structure_analysis.get("revolutionary_metrics", {}),
+        "optimization_opportunities": structure_analysis.get("optimization_opportunities", []),
+        "materialization": {
+            "file_count": materialization.get("file_count", 0),
+            "directory_count": materialization.get("directory_count", 0),
+            "bytes_written": materialization.get("bytes_written", 0),
+            "files_skipped": materialization.get("files_skipped", 0),
+            "bytes_skipped": materialization.get("bytes_skipped", 0),
+            "files_deleted": materialization.get("files_deleted", 0),
+            "preserved": len(materialization.get("preserved", [])),
+            "files_per_second": materialization.get("files_per_second", 0),
+            "seconds": materialization.get("seconds", 0),
+        },
+    }
+
+
+def code_analysis_inputs(code_analysis: Dict[str, Any], validation_report: Dict[str, Any],
+                         test_report: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """The parts of the code analysis, validation and test reports their document shows"""
+    code_metrics = code_analysis.get("code_metrics", {})
+    inputs = {
+        "total_files": code_analysis.get("total_files", 0),
+        "total_lines": code_analysis.get("total_lines", 0),
+        "languages": code_analysis.get("languages", {}),
+        "average_complexity": code_analysis.get("average_complexity", 0),
+        "max_complexity": code_metrics.get("max_complexity", 0),
+        "functions": code_metrics.get("functions", 0),
+        "classes": code_metrics.get("classes", 0),
+        "syntax_error_files": len(code_metrics.get("syntax_errors", {})),
+        "import_graph": code_metrics.get("import_graph", {}),
+        "revolutionary_metrics": code_analysis.get("revolutionary_metrics", {}),
+        "optimization_opportunities": code_analysis.get("optimization_opportunities", []),
+        "validation": {
+            "validated_files": validation_report["validated_files"],
+            "initial_failures": len(validation_report["initial_failures"]),
+            "repaired": len(validation_report["repaired"]),
+            "still_failing": validation_report["still_failing"],
+            "retries": validation_report["retries"],
+            "retry_bytes": validation_report["retry_bytes"],
+            "retry_seconds": validation_report["retry_seconds"],
+        },
+        "tests": None,
+    }
+    if test_report:
+        inputs["tests"] = {
+            "total": test_report["total"],
+            "executed": test_report["executed"],
+            "cached": test_report["cached"],
+            "counts": test_report["counts"],
+            "wall_seconds": test_report["wall_seconds"],
+            "summed_seconds": test_report["summed_seconds"],
+            "results": {path: {"status": r["status"], "duration": r["duration"], "cached": r["cached"]}
+                        for path, r in test_report["results"].items()},
+        }
+    return inputs
+
+
+def render_structure_analysis(meta: Dict[str, Any], outputs: Dict[str, Any]) -> str:
+    """File structure analysis document"""
+    analysis = outputs["structure_analysis"]
+    metrics = analysis.get("revolutionary_metrics", {})
+    materialization = analysis.get("materialization", {})
+    return f"""# Revolutionary File Structure Analysis
+
+## Project: {meta["name"]}
+- Generated: {meta.get("generated", "")}
+- Revolution Level: {meta.get("revolution_level", "maximum")}
+- Constraint Elimination: {meta.get("constraint_elimination", "aggressive")}
+
+## Structure Metrics
+- Total Directories: {analysis.get('total_directories', 0)}
+- Total Files: {analysis.get('total_files', 0)}
+- Complexity Score: {metrics.get('complexity_score', 0)}
+- Innovation Score: {metrics.get('innovation_score', 0)}
+- Maintainability Score: {metrics.get('maintainability_score', 0)}
+- Revolutionary Impact: {metrics.get('revolutionary_impact', 0)}
+
+## Materialization
+- Files Written: {materialization.get('file_count', 0)} in {materialization.get('directory_count', 0)} directories
+- Bytes Written: {materialization.get('bytes_written', 0)}
+- Files Skipped (unchanged): {materialization.get('files_skipped', 0)} ({materialization.get('bytes_skipped', 0)} bytes)
+- Files Deleted: {materialization.get('files_deleted', 0)}
+- Hand Edits Preserved: {materialization.get('preserved', 0)}
+- Throughput: {materialization.get('files_per_second', 0)} files/sec ({materialization.get('seconds', 0)}s)
+
+## Optimization Opportunities
+{json.dumps(analysis.get('optimization_opportunities', []), indent=2)}
+"""
+
+
+def render_code_analysis(meta: Dict[str, Any], outputs: Dict[str, Any]) -> str:
+    """Code analysis document, with generated test results when tests ran"""
+    analysis = outputs["code_analysis"]
+    validation = analysis["validation"]
+    metrics = analysis.get("revolutionary_metrics", {})
+    test_section = ""
+    tests = analysis.get("tests")
+    if tests:
+        counts = tests["counts"]
+        test_section = f"""
+## Generated Tests
+- Test Files: {tests['total']} ({tests['executed']} run, {tests['cached']} cached)
+- Passed: {counts['passed']}
+- Failed: {counts['failed']}
+- Timed Out: {counts['timeout']}
+- No Tests Collected: {counts['no_tests']}
+- Wall Time: {tests['wall_seconds']}s (summed test time {tests['summed_seconds']}s)
+- Results: {json.dumps(tests['results'], indent=2)}
+"""
+    return f"""# Revolutionary Code Analysis
+
+## Project: {meta["name"]}
+- Generated: {meta.get("generated", "")}
+- Revolution Level: {meta.get("revolution_level", "maximum")}
+- Constraint Elimination: {meta.get("constraint_elimination", "aggressive")}
+
+## Code Metrics
+- Total Files: {analysis.get('total_files', 0)}
+- Total Lines: {analysis.get('total_lines', 0)}
+- Languages: {json.dumps(analysis.get('languages', {}), indent=2)}
+- Average Complexity: {analysis.get('average_complexity', 0)}
+- Max Complexity: {analysis.get('max_complexity', 0)}
+- Functions: {analysis.get('functions', 0)}
+- Classes: {analysis.get('classes', 0)}
+- Files With Syntax Errors: {analysis.get('syntax_error_files', 0)}
+
+## Import Graph
+{json.dumps(analysis.get('import_graph', {}), indent=2)}
+
+## Validation
+- Validated Files: {validation['validated_files']}
+- Initially Failing: {validation['initial_failures']}
+- Repaired: {validation['repaired']}
+- Still Failing: {json.dumps(validation['still_failing'], indent=2)}
+- Regenerations: {validation['retries']} ({validation['retry_bytes']} bytes, {validation['retry_seconds']}s)
+{test_section}
+## Revolutionary Metrics
+- Conventional Patterns: {metrics.get('conventional_patterns', 0)}
+- Revolutionary Patterns: {metrics.get('revolutionary_patterns', 0)}
+- Innovation Score: {metrics.get('innovation_score', 0)}
+- Disruption Factor: {metrics.get('disruption_factor', 0)}
+- 10x Improvement Score: {metrics.get('10x_improvement_score', 0)}
+
+## Optimization Opportunities
+{json.dumps(analysis.get('optimization_opportunities', []), indent=2)}
+"""
+
+
+def render_history(meta: Dict[str, Any], outputs: Dict[str, Any]) -> str:
+    """Project development history from the stage event log
+
+    Stage outputs are linked, not repeated: each one is already a document.
+    """
+    content = f"""# Revolutionary Project Development History
+Generated: {meta.get("generated", "")}
+
+## Project Details
+- Name: {meta["name"]}
+- Description: {meta.get("description", "")}
+- Revolution Level: {meta.get("revolution_level", "maximum")}
+- Constraint Elimination: {meta.get("constraint_elimination", "aggressive")}
+
+## Development Timeline using First-Principles Thinking
+"""
+    history = outputs["history"]
+    if isinstance(history, str):
+        # Projects from before the event log stored the full running context
+        return content + f"{history}\n"
+    events = history.get("events", [])
+    total_seconds = sum(event.get("seconds", 0) for event in events)
+    total_tokens = sum(event.get("tokens", 0) for event in events)
+    content += "| # | Stage | Agent | Started | Duration | Tokens (est.) | Output |\n"
+    content += "|---|---|---|---|---|---|---|\n"
+    for number, event in enumerate(events, 1):
+        output = f"[{event['doc']}]({event['doc']})" if event.get("doc") else ""
+        details = ", ".join(f"{key}: {value}" for key, value in event.get("details", {}).items())
+        if details:
+            output = f"{output} ({details})" if output else details
+        content += (f"| {number} | {event['stage']} | {event.get('role', '').upper()} | {event['started']} "
+                    f"| {event['seconds']:.1f}s | {event.get('tokens', '')} | {output} |\n")
+    content += f"\nTotal: {len(events)} stages, {total_seconds:.1f}s, ~{total_tokens} tokens\n"
+    templates = history.get("templates")
+    if templates:
+        content += "\n## Template Versions\n"
+        for role, digest in templates.items():
+            content += f"- {role.upper()}: `{digest[:SHORT_HASH]}`\n"
+    return content
+
+
+# Document type -> output path (relative to the project), the stage outputs it
+# is derived from, and its deterministic renderer
+DOCUMENTS: Dict[str, Dict[str, Any]] = {
+    "vision": {"path": os.path.join("docs", "vision.md"), "sources": ("vision",), "render": render_vision},
+    "technical_strategy": {"path": os.path.join("docs", "technical_strategy.md"), "sources": ("tech_strategy",),
+                           "render": render_technical_strategy},
+    "architecture": {"path": os.path.join("docs", "architecture.md"), "sources": ("design",),
+                     "render": render_architecture},
+    "implementation": {"path": os.path.join("docs", "implementation.md"), "sources": ("implementation",),
+                       "render": render_implementation},
+    # The README summarizes the vision and strategy and links the other documents;
+    # without them there is nothing to summarize and it is generated instead
+    "readme": {"path": "README.md", "sources": ("vision", "tech_strategy"), "render": render_readme},
+    # Analysis documents render compact analysis inputs (see *_inputs above)
+    "structure_analysis": {"path": os.path.join("docs", "structure_analysis.md"), "sources": ("structure_analysis",),
+                           "render": render_structure_analysis, "title": "File Structure Analysis"},
+    "code_analysis": {"path": os.path.join("docs", "code_analysis.md"), "sources": ("code_analysis",),
+                      "render": render_code_analysis, "title": "Code Analysis"},
+    "history": {"path": "project_history.md", "sources": ("history",), "render": render_history,
+                "title": "Development History"},
+}
+
+
+def document_links(doc_types: Sequence[str]) -> List[Tuple[str, str]]:
+    """README links (title, relative URL) of written analysis documents"""
+    return [(DOCUMENTS[doc_type]["title"], DOCUMENTS[doc_type]["path"].replace(os.sep, "/"))
+            for doc_type in doc_types]
+
+
+def save_document_inputs(project_dir: str, meta: Dict[str, Any], inputs: Dict[str, Any],
+                         doc_types: Sequence[str]) -> str:
+    """Store what deferred documents need to be rendered later
+
+    Copies of the deferred documents rendered from earlier inputs (a project
+    regenerated over its previous output) are removed, so they are rendered
+    again from these inputs.
+
+    Args:
+        project_dir: Project directory
+        meta: Project metadata shared by all documents
+        inputs: Inputs by source key
+        doc_types: Deferred document types (may be empty)
+
+    Returns:
+        Path of the inputs file
+    """
+    sources = {source for doc_type in doc_types for source in DOCUMENTS[doc_type]["sources"]}
+    if "history" in inputs:
+        # Template versions are looked up in the history (see project_template_versions)
+        sources.add("history")
+    payload = {
+        # Only the vision and README (never deferred) use the analysis and document links
+        "meta": {key: value for key, value in meta.items() if key not in ("extra_docs", "revolutionary_analysis")},
+        "inputs": {source: inputs[source] for source in sorted(sources)},
+        "deferred": list(doc_types),
+    }
+    path = os.path.join(project_dir, DOC_INPUTS_NAME)
+    atomic_write_bytes(path, gzip.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), mtime=0))
+    for doc_type in doc_types:
+        try:
+            os.remove(os.path.join(project_dir, DOCUMENTS[doc_type]["path"]))
+        except FileNotFoundError:
+            pass
+    return path
+
+
+def load_document_inputs(project_dir: str) -> Optional[Dict[str, Any]]:
+    """Load the stored inputs of deferred documents, or None if there are none"""
+    try:
+        with open(os.path.join(project_dir, DOC_INPUTS_NAME), "rb") as f:
+            return json.loads(gzip.decompress(f.read()).decode("utf-8"))
+    except FileNotFoundError:
+        return None
+
+
+def project_template_versions(project_dir: str) -> Dict[str, str]:
+    """Template hashes a project was generated with (empty for older projects)"""
+    history = ((load_document_inputs(project_dir) or {}).get("inputs") or {}).get("history")
+    if not isinstance(history, dict):
+        return {}
+    return history.get("templates", {})
+
+
+def available_documents(project_dir: str) -> Dict[str, str]:
+    """Documents of a project and whether each is "written" or "deferred"
+
+    Args:
+        project_dir: Project directory
+
+    Returns:
+        Mapping of document type to state, in conventional order
+    """
+    stored = load_document_inputs(project_dir) or {}
+    deferred = set(stored.get("deferred", []))
+    documents = {}
+    for doc_type in DOC_TYPES + DEFERRABLE_DOC_TYPES:
+        if os.path.exists(os.path.join(project_dir, DOCUMENTS[doc_type]["path"])):
+            documents[doc_type] = "written"
+        elif doc_type in deferred:
+            documents[doc_type] = "deferred"
+    return documents
+
+
+def materialize_document(project_dir: str, doc_type: str) -> str:
+    """Return a document's markdown, rendering and writing it on first request
+
+    Args:
+        project_dir: Project directory
+        doc_type: Document type
+
+    Returns:
+        The document's markdown
+
+    Raises:
+        ValueError: If the project has no such document
+    """
+    if doc_type not in DOCUMENTS:
+        raise ValueError(f"Unknown document type: {doc_type}")
+    path = os.path.join(project_dir, DOCUMENTS[doc_type]["path"])
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+    stored = load_document_inputs(project_dir)
+    if not stored or doc_type not in stored.get("deferred", []):
+        raise ValueError(f"Project has no {doc_type} document")
+    outputs = {source: stored["inputs"][source] for source in DOCUMENTS[doc_type]["sources"]}
+    content = DOCUMENTS[doc_type]["render"](stored["meta"], outputs)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write_text(path, content)
+    return content
+
+
+def materialize_deferred_documents(project_dir: str) -> List[str]:
+    """Render every deferred document not written yet, e.g. before a project is exported
+
+    Args:
+        project_dir: Project directory
+
+    Returns:
+        Types of the documents rendered
+    """
+    rendered = []
+    for doc_type, state in available_documents(project_dir).items():
+        if state == "deferred":
+            materialize_document(project_dir, doc_type)
+            rendered.append(doc_type)
+    return rendered
+
+
+class DocumentPipeline:
+    """Derives project documents from stage outputs, generating only what is missing
+
+    Usage:
+        pipeline = DocumentPipeline(doc_generator)
+        paths = await pipeline.build(["vision", "architecture"], meta, stage_outputs, output_dir)
+        pipeline.report  # {"derived": [...], "generated": [...], "llm_calls": 0, "llm_calls_saved": 2, ...}
+    """
+
+    def __init__(self, doc_generator=None, logger=None):
+        """Initialize the pipeline.
+
+        Args:
+            doc_generator: DocumentationGenerator for documents that cannot be
+                derived; without one they are derived from whatever exists
+            logger: Optional logger instance
+        """
+        self.doc_generator = doc_generator
+        self.logger = logger or logging.getLogger(__name__)
+        self.report: Dict[str, Any] = {"derived": [], "generated": [], "llm_calls": 0, "llm_calls_saved": 0,
+                                       "timings": {}}
+
+    def plan(self, doc_types: Sequence[str], stage_outputs: Dict[str, Any],
+             regenerate: Sequence[str] = ()) -> Dict[str, str]:
+        """Decide how each document is produced
+
+        Args:
+            doc_types: Documents to produce
+            stage_outputs: Stage outputs by key (vision, tech_strategy, design, implementation)
+            regenerate: Documents to generate with the LLM even if derivable
+
+        Returns:
+            Mapping of document type to "derive" or "generate"
+        """
+        plan = {}
+        for doc_type in doc_types:
+            # Analysis documents have no LLM form
+            if doc_type in DEFERRABLE_DOC_TYPES:
+                plan[doc_type] = "derive"
+                continue
+            if doc_type not in DOCUMENTS:
+                raise ValueError(f"Unknown document type: {doc_type}")
+            derivable = doc_type not in regenerate and all(
+                stage_outputs.get(source) for source in DOCUMENTS[doc_type]["sources"]
+            )
+            plan[doc_type] = "derive" if derivable or self.doc_generator is None else "generate"
+        return plan
+
+    def render(self, doc_type: str, meta: Dict[str, Any], stage_outputs: Dict[str, Any]) -> str:
+        """Render one document from stage outputs (no LLM call)"""
+        outputs = {source: stage_outputs.get(source, "") for source in DOCUMENTS[doc_type]["sources"]}
+        return DOCUMENTS[doc_type]["render"](meta, outputs)
+
+    async def build(self, doc_types: Sequence[str], meta: Dict[str, Any], stage_outputs: Dict[str, Any],
+                    output_dir: str, regenerate: Sequence[str] = (),
+                    on_written: Optional[Callable[[str, str], None]] = None) -> Dict[str, str]:
+        """Produce and write documents
+
+        Derived documents are written immediately; the rest are generated
+        concurrently (under the shared LLM limit) and written as each finishes.
+        The report accumulates over successive calls.
+
+        Args:
+            doc_types: Documents to produce
+            meta: Project metadata (name, description, generated, revolution_level,
+                constraint_elimination, revolutionary_analysis, extra_docs, generator)
+            stage_outputs: Stage outputs by key
+            output_dir: Project directory
+            regenerate: Documents to generate with the LLM even if derivable
+            on_written: Optional callback (doc_type, path) after each document is written
+
+        Returns:
+            Mapping of document type to written path, in the requested order
+        """
+        plan = self.plan(doc_types, stage_outputs, regenerate)
+        paths: Dict[str, str] = {}
+        started = time.perf_counter()
+
+        def write(doc_type: str, content: str) -> None:
+            path = os.path.join(output_dir, DOCUMENTS[doc_type]["path"])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write_text(path, content)
+            paths[doc_type] = path
+            if on_written:
+                on_written(doc_type, path)
+
+        for doc_type, how in plan.items():
+            if how == "derive":
+                write(doc_type, self.render(doc_type, meta, stage_outputs))
+                self.report["derived"].append(doc_type)
+
+        async def generate(doc_type: str) -> None:
+            content, timing = await self.doc_generator._generate_document_timed(
+                doc_type, meta["name"], meta.get("description", ""), stage_outputs
+            )
+            await asyncio.to_thread(write, doc_type, content)
+            timing["finished_seconds"] = time.perf_counter() - started
+            self.report["timings"][doc_type] = timing
+            self.report["generated"].append(doc_type)
+            # Section-parallel documents take several calls
+            self.report["llm_calls"] += timing.get("calls", 1)
+
+        await asyncio.gather(*(generate(doc_type) for doc_type, how in plan.items() if how == "generate"))
+
+        # A call is saved only by deriving a document from the stage outputs it would
+        # otherwise be generated from; analysis documents never had an LLM form, and
+        # a document derived for lack of a generator saves nothing either
+        self.report["llm_calls_saved"] += len([
+            doc_type for doc_type, how in plan.items()
+            if how == "derive" and doc_type not in DEFERRABLE_DOC_TYPES and DOCUMENTS[doc_type]["sources"]
+            and all(stage_outputs.get(source) for source in DOCUMENTS[doc_type]["sources"])
+        ])
+        self.logger.info(f"Documents: {len(self.report['derived'])} derived from stage outputs, "
+                         f"{len(self.report['generated'])} generated "
+                         f"({self.report['llm_calls_saved']} LLM calls saved)")
+        return {doc_type: paths[doc_type] for doc_type in doc_types}
@@ -3,10 +3,31 @@ Structure Generator - Revolutionary project structure creation using first-princ
 """
 
 import os
-import json
 import logging
-import asyncio
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+try:
+    from omnitrace.utils.project_tree import ProjectTree, KIND_DIRECTORY
+    from omnitrace.utils.materializer import Materializer
+    from omnitrace.utils.stream_json import dumps_deep, loads_deep
+    from omnitrace.utils.structured_output import (
+        generate_validated_structure, constrain_llm, PROJECT_STRUCTURE_SCHEMA, MODE_SCHEMA
+    )
+except ImportError:
+    try:
+        from utils.project_tree import ProjectTree, KIND_DIRECTORY
+        from utils.materializer import Materializer
+        from utils.stream_json import dumps_deep, loads_deep
+        from utils.structured_output import (
+            generate_validated_structure, constrain_llm, PROJECT_STRUCTURE_SCHEMA, MODE_SCHEMA
+        )
+    except ImportError:
+        from project_tree import ProjectTree, KIND_DIRECTORY
+        from materializer import Materializer
+        from stream_json import dumps_deep, loads_deep
+        from structured_output import (
+            generate_validated_structure, constrain_llm, PROJECT_STRUCTURE_SCHEMA, MODE_SCHEMA
+        )
 
 class StructureGenerator:
     """Generates revolutionary project structure based on first-principles thinking"""
@@ -20,6 +41,14 @@ class StructureGenerator:
         self.llm = llm
         self.logger = logging.getLogger(__name__)
         
+        # Batched, thread-pooled file creation
+        self.materializer = Materializer(logger=self.logger)
+        self.last_materialization: Optional[Dict[str, Any]] = None
+        
+        # Schema-constrained structure output (None sends free-form requests)
+        self.structured_output: Optional[str] = None
+        self.max_structure_retries: int = 2
+        
         # Structure generation template
         self.structure_template = """
         You are a Revolutionary Structure Generator inspired by Elon Musk's first-principles thinking.
@@ -89,16 +118,38 @@ class StructureGenerator:
         Your response should be ONLY the JSON object with no explanation, comments, or markdown formatting.
         """
     
+    def enable_structured_output(self, enabled: bool = True, mode: str = MODE_SCHEMA,
+                                 max_retries: Optional[int] = None) -> None:
+        """Enable or disable schema-constrained structure responses
+        
+        Args:
+            enabled: Whether structure requests carry a response format
+            mode: "schema" sends the full JSON schema, "json" only requests JSON
+            max_retries: Optional number of retries for unparseable or invalid responses
+        """
+        self.structured_output = mode if enabled else None
+        if max_retries is not None:
+            self.max_structure_retries = max_retries
+        self.logger.info(f"Structured output {'enabled (' + mode + ')' if enabled else 'disabled'}")
+    
     async def generate_structure(self, 
                                project_name: str, 
                                project_description: str, 
-                               project_context: Dict[str, Any]) -> Dict[str, Any]:
+                               project_context: Dict[str, Any],
+                               on_node: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Dict[str, Any]:
         """Generate a revolutionary project structure
         
+        The response is parsed incrementally while it streams in, repairing
+        common JSON defects, so ``on_node`` can act on directories and files
+        before the whole structure has been generated. Unparseable or
+        schema-violating responses are retried up to ``max_structure_retries`` times.
+        
         Args:
             project_name: Name of the project
             project_description: Description of the project
             project_context: Context information about the project
+            on_node: Optional callback (function or coroutine function) called with
+                each completed node: {"kind": "directory"|"file", "path": ..., "info": ...}
             
         Returns:
             Dictionary containing the generated structure
@@ -117,44 +168,44 @@ class StructureGenerator:
             "implementation": project_context.get("implementation", "")
         }
         
-        # Generate structure using LLM
+        # Generate structure using LLM, constrained to the structure schema if enabled
         self.logger.info(f"Generating revolutionary structure for project: {project_name}")
-        chain = prompt | self.llm
-        result = await asyncio.to_thread(chain.invoke, context)
-        
-        # Extract structure from response
-        structure_text = result.text if hasattr(result, "text") else str(result)
-        
-        try:
-            # Parse JSON structure (handling potential markdown formatting)
-            import re
-            
-            # Try to extract JSON if wrapped in markdown code blocks
-            json_match = re.search(r'```(?:json)?\n(.*?)\n```', structure_text, re.DOTALL)
-            if json_match:
-                structure_json = json_match.group(1)
-            else:
-                structure_json = structure_text
-            
-            structure = json.loads(structure_json)
-            
-            # Add metadata
-            structure["metadata"] = {
-                "generation_timestamp": self._get_timestamp(),
-                "project_description": project_description,
-            }
-            
-            self.logger.info(f"Generated revolutionary structure with {self._count_items(structure)} items")
-            return structure
-            
-        except json.JSONDecodeError as e:
-            self.logger.error(f"Failed to parse structure JSON: {str(e)}")
+        llm = self.llm
+        if self.structured_output:
+            llm = constrain_llm(self.llm, PROJECT_STRUCTURE_SCHEMA, self.structured_output)
+        chain = prompt | llm
+        
+        # Parse the structure while it streams in
+        structure, report = await generate_validated_structure(
+            chain, context, PROJECT_STRUCTURE_SCHEMA, on_node,
+            max_retries=self.max_structure_retries, logger=self.logger
+        )
+        if structure is None:
+            self.logger.error(f"Failed to parse structure JSON after {report['attempts']} attempts: {report['error']}")
             # Return error info for debugging
             return {
                 "error": "JSON parsing error",
-                "error_details": str(e),
-                "raw_text": structure_text
+                "error_details": report["error"],
+                "raw_text": report["raw_text"],
+                "attempts": report["attempts"]
             }
+        
+        repairs = report["repairs"]
+        if repairs:
+            self.logger.warning(f"Repaired structure JSON defects: {repairs}")
+        
+        # Add metadata
+        structure["metadata"] = {
+            "generation_timestamp": self._get_timestamp(),
+            "project_description": project_description,
+            "json_repairs": repairs,
+            "structured_output": self.structured_output,
+            "attempts": report["attempts"],
+            "schema_errors": report["schema_errors"],
+        }
+        
+        self.logger.info(f"Generated revolutionary structure with {self._count_items(structure)} items")
+        return structure
     
     def _get_timestamp(self) -> str:
         """Get current timestamp string"""
@@ -163,92 +214,75 @@ class StructureGenerator:
     
     def _count_items(self, structure: Dict[str, Any]) -> int:
         """Count the total number of directories and files in the structure"""
-        count = 0
-        
-        # Count root files
-        root_files = structure.get("structure", {}).get("files", [])
-        count += len(root_files)
-        
-        # Count directories and their contents recursively
-        directories = structure.get("structure", {}).get("directories", [])
-        
-        def count_directory(directory):
-            nonlocal count
-            # Count this directory
-            count += 1
-            # Count files in this directory
-            count += len(directory.get("files", []))
-            # Count subdirectories recursively
-            for subdir in directory.get("subdirectories", []):
-                count_directory(subdir)
-        
-        for directory in directories:
-            count_directory(directory)
-            
-        return count
+        return len(ProjectTree.from_structure_schema(structure))
     
-    async def create_physical_structure(self, output_dir: str, structure: Dict[str, Any]) -> List[str]:
+    async def create_physical_structure(self, output_dir: str, structure: Dict[str, Any],
+                                        incremental: bool = False) -> List[str]:
         """Create physical directories and files based on structure
         
         Args:
             output_dir: Path to create the structure in
             structure: The structure definition
+            incremental: Diff against the previous ``.structure.json`` and touch
+                only added, changed or removed files, preserving hand edits
             
         Returns:
-            List of created files and directories
+            List of created (or, when incremental, written) files and directories
         """
         self.logger.info(f"Creating physical structure in: {output_dir}")
         
-        created_items = []
         root_directory = os.path.join(output_dir, structure.get("root_directory", ""))
-        
-        # Create root directory
-        os.makedirs(root_directory, exist_ok=True)
-        created_items.append(root_directory)
-        
-        # Create root files
-        for file_info in structure.get("structure", {}).get("files", []):
-            file_path = os.path.join(root_directory, file_info["name"])
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(f"# {file_info['purpose']}\n\n# Generated by OmnitrAIce StructureGenerator with first-principles thinking\n\n")
-            created_items.append(file_path)
-        
-        # Create directories and their contents recursively
-        async def create_directory(parent_path, directory_info):
-            # Create this directory
-            directory_path = os.path.join(parent_path, directory_info["name"])
-            os.makedirs(directory_path, exist_ok=True)
-            created_items.append(directory_path)
-            
-            # Create README with purpose description
-            readme_path = os.path.join(directory_path, "README.md")
-            with open(readme_path, "w", encoding="utf-8") as f:
-                f.write(f"# {directory_info['name']}\n\n{directory_info['purpose']}\n\n_Generated by OmnitrAIce StructureGenerator with first-principles thinking_\n")
-            created_items.append(readme_path)
-            
-            # Create files in this directory
-            for file_info in directory_info.get("files", []):
-                file_path = os.path.join(directory_path, file_info["name"])
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(f"# {file_info['purpose']}\n\n# Generated by OmnitrAIce StructureGenerator with first-principles thinking\n\n")
-                created_items.append(file_path)
-            
-            # Create subdirectories recursively
-            for subdir_info in directory_info.get("subdirectories", []):
-                await create_directory(directory_path, subdir_info)
-        
-        # Process all root directories
-        for directory_info in structure.get("structure", {}).get("directories", []):
-            await create_directory(root_directory, directory_info)
+        directories, files = self._render_structure(structure)
+        previous = self._load_previous_structure(root_directory) if incremental else None
+        
+        if previous is not None:
+            previous_directories, previous_files = self._render_structure(previous)
+            report = await self.materializer.rematerialize(
+                root_directory, directories, files, previous_directories, previous_files
+            )
+        else:
+            report = await self.materializer.materialize(root_directory, directories, files)
+        self.last_materialization = report
+        created_items = [root_directory] + report["directories"] + report["files"]
+        
+        self.logger.info(f"Created {len(created_items)} files and directories "
+                         f"({report['files_per_second']} files/sec)")
+        return created_items
+    
+    def _render_structure(self, structure: Dict[str, Any]) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """Render a structure into its directories and (path, content) file pairs"""
+        tree = ProjectTree.from_structure_schema(structure)
+        directories = []
+        files = []
+        
+        # Render every file up front; directories precede their contents in preorder
+        for index, rel_path in tree.iter_nodes():
+            if tree.kinds[index] == KIND_DIRECTORY:
+                directories.append(rel_path)
+                
+                # Create README with purpose description
+                files.append((
+                    os.path.join(rel_path, "README.md"),
+                    f"# {tree.name(index)}\n\n{tree.description(index)}\n\n_Generated by OmnitrAIce StructureGenerator with first-principles thinking_\n"
+                ))
+            else:
+                files.append((rel_path, f"# {tree.description(index)}\n\n# Generated by OmnitrAIce StructureGenerator with first-principles thinking\n\n"))
         
         # Save structure definition file
-        structure_path = os.path.join(root_directory, ".structure.json")
-        with open(structure_path, "w", encoding="utf-8") as f:
-            json.dump(structure, f, indent=2)
-        created_items.append(structure_path)
-        
-        self.logger.info(f"Created {len(created_items)} files and directories")
-        return created_items
+        files.append((".structure.json", dumps_deep(structure, indent=2)))
+        return directories, files
+    
+    def _load_previous_structure(self, root_directory: str) -> Optional[Dict[str, Any]]:
+        """Load the structure a project was last materialized from, if any"""
+        path = os.path.join(root_directory, ".structure.json")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return loads_deep(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable previous structure {path}: {e}")
+            return None
     
     async def analyze_structure(self, structure: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze the revolutionary nature of the generated structure
@@ -261,37 +295,11 @@ class StructureGenerator:
         """
         self.logger.info("Analyzing revolutionary structure")
         
-        # Calculate statistics
-        dir_count = 0
-        file_count = 0
-        nesting_depth = 0
-        
-        # Process directories recursively
-        directories = structure.get("structure", {}).get("directories", [])
-        
-        def analyze_directory(directory, depth=1):
-            nonlocal dir_count, file_count, nesting_depth
-            
-            # Count this directory
-            dir_count += 1
-            
-            # Track maximum nesting depth
-            nesting_depth = max(nesting_depth, depth)
-            
-            # Count files in this directory
-            file_count += len(directory.get("files", []))
-            
-            # Process subdirectories recursively
-            for subdir in directory.get("subdirectories", []):
-                analyze_directory(subdir, depth + 1)
-        
-        # Count root files
-        root_files = structure.get("structure", {}).get("files", [])
-        file_count += len(root_files)
-        
-        # Process all directories
-        for directory in directories:
-            analyze_directory(directory)
+        # Calculate statistics in one pass over the tree
+        tree = ProjectTree.from_structure_schema(structure)
+        dir_count = tree.directory_count
+        file_count = tree.file_count
+        nesting_depth = tree.max_directory_depth
         
         # Calculate revolutionary metrics
         # (These would be more sophisticated in a full implementation)
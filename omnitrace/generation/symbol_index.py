@@ -0,0 +1,143 @@
+"""
+Symbol Index - Public interfaces of already-generated modules
+
+Keeps a compact map of module -> public classes/functions and their
+signatures, built incrementally as files are generated, so later file
+prompts can reference exact interfaces instead of whole files.
+"""
+
+import ast
+import logging
+from typing import Dict, Any, List, Optional, Iterable
+
+try:
+    from omnitrace.generation.code_metrics import module_name_for_path
+except ImportError:
+    try:
+        from generation.code_metrics import module_name_for_path
+    except ImportError:
+        from code_metrics import module_name_for_path
+
+
+def _format_arguments(args: ast.arguments) -> str:
+    """Render function arguments with annotations but without default values"""
+    rendered = []
+    positional = list(getattr(args, "posonlyargs", [])) + list(args.args)
+    first_default = len(positional) - len(args.defaults)
+
+    def render(arg: ast.arg, has_default: bool) -> str:
+        text = arg.arg
+        if arg.annotation is not None:
+            text += f": {ast.unparse(arg.annotation)}"
+        return text + ("=..." if has_default else "")
+
+    for i, arg in enumerate(positional):
+        rendered.append(render(arg, i >= first_default))
+        if getattr(args, "posonlyargs", None) and i == len(args.posonlyargs) - 1:
+            rendered.append("/")
+    if args.vararg:
+        rendered.append("*" + render(args.vararg, False))
+    elif args.kwonlyargs:
+        rendered.append("*")
+    for arg, default in zip(args.kwonlyargs, args.kw_defaults):
+        rendered.append(render(arg, default is not None))
+    if args.kwarg:
+        rendered.append("**" + render(args.kwarg, False))
+    return ", ".join(rendered)
+
+
+def _function_signature(node: ast.AST) -> str:
+    """Render a one-line signature for a function definition"""
+    prefix = "async def" if isinstance(node, ast.AsyncFunctionDef) else "def"
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns is not None else ""
+    return f"{prefix} {node.name}({_format_arguments(node.args)}){returns}"
+
+
+def extract_public_symbols(source: str) -> List[str]:
+    """Extract public class and function signatures from Python source
+
+    Args:
+        source: Python source code
+
+    Returns:
+        Signature lines; methods are indented under their class.
+        Returns an empty list if the source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return []
+
+    signatures = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and not node.name.startswith("_"):
+            signatures.append(_function_signature(node))
+        elif isinstance(node, ast.ClassDef) and not node.name.startswith("_"):
+            bases = ", ".join(ast.unparse(base) for base in node.bases)
+            signatures.append(f"class {node.name}({bases})" if bases else f"class {node.name}")
+            for member in node.body:
+                if isinstance(member, (ast.FunctionDef, ast.AsyncFunctionDef)) and (
+                    not member.name.startswith("_") or member.name == "__init__"
+                ):
+                    signatures.append("    " + _function_signature(member))
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                if isinstance(target, ast.Name) and target.id.isupper():
+                    signatures.append(f"{target.id} = ...")
+    return signatures
+
+
+class SymbolIndex:
+    """Incremental index of public symbols per generated module"""
+
+    def __init__(self, logger=None):
+        """Initialize an empty index.
+
+        Args:
+            logger: Optional logger instance
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.modules: Dict[str, List[str]] = {}
+
+    def add_source(self, file_path: str, source: str) -> None:
+        """Index the public symbols of a generated Python file
+
+        Args:
+            file_path: Relative path of the file
+            source: Python source code
+        """
+        if not file_path.endswith(".py"):
+            return
+        self.modules[module_name_for_path(file_path)] = extract_public_symbols(source)
+
+    def add_file(self, file_path: str, abs_path: str) -> None:
+        """Index the public symbols of a generated Python file on disk
+
+        Args:
+            file_path: Relative path of the file
+            abs_path: Absolute path to read the source from
+        """
+        if not file_path.endswith(".py"):
+            return
+        try:
+            with open(abs_path, "r", encoding="utf-8", errors="replace") as f:
+                self.add_source(file_path, f.read())
+        except OSError as e:
+            self.logger.warning(f"Could not index {abs_path}: {e}")
+
+    def render(self, modules: Iterable[str]) -> str:
+        """Render the signatures of the given modules for a prompt
+
+        Args:
+            modules: Module names to include; unknown or empty modules are skipped
+
+        Returns:
+            Prompt snippet, or an empty string if nothing is known
+        """
+        sections = []
+        for module in modules:
+            signatures = self.modules.get(module)
+            if signatures:
+                sections.append(f"# module {module}\n" + "\n".join(signatures))
+        return "\n\n".join(sections)
@@ -0,0 +1,319 @@
+"""
+Test Runner - Parallel execution of generated test files
+
+Runs generated test files in isolated subprocesses across a worker pool
+with per-test timeouts. Results are cached by the content hash of the test
+file and the code under test, so regenerating a project only re-runs the
+tests whose inputs changed. The code under test is what the test imports,
+directly or transitively, according to the AST import graph of the
+generated modules. Imports are resolved against the project root, ``src/``
+and the importing file's own directory; a test whose imports cannot be
+parsed, or that imports a module that is neither generated, in the standard
+library nor installed, depends on every module. The cache keeps one result
+per test file that still exists.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import importlib.util
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+try:
+    from omnitrace.generation.code_metrics import CodeMetricsAnalyzer, file_hash, module_name_for_path
+except ImportError:
+    try:
+        from generation.code_metrics import CodeMetricsAnalyzer, file_hash, module_name_for_path
+    except ImportError:
+        from code_metrics import CodeMetricsAnalyzer, file_hash, module_name_for_path
+
+# Result statuses that only depend on file content and can be cached
+CACHEABLE_STATUSES = {"passed", "failed", "no_tests"}
+
+# Characters of test output kept per result
+OUTPUT_TAIL_CHARS = 2000
+
+# Directories generated projects commonly import their packages from, besides the root
+SOURCE_ROOTS = ("src",)
+
+
+def is_test_file(file_path: str) -> bool:
+    """Check whether a generated file is a Python test file"""
+    name = os.path.basename(file_path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+class GeneratedTestRunner:
+    """Runs generated tests in subprocesses with a content-hash result cache"""
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: float = 30.0,
+                 cache_path: Optional[str] = None, logger=None):
+        """Initialize the test runner.
+
+        Args:
+            max_workers: Number of tests run concurrently (default: CPU count)
+            timeout: Per-test timeout in seconds
+            cache_path: JSON file for cached results (default: no persistent cache)
+            logger: Optional logger instance
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self._cache_lock = threading.Lock()
+        self._cache = self._load_cache()
+        self.use_pytest = importlib.util.find_spec("pytest") is not None
+        self._available: Dict[str, bool] = {}
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load cached results from disk"""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"Ignoring unreadable test cache {self.cache_path}: {e}")
+            return {}
+
+    def _save_cache(self, project_dir: str, test_paths: List[str]) -> None:
+        """Persist cached results to disk, pruning results of tests that are gone
+
+        Results of this project are kept for its current test files; results
+        of other projects are kept while their test file exists.
+        """
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        current = set(test_paths)
+        temp_path = f"{self.cache_path}.tmp"
+        with self._cache_lock:
+            self._cache = {
+                key: result for key, result in self._cache.items()
+                if result.get("project") and result.get("test") and (
+                    result["test"] in current if result["project"] == project_dir
+                    else os.path.exists(os.path.join(result["project"], result["test"]))
+                )
+            }
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f)
+        os.replace(temp_path, self.cache_path)
+
+    def _store_result(self, key: str, project_dir: str, test_path: str, outcome: Dict[str, Any]) -> None:
+        """Cache a result, replacing the test file's previous one"""
+        with self._cache_lock:
+            for stale in [old for old, result in self._cache.items()
+                          if result.get("project") == project_dir and result.get("test") == test_path]:
+                del self._cache[stale]
+            self._cache[key] = dict(outcome, project=project_dir, test=test_path)
+
+    def import_graph(self, output_dir: str, python_files: List[str]) -> Dict[str, Optional[List[str]]]:
+        """Generated modules each Python file imports, from its AST
+
+        Args:
+            output_dir: Directory where the project was generated
+            python_files: Relative paths of the generated Python files
+
+        Returns:
+            Mapping of file to the files it imports directly; None for files
+            that do not parse (their imports are unknown)
+        """
+        metrics = CodeMetricsAnalyzer(logger=self.logger).analyze_paths(output_dir, python_files)
+        # Module names of the generated files as seen from each source root
+        roots = {"": {module_name_for_path(path): path for path in python_files}}
+        for root in SOURCE_ROOTS:
+            prefix = f"{root}/"
+            roots[root] = {module_name_for_path(path[len(prefix):]): path
+                           for path in python_files if path.replace(os.sep, "/").startswith(prefix)}
+        graph: Dict[str, Optional[List[str]]] = {}
+        for path in python_files:
+            python = (metrics.get(path) or {}).get("python")
+            if not python or python["syntax_error"]:
+                graph[path] = None
+                continue
+            directory = os.path.dirname(path).replace(os.sep, "/")
+            local = {module_name_for_path(other[len(directory) + 1:]): other for other in python_files
+                     if directory and other.replace(os.sep, "/").startswith(f"{directory}/")}
+            imported_paths = set()
+            for imported in python["imports"]:
+                resolved = self._resolve_import(imported, [roots[""], *(roots[root] for root in SOURCE_ROOTS), local])
+                if resolved is None and not self._is_available(imported):
+                    # Not generated and not importable here: the dependencies are unknown
+                    imported_paths = None
+                    break
+                if resolved is not None and resolved != path:
+                    imported_paths.add(resolved)
+            graph[path] = None if imported_paths is None else sorted(imported_paths)
+        return graph
+
+    @staticmethod
+    def _resolve_import(imported: str, module_maps: List[Dict[str, str]]) -> Optional[str]:
+        """File of the longest generated module that prefixes an import, trying each root in turn"""
+        for modules in module_maps:
+            candidate = imported
+            while candidate and candidate not in modules:
+                candidate = candidate.rpartition(".")[0]
+            if candidate:
+                return modules[candidate]
+        return None
+
+    def _is_available(self, imported: str) -> bool:
+        """Whether an import is satisfied by the standard library or an installed package"""
+        top_level = imported.split(".")[0]
+        if top_level in sys.builtin_module_names or top_level in getattr(sys, "stdlib_module_names", ()):
+            return True
+        available = self._available.get(top_level)
+        if available is None:
+            try:
+                available = importlib.util.find_spec(top_level) is not None
+            except (ImportError, ValueError):
+                available = False
+            self._available[top_level] = available
+        return available
+
+    def _code_under_test(self, test_path: str, python_files: List[str],
+                         import_graph: Dict[str, Optional[List[str]]]) -> List[str]:
+        """Resolve the generated modules a test imports (transitively)
+
+        pytest loads conftest.py files without an import, so they always count.
+        """
+        conftests = [path for path in python_files if os.path.basename(path) == "conftest.py"]
+        seen = set()
+        pending = [test_path]
+        while pending:
+            path = pending.pop()
+            if path in seen:
+                continue
+            seen.add(path)
+            imports = import_graph.get(path)
+            if imports is None:
+                # Unknown imports: the test may depend on any module
+                return [path for path in python_files if not is_test_file(path)]
+            pending.extend(imports)
+        seen.discard(test_path)
+        return sorted(seen.union(conftests))
+
+    def _cache_key(self, output_dir: str, test_path: str, code_paths: List[str],
+                   hashes: Dict[str, str]) -> str:
+        """Hash the test file, the code under test and the interpreter version"""
+        digest = hashlib.sha256()
+        digest.update(f"{sys.version_info[:3]}:{self.use_pytest}".encode("utf-8"))
+        for path in [test_path] + code_paths:
+            if path not in hashes:
+                try:
+                    hashes[path] = file_hash(os.path.join(output_dir, path))
+                except OSError:
+                    hashes[path] = "missing"
+            digest.update(f"{path}:{hashes[path]}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _run_one(self, output_dir: str, test_path: str) -> Dict[str, Any]:
+        """Run a single test file in its own subprocess"""
+        if self.use_pytest:
+            command = [sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", test_path]
+        else:
+            command = [sys.executable, "-m", "unittest", test_path]
+
+        env = dict(os.environ)
+        source_roots = [os.path.join(output_dir, root) for root in SOURCE_ROOTS
+                        if os.path.isdir(os.path.join(output_dir, root))]
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.abspath(path) for path in [output_dir] + source_roots]
+                                                   + [env.get("PYTHONPATH")]))
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+        started = time.perf_counter()
+        try:
+            completed = subprocess.run(
+                command, cwd=output_dir, env=env, stdin=subprocess.DEVNULL,
+                capture_output=True, text=True, timeout=self.timeout
+            )
+            duration = time.perf_counter() - started
+            output = (completed.stdout or "") + (completed.stderr or "")
+            if completed.returncode == 0:
+                status = "passed"
+            elif self.use_pytest and completed.returncode == 5:
+                status = "no_tests"
+            else:
+                status = "failed"
+        except subprocess.TimeoutExpired as e:
+            duration = time.perf_counter() - started
+            status = "timeout"
+            output = f"Timed out after {self.timeout}s"
+            if e.stdout:
+                output = (e.stdout if isinstance(e.stdout, str) else e.stdout.decode("utf-8", "replace")) + output
+        except OSError as e:
+            duration = time.perf_counter() - started
+            status = "error"
+            output = str(e)
+
+        return {
+            "status": status,
+            "duration": round(duration, 3),
+            "output": output[-OUTPUT_TAIL_CHARS:]
+        }
+
+    def run(self, output_dir: str, rel_paths: List[str], project_dir: Optional[str] = None) -> Dict[str, Any]:
+        """Run all generated test files of a project
+
+        Args:
+            output_dir: Directory where the project was generated
+            rel_paths: Relative paths of the generated files
+            project_dir: Final directory of the project when ``output_dir`` is a
+                staging directory (default: ``output_dir``); identifies its cached results
+
+        Returns:
+            Summary with per-test results, status counts and timing
+        """
+        project_dir = os.path.abspath(project_dir or output_dir)
+        python_files = [path for path in rel_paths if path.endswith(".py")]
+        test_paths = [path for path in python_files if is_test_file(path)]
+        hashes: Dict[str, str] = {}
+        results: Dict[str, Dict[str, Any]] = {}
+        to_run = []
+        import_graph = self.import_graph(output_dir, python_files) if test_paths else {}
+
+        for test_path in test_paths:
+            code_paths = self._code_under_test(test_path, python_files, import_graph)
+            key = self._cache_key(output_dir, test_path, code_paths, hashes)
+            cached = self._cache.get(key)
+            if cached is not None:
+                results[test_path] = {name: value for name, value in cached.items() if name not in ("project", "test")}
+                results[test_path]["cached"] = True
+            else:
+                to_run.append((test_path, key))
+
+        self.logger.info(f"Running {len(to_run)} generated test files ({len(results)} cached) "
+                         f"with {self.max_workers} workers")
+        started = time.perf_counter()
+        if to_run:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                outcomes = executor.map(lambda item: self._run_one(output_dir, item[0]), to_run)
+                for (test_path, key), outcome in zip(to_run, outcomes):
+                    results[test_path] = dict(outcome, cached=False)
+                    if outcome["status"] in CACHEABLE_STATUSES:
+                        self._store_result(key, project_dir, test_path, outcome)
+        self._save_cache(project_dir, test_paths)
+        wall_seconds = time.perf_counter() - started
+
+        counts = {"passed": 0, "failed": 0, "no_tests": 0, "timeout": 0, "error": 0}
+        for result in results.values():
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+        summary = {
+            "total": len(test_paths),
+            "executed": len(to_run),
+            "cached": len(test_paths) - len(to_run),
+            "counts": counts,
+            "wall_seconds": round(wall_seconds, 2),
+            "summed_seconds": round(sum(r["duration"] for r in results.values() if not r["cached"]), 2),
+            "results": {path: results[path] for path in test_paths}
+        }
+        self.logger.info(f"Generated tests: {counts['passed']} passed, {counts['failed']} failed, "
+                         f"{counts['timeout']} timed out in {summary['wall_seconds']}s")
+        return summary
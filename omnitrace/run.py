@@ -41,6 +41,17 @@ except ImportError:
                             except ImportError:
                                 from omniagent import OmniAgent as UnifiedOmniAgent
 
+try:
+    from omnitrace.utils.llm_limit import set_llm_concurrency, DEFAULT_LLM_CONCURRENCY
+    from omnitrace.utils.template_cache import get_template_cache
+except ImportError:
+    try:
+        from utils.llm_limit import set_llm_concurrency, DEFAULT_LLM_CONCURRENCY
+        from utils.template_cache import get_template_cache
+    except ImportError:
+        from llm_limit import set_llm_concurrency, DEFAULT_LLM_CONCURRENCY
+        from template_cache import get_template_cache
+
 # Configure logging
 def setup_logging(debug_mode: bool = False) -> logging.Logger:
     """Set up logging with appropriate level based on debug mode."""
@@ -128,6 +139,25 @@ def main() -> None:
     parser.add_argument("--description", help="Project description")
     parser.add_argument("--code-gen", action="store_true", help="Enable code generation")
     parser.add_argument("--no-code-gen", action="store_true", help="Disable code generation")
+    parser.add_argument("--stream-code", action="store_true", help="Stream generated code straight to disk")
+    parser.add_argument("--run-tests", action="store_true", help="Run generated test files after code generation")
+    parser.add_argument("--test-timeout", type=float, default=30.0, help="Per-test timeout in seconds for --run-tests")
+    parser.add_argument("--dedup", choices=["reflink", "hardlink"],
+                        help="Deduplicate project files across projects through the blob store")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update an existing project in place of rewriting it, preserving hand edits")
+    parser.add_argument("--structured-output", choices=["schema", "json"],
+                        help="Constrain structure responses to the JSON schema or to JSON")
+    parser.add_argument("--lazy-docs", action="store_true",
+                        help="Render analysis documents on first request instead of during generation")
+    parser.add_argument("--section-docs", action="store_true",
+                        help="Generate LLM-written documents as an outline plus concurrently generated sections")
+    parser.add_argument("--llm-concurrency", type=int, default=DEFAULT_LLM_CONCURRENCY,
+                        help="Maximum concurrent LLM calls across all generators")
+    parser.add_argument("--watch-templates", action="store_true",
+                        help="Reload agent templates when their files change")
+    parser.add_argument("--templates-from", metavar="PROJECT",
+                        help="Generate with the exact template versions a previous project used")
     parser.add_argument("--config", help="Path to configuration file (YAML or JSON)")
     parser.add_argument("--revolution-level", 
                         choices=["moderate", "high", "maximum"], 
@@ -157,6 +187,10 @@ def main() -> None:
     logger.debug(f"Loaded configuration: {config}")
     
     try:
+        set_llm_concurrency(config.get("llm_concurrency", args.llm_concurrency))
+        if config.get("watch_templates", args.watch_templates):
+            get_template_cache().start_watching()
+        
         # Initialize the unified agent
         agent = UnifiedOmniAgent(model_name=args.model)
         
@@ -178,6 +212,41 @@ def main() -> None:
             
             agent.enable_code_generation(code_gen)
         
+        if hasattr(agent, "enable_code_streaming"):
+            agent.enable_code_streaming(config.get("code_streaming", args.stream_code))
+        
+        if hasattr(agent, "enable_test_execution"):
+            agent.enable_test_execution(
+                config.get("run_tests", args.run_tests),
+                timeout=config.get("test_timeout", args.test_timeout)
+            )
+        
+        dedup = config.get("dedup", args.dedup)
+        if dedup and hasattr(agent, "enable_artifact_dedup"):
+            agent.enable_artifact_dedup(True, link_mode=dedup)
+        
+        if hasattr(agent, "enable_incremental_structure"):
+            agent.enable_incremental_structure(config.get("incremental", args.incremental))
+        
+        if hasattr(agent, "enable_lazy_docs"):
+            agent.enable_lazy_docs(config.get("lazy_docs", args.lazy_docs))
+        
+        if hasattr(agent, "enable_section_parallel_docs"):
+            agent.enable_section_parallel_docs(config.get("section_docs", args.section_docs))
+        
+        structured_output = config.get("structured_output", args.structured_output)
+        if structured_output and hasattr(agent, "enable_structured_output"):
+            agent.enable_structured_output(True, mode=structured_output)
+        
+        templates_from = config.get("templates_from", args.templates_from)
+        if templates_from and hasattr(agent, "use_project_templates"):
+            try:
+                agent.use_project_templates(os.path.join(os.getcwd(), "projects", templates_from))
+            except ValueError as e:
+                logger.error(str(e))
+                print(f"Error: {e}")
+                sys.exit(1)
+        
         # Launch web UI if requested
         if args.web:
             logger.info("Launching web interface")
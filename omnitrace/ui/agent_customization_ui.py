@@ -17,6 +17,14 @@ except ImportError:
     except ImportError:
         from enhanced_omniagent import EnhancedOmniAgent
 
+try:
+    from omnitrace.utils.staging import list_projects as list_committed_projects
+except ImportError:
+    try:
+        from utils.staging import list_projects as list_committed_projects
+    except ImportError:
+        from staging import list_projects as list_committed_projects
+
 class AgentCustomizationUI:
     """Gradio UI for agent customization"""
 
@@ -147,10 +155,9 @@ class AgentCustomizationUI:
             # List all generated projects
             def list_projects():
                 projects_dir = os.path.join(os.getcwd(), "projects")
-                if not os.path.exists(projects_dir):
-                    return "No projects generated yet."
-
-                projects = os.listdir(projects_dir)
+                
+                # Only committed projects; in-progress generations live in a hidden staging area
+                projects = list_committed_projects(projects_dir)
                 if not projects:
                     return "No projects generated yet."
                 
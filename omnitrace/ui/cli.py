@@ -23,6 +23,126 @@ except ImportError:
         except ImportError:
             from enhanced_omniagent import EnhancedOmniAgent as UnifiedOmniAgent
 
+try:
+    from omnitrace.utils.staging import list_projects
+    from omnitrace.utils.blob_store import BlobStore
+    from omnitrace.utils.project_export import ProjectExport, ARCHIVE_FORMATS
+except ImportError:
+    try:
+        from utils.staging import list_projects
+        from utils.blob_store import BlobStore
+        from utils.project_export import ProjectExport, ARCHIVE_FORMATS
+    except ImportError:
+        from staging import list_projects
+        from blob_store import BlobStore
+        from project_export import ProjectExport, ARCHIVE_FORMATS
+
+try:
+    from omnitrace.generation.doc_pipeline import (
+        available_documents, materialize_document, materialize_deferred_documents
+    )
+except ImportError:
+    try:
+        from generation.doc_pipeline import (
+            available_documents, materialize_document, materialize_deferred_documents
+        )
+    except ImportError:
+        from doc_pipeline import (
+            available_documents, materialize_document, materialize_deferred_documents
+        )
+
+try:
+    from omnitrace.utils.llm_limit import set_llm_concurrency, DEFAULT_LLM_CONCURRENCY
+    from omnitrace.utils.template_cache import get_template_cache
+except ImportError:
+    try:
+        from utils.llm_limit import set_llm_concurrency, DEFAULT_LLM_CONCURRENCY
+        from utils.template_cache import get_template_cache
+    except ImportError:
+        from llm_limit import set_llm_concurrency, DEFAULT_LLM_CONCURRENCY
+        from template_cache import get_template_cache
+
+def collect_garbage(dry_run: bool = False, logger=None):
+    """Remove blobs no project references and report the space deduplication saves"""
+    projects_dir = os.path.join(os.getcwd(), "projects")
+    report = BlobStore(projects_dir, logger=logger).gc(dry_run=dry_run)
+    
+    action = "Would remove" if dry_run else "Removed"
+    print(f"\n{action} {report['removed_blobs']} unreferenced blobs ({report['removed_bytes']} bytes)")
+    print(f"Blob store: {report['blobs']} blobs, {report['blob_bytes']} bytes")
+    print(f"Referenced by projects: {report['referenced_bytes']} bytes")
+    print(f"Disk space saved: {report['bytes_saved']} bytes")
+    return report
+
+def export_project(name: str, archive_format: str = "tar.gz", output: str = None,
+                   dedup: bool = False, logger=None):
+    """Stream a generated project into an archive file or stdout and report throughput
+    
+    Args:
+        name: Project name
+        archive_format: One of ARCHIVE_FORMATS
+        output: Archive path, "-" for stdout (default: <name><extension> in the working directory)
+        dedup: Store identical files once (tar formats only)
+        logger: Optional logger instance
+    
+    Returns:
+        The export report, or None if the project does not exist
+    """
+    projects_dir = os.path.join(os.getcwd(), "projects")
+    if name not in list_projects(projects_dir):
+        print(f"Project not found: {name}", file=sys.stderr)
+        return None
+    
+    # The archive carries every document, not the inputs of deferred ones only
+    materialize_deferred_documents(os.path.join(projects_dir, name))
+    export = ProjectExport(os.path.join(projects_dir, name), archive_format, dedup=dedup, logger=logger)
+    if output == "-":
+        report = export.write_to(sys.stdout.buffer)
+    else:
+        output = output or export.filename
+        with open(output, "wb") as f:
+            report = export.write_to(f)
+    
+    # Keep stdout clean when it carries the archive
+    out = sys.stderr if output == "-" else sys.stdout
+    print(f"\nExported {report['files']} files ({report['bytes_in']} bytes) to {output} "
+          f"as {archive_format}: {report['bytes_out']} bytes", file=out)
+    if dedup:
+        print(f"Duplicates stored as links: {report['duplicates']} ({report['bytes_deduplicated']} bytes)", file=out)
+    print(f"Throughput: {report['mb_per_second']:.1f} MB/s in {report['seconds']:.2f}s "
+          f"(compression ratio {report['compression_ratio']:.2f})", file=out)
+    return report
+
+def show_document(name: str, doc_type: str = None):
+    """Print a project document, rendering a deferred one on first request (no LLM calls)
+    
+    Args:
+        name: Project name
+        doc_type: Document type; without one the project's documents are listed
+    
+    Returns:
+        The document's markdown, or None
+    """
+    projects_dir = os.path.join(os.getcwd(), "projects")
+    if name not in list_projects(projects_dir):
+        print(f"Project not found: {name}")
+        return None
+    
+    project_dir = os.path.join(projects_dir, name)
+    if not doc_type:
+        print(f"\nDocuments of {name}:")
+        for available, state in available_documents(project_dir).items():
+            print(f"  {available:<20} {state}")
+        return None
+    
+    try:
+        content = materialize_document(project_dir, doc_type)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return None
+    print(content)
+    return content
+
 class OmnitrAIceCLI:
     """Command Line Interface for OmnitrAIce system"""
     
@@ -92,6 +212,11 @@ class OmnitrAIceCLI:
         print("  create - Create new revolutionary project using first-principles thinking")
         print("          (format: create ProjectName \"Project Description\")")
         print("  list   - List all generated projects")
+        print("  gc     - Remove unreferenced blobs and report disk space saved")
+        print("  show   - Show a project document, rendering deferred ones on first request")
+        print("          (format: show ProjectName [document])")
+        print("  export - Stream a project into a tar/zip archive")
+        print(f"          (format: export ProjectName [{'|'.join(ARCHIVE_FORMATS)}] [dedup])")
         print("  config - Show or update configuration")
         print("          (format: config [parameter] [value])")
         print("  exit   - Exit the system")
@@ -101,11 +226,9 @@ class OmnitrAIceCLI:
     def list_projects(self):
         """List all generated projects"""
         projects_dir = os.path.join(os.getcwd(), "projects")
-        if not os.path.exists(projects_dir):
-            print("No projects have been generated yet.")
-            return
         
-        projects = os.listdir(projects_dir)
+        # Only committed projects; in-progress generations live in a hidden staging area
+        projects = list_projects(projects_dir)
         if not projects:
             print("No projects have been generated yet.")
             return
@@ -139,6 +262,27 @@ class OmnitrAIceCLI:
         
         if hasattr(self.agent, "enable_code_gen"):
             print(f"  Code Generation: {'Enabled' if self.agent.enable_code_gen else 'Disabled'}")
+        
+        if hasattr(self.agent, "stream_code_to_disk"):
+            print(f"  Code Streaming: {'Enabled' if self.agent.stream_code_to_disk else 'Disabled'}")
+        
+        if hasattr(self.agent, "run_generated_tests"):
+            print(f"  Generated Test Execution: {'Enabled' if self.agent.run_generated_tests else 'Disabled'}")
+        
+        if hasattr(self.agent, "dedup_link_mode"):
+            print(f"  Artifact Deduplication: {self.agent.dedup_link_mode or 'Disabled'}")
+        
+        if hasattr(self.agent, "incremental_structure"):
+            print(f"  Incremental Structure: {'Enabled' if self.agent.incremental_structure else 'Disabled'}")
+        
+        structured_output = getattr(getattr(self.agent, "filesystem_agent", None), "structured_output", None)
+        print(f"  Structured Output: {structured_output or 'Disabled'}")
+        
+        if hasattr(self.agent, "lazy_docs"):
+            print(f"  Lazy Documents: {'Enabled' if self.agent.lazy_docs else 'Disabled'}")
+        
+        section_parallel = getattr(getattr(self.agent, "doc_generator", None), "section_parallel", False)
+        print(f"  Section-Parallel Documents: {'Enabled' if section_parallel else 'Disabled'}")
     
     def update_config(self, parameter, value):
         """Update a configuration parameter
@@ -166,6 +310,41 @@ class OmnitrAIceCLI:
                     self.agent.enable_code_generation(value.lower() == "true")
                     return True
             
+            elif parameter == "code_streaming":
+                if hasattr(self.agent, "enable_code_streaming"):
+                    self.agent.enable_code_streaming(value.lower() == "true")
+                    return True
+            elif parameter == "run_tests":
+                if hasattr(self.agent, "enable_test_execution"):
+                    self.agent.enable_test_execution(value.lower() == "true")
+                    return True
+            elif parameter == "dedup":
+                if hasattr(self.agent, "enable_artifact_dedup"):
+                    if value.lower() in ("reflink", "hardlink"):
+                        self.agent.enable_artifact_dedup(True, link_mode=value.lower())
+                    else:
+                        self.agent.enable_artifact_dedup(value.lower() == "true")
+                    return True
+            elif parameter == "incremental":
+                if hasattr(self.agent, "enable_incremental_structure"):
+                    self.agent.enable_incremental_structure(value.lower() == "true")
+                    return True
+            elif parameter == "lazy_docs":
+                if hasattr(self.agent, "enable_lazy_docs"):
+                    self.agent.enable_lazy_docs(value.lower() == "true")
+                    return True
+            elif parameter == "section_docs":
+                if hasattr(self.agent, "enable_section_parallel_docs"):
+                    self.agent.enable_section_parallel_docs(value.lower() == "true")
+                    return True
+            elif parameter == "structured_output":
+                if hasattr(self.agent, "enable_structured_output"):
+                    if value.lower() in ("schema", "json"):
+                        self.agent.enable_structured_output(True, mode=value.lower())
+                    else:
+                        self.agent.enable_structured_output(value.lower() == "true")
+                    return True
+            
             return False
         except Exception as e:
             self.logger.error(f"Error updating configuration: {str(e)}")
@@ -196,6 +375,18 @@ class OmnitrAIceCLI:
                     print(f"- File structure generation: {'Yes' if capabilities.get('file_structure', False) else 'No'}")
                     print(f"- Code generation: {'Yes' if capabilities.get('code_generation', False) else 'No'}")
                 
+                if result.get("documentation"):
+                    documentation = result["documentation"]
+                    print(f"\nDocuments: {len(documentation['derived'])} derived from agent outputs, "
+                          f"{len(documentation['generated'])} generated ({documentation['llm_calls_saved']} LLM calls saved)")
+                    if documentation.get("deferred"):
+                        print(f"Deferred until shown: {', '.join(documentation['deferred'])} "
+                              f"(show {os.path.basename(result.get('output_dir', ''))} <document>)")
+
+                if result.get("template_versions"):
+                    print("Template versions: " + ", ".join(
+                        f"{role} {digest[:12]}" for role, digest in result["template_versions"].items()))
+
                 # Display revolutionary metrics if available
                 if result.get("revolutionary_metrics"):
                     metrics = result.get("revolutionary_metrics", {})
@@ -224,6 +415,18 @@ class OmnitrAIceCLI:
                     self.print_help()
                 elif command.lower() == "list":
                     self.list_projects()
+                elif command.lower() == "gc":
+                    collect_garbage(logger=self.logger)
+                elif command.lower().startswith("show "):
+                    parts = command.split()
+                    show_document(parts[1], parts[2] if len(parts) >= 3 else None)
+                elif command.lower().startswith("export "):
+                    parts = command.split()
+                    archive_format = parts[2] if len(parts) >= 3 else "tar.gz"
+                    if archive_format not in ARCHIVE_FORMATS:
+                        print(f"Unknown archive format. Use one of: {', '.join(ARCHIVE_FORMATS)}")
+                    else:
+                        export_project(parts[1], archive_format, dedup="dedup" in parts[3:], logger=self.logger)
                 elif command.lower() == "config":
                     self.show_config()
                 elif command.lower().startswith("config "):
@@ -271,6 +474,35 @@ def main():
                         help="Level of constraint elimination (cautious=fewer constraints challenged, aggressive=most constraints challenged)")
     parser.add_argument("--code-gen", action="store_true", help="Enable code generation")
     parser.add_argument("--no-code-gen", action="store_true", help="Disable code generation")
+    parser.add_argument("--stream-code", action="store_true", help="Stream generated code straight to disk")
+    parser.add_argument("--run-tests", action="store_true", help="Run generated test files after code generation")
+    parser.add_argument("--test-timeout", type=float, default=30.0, help="Per-test timeout in seconds for --run-tests")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Update an existing project in place of rewriting it, preserving hand edits")
+    parser.add_argument("--structured-output", choices=["schema", "json"],
+                        help="Constrain structure responses to the JSON schema or to JSON")
+    parser.add_argument("--dedup", choices=["reflink", "hardlink"],
+                        help="Deduplicate project files across projects through the blob store")
+    parser.add_argument("--section-docs", action="store_true",
+                        help="Generate LLM-written documents as an outline plus concurrently generated sections")
+    parser.add_argument("--llm-concurrency", type=int, default=DEFAULT_LLM_CONCURRENCY,
+                        help="Maximum concurrent LLM calls across all generators")
+    parser.add_argument("--watch-templates", action="store_true",
+                        help="Reload agent templates when their files change")
+    parser.add_argument("--templates-from", metavar="PROJECT",
+                        help="Generate with the exact template versions a previous project used")
+    parser.add_argument("--gc", action="store_true",
+                        help="Remove unreferenced blobs, report disk space saved and exit")
+    parser.add_argument("--dry-run", action="store_true", help="With --gc, only report what would be removed")
+    parser.add_argument("--lazy-docs", action="store_true",
+                        help="Render analysis documents on first request instead of during generation")
+    parser.add_argument("--show", nargs="+", metavar=("PROJECT", "DOCUMENT"),
+                        help="Show a project document (or list them) and exit")
+    parser.add_argument("--export", metavar="PROJECT", help="Stream a generated project into an archive and exit")
+    parser.add_argument("--format", choices=list(ARCHIVE_FORMATS), default="tar.gz", help="Archive format for --export")
+    parser.add_argument("--output", help="Archive path for --export, '-' for stdout")
+    parser.add_argument("--export-dedup", action="store_true",
+                        help="With --export, store identical files once as hard-link entries (tar formats)")
     parser.add_argument("--interactive", action="store_true", help="Run in interactive mode")
     parser.add_argument("--verbose", action="store_true", help="Enable verbose logging")
     
@@ -281,6 +513,26 @@ def main():
     logging.basicConfig(level=log_level)
     
     try:
+        # Blob garbage collection needs no model
+        if args.gc:
+            collect_garbage(dry_run=args.dry_run)
+            return
+        
+        # Showing documents never calls the model
+        if args.show:
+            show_document(args.show[0], args.show[1] if len(args.show) > 1 else None)
+            return
+        
+        # Exports read finished projects only
+        if args.export:
+            if not export_project(args.export, args.format, args.output, dedup=args.export_dedup):
+                sys.exit(1)
+            return
+        
+        set_llm_concurrency(args.llm_concurrency)
+        if args.watch_templates:
+            get_template_cache().start_watching()
+        
         # Initialize CLI
         cli = OmnitrAIceCLI(model_name=args.model)
         
@@ -298,6 +550,34 @@ def main():
             elif args.code_gen:
                 cli.agent.enable_code_generation(True)
         
+        if args.stream_code and hasattr(cli.agent, "enable_code_streaming"):
+            cli.agent.enable_code_streaming(True)
+        
+        if args.run_tests and hasattr(cli.agent, "enable_test_execution"):
+            cli.agent.enable_test_execution(True, timeout=args.test_timeout)
+        
+        if args.incremental and hasattr(cli.agent, "enable_incremental_structure"):
+            cli.agent.enable_incremental_structure(True)
+        
+        if args.dedup and hasattr(cli.agent, "enable_artifact_dedup"):
+            cli.agent.enable_artifact_dedup(True, link_mode=args.dedup)
+        
+        if args.lazy_docs and hasattr(cli.agent, "enable_lazy_docs"):
+            cli.agent.enable_lazy_docs(True)
+        
+        if args.section_docs and hasattr(cli.agent, "enable_section_parallel_docs"):
+            cli.agent.enable_section_parallel_docs(True)
+        
+        if args.structured_output and hasattr(cli.agent, "enable_structured_output"):
+            cli.agent.enable_structured_output(True, mode=args.structured_output)
+        
+        if args.templates_from and hasattr(cli.agent, "use_project_templates"):
+            try:
+                cli.agent.use_project_templates(os.path.join(os.getcwd(), "projects", args.templates_from))
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
+        
         # Run in appropriate mode
         if args.interactive:
             # Interactive mode
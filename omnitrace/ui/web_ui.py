@@ -25,6 +25,31 @@ except ImportError:
         except ImportError:
             from enhanced_omniagent import EnhancedOmniAgent as UnifiedOmniAgent
 
+try:
+    from omnitrace.generation.doc_pipeline import available_documents, materialize_document, materialize_deferred_documents
+except ImportError:
+    try:
+        from generation.doc_pipeline import available_documents, materialize_document, materialize_deferred_documents
+    except ImportError:
+        from doc_pipeline import available_documents, materialize_document, materialize_deferred_documents
+
+try:
+    from omnitrace.utils.staging import PROJECTS_ROOT, list_projects
+    from omnitrace.utils.project_export import ProjectExport, ARCHIVE_FORMATS
+    from omnitrace.utils.template_cache import get_template_cache, template_path
+except ImportError:
+    try:
+        from utils.staging import PROJECTS_ROOT, list_projects
+        from utils.project_export import ProjectExport, ARCHIVE_FORMATS
+        from utils.template_cache import get_template_cache, template_path
+    except ImportError:
+        from staging import PROJECTS_ROOT, list_projects
+        from project_export import ProjectExport, ARCHIVE_FORMATS
+        from template_cache import get_template_cache, template_path
+
+# Route that streams project archives (gradio file outputs need a file on disk)
+EXPORT_ROUTE = "/omnitrace/export"
+
 class OmnitrAIceWebUI:
     """
     Comprehensive Web Interface for OmnitrAIce Project Generation System
@@ -108,6 +133,14 @@ class OmnitrAIceWebUI:
                 # Revolutionary Settings Tab
                 with gr.TabItem("Revolutionary Settings"):
                     self._revolutionary_settings_tab()
+                
+                # Project Documents Tab
+                with gr.TabItem("Project Documents"):
+                    self._documents_tab()
+                
+                # Project Export Tab
+                with gr.TabItem("Export Project"):
+                    self._export_tab()
             
             # Status and Output Section (now visible)
             status_row.visible = True
@@ -273,6 +306,48 @@ class OmnitrAIceWebUI:
                                              inputs=[self.enable_code_gen, self.enable_file_structure, self.enable_metrics],
                                              outputs=[self.output_status])
 
+    def _documents_tab(self):
+        """
+        Create the Project Documents Tab UI Components
+        """
+        with gr.Row():
+            with gr.Column(scale=1):
+                self.docs_project = gr.Dropdown(choices=list_projects(PROJECTS_ROOT), label="Project")
+                self.refresh_docs_btn = gr.Button("Refresh Projects")
+                self.docs_document = gr.Dropdown(choices=[], label="Document")
+                self.show_doc_btn = gr.Button("Show Document", variant="primary")
+            
+            with gr.Column(scale=3):
+                self.doc_view = gr.Markdown()
+        
+        self.refresh_docs_btn.click(fn=lambda: gr.update(choices=list_projects(PROJECTS_ROOT)),
+                                    outputs=[self.docs_project])
+        self.docs_project.change(fn=self._document_choices, inputs=[self.docs_project], outputs=[self.docs_document])
+        self.show_doc_btn.click(fn=self._show_document, inputs=[self.docs_project, self.docs_document],
+                                outputs=[self.doc_view])
+
+    def _export_tab(self):
+        """
+        Create the Project Export Tab UI Components
+        """
+        with gr.Row():
+            with gr.Column():
+                gr.Markdown("### Download a Generated Project")
+                self.export_project = gr.Dropdown(choices=list_projects(PROJECTS_ROOT), label="Project")
+                self.refresh_export_btn = gr.Button("Refresh Projects")
+                self.export_format = gr.Radio(choices=list(ARCHIVE_FORMATS), value="tar.gz", label="Archive Format")
+                self.export_dedup = gr.Checkbox(label="Store identical files once (tar formats)", value=False)
+                self.export_btn = gr.Button("Prepare Download", variant="primary")
+            
+            with gr.Column():
+                self.export_link = gr.Markdown()
+        
+        self.refresh_export_btn.click(fn=lambda: gr.update(choices=list_projects(PROJECTS_ROOT)),
+                                      outputs=[self.export_project])
+        self.export_btn.click(fn=self._export_link,
+                              inputs=[self.export_project, self.export_format, self.export_dedup],
+                              outputs=[self.export_link])
+
     # Implementation of UI action handlers
     def _create_project(self, name, description):
         """Create a new revolutionary project"""
@@ -370,11 +445,8 @@ class OmnitrAIceWebUI:
             if not template_name:
                 return "Error: No template selected", self._get_custom_templates()
             
-            templates_dir = os.path.join("config", "templates")
-            template_path = os.path.join(templates_dir, f"{template_name}_template.json")
-            
-            if os.path.exists(template_path):
-                os.remove(template_path)
+            # Agents using the template fall back to their defaults
+            if get_template_cache().remove(template_path(template_name)):
                 return f"Successfully deleted template: {template_name}", self._get_custom_templates()
             else:
                 return f"Template not found: {template_name}", self._get_custom_templates()
@@ -400,6 +472,52 @@ class OmnitrAIceWebUI:
             self.logger.error(f"Error updating revolutionary settings: {str(e)}")
             return f"Error: {str(e)}"
 
+    def _document_choices(self, name):
+        """List a project's documents; deferred ones are rendered when shown"""
+        if not name or name not in list_projects(PROJECTS_ROOT):
+            return gr.update(choices=[], value=None)
+        documents = available_documents(os.path.join(PROJECTS_ROOT, name))
+        return gr.update(choices=list(documents), value=next(iter(documents), None))
+
+    def _show_document(self, name, doc_type):
+        """Show a document, rendering a deferred one on first request (no LLM calls)"""
+        if not name or name not in list_projects(PROJECTS_ROOT) or not doc_type:
+            return "Select a project and a document"
+        try:
+            return materialize_document(os.path.join(PROJECTS_ROOT, name), doc_type)
+        except ValueError as e:
+            return f"Error: {str(e)}"
+
+    def _export_link(self, name, archive_format, dedup):
+        """Build the download link for a project archive"""
+        if not name or name not in list_projects(PROJECTS_ROOT):
+            return "Error: Select a generated project"
+        if dedup and archive_format == "zip":
+            return "Error: Zip archives cannot store duplicates as links; choose a tar format"
+        extension = ARCHIVE_FORMATS[archive_format][1]
+        query = f"format={archive_format}" + ("&dedup=true" if dedup else "")
+        return f"[⬇️ Download {name}{extension}]({EXPORT_ROUTE}/{name}?{query})"
+
+    def _stream_export(self, name: str, format: str = "tar.gz", dedup: bool = False):
+        """Stream a project archive as the HTTP response, chunk by chunk"""
+        from fastapi import HTTPException
+        from fastapi.responses import StreamingResponse
+        
+        # Only committed projects: the name never reaches the filesystem unchecked
+        if name not in list_projects(PROJECTS_ROOT):
+            raise HTTPException(status_code=404, detail=f"Project not found: {name}")
+        try:
+            export = ProjectExport(os.path.join(PROJECTS_ROOT, name), format, dedup=dedup, logger=self.logger)
+            # The archive carries every document, not the inputs of deferred ones only
+            materialize_deferred_documents(export.project_dir)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(
+            export.iter_chunks(),
+            media_type=export.media_type,
+            headers={"Content-Disposition": f'attachment; filename="{export.filename}"'}
+        )
+
     def _get_custom_templates(self):
         """Get a list of custom templates"""
         try:
@@ -428,7 +546,10 @@ class OmnitrAIceWebUI:
             self.create_ui()
         
         try:
-            self.app.launch(share=share, debug=debug)
+            # The export route is added to gradio's FastAPI app once it exists
+            self.app.launch(share=share, show_error=debug, prevent_thread_lock=True)
+            self.app.server_app.add_api_route(f"{EXPORT_ROUTE}/{{name}}", self._stream_export, methods=["GET"])
+            self.app.block_thread()
         except Exception as e:
             self.logger.error(f"Error launching Web UI: {e}")
             traceback.print_exc()
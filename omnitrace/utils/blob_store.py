@@ -0,0 +1,278 @@
+"""
+Blob Store - Content-addressed deduplication of generated project files
+
+Generated projects repeat many identical files: directory READMEs, stub
+templates, boilerplate headers and documentation. The blob store keeps one
+copy of each distinct content under ``projects/.blobs`` (addressed by its
+SHA-256) and makes project files share it, either as a reflink (a
+copy-on-write clone, where the filesystem supports it) or as a hard link.
+
+Reflinks are the default: an edit to one project never reaches another.
+Hard links save space on every filesystem, but all projects sharing a blob
+share one inode, so a tool that rewrites a file in place changes it
+everywhere; every writer in the pipeline runs before deduplication, and
+blobs are stored read-only.
+
+Each deduplicated project records the blobs it references in
+``.omnitrace_blobs.json``; garbage collection keeps every blob referenced
+by a manifest and removes the rest.
+"""
+
+import os
+import json
+import errno
+import shutil
+import hashlib
+import logging
+import tempfile
+from typing import Dict, Any, Optional
+
+try:
+    from omnitrace.utils.staging import PROJECTS_ROOT
+except ImportError:
+    try:
+        from utils.staging import PROJECTS_ROOT
+    except ImportError:
+        from staging import PROJECTS_ROOT
+
+# Hidden directory under the projects root that holds the blobs
+BLOBS_DIR = ".blobs"
+
+# Per-project manifest of referenced blobs
+MANIFEST_NAME = ".omnitrace_blobs.json"
+
+# Link modes
+LINK_REFLINK = "reflink"
+LINK_HARDLINK = "hardlink"
+LINK_MODES = (LINK_REFLINK, LINK_HARDLINK)
+
+# Linux FICLONE ioctl: clone all extents of one file into another
+_FICLONE = 0x40049409
+
+
+def _hash_file(path: str) -> str:
+    """Hash a file's content in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _reflink(source: str, dest: str) -> None:
+    """Clone ``source`` to ``dest`` copy-on-write; raises OSError if unsupported"""
+    try:
+        import fcntl
+    except ImportError:
+        raise OSError(errno.EOPNOTSUPP, "reflinks are not supported on this platform")
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+
+
+class BlobStore:
+    """Content-addressed store that deduplicates files across projects"""
+
+    def __init__(self, projects_root: str = PROJECTS_ROOT, link_mode: str = LINK_REFLINK,
+                 min_size: int = 1, logger=None):
+        """Initialize the blob store.
+
+        Args:
+            projects_root: Directory that holds generated projects
+            link_mode: "reflink" (copy-on-write clones) or "hardlink"
+            min_size: Files smaller than this many bytes are left alone
+            logger: Optional logger instance
+        """
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {link_mode} (expected one of {LINK_MODES})")
+        self.logger = logger or logging.getLogger(__name__)
+        self.projects_root = projects_root
+        self.blobs_dir = os.path.join(projects_root, BLOBS_DIR)
+        self.link_mode = link_mode
+        self.min_size = min_size
+        self._reflink_supported: Optional[bool] = None
+
+    def blob_path(self, digest: str) -> str:
+        """Path of the blob with the given digest"""
+        return os.path.join(self.blobs_dir, digest[:2], digest[2:])
+
+    def _add_blob(self, path: str, digest: str) -> bool:
+        """Store a copy of ``path`` as a blob unless it exists; returns True if added"""
+        blob_path = self.blob_path(digest)
+        if os.path.exists(blob_path):
+            return False
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(blob_path))
+        os.close(fd)
+        try:
+            shutil.copyfile(path, temp_path)
+            os.chmod(temp_path, 0o444)
+            # Same content under the same name: losing a race to another writer is fine
+            os.replace(temp_path, blob_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        return True
+
+    def _link(self, blob_path: str, path: str) -> bool:
+        """Replace ``path`` with a link to ``blob_path``; returns False if unsupported"""
+        temp_path = f"{path}.omnitrace-link"
+        try:
+            if self.link_mode == LINK_HARDLINK:
+                os.link(blob_path, temp_path)
+            else:
+                if self._reflink_supported is False:
+                    return False
+                try:
+                    _reflink(blob_path, temp_path)
+                    self._reflink_supported = True
+                except OSError as e:
+                    if os.path.exists(temp_path):
+                        os.unlink(temp_path)
+                    if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS):
+                        if self._reflink_supported is None:
+                            self.logger.warning("Filesystem does not support reflinks; files are not deduplicated")
+                        self._reflink_supported = False
+                        return False
+                    raise
+                shutil.copymode(path, temp_path)
+            os.replace(temp_path, path)
+            return True
+        except OSError as e:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            if e.errno in (errno.EXDEV, errno.EMLINK, errno.EPERM):
+                return False
+            raise
+
+    def ingest_tree(self, root: str) -> Dict[str, Any]:
+        """Deduplicate every file below ``root`` against the store
+
+        Must run once all writers of the tree are done (e.g. right before a
+        staged project is committed). Writes ``.omnitrace_blobs.json`` into
+        ``root`` listing the referenced blobs.
+
+        Args:
+            root: Project directory to deduplicate
+
+        Returns:
+            Report with file, blob, byte and saved-byte counts
+        """
+        manifest: Dict[str, str] = {}
+        report = {"files": 0, "linked": 0, "new_blobs": 0, "bytes": 0, "bytes_shared": 0}
+        # Explicit stack of directories: project trees can nest arbitrarily deep
+        pending = [root]
+        while pending:
+            directory = pending.pop()
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False) or entry.name == MANIFEST_NAME:
+                        continue
+                    size = entry.stat(follow_symlinks=False).st_size
+                    report["files"] += 1
+                    report["bytes"] += size
+                    if size < self.min_size or self._reflink_supported is False:
+                        continue
+                    digest = _hash_file(entry.path)
+                    is_new = self._add_blob(entry.path, digest)
+                    if not self._link(self.blob_path(digest), entry.path):
+                        if is_new:
+                            os.unlink(self.blob_path(digest))
+                        continue
+                    manifest[os.path.relpath(entry.path, root)] = digest
+                    report["linked"] += 1
+                    if is_new:
+                        report["new_blobs"] += 1
+                    else:
+                        # Content another project (or file) already stored
+                        report["bytes_shared"] += size
+
+        with open(os.path.join(root, MANIFEST_NAME), "w", encoding="utf-8") as f:
+            json.dump({"link_mode": self.link_mode, "files": manifest}, f, indent=2, sort_keys=True)
+        self.logger.info(f"Deduplicated {report['linked']} of {report['files']} files in {root} "
+                         f"({report['new_blobs']} new blobs, {report['bytes_shared']} bytes shared)")
+        return report
+
+    def _referenced(self) -> Dict[str, int]:
+        """Count references to each blob from the manifests of all projects"""
+        references: Dict[str, int] = {}
+        if not os.path.isdir(self.projects_root):
+            return references
+        for entry in os.scandir(self.projects_root):
+            if not entry.is_dir() or entry.name.startswith("."):
+                continue
+            try:
+                with open(os.path.join(entry.path, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                    files = json.load(f).get("files", {})
+            except (OSError, ValueError):
+                continue
+            for digest in files.values():
+                references[digest] = references.get(digest, 0) + 1
+        return references
+
+    def _iter_blobs(self):
+        """Yield (digest, path, size) for every blob in the store"""
+        if not os.path.isdir(self.blobs_dir):
+            return
+        for prefix in os.scandir(self.blobs_dir):
+            if not prefix.is_dir():
+                continue
+            for blob in os.scandir(prefix.path):
+                if blob.name.startswith("."):
+                    continue
+                yield prefix.name + blob.name, blob.path, blob.stat().st_size
+
+    def stats(self) -> Dict[str, Any]:
+        """Report the store's size and the disk space it saves
+
+        Returns:
+            Blob count and bytes, referenced (logical) bytes and bytes saved
+        """
+        references = self._referenced()
+        blob_count = blob_bytes = referenced_bytes = 0
+        for digest, _, size in self._iter_blobs():
+            blob_count += 1
+            blob_bytes += size
+            referenced_bytes += size * references.get(digest, 0)
+        return {
+            "blobs": blob_count,
+            "blob_bytes": blob_bytes,
+            "referenced_bytes": referenced_bytes,
+            "bytes_saved": max(referenced_bytes - blob_bytes, 0)
+        }
+
+    def gc(self, dry_run: bool = False) -> Dict[str, Any]:
+        """Remove blobs no project manifest references
+
+        A blob removed while a concurrent generation links to it is harmless:
+        its project keeps the content through its own link or clone.
+
+        Args:
+            dry_run: Only report what would be removed
+
+        Returns:
+            Removed blob count and bytes, plus the store stats afterwards
+        """
+        references = self._referenced()
+        removed = removed_bytes = 0
+        for digest, path, size in self._iter_blobs():
+            if digest in references:
+                continue
+            if not dry_run:
+                os.unlink(path)
+            removed += 1
+            removed_bytes += size
+        if not dry_run and os.path.isdir(self.blobs_dir):
+            for prefix in os.scandir(self.blobs_dir):
+                if prefix.is_dir():
+                    try:
+                        os.rmdir(prefix.path)
+                    except OSError:
+                        pass
+        report = {"removed_blobs": removed, "removed_bytes": removed_bytes, "dry_run": dry_run}
+        report.update(self.stats())
+        self.logger.info(f"Blob GC {'would remove' if dry_run else 'removed'} {removed} blobs ({removed_bytes} bytes)")
+        return report
@@ -0,0 +1,95 @@
+"""
+File Writer - Atomic file output for generated artifacts
+
+Files are written to a temporary sibling and renamed into place once
+complete, so readers never observe a partially written file.
+"""
+
+import os
+import tempfile
+from typing import Optional, Union
+
+class AtomicFileWriter:
+    """Context manager that writes a text (or binary) file atomically
+
+    Content is written incrementally to a temporary file in the target
+    directory and renamed over the target with ``os.replace`` when the
+    block exits without an exception. On error the temporary file is removed.
+    """
+
+    def __init__(self, file_path: str, encoding: Optional[str] = "utf-8"):
+        """Initialize the writer.
+
+        Args:
+            file_path: Final path of the file
+            encoding: Text encoding to use; None writes bytes
+        """
+        self.file_path = file_path
+        self.encoding = encoding
+        self.bytes_written = 0
+        self._temp_path: Optional[str] = None
+        self._file = None
+
+    def __enter__(self) -> "AtomicFileWriter":
+        directory = os.path.dirname(self.file_path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, self._temp_path = tempfile.mkstemp(
+            dir=directory, prefix=f".{os.path.basename(self.file_path)}.", suffix=".tmp"
+        )
+        if self.encoding is None:
+            self._file = os.fdopen(fd, "wb")
+        else:
+            self._file = os.fdopen(fd, "w", encoding=self.encoding, newline="")
+        return self
+
+    def write(self, text: Union[str, bytes]) -> None:
+        """Append text (bytes when the writer has no encoding) to the temporary file"""
+        self._file.write(text)
+        self.bytes_written += len(text) if self.encoding is None else len(text.encode(self.encoding))
+
+    def flush(self) -> None:
+        """Flush buffered text to the temporary file"""
+        self._file.flush()
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        try:
+            self._file.close()
+            if exc_type is None:
+                # mkstemp creates the file owner-only; generated files are world-readable
+                os.chmod(self._temp_path, 0o644)
+                os.replace(self._temp_path, self.file_path)
+        finally:
+            if exc_type is not None and os.path.exists(self._temp_path):
+                os.unlink(self._temp_path)
+        return False
+
+
+def atomic_write_text(file_path: str, content: str, encoding: str = "utf-8") -> int:
+    """Write a complete text file atomically
+
+    Args:
+        file_path: Path of the file to write
+        content: Text content
+        encoding: Text encoding to use
+
+    Returns:
+        Number of bytes written
+    """
+    with AtomicFileWriter(file_path, encoding=encoding) as writer:
+        writer.write(content)
+    return writer.bytes_written
+
+
+def atomic_write_bytes(file_path: str, data: bytes) -> int:
+    """Write a complete binary file atomically
+
+    Args:
+        file_path: Path of the file to write
+        data: File content
+
+    Returns:
+        Number of bytes written
+    """
+    with AtomicFileWriter(file_path, encoding=None) as writer:
+        writer.write(data)
+    return writer.bytes_written
@@ -8,6 +8,14 @@ first-principles thinking approach to problem-solving in the multi-agent system.
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 
+try:
+    from omnitrace.utils.prompt_compaction import compact_prompt, contains_block
+except ImportError:
+    try:
+        from utils.prompt_compaction import compact_prompt, contains_block
+    except ImportError:
+        from prompt_compaction import compact_prompt, contains_block
+
 class FirstPrinciplesAnalyzer:
     """Analyzes problems using Elon Musk's first-principles thinking."""
     
@@ -291,6 +299,11 @@ class PromptEnhancer:
             self.logger.warning(f"No first-principles prompt available for agent type: {agent_type}")
             return original_prompt
         
+        # The default templates already carry this analysis; never insert it twice
+        if contains_block(original_prompt, first_principles_prompt):
+            self.logger.info(f"{agent_type} prompt already applies first-principles thinking")
+            return original_prompt
+        
         # Find a good insertion point - after the introduction but before the task
         # This is a simple implementation; a more robust implementation would parse the prompt structure
         
@@ -332,10 +345,10 @@ def apply_first_principles_to_template(agent_type: str, template: str) -> str:
         template: The agent template
         
     Returns:
-        Template enhanced with first-principles thinking
+        Template enhanced with first-principles thinking, compacted
     """
     enhancer = PromptEnhancer()
-    return enhancer.enhance_prompt(agent_type, template)
+    return compact_prompt(enhancer.enhance_prompt(agent_type, template))
 
 def create_first_principles_analysis(problem: str, 
                                     revolution_level: str = "maximum",
@@ -0,0 +1,94 @@
+"""
+LLM Limit - Process-wide cap on concurrent LLM calls
+
+A local model server decodes only a few requests at once; anything beyond
+that queues on the server and every request slows down. Generators that
+issue LLM calls concurrently take a slot here first, so the total number
+of in-flight calls across all of them stays at the configured limit.
+
+LLM calls run on worker threads (``asyncio.to_thread``) and web UI requests
+each run their own event loop, so the limit is a thread semaphore rather
+than an ``asyncio.Semaphore`` bound to one loop.
+"""
+
+import time
+import asyncio
+import threading
+from typing import Any, Dict, Tuple
+
+# Concurrent LLM calls allowed by default (Ollama's default parallel decode slots)
+DEFAULT_LLM_CONCURRENCY = 4
+
+_limit = DEFAULT_LLM_CONCURRENCY
+_slots = threading.BoundedSemaphore(_limit)
+_lock = threading.Lock()
+
+# Calls holding a slot now, and the most at once since the peak was last taken
+_active = 0
+_peak = 0
+
+
+def set_llm_concurrency(limit: int) -> None:
+    """Set the number of concurrent LLM calls for the whole process
+
+    Calls already holding a slot finish under the previous limit.
+
+    Args:
+        limit: Maximum concurrent LLM calls (at least 1)
+    """
+    global _limit, _slots
+    if limit < 1:
+        raise ValueError("LLM concurrency limit must be at least 1")
+    with _lock:
+        _limit = limit
+        _slots = threading.BoundedSemaphore(limit)
+
+
+def get_llm_concurrency() -> int:
+    """Current number of concurrent LLM calls allowed"""
+    return _limit
+
+
+def take_llm_peak() -> int:
+    """Most LLM calls in flight at once since the last call, then start counting again
+
+    Returns:
+        Peak number of concurrent calls
+    """
+    global _peak
+    with _lock:
+        peak = _peak
+        _peak = _active
+    return peak
+
+
+def _invoke_with_slot(chain, context: Dict[str, Any]) -> Tuple[Any, float, float]:
+    """Wait for a slot, then invoke the chain; returns (result, wait seconds, call seconds)"""
+    global _active, _peak
+    slots = _slots
+    queued = time.perf_counter()
+    with slots:
+        started = time.perf_counter()
+        with _lock:
+            _active += 1
+            _peak = max(_peak, _active)
+        try:
+            result = chain.invoke(context)
+        finally:
+            with _lock:
+                _active -= 1
+        return result, started - queued, time.perf_counter() - started
+
+
+async def invoke_limited(chain, context: Dict[str, Any]) -> Tuple[Any, Dict[str, float]]:
+    """Invoke a chain on a worker thread under the process-wide LLM limit
+
+    Args:
+        chain: Runnable with a synchronous ``invoke``
+        context: Chain input
+
+    Returns:
+        Tuple of (chain result, timing with ``wait_seconds`` and ``llm_seconds``)
+    """
+    result, wait_seconds, llm_seconds = await asyncio.to_thread(_invoke_with_slot, chain, context)
+    return result, {"wait_seconds": wait_seconds, "llm_seconds": llm_seconds}
@@ -0,0 +1,405 @@
+"""
+Materializer - Batched, thread-pooled creation of project files
+
+Creating a generated structure used to issue blocking ``os.makedirs`` and
+``open``/``write`` calls one file at a time inside coroutines, stalling the
+event loop. The materializer precomputes the unique directory set, creates
+it once, and writes files in batches through a bounded thread pool while
+the event loop stays free.
+
+Regenerating into an existing project can instead apply a diff: the
+previous rendering is compared with the new one by content hash and only
+added, changed and removed files are touched. Files whose on-disk content
+no longer matches what was generated before are hand edits and are left
+alone. Code generation overwrites the rendered stubs, so the hashes of the
+generated files are recorded in ``.omnitrace_generated.json`` and count as
+"generated before" as well.
+"""
+
+import os
+import time
+import asyncio
+import json
+import hashlib
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Iterable, Tuple, Optional
+
+try:
+    from omnitrace.utils.file_writer import atomic_write_text
+except ImportError:
+    try:
+        from utils.file_writer import atomic_write_text
+    except ImportError:
+        from file_writer import atomic_write_text
+
+# Hashes of the generated code written over the rendered stubs, per relative path
+GENERATED_HASHES = ".omnitrace_generated.json"
+
+
+def directory_set(directories: Iterable[str], file_paths: Iterable[str]) -> List[str]:
+    """Compute every directory that has to exist, parents first
+
+    Args:
+        directories: Relative directory paths declared by the structure
+        file_paths: Relative paths of the files to write
+
+    Returns:
+        Unique relative directory paths sorted so parents precede children
+    """
+    needed = set()
+    pending = list(directories) + [os.path.dirname(path) for path in file_paths]
+    while pending:
+        path = pending.pop()
+        if path and path not in needed:
+            needed.add(path)
+            pending.append(os.path.dirname(path))
+    return sorted(needed, key=lambda path: (path.count(os.sep), path))
+
+
+def _write_batch(root: str, batch: List[Tuple[str, str]], encoding: str) -> int:
+    """Write a batch of files; runs in a worker thread"""
+    written = 0
+    for rel_path, content in batch:
+        data = content.encode(encoding)
+        with open(os.path.join(root, rel_path), "wb") as f:
+            f.write(data)
+        written += len(data)
+    return written
+
+
+def content_hash(data: bytes) -> str:
+    """Hash file content for change detection"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_hash(path: str) -> Optional[str]:
+    """Hash a file on disk, or None if it does not exist"""
+    try:
+        with open(path, "rb") as f:
+            return content_hash(f.read())
+    except (FileNotFoundError, IsADirectoryError, NotADirectoryError):
+        return None
+
+
+def load_generated_hashes(root: str) -> Dict[str, str]:
+    """Load the recorded hashes of generated code below ``root`` (empty if none)"""
+    try:
+        with open(os.path.join(root, GENERATED_HASHES), "r", encoding="utf-8") as f:
+            hashes = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return hashes if isinstance(hashes, dict) else {}
+
+
+def save_generated_hashes(root: str, hashes: Dict[str, str]) -> None:
+    """Replace the recorded hashes of generated code below ``root``"""
+    atomic_write_text(os.path.join(root, GENERATED_HASHES), json.dumps(hashes, indent=2, sort_keys=True))
+
+
+def record_generated_hashes(root: str, rel_paths: Iterable[str]) -> Dict[str, str]:
+    """Record the on-disk content of freshly generated files as their baseline
+
+    Args:
+        root: Project directory
+        rel_paths: Relative paths of the files code generation just wrote
+
+    Returns:
+        The updated hashes
+    """
+    hashes = load_generated_hashes(root)
+    for rel_path in rel_paths:
+        digest = _file_hash(os.path.join(root, rel_path))
+        if digest is None:
+            hashes.pop(rel_path, None)
+        else:
+            hashes[rel_path] = digest
+    save_generated_hashes(root, hashes)
+    return hashes
+
+
+def _replace_batch(root: str, batch: List[Tuple[str, str]], encoding: str) -> int:
+    """Write a batch of files by atomic replacement; runs in a worker thread
+
+    Existing files are replaced rather than truncated, so readers never see
+    partial content and hard links to the old content are left intact.
+    """
+    written = 0
+    for rel_path, content in batch:
+        data = content.encode(encoding)
+        path = os.path.join(root, rel_path)
+        fd, temp_path = tempfile.mkstemp(prefix=".omnitrace-", dir=os.path.dirname(path) or ".")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        written += len(data)
+    return written
+
+
+def plan_changes(root: str, previous_files: List[Tuple[str, str]], files: List[Tuple[str, str]],
+                 encoding: str = "utf-8", generated: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """Diff two renderings of a project against each other and the disk
+
+    Only paths whose rendered content changed between the renderings (or
+    that were added or removed) are looked up on disk; unchanged paths are
+    skipped without any I/O.
+
+    Args:
+        root: Directory the relative paths are resolved against
+        previous_files: (relative_path, content) pairs of the previous rendering
+        files: (relative_path, content) pairs of the new rendering
+        generated: Hashes of generated code written over the previous rendering;
+            a file still holding it is not a hand edit
+
+    Returns:
+        Plan with ``writes`` ((path, content) pairs), ``deletes``, ``skipped``
+        (unchanged or already up to date), ``unchanged`` (same rendering, so
+        not looked up) and ``preserved`` (hand-edited) paths
+    """
+    previous = {path: content_hash(content.encode(encoding)) for path, content in previous_files}
+    generated = generated or {}
+    current = dict(files)
+    writes, deletes, skipped, unchanged, preserved = [], [], [], [], []
+    skipped_bytes = 0
+
+    for path, content in current.items():
+        data = content.encode(encoding)
+        new_hash = content_hash(data)
+        old_hash = previous.get(path)
+        if old_hash == new_hash:
+            skipped.append(path)
+            unchanged.append(path)
+            skipped_bytes += len(data)
+            continue
+        disk_hash = _file_hash(os.path.join(root, path))
+        if disk_hash == new_hash:
+            skipped.append(path)
+            skipped_bytes += len(data)
+        elif disk_hash is None or disk_hash == old_hash or disk_hash == generated.get(path):
+            writes.append((path, content))
+        else:
+            # Edited by hand since it was generated (or never generated by us)
+            preserved.append(path)
+
+    for path, old_hash in previous.items():
+        if path in current:
+            continue
+        disk_hash = _file_hash(os.path.join(root, path))
+        if disk_hash == old_hash or (disk_hash is not None and disk_hash == generated.get(path)):
+            deletes.append(path)
+        elif disk_hash is not None:
+            preserved.append(path)
+
+    return {
+        "writes": writes,
+        "deletes": deletes,
+        "skipped": skipped,
+        "skipped_bytes": skipped_bytes,
+        "unchanged": unchanged,
+        "preserved": preserved
+    }
+
+
+class Materializer:
+    """Creates directories and files of a generated project off the event loop"""
+
+    def __init__(self, max_workers: int = 8, batch_size: int = 64, encoding: str = "utf-8", logger=None):
+        """Initialize the materializer.
+
+        Args:
+            max_workers: Maximum number of writer threads
+            batch_size: Number of files written per thread task
+            encoding: Text encoding of the written files
+            logger: Optional logger instance
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.encoding = encoding
+
+    def _create_directories(self, root: str, directories: List[str]) -> int:
+        """Create the root and every directory in parent-first order"""
+        os.makedirs(root, exist_ok=True)
+        for rel_path in directories:
+            try:
+                os.mkdir(os.path.join(root, rel_path))
+            except FileExistsError:
+                pass
+        return len(directories)
+
+    async def _write_batches(self, root: str, files: List[Tuple[str, str]], write_batch) -> Tuple[int, int]:
+        """Write files in batches from a shared work queue
+        
+        A fixed set of workers takes the next batch when its previous one is
+        written, so at most ``max_workers`` batches are in flight and no
+        per-batch futures or slices are created up front, however many files
+        a structure has.
+        
+        Returns:
+            Tuple of (bytes written, number of batches)
+        """
+        if not files:
+            return 0, 0
+        batch_count = (len(files) + self.batch_size - 1) // self.batch_size
+        workers = min(self.max_workers, batch_count)
+        starts = iter(range(0, len(files), self.batch_size))
+        loop = asyncio.get_running_loop()
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            async def worker() -> int:
+                written = 0
+                # The iterator is the queue: each batch is taken by exactly one worker
+                for start in starts:
+                    batch = files[start:start + self.batch_size]
+                    written += await loop.run_in_executor(executor, write_batch, root, batch, self.encoding)
+                return written
+            
+            results = await asyncio.gather(*(worker() for _ in range(workers)))
+        return sum(results), batch_count
+    
+    async def materialize(self, root: str, directories: Iterable[str],
+                          files: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """Create directories and write files below ``root``
+
+        Args:
+            root: Directory the relative paths are resolved against
+            directories: Relative directory paths to create (parents are added)
+            files: List of (relative_path, content) pairs to write
+
+        Returns:
+            Report with created paths, byte count, timing and files/sec
+        """
+        started = time.perf_counter()
+        # Later entries for the same path win, so a path is never written by two threads
+        files = list(dict(files).items())
+        dirs = directory_set(directories, (rel_path for rel_path, _ in files))
+        await asyncio.to_thread(self._create_directories, root, dirs)
+
+        bytes_written, batches = await self._write_batches(root, files, _write_batch)
+
+        seconds = time.perf_counter() - started
+        report = {
+            "directories": [os.path.join(root, rel_path) for rel_path in dirs],
+            "files": [os.path.join(root, rel_path) for rel_path, _ in files],
+            "directory_count": len(dirs),
+            "file_count": len(files),
+            "bytes_written": bytes_written,
+            "batches": batches,
+            "seconds": round(seconds, 4),
+            "files_per_second": round(len(files) / seconds, 1) if seconds > 0 else 0.0
+        }
+        self.logger.info(f"Materialized {len(files)} files in {len(dirs)} directories "
+                         f"({report['files_per_second']} files/sec, {batches} batches)")
+        return report
+    
+    async def write_now(self, root: str, directories: Iterable[str], files: List[Tuple[str, str]]) -> int:
+        """Create directories and write a few files right away
+
+        Used for nodes of a structure that is still streaming in, where
+        batching would wait for files that have not been generated yet.
+
+        Returns:
+            Number of bytes written
+        """
+        dirs = directory_set(directories, (rel_path for rel_path, _ in files))
+
+        def write() -> int:
+            self._create_directories(root, dirs)
+            return _write_batch(root, files, self.encoding)
+
+        return await asyncio.to_thread(write)
+
+    async def discard(self, root: str, files: List[str], directories: List[str]) -> int:
+        """Delete files, then the given directories once empty (deepest first)
+
+        Returns:
+            Number of directories removed
+        """
+        directories = sorted(directories, key=lambda path: -path.count(os.sep))
+        return await asyncio.to_thread(self._delete, root, files, directories)
+
+    async def rematerialize(self, root: str, directories: Iterable[str], files: List[Tuple[str, str]],
+                            previous_directories: Iterable[str],
+                            previous_files: List[Tuple[str, str]],
+                            generated: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Apply the difference between a previous and a new rendering below ``root``
+        
+        Added and changed files are written (by atomic replacement), removed
+        files are deleted, and directories that were dropped from the
+        structure are removed once empty. Unchanged files are not touched and
+        hand-edited files are preserved.
+        
+        Args:
+            root: Directory the relative paths are resolved against
+            directories: Relative directory paths of the new structure
+            files: (relative_path, content) pairs of the new rendering
+            previous_directories: Relative directory paths of the previous structure
+            previous_files: (relative_path, content) pairs of the previous rendering
+            generated: Hashes of generated code written over the previous rendering
+            
+        Returns:
+            Report with written, skipped, deleted and preserved counts and bytes
+        """
+        started = time.perf_counter()
+        files = list(dict(files).items())
+        plan = await asyncio.to_thread(plan_changes, root, previous_files, files, self.encoding, generated)
+        
+        writes = plan["writes"]
+        new_dirs = directory_set(directories, (rel_path for rel_path, _ in files))
+        old_dirs = set(directory_set(previous_directories, (rel_path for rel_path, _ in previous_files)))
+        added_dirs = [path for path in new_dirs if path not in old_dirs]
+        # Parents of written files may have been deleted by hand
+        await asyncio.to_thread(
+            self._create_directories, root,
+            directory_set(added_dirs, (rel_path for rel_path, _ in writes))
+        )
+        
+        bytes_written, batches = await self._write_batches(root, writes, _replace_batch)
+        
+        removed_dirs = sorted(old_dirs.difference(new_dirs), key=lambda path: -path.count(os.sep))
+        removed_dir_count = await asyncio.to_thread(self._delete, root, plan["deletes"], removed_dirs)
+        
+        seconds = time.perf_counter() - started
+        report = {
+            "directories": [os.path.join(root, rel_path) for rel_path in added_dirs],
+            "files": [os.path.join(root, rel_path) for rel_path, _ in writes],
+            "directory_count": len(added_dirs),
+            "file_count": len(writes),
+            "bytes_written": bytes_written,
+            "files_skipped": len(plan["skipped"]),
+            "bytes_skipped": plan["skipped_bytes"],
+            "files_deleted": len(plan["deletes"]),
+            "directories_removed": removed_dir_count,
+            "unchanged": plan["unchanged"],
+            "preserved": plan["preserved"],
+            "batches": batches,
+            "seconds": round(seconds, 4),
+            "files_per_second": round(len(writes) / seconds, 1) if seconds > 0 else 0.0
+        }
+        self.logger.info(f"Rematerialized {len(writes)} changed files ({bytes_written} bytes), "
+                         f"skipped {report['files_skipped']} unchanged ({report['bytes_skipped']} bytes), "
+                         f"deleted {report['files_deleted']}, preserved {len(plan['preserved'])} hand-edited")
+        return report
+    
+    def _delete(self, root: str, files: List[str], directories: List[str]) -> int:
+        """Delete removed files, then removed directories that are now empty (deepest first)"""
+        for rel_path in files:
+            try:
+                os.unlink(os.path.join(root, rel_path))
+            except FileNotFoundError:
+                pass
+        removed = 0
+        for rel_path in directories:
+            try:
+                os.rmdir(os.path.join(root, rel_path))
+                removed += 1
+            except OSError:
+                # Still holds hand-made or preserved files
+                pass
+        return removed
@@ -0,0 +1,398 @@
+"""
+Project Export - Streaming tar/zip archives of generated projects
+
+A project is written into the archive as it is walked: every file is read
+once, compressed and handed to the output (a file, stdout or an HTTP
+response) in fixed-size chunks, so neither the archive nor the project is
+ever held in memory or staged in a temporary file.
+
+Tar archives can optionally deduplicate identical files: the first copy is
+stored and every later copy becomes a hard-link entry pointing at it. Files
+that already share an inode (blob store hard links) are recognized without
+being read; other files are hashed while they are read, so only large files
+that collide in size with an earlier file are read twice. Zip has no link
+entries, so deduplication is tar-only.
+"""
+
+import os
+import io
+import bz2
+import lzma
+import time
+import zlib
+import queue
+import shutil
+import hashlib
+import logging
+import tarfile
+import zipfile
+import threading
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from omnitrace.utils.blob_store import MANIFEST_NAME
+except ImportError:
+    try:
+        from utils.blob_store import MANIFEST_NAME
+    except ImportError:
+        from blob_store import MANIFEST_NAME
+
+# Archive format -> (compression, file extension, media type)
+ARCHIVE_FORMATS = {
+    "tar": (None, ".tar", "application/x-tar"),
+    "tar.gz": ("gz", ".tar.gz", "application/gzip"),
+    "tar.bz2": ("bz2", ".tar.bz2", "application/x-bzip2"),
+    "tar.xz": ("xz", ".tar.xz", "application/x-xz"),
+    "zip": ("zip", ".zip", "application/zip"),
+}
+
+# Size of the chunks handed to the output
+CHUNK_SIZE = 1 << 16
+
+# Files up to this size are read into memory once so they can be hashed and written from one read
+_HASH_IN_MEMORY_LIMIT = 1 << 20
+
+
+class _CountingWriter:
+    """Write-only file object that forwards to ``target`` and counts bytes"""
+
+    def __init__(self, target):
+        self.target = target
+        self.bytes = 0
+
+    def write(self, data) -> int:
+        self.target.write(data)
+        self.bytes += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        if hasattr(self.target, "flush"):
+            self.target.flush()
+
+
+class _CompressingWriter:
+    """Write-only file object that compresses into another file object
+
+    ``tarfile``'s own stream mode always compresses at the slowest level;
+    compressing here keeps the level configurable.
+    """
+
+    def __init__(self, target, compression: str, level: int):
+        self.target = target
+        if compression == "gz":
+            # wbits=31: gzip container
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        elif compression == "bz2":
+            self._compressor = bz2.BZ2Compressor(max(level, 1))
+        else:
+            self._compressor = lzma.LZMACompressor(preset=level)
+
+    def write(self, data) -> int:
+        compressed = self._compressor.compress(data)
+        if compressed:
+            self.target.write(compressed)
+        return len(data)
+
+    def close(self) -> None:
+        self.target.write(self._compressor.flush())
+
+
+class _Cancelled(Exception):
+    """Raised inside the archive writer when the reader stops consuming"""
+
+
+class _QueueWriter:
+    """Write-only file object that hands ``chunk_size`` chunks to a bounded queue"""
+
+    def __init__(self, chunks: "queue.Queue", chunk_size: int, cancelled: threading.Event):
+        self.chunks = chunks
+        self.chunk_size = chunk_size
+        self.cancelled = cancelled
+        self._buffer = bytearray()
+
+    def _put(self, item) -> None:
+        while True:
+            if self.cancelled.is_set():
+                raise _Cancelled()
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def write(self, data) -> int:
+        self._buffer += data
+        if len(self._buffer) >= self.chunk_size:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+
+
+def _hash_file(path: str) -> str:
+    """Hash a file's content in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ProjectExport:
+    """Streams one project directory into a tar or zip archive
+
+    Usage:
+        export = ProjectExport("projects/my_project", "tar.gz", dedup=True)
+        with open("my_project.tar.gz", "wb") as f:
+            report = export.write_to(f)
+
+        # Or pull chunks, e.g. for an HTTP response
+        for chunk in export.iter_chunks():
+            ...
+    """
+
+    def __init__(self, project_dir: str, archive_format: str = "tar.gz", dedup: bool = False,
+                 compresslevel: int = 6, chunk_size: int = CHUNK_SIZE, logger=None):
+        """Initialize the export.
+
+        Args:
+            project_dir: Project directory to archive
+            archive_format: One of ``ARCHIVE_FORMATS``
+            dedup: Store identical files once (tar formats only)
+            compresslevel: Compression level (0-9)
+            chunk_size: Size of the chunks yielded by ``iter_chunks``
+            logger: Optional logger instance
+
+        Raises:
+            ValueError: On an unknown format or deduplication of a zip archive
+        """
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unknown archive format: {archive_format} (expected one of {list(ARCHIVE_FORMATS)})")
+        if dedup and archive_format == "zip":
+            raise ValueError("Zip archives have no link entries; use a tar format to deduplicate files")
+        self.logger = logger or logging.getLogger(__name__)
+        self.project_dir = os.path.abspath(project_dir)
+        self.name = os.path.basename(self.project_dir.rstrip(os.sep))
+        self.archive_format = archive_format
+        self.compression, extension, self.media_type = ARCHIVE_FORMATS[archive_format]
+        self.filename = f"{self.name}{extension}"
+        self.dedup = dedup
+        self.compresslevel = compresslevel
+        self.chunk_size = chunk_size
+        self.report: Dict[str, Any] = {}
+
+    def _walk(self) -> Iterator[Tuple[str, os.DirEntry, os.stat_result]]:
+        """Yield (archive name, entry, stat) for every entry, parents first, in sorted order"""
+        pending = [(self.project_dir, self.name)]
+        while pending:
+            directory, arc_directory = pending.pop()
+            with os.scandir(directory) as scanned:
+                entries = sorted(scanned, key=lambda entry: entry.name)
+            subdirectories = []
+            for entry in entries:
+                if entry.name == MANIFEST_NAME:
+                    # Blob store bookkeeping; meaningless outside this machine
+                    continue
+                arcname = f"{arc_directory}/{entry.name}"
+                yield arcname, entry, entry.stat(follow_symlinks=False)
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append((entry.path, arcname))
+            # Explicit stack: project trees can nest arbitrarily deep
+            pending.extend(reversed(subdirectories))
+
+    def _tar_info(self, arcname: str, st: os.stat_result) -> tarfile.TarInfo:
+        """Tar header for an entry, without owner information"""
+        info = tarfile.TarInfo(arcname)
+        info.mode = st.st_mode & 0o7777
+        info.mtime = int(st.st_mtime)
+        return info
+
+    def _write_tar(self, output) -> None:
+        """Write the tar archive to ``output``"""
+        report = self.report
+        by_inode: Dict[Tuple[int, int], str] = {}
+        by_digest: Dict[str, str] = {}
+        # Large files by size, hashed only once another file of the same size shows up
+        by_size: Dict[int, List[List[Optional[str]]]] = {}
+
+        with tarfile.open(fileobj=output, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+            for arcname, entry, st in self._walk():
+                info = self._tar_info(arcname, st)
+                if entry.is_dir(follow_symlinks=False):
+                    info.type = tarfile.DIRTYPE
+                    tar.addfile(info)
+                    report["directories"] += 1
+                    continue
+                if entry.is_symlink():
+                    info.type = tarfile.SYMTYPE
+                    info.linkname = os.readlink(entry.path)
+                    tar.addfile(info)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    report["skipped"] += 1
+                    continue
+
+                report["files"] += 1
+                report["bytes_in"] += st.st_size
+                if not self.dedup or st.st_size == 0:
+                    info.size = st.st_size
+                    with open(entry.path, "rb") as f:
+                        tar.addfile(info, f)
+                    continue
+
+                inode = (st.st_dev, st.st_ino)
+                original = by_inode.get(inode) if st.st_nlink > 1 else None
+                data = digest = None
+                if original is None and st.st_size <= _HASH_IN_MEMORY_LIMIT:
+                    with open(entry.path, "rb") as f:
+                        data = f.read()
+                    digest = hashlib.sha256(data).hexdigest()
+                    original = by_digest.get(digest)
+                elif original is None:
+                    same_size = by_size.setdefault(st.st_size, [])
+                    if same_size:
+                        digest = _hash_file(entry.path)
+                        for candidate in same_size:
+                            if candidate[1] is None:
+                                candidate[1] = _hash_file(candidate[2])
+                                by_digest.setdefault(candidate[1], candidate[0])
+                        original = by_digest.get(digest)
+                    same_size.append([arcname, digest, entry.path])
+
+                if original is not None:
+                    info.type = tarfile.LNKTYPE
+                    info.linkname = original
+                    tar.addfile(info)
+                    report["duplicates"] += 1
+                    report["bytes_deduplicated"] += st.st_size
+                    continue
+
+                info.size = st.st_size if data is None else len(data)
+                if data is not None:
+                    tar.addfile(info, io.BytesIO(data))
+                else:
+                    with open(entry.path, "rb") as f:
+                        tar.addfile(info, f)
+                if digest is not None:
+                    by_digest.setdefault(digest, arcname)
+                if st.st_nlink > 1:
+                    by_inode.setdefault(inode, arcname)
+
+    def _write_zip(self, output) -> None:
+        """Write the zip archive to ``output`` (data descriptors, no seeking)"""
+        report = self.report
+        compress_type = zipfile.ZIP_DEFLATED if self.compresslevel > 0 else zipfile.ZIP_STORED
+        with zipfile.ZipFile(output, "w", compression=compress_type, compresslevel=self.compresslevel or None) as archive:
+            for arcname, entry, st in self._walk():
+                if entry.is_symlink() or not (entry.is_dir() or entry.is_file()):
+                    report["skipped"] += 1
+                    continue
+                info = zipfile.ZipInfo.from_file(entry.path, arcname, strict_timestamps=False)
+                if info.is_dir():
+                    archive.writestr(info, b"")
+                    report["directories"] += 1
+                    continue
+                info.compress_type = compress_type
+                report["files"] += 1
+                report["bytes_in"] += st.st_size
+                with open(entry.path, "rb") as source, \
+                        archive.open(info, "w", force_zip64=st.st_size >= zipfile.ZIP64_LIMIT) as target:
+                    shutil.copyfileobj(source, target, self.chunk_size)
+
+    def write_to(self, fileobj: BinaryIO) -> Dict[str, Any]:
+        """Stream the archive into a writable binary file object
+
+        ``fileobj`` only needs ``write``: pipes, sockets and stdout work.
+
+        Args:
+            fileobj: Destination
+
+        Returns:
+            Report with file, directory, byte, duplicate and throughput figures
+        """
+        self.report = {
+            "project": self.name,
+            "format": self.archive_format,
+            "files": 0,
+            "directories": 0,
+            "skipped": 0,
+            "duplicates": 0,
+            "bytes_in": 0,
+            "bytes_deduplicated": 0,
+            "bytes_out": 0
+        }
+        started = time.perf_counter()
+        counting = _CountingWriter(fileobj)
+        if self.compression == "zip":
+            self._write_zip(counting)
+        elif self.compression is None:
+            self._write_tar(counting)
+        else:
+            compressing = _CompressingWriter(counting, self.compression, self.compresslevel)
+            self._write_tar(compressing)
+            compressing.close()
+        counting.flush()
+
+        seconds = time.perf_counter() - started
+        report = self.report
+        report["bytes_out"] = counting.bytes
+        report["seconds"] = seconds
+        report["mb_per_second"] = report["bytes_in"] / seconds / (1 << 20) if seconds > 0 else 0.0
+        report["compression_ratio"] = report["bytes_in"] / counting.bytes if counting.bytes else 0.0
+        self.logger.info(
+            f"Exported {report['files']} files of {self.name} as {self.archive_format}: "
+            f"{report['bytes_in']} bytes in, {report['bytes_out']} bytes out, "
+            f"{report['duplicates']} duplicates, {report['mb_per_second']:.1f} MB/s"
+        )
+        return report
+
+    def iter_chunks(self, max_pending: int = 8) -> Iterator[bytes]:
+        """Yield the archive in chunks as it is produced
+
+        The archive is written on a worker thread into a bounded queue, so at
+        most ``max_pending`` chunks are buffered however slow the consumer is.
+        Closing the generator early stops the writer. ``self.report`` is
+        complete once the generator is exhausted.
+
+        Args:
+            max_pending: Chunks buffered ahead of the consumer
+
+        Yields:
+            Archive bytes
+        """
+        chunks: "queue.Queue" = queue.Queue(maxsize=max_pending)
+        cancelled = threading.Event()
+        done = object()
+        failure: List[BaseException] = []
+
+        def produce():
+            writer = _QueueWriter(chunks, self.chunk_size, cancelled)
+            try:
+                self.write_to(writer)
+                writer._put(done)
+            except _Cancelled:
+                pass
+            except BaseException as e:
+                failure.append(e)
+                try:
+                    writer._put(done)
+                except _Cancelled:
+                    pass
+
+        worker = threading.Thread(target=produce, name=f"export-{self.name}", daemon=True)
+        worker.start()
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is done:
+                    break
+                yield chunk
+            if failure:
+                raise failure[0]
+        finally:
+            cancelled.set()
+            worker.join()
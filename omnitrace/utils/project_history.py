@@ -0,0 +1,91 @@
+"""
+Project History - Compact event log of a project's generation
+
+The development history used to be the full text of every stage response
+(the running project context) written to ``project_history.md``, repeating
+every document already in ``docs/``. The history is now an event log: one
+small record per stage with its timing, an estimate of the tokens it
+produced and the document that holds its output. ``project_history.md``
+is rendered from the log during generation; with lazy documents it is
+deferred, and rendered from the log stored with the other deferred document
+inputs the first time it is shown. The log also records the content hash of
+every template the run used (see ``template_versions``).
+"""
+
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Rough characters per token for English text and code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Estimate the number of tokens in a text without a tokenizer"""
+    if not text:
+        return 0
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+class ProjectHistory:
+    """Records the stages of one project generation as compact events
+
+    Usage:
+        history = ProjectHistory()
+        started = history.start()
+        vision = await agent.process(...)
+        history.record("vision", started, role="ceo", output=vision, doc="docs/vision.md")
+        history.templates = agent.template_versions()
+        history.to_dict()  # {"version": 1, "events": [...], "templates": {...}}
+    """
+
+    VERSION = 1
+
+    def __init__(self):
+        """Initialize an empty history"""
+        self.events: List[Dict[str, Any]] = []
+        # Role -> content hash of the template the run used
+        self.templates: Dict[str, str] = {}
+
+    @staticmethod
+    def start() -> float:
+        """Timestamp for the beginning of a stage"""
+        return time.time()
+
+    def record(self, stage: str, started: float, role: Optional[str] = None, output: Optional[str] = None,
+               doc: Optional[str] = None, **details: Any) -> Dict[str, Any]:
+        """Record a finished stage
+
+        Args:
+            stage: Stage name (vision, tech_strategy, file_structure, ...)
+            started: Timestamp from ``start()``
+            role: Agent role that ran the stage, if any
+            output: Stage output; only its estimated token count is kept
+            doc: Project-relative path of the document holding the output
+            **details: Small JSON-serializable facts about the stage
+
+        Returns:
+            The recorded event
+        """
+        event: Dict[str, Any] = {
+            "stage": stage,
+            "started": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+            "seconds": round(time.time() - started, 3),
+        }
+        if role:
+            event["role"] = role
+        if output is not None:
+            event["tokens"] = estimate_tokens(output)
+        if doc:
+            event["doc"] = doc
+        if details:
+            event["details"] = details
+        self.events.append(event)
+        return event
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable event log"""
+        data: Dict[str, Any] = {"version": self.VERSION, "events": list(self.events)}
+        if self.templates:
+            data["templates"] = dict(self.templates)
+        return data
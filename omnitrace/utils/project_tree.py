@@ -0,0 +1,235 @@
+"""
+Project Tree - Compact shared model of a generated project structure
+
+FilesystemAgent produces a dict-of-dicts schema (``directories``/``files``
+keyed by name) while StructureGenerator produces lists of nodes
+(``subdirectories``/``files`` with ``name``/``purpose``). ProjectTree loads
+either schema into flat node arrays with parent indices and interned names,
+so counting, depth and path iteration are single linear passes instead of
+per-consumer recursive walks.
+"""
+
+import os
+from array import array
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+# Node kinds
+KIND_DIRECTORY = 0
+KIND_FILE = 1
+
+# Index of the implicit project root node
+ROOT = 0
+
+
+class ProjectTree:
+    """Flat, preorder array representation of a project structure
+
+    Nodes are stored in preorder: every parent has a lower index than its
+    children, so derived values such as paths can be computed in one forward
+    pass. Within a directory, files come before subdirectories.
+    """
+
+    def __init__(self):
+        """Initialize a tree containing only the root directory."""
+        self.parents = array("i", [-1])
+        self.name_ids = array("i", [0])
+        self.kinds = array("b", [KIND_DIRECTORY])
+        self.depths = array("i", [0])
+        self.infos: List[Dict[str, Any]] = [{}]
+        self.names: List[str] = [""]
+        self._name_index: Dict[str, int] = {"": 0}
+        self._paths: Optional[List[str]] = None
+
+        # Maintained while nodes are added
+        self.directory_count = 0
+        self.file_count = 0
+        self.max_depth = 0
+        self.max_directory_depth = 0
+
+    def __len__(self) -> int:
+        """Number of nodes, excluding the root"""
+        return len(self.parents) - 1
+
+    def _intern(self, name: str) -> int:
+        """Return the id of a name, adding it to the name table if needed"""
+        name_id = self._name_index.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_index[name] = name_id
+        return name_id
+
+    def add_node(self, parent: int, name: str, kind: int, info: Optional[Dict[str, Any]] = None) -> int:
+        """Append a node below ``parent``
+
+        Args:
+            parent: Index of the parent directory node
+            name: File or directory name
+            kind: KIND_DIRECTORY or KIND_FILE
+            info: Schema-specific information about the node
+
+        Returns:
+            Index of the new node
+        """
+        index = len(self.parents)
+        depth = self.depths[parent] + 1
+        self.parents.append(parent)
+        self.name_ids.append(self._intern(name))
+        self.kinds.append(kind)
+        self.depths.append(depth)
+        self.infos.append(info if info is not None else {})
+        self._paths = None
+
+        self.max_depth = max(self.max_depth, depth)
+        if kind == KIND_DIRECTORY:
+            self.directory_count += 1
+            self.max_directory_depth = max(self.max_directory_depth, depth)
+        else:
+            self.file_count += 1
+        return index
+
+    def _load(self, root_info: Dict[str, Any], children) -> "ProjectTree":
+        """Load nodes in preorder with an explicit stack
+
+        Args:
+            root_info: Schema node describing the project root
+            children: Callable returning ([(name, file_info)], [(name, dir_info)])
+                for a directory node and whether it is the root
+
+        Returns:
+            This tree
+        """
+        self.infos[ROOT] = root_info
+        pending = []
+
+        def push_children(parent: int, info: Dict[str, Any], is_root: bool) -> None:
+            files, directories = children(info, is_root)
+            for name, dir_info in reversed(directories):
+                pending.append((parent, name, KIND_DIRECTORY, dir_info))
+            for name, file_info in reversed(files):
+                pending.append((parent, name, KIND_FILE, file_info))
+
+        push_children(ROOT, root_info, True)
+        while pending:
+            parent, name, kind, info = pending.pop()
+            index = self.add_node(parent, name, kind, info)
+            if kind == KIND_DIRECTORY:
+                push_children(index, info, False)
+        return self
+
+    @classmethod
+    def from_filesystem_schema(cls, structure: Dict[str, Any]) -> "ProjectTree":
+        """Load the FilesystemAgent schema (``directories``/``files`` keyed by name)
+
+        Args:
+            structure: Structure dictionary as returned by FilesystemAgent.process
+
+        Returns:
+            Loaded project tree
+        """
+        def children(info: Dict[str, Any], is_root: bool):
+            files = [(name, value if isinstance(value, dict) else {})
+                     for name, value in (info.get("files") or {}).items()]
+            directories = [(name, value if isinstance(value, dict) else {})
+                           for name, value in (info.get("directories") or {}).items()]
+            return files, directories
+
+        return cls()._load(structure, children)
+
+    @classmethod
+    def from_structure_schema(cls, structure: Dict[str, Any]) -> "ProjectTree":
+        """Load the StructureGenerator schema (lists of ``name``/``purpose`` nodes)
+
+        Entries without a name are skipped.
+
+        Args:
+            structure: Structure dictionary as returned by StructureGenerator.generate_structure
+
+        Returns:
+            Loaded project tree
+        """
+        def named(entries) -> List[Tuple[str, Dict[str, Any]]]:
+            return [(entry["name"], entry) for entry in entries or []
+                    if isinstance(entry, dict) and entry.get("name")]
+
+        def children(info: Dict[str, Any], is_root: bool):
+            return named(info.get("files")), named(info.get("directories" if is_root else "subdirectories"))
+
+        return cls()._load(structure.get("structure", structure), children)
+
+    @classmethod
+    def from_structure(cls, structure: Dict[str, Any]) -> "ProjectTree":
+        """Load either schema, detecting which one is used
+
+        Args:
+            structure: Structure dictionary in either schema
+
+        Returns:
+            Loaded project tree
+        """
+        body = structure.get("structure")
+        body = body if isinstance(body, dict) else structure
+        if isinstance(body.get("directories"), list) or isinstance(body.get("files"), list):
+            return cls.from_structure_schema(structure)
+        return cls.from_filesystem_schema(structure)
+
+    def name(self, index: int) -> str:
+        """Name of a node"""
+        return self.names[self.name_ids[index]]
+
+    def is_directory(self, index: int) -> bool:
+        """Check whether a node is a directory"""
+        return self.kinds[index] == KIND_DIRECTORY
+
+    def description(self, index: int) -> str:
+        """Description of a node in either schema"""
+        info = self.infos[index]
+        return info.get("description") or info.get("purpose") or ""
+
+    def file_type(self, index: int) -> str:
+        """File type of a node in either schema"""
+        info = self.infos[index]
+        return info.get("type") or info.get("content_type") or "other"
+
+    def paths(self) -> List[str]:
+        """Relative paths of all nodes (the root is ``""``), computed in one pass"""
+        if self._paths is None:
+            names = self.names
+            paths = [""] * len(self.parents)
+            for index in range(1, len(self.parents)):
+                parent_path = paths[self.parents[index]]
+                name = names[self.name_ids[index]]
+                paths[index] = os.path.join(parent_path, name) if parent_path else name
+            self._paths = paths
+        return self._paths
+
+    def iter_nodes(self, kind: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Yield (index, relative_path) in preorder, excluding the root
+
+        Args:
+            kind: Optional KIND_DIRECTORY or KIND_FILE filter
+        """
+        paths = self.paths()
+        kinds = self.kinds
+        for index in range(1, len(paths)):
+            if kind is None or kinds[index] == kind:
+                yield index, paths[index]
+
+    def iter_files(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (relative_path, file_info) for every file in preorder"""
+        for index, path in self.iter_nodes(KIND_FILE):
+            yield path, self.infos[index]
+
+    def iter_directories(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (relative_path, directory_info) for every directory in preorder"""
+        for index, path in self.iter_nodes(KIND_DIRECTORY):
+            yield path, self.infos[index]
+
+    def count_file_types(self) -> Dict[str, int]:
+        """Count files per file type"""
+        counts: Dict[str, int] = {}
+        for index in range(1, len(self.kinds)):
+            if self.kinds[index] == KIND_FILE:
+                file_type = self.file_type(index)
+                counts[file_type] = counts.get(file_type, 0) + 1
+        return counts
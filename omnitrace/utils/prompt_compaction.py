@@ -0,0 +1,103 @@
+"""
+Prompt Compaction - Remove repeated instruction blocks from agent prompts
+
+Agent templates are assembled from fixed instruction blocks: the role
+introduction, the five first-principles questions, the "focus on" list.
+Enhancing a template that already contains the first-principles analysis
+used to insert the same block a second time, and the default templates,
+written as indented Python strings, send a dozen spaces of indentation per
+line to the model on every call.
+
+A block is a run of non-blank lines. A block is a duplicate when an
+earlier block has the same lines in the same order (compared with
+whitespace collapsed); duplicates are dropped and the first occurrence is
+kept. Lines that merely reappear elsewhere, in another order or another
+block, are left alone. The remaining blocks are dedented and separated by
+single blank lines. Prompt variables survive compaction because a dropped
+block, and therefore each of its variables, is still in the prompt.
+"""
+
+import re
+import textwrap
+from typing import Dict, List, Set, Tuple
+
+try:
+    from omnitrace.utils.project_history import estimate_tokens
+except ImportError:
+    try:
+        from utils.project_history import estimate_tokens
+    except ImportError:
+        from project_history import estimate_tokens
+
+# One or more blank (or whitespace-only) lines between blocks
+_SEPARATOR = re.compile(r"\n[ \t]*\n(?:[ \t]*\n)*")
+
+
+def _normalize(line: str) -> str:
+    return " ".join(line.split())
+
+
+def _block_lines(block: str) -> List[str]:
+    """Normalized non-blank lines of a block"""
+    return [normalized for normalized in map(_normalize, block.splitlines()) if normalized]
+
+
+def _blocks(prompt: str) -> List[str]:
+    """Instruction blocks of a prompt, in order"""
+    return _SEPARATOR.split(prompt)
+
+
+def contains_block(prompt: str, block: str) -> bool:
+    """Whether the lines of ``block`` already appear in ``prompt``, consecutively and in order
+
+    Args:
+        prompt: Prompt or template text
+        block: Instruction block, in any indentation
+
+    Returns:
+        True if inserting the block would only repeat the prompt
+    """
+    lines = _block_lines(block)
+    prompt_lines = _block_lines(prompt)
+    return bool(lines) and any(
+        prompt_lines[start:start + len(lines)] == lines for start in range(len(prompt_lines) - len(lines) + 1)
+    )
+
+
+def compact_prompt(prompt: str) -> str:
+    """Drop repeated instruction blocks and the indentation around them
+
+    Args:
+        prompt: Prompt or template text
+
+    Returns:
+        The compacted prompt
+    """
+    seen: Set[Tuple[str, ...]] = set()
+    kept: List[str] = []
+    for block in _blocks(prompt):
+        lines = tuple(_block_lines(block))
+        if not lines or lines in seen:
+            continue
+        seen.add(lines)
+        # Relative indentation inside a block (examples, nested lists) is kept
+        kept.append("\n".join(line.rstrip() for line in textwrap.dedent(block).strip("\n").splitlines()))
+    return "\n\n".join(kept)
+
+
+def prompt_token_report(prompts: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+    """Estimated prompt tokens per role before and after compaction
+
+    Args:
+        prompts: Mapping of role to prompt or template text
+
+    Returns:
+        Mapping of role to {"before", "after", "saved"} token estimates
+    """
+    report = {}
+    for role, prompt in prompts.items():
+        before = estimate_tokens(prompt)
+        after = estimate_tokens(compact_prompt(prompt))
+        report[role] = {"before": before, "after": after, "saved": before - after}
+    return report
+
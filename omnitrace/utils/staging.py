@@ -0,0 +1,237 @@
+"""
+Staging - Atomic, staged project materialization
+
+Every generation writes into its own staging directory under
+``projects/.staging`` (on the same filesystem as the projects) and is renamed
+into ``projects/<name>`` only once all outputs are complete. A crash leaves
+nothing but a hidden staging directory behind, and concurrent generations
+of the same name never interleave files: the last one to finish replaces
+the project as a whole.
+"""
+
+import os
+import stat
+import time
+import shutil
+import logging
+import tempfile
+from contextlib import contextmanager
+from typing import List, Optional
+
+# Default directory that holds generated projects
+PROJECTS_ROOT = "projects"
+
+# Hidden directory under the projects root that holds in-progress generations
+STAGING_DIR = ".staging"
+
+
+def remove_tree(path: str, ignore_errors: bool = False) -> None:
+    """Delete a directory tree without recursion
+
+    ``shutil.rmtree`` recurses once per directory level, so very deep
+    generated trees exceed the recursion limit.
+
+    Args:
+        path: Directory to delete
+        ignore_errors: Keep going (and leave undeletable entries) on errors
+    """
+    def handle(operation, target):
+        try:
+            operation(target)
+        except OSError:
+            if not ignore_errors:
+                raise
+
+    directories = []
+    pending = [path]
+    while pending:
+        directory = pending.pop()
+        directories.append(directory)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    else:
+                        handle(os.unlink, entry.path)
+        except OSError:
+            if not ignore_errors:
+                raise
+    # Children were appended after their parents
+    for directory in reversed(directories):
+        handle(os.rmdir, directory)
+
+
+def copy_tree(source: str, destination: str) -> None:
+    """Copy a directory tree without recursion (symlinks are copied as links)
+
+    Copies are always writable by their owner: deduplicated projects share
+    read-only blob inodes, and a seeded generation rewrites files in place.
+
+    Args:
+        source: Directory to copy
+        destination: Target directory; may already exist
+    """
+    pending = [(source, destination)]
+    while pending:
+        source_dir, destination_dir = pending.pop()
+        os.makedirs(destination_dir, exist_ok=True)
+        with os.scandir(source_dir) as entries:
+            for entry in entries:
+                target = os.path.join(destination_dir, entry.name)
+                if entry.is_symlink():
+                    os.symlink(os.readlink(entry.path), target)
+                elif entry.is_dir():
+                    pending.append((entry.path, target))
+                else:
+                    shutil.copy2(entry.path, target)
+                    mode = os.stat(target).st_mode
+                    if not mode & stat.S_IWUSR:
+                        os.chmod(target, stat.S_IMODE(mode) | stat.S_IWUSR)
+
+
+def list_projects(projects_root: str = PROJECTS_ROOT) -> List[str]:
+    """List completed projects
+
+    Hidden entries (staging area, caches, locks) are never projects.
+
+    Args:
+        projects_root: Directory that holds generated projects
+
+    Returns:
+        Sorted project names
+    """
+    if not os.path.isdir(projects_root):
+        return []
+    return sorted(
+        entry.name for entry in os.scandir(projects_root)
+        if entry.is_dir() and not entry.name.startswith(".")
+    )
+
+
+class ProjectStaging:
+    """Stages a project's outputs and renames them into place on success
+
+    Usage:
+        staging = ProjectStaging("projects", "my_project")
+        output_dir = staging.begin()
+        try:
+            ...  # write everything below output_dir
+            final_dir = staging.commit()
+        except Exception:
+            staging.abort()
+            raise
+    """
+
+    def __init__(self, projects_root: str, name: str, lock_timeout: float = 30.0, logger=None):
+        """Initialize the staging area for one generation.
+
+        Args:
+            projects_root: Directory that holds generated projects
+            name: Project directory name
+            lock_timeout: Seconds after which a leftover commit lock is considered stale
+            logger: Optional logger instance
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.projects_root = projects_root
+        self.name = name
+        self.lock_timeout = lock_timeout
+        self.final_dir = os.path.join(projects_root, name)
+        self.staging_root = os.path.join(projects_root, STAGING_DIR)
+        self.staging_dir: Optional[str] = None
+        self.committed = False
+
+    def begin(self, seed: bool = False) -> str:
+        """Create a private staging directory for this generation
+
+        Args:
+            seed: Start from a copy of the current project (if any) so the
+                generation can update it incrementally
+
+        Returns:
+            Path of the staging directory to write outputs into
+        """
+        os.makedirs(self.staging_root, exist_ok=True)
+        self.staging_dir = tempfile.mkdtemp(prefix=f"{self.name}.", dir=self.staging_root)
+        # mkdtemp creates private directories; the project should get normal permissions
+        os.chmod(self.staging_dir, 0o755)
+        if seed and os.path.isdir(self.final_dir):
+            # A real copy, not hard links: later pipeline steps write files in place
+            copy_tree(self.final_dir, self.staging_dir)
+        self.logger.info(f"Staging project {self.name} in {self.staging_dir}")
+        return self.staging_dir
+
+    def final_path(self, path: str) -> str:
+        """Map a path inside the staging directory to its final location"""
+        if self.staging_dir is None:
+            return path
+        rel_path = os.path.relpath(path, self.staging_dir)
+        if rel_path == os.curdir:
+            return self.final_dir
+        if rel_path.startswith(os.pardir):
+            return path
+        return os.path.join(self.final_dir, rel_path)
+
+    @contextmanager
+    def _commit_lock(self):
+        """Serialize commits of the same project name across processes"""
+        lock_path = os.path.join(self.staging_root, f"{self.name}.lock")
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > self.lock_timeout:
+                        self.logger.warning(f"Removing stale commit lock {lock_path}")
+                        os.unlink(lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                time.sleep(0.05)
+        try:
+            os.write(fd, str(os.getpid()).encode("ascii"))
+            os.close(fd)
+            yield
+        finally:
+            try:
+                os.unlink(lock_path)
+            except FileNotFoundError:
+                pass
+
+    def commit(self) -> str:
+        """Rename the staged project into place, replacing any previous version
+
+        Returns:
+            Final project directory
+        """
+        if self.staging_dir is None or self.committed:
+            raise RuntimeError("ProjectStaging.commit() called without an active staging directory")
+
+        previous = None
+        with self._commit_lock():
+            if os.path.exists(self.final_dir):
+                # Directories cannot be renamed over non-empty ones: move the old version aside first
+                previous = tempfile.mkdtemp(prefix=f"{self.name}.old.", dir=self.staging_root)
+                os.rmdir(previous)
+                os.rename(self.final_dir, previous)
+            try:
+                os.rename(self.staging_dir, self.final_dir)
+            except OSError:
+                if previous:
+                    # Put the old version back rather than leave the project missing
+                    os.rename(previous, self.final_dir)
+                raise
+
+        if previous:
+            remove_tree(previous, ignore_errors=True)
+        self.committed = True
+        self.logger.info(f"Committed project {self.name} to {self.final_dir}")
+        return self.final_dir
+
+    def abort(self) -> None:
+        """Discard the staged outputs (no-op after a commit)"""
+        if self.staging_dir is not None and not self.committed:
+            remove_tree(self.staging_dir, ignore_errors=True)
+            self.logger.info(f"Discarded staged project {self.name}")
+            self.staging_dir = None
@@ -0,0 +1,653 @@
+"""
+Stream JSON - Incremental, tolerant JSON parsing of LLM structure responses
+
+Structure responses used to be parsed only after the whole completion had
+arrived, by regex-extracting a ```json block and calling ``json.loads``; any
+trailing text or small syntax slip failed the whole stage. This module
+parses the token stream as it arrives, emits directory and file nodes as
+soon as their JSON objects close, and repairs the defects LLMs commonly
+produce instead of failing:
+
+- prose, ``<think>`` blocks and code fences around the JSON value; a
+  bracket in the prose (``Here is the structure [v1]: ```json {...}```)
+  is superseded by the fenced value or a later object
+- trailing text after the value
+- trailing and missing commas, missing colons
+- single-quoted strings, unquoted keys and values
+- Python literals (True/False/None) and comments
+- raw control characters and invalid escapes inside strings
+- truncated output (open strings and containers are closed)
+
+``dumps_deep``/``loads_deep`` serialize structures of any depth: they use
+the C ``json`` module and fall back to iterative code on recursion errors.
+"""
+
+import os
+import json
+import asyncio
+import inspect
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+# Characters that end an unquoted token
+_DELIMITERS = set(" \t\r\n,:{}[]\"'/")
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "/": "/", "\\": "\\", "\"": "\"", "'": "'"}
+
+_LITERALS = {"true": True, "false": False, "null": None}
+_PYTHON_LITERALS = {"True": True, "False": False, "None": None}
+
+
+def _decode_string(raw: str) -> str:
+    """Decode escape sequences, keeping invalid escapes literally"""
+    if "\\" not in raw:
+        return raw
+    decoded = []
+    i = 0
+    while i < len(raw):
+        ch = raw[i]
+        if ch != "\\" or i + 1 >= len(raw):
+            decoded.append(ch)
+            i += 1
+            continue
+        escape = raw[i + 1]
+        if escape in _ESCAPES:
+            decoded.append(_ESCAPES[escape])
+            i += 2
+        elif escape == "u" and i + 6 <= len(raw):
+            try:
+                decoded.append(chr(int(raw[i + 2:i + 6], 16)))
+                i += 6
+            except ValueError:
+                decoded.append(raw[i:i + 2])
+                i += 2
+        else:
+            decoded.append(raw[i:i + 2])
+            i += 2
+    return "".join(decoded)
+
+
+def _convert_token(text: str) -> Tuple[Any, Optional[str]]:
+    """Convert an unquoted token to a value, returning (value, repair name)"""
+    if text in _LITERALS:
+        return _LITERALS[text], None
+    if text in _PYTHON_LITERALS:
+        return _PYTHON_LITERALS[text], "python_literal"
+    try:
+        return int(text), None
+    except ValueError:
+        pass
+    try:
+        return float(text), None
+    except ValueError:
+        return text, "unquoted_value"
+
+
+class StreamingJSONParser:
+    """Incremental JSON parser that repairs common LLM defects
+
+    Call ``feed`` with each chunk of text; it returns ``(path, value)``
+    events for every object or array that closed within the chunk, where
+    ``path`` is the tuple of keys/indices leading to the value. ``close``
+    finishes parsing, repairing truncated output, and returns the root value;
+    events for containers it had to close are available from ``take_events``.
+
+    Fenced content wins over prose: a root value that did not start inside a
+    code fence is replaced by a value that starts inside a fence opened
+    after it, and a root that is not an object by any later object.
+    ``restarts`` counts these replacements; events already returned for a
+    replaced value are not retracted.
+    """
+
+    def __init__(self):
+        """Initialize an empty parser."""
+        self.root: Any = None
+        self.repairs: Dict[str, int] = {}
+        self._preamble: List[str] = []
+        self._state = "preamble"
+        self._stack: List[List[Any]] = []  # [container, pending key, key in parent]
+        self._path: List[Any] = []
+        self._after_comma = False
+        self._token: List[str] = []
+        self._token_role = "value"
+        self._quote = ""
+        self._escape = False
+        self._return_state = "value"
+        self._events: List[Tuple[tuple, Any]] = []
+        self._fenced = False
+        self._trailing: List[str] = []
+        self.restarts = 0
+
+    @property
+    def done(self) -> bool:
+        """Whether the root value has been closed"""
+        return self._state == "done"
+
+    def _repair(self, name: str) -> None:
+        self.repairs[name] = self.repairs.get(name, 0) + 1
+
+    def feed(self, chunk: str) -> List[Tuple[tuple, Any]]:
+        """Parse a chunk of text
+
+        Args:
+            chunk: Next piece of the response
+
+        Returns:
+            List of (path, value) for objects and arrays closed in this chunk
+        """
+        step = self._step
+        for ch in chunk:
+            step(ch)
+        return self.take_events()
+
+    def take_events(self) -> List[Tuple[tuple, Any]]:
+        """Return and clear the (path, value) events not yet consumed"""
+        events, self._events = self._events, []
+        return events
+
+    def close(self) -> Any:
+        """Finish parsing, closing anything left open
+
+        Returns:
+            The parsed root value
+
+        Raises:
+            ValueError: If the text contained no JSON object or array
+        """
+        if self._state == "preamble":
+            raise ValueError("No JSON object found in response")
+        if self._state == "string":
+            self._repair("unterminated_string")
+            self._finish_string()
+        elif self._state == "bare":
+            self._finish_bare()
+        elif self._state == "slash":
+            self._state = self._return_state
+        elif self._state in ("comment_line", "comment_block", "comment_block_star"):
+            self._state = self._return_state
+        if self._stack:
+            self._repair("truncated")
+            top = self._stack[-1]
+            if isinstance(top[0], dict) and top[1] is not None:
+                top[0][top[1]] = None
+                top[1] = None
+            while self._stack:
+                self._close_container()
+        return self.root
+
+    # Container handling
+
+    def _open_container(self, container: Any) -> None:
+        if not self._stack:
+            self.root = container
+            key = None
+        else:
+            parent = self._stack[-1]
+            if isinstance(parent[0], dict):
+                key = parent[1] if parent[1] is not None else ""
+                parent[0][key] = container
+                parent[1] = None
+            else:
+                key = len(parent[0])
+                parent[0].append(container)
+            self._path.append(key)
+        self._stack.append([container, None, key])
+        self._after_comma = False
+        self._state = "key" if isinstance(container, dict) else "value"
+
+    def _close_container(self) -> None:
+        container = self._stack.pop()[0]
+        self._after_comma = False
+        self._events.append((tuple(self._path), container))
+        if self._stack:
+            self._path.pop()
+            self._state = "after"
+        else:
+            self._state = "done"
+
+    def _add_value(self, value: Any) -> None:
+        top = self._stack[-1]
+        if isinstance(top[0], dict):
+            top[0][top[1] if top[1] is not None else ""] = value
+            top[1] = None
+        else:
+            top[0].append(value)
+        self._state = "after"
+
+    def _close_bracket(self, ch: str) -> None:
+        expected = "}" if isinstance(self._stack[-1][0], dict) else "]"
+        if ch != expected:
+            self._repair("mismatched_bracket")
+        if self._after_comma:
+            self._repair("trailing_comma")
+        self._close_container()
+
+    # Tokens
+
+    def _start_string(self, quote: str, role: str) -> None:
+        if quote == "'":
+            self._repair("single_quotes")
+        self._quote = quote
+        self._token = []
+        self._token_role = role
+        self._escape = False
+        self._state = "string"
+
+    def _finish_string(self) -> None:
+        text = _decode_string("".join(self._token))
+        self._token = []
+        if self._token_role == "key":
+            self._stack[-1][1] = text
+            self._state = "colon"
+        else:
+            self._add_value(text)
+
+    def _start_bare(self, ch: str, role: str) -> None:
+        self._token = [ch]
+        self._token_role = role
+        self._state = "bare"
+
+    def _finish_bare(self) -> None:
+        text = "".join(self._token)
+        self._token = []
+        if self._token_role == "key":
+            self._repair("unquoted_key")
+            self._stack[-1][1] = text
+            self._state = "colon"
+            return
+        value, repair = _convert_token(text)
+        if repair:
+            self._repair(repair)
+        self._add_value(value)
+
+    def _start_comment(self) -> None:
+        self._return_state = self._state
+        self._state = "slash"
+
+    # State machine
+
+    def _step(self, ch: str) -> None:
+        state = self._state
+
+        if state == "string":
+            if self._escape:
+                self._escape = False
+                self._token.append(ch)
+            elif ch == "\\":
+                self._escape = True
+                self._token.append(ch)
+            elif ch == self._quote:
+                self._finish_string()
+            else:
+                self._token.append(ch)
+            return
+
+        if state == "bare":
+            if ch in _DELIMITERS:
+                self._finish_bare()
+                self._step(ch)
+            else:
+                self._token.append(ch)
+            return
+
+        if ch in " \t\r\n" and state not in ("preamble", "done", "comment_line", "comment_block", "comment_block_star"):
+            return
+
+        if state == "preamble":
+            if ch in "{[" and not self._in_think_block():
+                self._fenced = "".join(self._preamble).count("```") % 2 == 1
+                self._preamble = []
+                self._open_container({} if ch == "{" else [])
+            else:
+                self._preamble.append(ch)
+        elif state == "done":
+            if ch in "{[" and not self._fenced and self._supersedes(ch):
+                self._restart(ch)
+                return
+            self._trailing.append(ch)
+            if not ch.isspace() and "trailing_text" not in self.repairs:
+                self._repair("trailing_text")
+        elif state == "value":
+            if ch == "{":
+                self._open_container({})
+            elif ch == "[":
+                self._open_container([])
+            elif ch in "\"'":
+                self._after_comma = False
+                self._start_string(ch, "value")
+            elif ch in "]}":
+                if isinstance(self._stack[-1][0], dict):
+                    self._repair("missing_value")
+                    self._stack[-1][0][self._stack[-1][1] or ""] = None
+                    self._stack[-1][1] = None
+                    self._close_container()
+                else:
+                    self._close_bracket(ch)
+            elif ch == ",":
+                self._repair("extra_comma")
+            elif ch == "/":
+                self._start_comment()
+            elif ch != ":":
+                self._after_comma = False
+                self._start_bare(ch, "value")
+        elif state == "key":
+            if ch in "\"'":
+                self._after_comma = False
+                self._start_string(ch, "key")
+            elif ch in "}]":
+                self._close_bracket(ch)
+            elif ch == ",":
+                self._repair("extra_comma")
+            elif ch == "/":
+                self._start_comment()
+            elif ch.isalnum() or ch in "_$-":
+                self._after_comma = False
+                self._start_bare(ch, "key")
+        elif state == "colon":
+            if ch == ":":
+                self._state = "value"
+            elif ch == "/":
+                self._start_comment()
+            else:
+                self._repair("missing_colon")
+                self._state = "value"
+                self._step(ch)
+        elif state == "after":
+            if ch == ",":
+                self._after_comma = True
+                self._state = "key" if isinstance(self._stack[-1][0], dict) else "value"
+            elif ch in "}]":
+                self._close_bracket(ch)
+            elif ch == "/":
+                self._start_comment()
+            else:
+                # A new member without a separating comma
+                self._repair("missing_comma")
+                self._state = "key" if isinstance(self._stack[-1][0], dict) else "value"
+                self._step(ch)
+        elif state == "slash":
+            if ch == "/":
+                self._repair("comment")
+                self._state = "comment_line"
+            elif ch == "*":
+                self._repair("comment")
+                self._state = "comment_block"
+            else:
+                self._state = self._return_state
+                self._step(ch)
+        elif state == "comment_line":
+            if ch == "\n":
+                self._state = self._return_state
+        elif state == "comment_block":
+            if ch == "*":
+                self._state = "comment_block_star"
+        elif state == "comment_block_star":
+            self._state = self._return_state if ch == "/" else ("comment_block_star" if ch == "*" else "comment_block")
+
+    def _supersedes(self, ch: str) -> bool:
+        """Whether a value starting after the root replaces it
+
+        Only a root that came from prose can be replaced: by a value inside a
+        code fence opened after it, or, if it is not an object, by an object.
+        """
+        fence_open = "".join(self._trailing).count("```") % 2 == 1
+        return fence_open or (ch == "{" and not isinstance(self.root, dict))
+
+    def _restart(self, ch: str) -> None:
+        """Discard the root value and parse the value starting at ``ch``"""
+        # Repairs of the discarded value no longer apply
+        self.repairs = {"superseded_value": self.repairs.get("superseded_value", 0) + 1}
+        self.restarts += 1
+        self._fenced = "".join(self._trailing).count("```") % 2 == 1
+        self._trailing = []
+        self._events = []
+        self.root = None
+        self._open_container({} if ch == "{" else [])
+
+    def _in_think_block(self) -> bool:
+        """Check whether the preamble ends inside an unclosed <think> block"""
+        text = "".join(self._preamble)
+        self._preamble = [text]
+        return text.rfind("<think>") > text.rfind("</think>")
+
+
+_END = object()
+
+
+def _dumps_iterative(value: Any, indent: Optional[int]) -> str:
+    """Serialize like ``json.dumps`` with an explicit stack instead of recursion"""
+    newline = "" if indent is None else "\n"
+    pad = "" if indent is None else " " * indent
+    item_separator = ", " if indent is None else ","
+    parts: List[str] = []
+    # Frames: [iterator, closing bracket, level of the items, first item pending]
+    stack: List[list] = []
+
+    def emit(item: Any, level: int) -> None:
+        if isinstance(item, dict):
+            if not item:
+                parts.append("{}")
+            else:
+                parts.append("{")
+                stack.append([iter(item.items()), "}", level + 1, True])
+        elif isinstance(item, (list, tuple)):
+            if not item:
+                parts.append("[]")
+            else:
+                parts.append("[")
+                stack.append([iter(item), "]", level + 1, True])
+        else:
+            parts.append(json.dumps(item))
+
+    emit(value, 0)
+    while stack:
+        frame = stack[-1]
+        item = next(frame[0], _END)
+        if item is _END:
+            stack.pop()
+            parts.append(newline + pad * (frame[2] - 1) + frame[1])
+            continue
+        parts.append(("" if frame[3] else item_separator) + newline + pad * frame[2])
+        frame[3] = False
+        if frame[1] == "}":
+            key, item = item
+            parts.append(json.dumps(key if isinstance(key, str) else json.dumps(key)) + ": ")
+        emit(item, frame[2])
+    return "".join(parts)
+
+
+def dumps_deep(value: Any, indent: Optional[int] = None) -> str:
+    """Serialize JSON of any nesting depth (same output as ``json.dumps``)"""
+    try:
+        return json.dumps(value, indent=indent)
+    except RecursionError:
+        return _dumps_iterative(value, indent)
+
+
+def loads_deep(text: str) -> Any:
+    """Parse JSON of any nesting depth"""
+    try:
+        return json.loads(text)
+    except RecursionError:
+        parser = StreamingJSONParser()
+        parser.feed(text)
+        return parser.close()
+
+
+class StructureParseError(ValueError):
+    """Raised when a response contains no usable JSON structure"""
+
+    def __init__(self, message: str, raw_text: str = ""):
+        super().__init__(message)
+        self.raw_text = raw_text
+
+
+def parse_json_tolerant(text: str) -> Tuple[Any, Dict[str, int]]:
+    """Parse a complete response with the tolerant parser
+
+    Args:
+        text: Full LLM response
+
+    Returns:
+        Tuple of (parsed value, repair counts)
+
+    Raises:
+        ValueError: If the text contained no JSON object or array
+    """
+    parser = StreamingJSONParser()
+    parser.feed(text)
+    return parser.close(), parser.repairs
+
+
+class StructureNodeStream:
+    """Turns a streamed structure response into directory and file nodes
+
+    Understands both structure schemas: the FilesystemAgent dict-of-dicts
+    (``directories``/``files`` keyed by name) and the StructureGenerator
+    lists (``directories``/``subdirectories``/``files`` entries with a
+    ``name``). Nodes are dictionaries with ``kind`` ("directory" or "file"),
+    ``path`` (relative path) and ``info``. Files are emitted as soon as their
+    object closes, directories once all of their contents have closed.
+    """
+
+    _CONTAINER_KEYS = ("directories", "subdirectories", "files")
+
+    def __init__(self):
+        """Initialize the node stream."""
+        self.parser = StreamingJSONParser()
+        self.nodes: List[Dict[str, Any]] = []
+        self._deferred: List[Tuple[tuple, Dict[str, Any]]] = []
+        self._restarts = 0
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Parse a chunk and return the nodes completed by it"""
+        return self._collect(self.parser.feed(chunk))
+
+    def close(self) -> Tuple[Any, List[Dict[str, Any]]]:
+        """Finish parsing
+
+        Returns:
+            Tuple of (parsed structure, nodes completed while closing)
+        """
+        if not self.parser.done:
+            self.parser.close()
+        return self.parser.root, self._collect(self.parser.take_events(), final=True)
+
+    def _resolve(self, path: tuple) -> Optional[str]:
+        """Resolve the relative path of a node, or None if an ancestor name is not known yet"""
+        start = 1 if path and path[0] == "structure" else 0
+        pairs = path[start:]
+        if len(pairs) < 2 or len(pairs) % 2:
+            return None
+        node = self.parser.root
+        if start:
+            node = node.get("structure")
+        names = []
+        for i in range(0, len(pairs), 2):
+            key, item = pairs[i], pairs[i + 1]
+            if key not in self._CONTAINER_KEYS or (key == "files" and i != len(pairs) - 2):
+                return None
+            try:
+                node = node[key][item]
+            except (KeyError, IndexError, TypeError):
+                return None
+            name = item if isinstance(item, str) else (node.get("name") if isinstance(node, dict) else None)
+            if not isinstance(name, str) or not name:
+                return None
+            names.append(name)
+        return os.path.join(*names)
+
+    def _collect(self, events: List[Tuple[tuple, Any]], final: bool = False) -> List[Dict[str, Any]]:
+        if self.parser.restarts != self._restarts:
+            # Nodes waiting for a name belong to a value the parser replaced
+            self._restarts = self.parser.restarts
+            self._deferred = []
+        pending = self._deferred + [(path, value) for path, value in events
+                                    if isinstance(value, dict) and len(path) >= 2
+                                    and path[-2] in self._CONTAINER_KEYS]
+        self._deferred = []
+        completed = []
+        for path, info in pending:
+            rel_path = self._resolve(path)
+            if rel_path is None:
+                if not final:
+                    self._deferred.append((path, info))
+                continue
+            completed.append({
+                "kind": "file" if path[-2] == "files" else "directory",
+                "path": rel_path,
+                "info": info
+            })
+        self.nodes.extend(completed)
+        return completed
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Extract text from a streamed LLM chunk"""
+    if isinstance(chunk, str):
+        return chunk
+    return getattr(chunk, "content", None) or getattr(chunk, "text", None) or ""
+
+
+async def stream_structure(chain, context: Dict[str, Any],
+                           on_node: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Tuple[Any, Dict[str, int], str]:
+    """Stream a structure completion through the tolerant parser
+
+    The blocking ``chain.stream`` runs in a worker thread; chunks are parsed
+    on the event loop as they arrive and ``on_node`` (a function or
+    coroutine function) is called for every completed directory and file.
+
+    Args:
+        chain: LangChain runnable producing the structure response
+        context: Prompt variables
+        on_node: Optional callback receiving each completed node
+
+    Returns:
+        Tuple of (parsed structure, repair counts, raw response text)
+
+    Raises:
+        StructureParseError: If the response contained no JSON object
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    def produce() -> None:
+        try:
+            for chunk in chain.stream(context):
+                loop.call_soon_threadsafe(queue.put_nowait, _chunk_text(chunk))
+        except BaseException as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+        finally:
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+    async def emit(nodes: List[Dict[str, Any]]) -> None:
+        if on_node is None:
+            return
+        for node in nodes:
+            result = on_node(node)
+            if inspect.isawaitable(result):
+                await result
+
+    stream = StructureNodeStream()
+    raw = []
+    producer = loop.run_in_executor(None, produce)
+    while True:
+        item = await queue.get()
+        if item is finished:
+            break
+        if isinstance(item, BaseException):
+            await producer
+            raise item
+        raw.append(item)
+        await emit(stream.feed(item))
+    await producer
+
+    raw_text = "".join(raw)
+    try:
+        structure, nodes = stream.close()
+    except ValueError as e:
+        raise StructureParseError(str(e), raw_text) from e
+    if not isinstance(structure, dict):
+        raise StructureParseError("Response JSON is not an object", raw_text)
+    await emit(nodes)
+    return structure, stream.parser.repairs, raw_text
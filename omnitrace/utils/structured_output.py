@@ -0,0 +1,254 @@
+"""
+Structured Output - Schema-constrained structure generation
+
+Structure responses used to be free-form text that was parsed after the
+fact; one malformed response silently skipped file structure and code
+generation. With structured output enabled the LLM request carries a JSON
+schema (or Ollama's plain ``"json"`` format mode), so the server constrains
+decoding and the response is valid by construction. Every response is
+still validated against the same schema, and invalid or unparseable
+responses are retried a bounded number of times with the counts reported.
+"""
+
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Callable, Union
+
+try:
+    from omnitrace.utils.stream_json import stream_structure, StructureParseError
+except ImportError:
+    try:
+        from utils.stream_json import stream_structure, StructureParseError
+    except ImportError:
+        from stream_json import stream_structure, StructureParseError
+
+# Structured output modes: send the full JSON schema, or only request JSON
+MODE_SCHEMA = "schema"
+MODE_JSON = "json"
+STRUCTURED_OUTPUT_MODES = (MODE_SCHEMA, MODE_JSON)
+
+# Schema of the FilesystemAgent structure (nested dictionaries keyed by name)
+FILESYSTEM_STRUCTURE_SCHEMA: Dict[str, Any] = {
+    "$defs": {
+        "file": {
+            "type": "object",
+            "properties": {
+                "description": {"type": "string"},
+                "type": {"type": "string"},
+                "content_template": {"type": "string"}
+            },
+            "required": ["description"]
+        },
+        "directory": {
+            "type": "object",
+            "properties": {
+                "description": {"type": "string"},
+                "directories": {"type": "object", "additionalProperties": {"$ref": "#/$defs/directory"}},
+                "files": {"type": "object", "additionalProperties": {"$ref": "#/$defs/file"}}
+            },
+            "required": ["description"]
+        }
+    },
+    "type": "object",
+    "properties": {
+        "directories": {"type": "object", "additionalProperties": {"$ref": "#/$defs/directory"}},
+        "files": {"type": "object", "additionalProperties": {"$ref": "#/$defs/file"}}
+    },
+    "required": ["directories", "files"]
+}
+
+# Schema of the StructureGenerator structure (lists of named entries)
+PROJECT_STRUCTURE_SCHEMA: Dict[str, Any] = {
+    "$defs": {
+        "file": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "purpose": {"type": "string"},
+                "content_type": {"type": "string"},
+                "content_summary": {"type": "string"}
+            },
+            "required": ["name"]
+        },
+        "directory": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string"},
+                "purpose": {"type": "string"},
+                "subdirectories": {"type": "array", "items": {"$ref": "#/$defs/directory"}},
+                "files": {"type": "array", "items": {"$ref": "#/$defs/file"}}
+            },
+            "required": ["name"]
+        }
+    },
+    "type": "object",
+    "properties": {
+        "project": {"type": "string"},
+        "root_directory": {"type": "string"},
+        "structure": {
+            "type": "object",
+            "properties": {
+                "directories": {"type": "array", "items": {"$ref": "#/$defs/directory"}},
+                "files": {"type": "array", "items": {"$ref": "#/$defs/file"}}
+            },
+            "required": ["directories", "files"]
+        }
+    },
+    "required": ["project", "structure"]
+}
+
+_JSON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "boolean": bool,
+    "null": type(None),
+}
+
+
+def output_format(schema: Dict[str, Any], mode: str = MODE_SCHEMA) -> Union[str, Dict[str, Any]]:
+    """Get the value of Ollama's ``format`` request option for a mode
+
+    Args:
+        schema: JSON schema of the expected response
+        mode: "schema" to constrain decoding to the schema, "json" for any JSON
+
+    Returns:
+        The schema itself or the string "json"
+    """
+    if mode not in STRUCTURED_OUTPUT_MODES:
+        raise ValueError(f"Unknown structured output mode: {mode} (expected one of {STRUCTURED_OUTPUT_MODES})")
+    return schema if mode == MODE_SCHEMA else MODE_JSON
+
+
+def constrain_llm(llm, schema: Dict[str, Any], mode: str = MODE_SCHEMA):
+    """Bind the structured output format to an LLM
+
+    Runnable LLMs such as ``OllamaLLM`` pass bound keyword arguments through
+    to the request, so ``format`` reaches the server with every call.
+
+    Args:
+        llm: The LLM to constrain
+        schema: JSON schema of the expected response
+        mode: "schema" or "json"
+
+    Returns:
+        The bound LLM, or the LLM unchanged if it does not support binding
+    """
+    fmt = output_format(schema, mode)
+    if hasattr(llm, "bind"):
+        return llm.bind(format=fmt)
+    logging.getLogger(__name__).warning(
+        f"{type(llm).__name__} does not support bound options; structured output is not enforced"
+    )
+    return llm
+
+
+def validate_structure(value: Any, schema: Dict[str, Any]) -> List[str]:
+    """Validate a value against the subset of JSON schema used for structures
+
+    Supports ``type``, ``properties``, ``required``, ``additionalProperties``,
+    ``items`` and local ``$ref`` pointers into ``$defs``.
+
+    Args:
+        value: Parsed response
+        schema: JSON schema to validate against
+
+    Returns:
+        List of human-readable violations (empty if the value is valid)
+    """
+    defs = schema.get("$defs", {})
+    errors: List[str] = []
+    # Explicit work stack: structures can nest arbitrarily deep
+    pending = [(value, schema, "$")]
+    while pending:
+        node, node_schema, path = pending.pop()
+        ref = node_schema.get("$ref")
+        if ref:
+            node_schema = defs[ref.rsplit("/", 1)[-1]]
+
+        expected = node_schema.get("type")
+        if expected and not isinstance(node, _JSON_TYPES[expected]):
+            errors.append(f"{path}: expected {expected}, got {type(node).__name__}")
+            continue
+
+        if isinstance(node, dict):
+            for key in node_schema.get("required", ()):
+                if key not in node:
+                    errors.append(f"{path}: missing required property '{key}'")
+            properties = node_schema.get("properties", {})
+            additional = node_schema.get("additionalProperties")
+            for key, child in node.items():
+                if key in properties:
+                    pending.append((child, properties[key], f"{path}.{key}"))
+                elif isinstance(additional, dict):
+                    pending.append((child, additional, f"{path}.{key}"))
+        elif isinstance(node, list) and "items" in node_schema:
+            for index, child in enumerate(node):
+                pending.append((child, node_schema["items"], f"{path}[{index}]"))
+    return errors
+
+
+async def generate_validated_structure(chain, context: Dict[str, Any], schema: Dict[str, Any],
+                                       on_node: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                                       max_retries: int = 0,
+                                       logger=None) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """Stream a structure response, validate it and retry failed attempts
+
+    A response that cannot be parsed, or that violates the schema, is
+    retried up to ``max_retries`` times. If every attempt violates the
+    schema the last parsed structure is still returned (downstream
+    consumers tolerate missing fields); only when no attempt parsed at all
+    is the structure ``None``. Nodes of rejected attempts may already have
+    been passed to ``on_node``.
+
+    Args:
+        chain: Runnable whose ``stream(context)`` yields response chunks
+        context: Prompt variables
+        schema: JSON schema the structure must satisfy
+        on_node: Optional callback for each completed node
+        max_retries: Additional attempts after the first one
+        logger: Optional logger instance
+
+    Returns:
+        Tuple of (structure or None, report). The report holds attempts,
+        retries, parse_failures, schema_failures, the repairs and schema
+        errors of the accepted attempt, and on failure the error and raw text.
+    """
+    logger = logger or logging.getLogger(__name__)
+    report: Dict[str, Any] = {
+        "attempts": 0,
+        "retries": 0,
+        "parse_failures": 0,
+        "schema_failures": 0,
+        "repairs": {},
+        "schema_errors": []
+    }
+    structure = None
+    for attempt in range(max_retries + 1):
+        report["attempts"] = attempt + 1
+        report["retries"] = attempt
+        try:
+            candidate, repairs, _ = await stream_structure(chain, context, on_node)
+        except StructureParseError as e:
+            report["parse_failures"] += 1
+            report["error"] = str(e)
+            report["raw_text"] = e.raw_text
+            logger.warning(f"Structure attempt {attempt + 1} could not be parsed: {e}")
+            continue
+
+        errors = validate_structure(candidate, schema)
+        structure = candidate
+        report["repairs"] = repairs
+        report["schema_errors"] = errors[:20]
+        report.pop("error", None)
+        report.pop("raw_text", None)
+        if not errors:
+            break
+        report["schema_failures"] += 1
+        logger.warning(f"Structure attempt {attempt + 1} violates the schema ({len(errors)} errors): {errors[0]}")
+
+    if structure is not None:
+        # A later unparseable attempt does not invalidate an earlier structure
+        report.pop("error", None)
+        report.pop("raw_text", None)
+    return structure, report
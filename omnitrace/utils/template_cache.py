@@ -0,0 +1,334 @@
+"""
+Template Cache - Process-wide cache of agent template files
+
+OmniAgent, EnhancedOmniAgent, TemplateManager and every specialized agent
+read the same JSON files in ``config/templates``. They all read through
+one cache instead: a file is parsed once and served from memory until its
+modification time or size changes, which costs one ``stat`` per load.
+
+Templates are also checked when they are loaded or saved: a template that
+uses a variable its agent never fills is rejected before any LLM call,
+instead of failing with a KeyError in the middle of a run.
+
+Consumers that build chains from a template subscribe to changes. Saving or
+deleting a template through the cache notifies them immediately; changes
+made by other processes or editors are noticed on the next load, on
+``check()``, or continuously by the optional watcher thread.
+"""
+
+import os
+import copy
+import json
+import logging
+import threading
+import weakref
+from typing import AbstractSet, Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from omnitrace.utils.compiled_template import CompiledTemplate, compile_template
+except ImportError:
+    try:
+        from utils.compiled_template import CompiledTemplate, compile_template
+    except ImportError:
+        from compiled_template import CompiledTemplate, compile_template
+
+try:
+    from omnitrace.utils.file_writer import atomic_write_text
+except ImportError:
+    try:
+        from utils.file_writer import atomic_write_text
+    except ImportError:
+        from file_writer import atomic_write_text
+
+# Directory that holds saved agent templates
+TEMPLATES_DIR = os.path.join("config", "templates")
+
+# Suffix of template files; the role is the file name up to the first "_"
+TEMPLATE_SUFFIX = "_template.json"
+
+
+# Variables each role's template may use. A role's template is shared by
+# OmniAgent's generation stage and the role's specialized agent, so this is
+# what the specialized agent fills (OmniAgent stages fill a superset); the
+# agents check templates against these same sets.
+ROLE_VARIABLES: Dict[str, AbstractSet[str]] = {
+    "ceo": frozenset({"task", "context", "decisions"}),
+    "cto": frozenset({"task", "context", "vision", "technical_decisions"}),
+    "architect": frozenset({"task", "context", "vision", "tech_strategy", "designs"}),
+    "developer": frozenset({"task", "context", "design", "tech_strategy", "work"}),
+    "filesystem": frozenset({"task", "context", "vision", "tech_strategy", "design", "implementation",
+                             "filesystem_decisions"}),
+}
+
+
+def compile_role_template(role: str, source: str, allowed: Optional[AbstractSet[str]] = None) -> CompiledTemplate:
+    """Parse a role's template and check its variables
+
+    Args:
+        role: Agent role
+        source: Template text
+        allowed: Variables the consumer fills (default: ``ROLE_VARIABLES[role]``;
+            roles without an entry are only parsed)
+
+    Returns:
+        The compiled template; ``variables`` is what a call needs to supply
+
+    Raises:
+        ValueError: If the template has unbalanced braces or unknown variables
+    """
+    compiled = compile_template(source)
+    allowed = ROLE_VARIABLES.get(role) if allowed is None else allowed
+    if allowed is not None:
+        unknown = compiled.variables - allowed
+        if unknown:
+            raise ValueError(
+                f"{role} template uses unknown variables {', '.join(repr(name) for name in sorted(unknown))}; "
+                f"available: {', '.join(sorted(allowed))}"
+            )
+    return compiled
+
+
+def template_path(role: str, templates_dir: Optional[str] = None) -> str:
+    """Path of the template file for a role"""
+    return os.path.join(templates_dir or TEMPLATES_DIR, f"{role}{TEMPLATE_SUFFIX}")
+
+
+def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+    """(mtime in ns, size, inode) of a file, or None if it does not exist
+
+    File system timestamps can be coarser than two quick saves; atomic
+    saves also replace the inode, which tells them apart.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class TemplateCache:
+    """Parsed template files keyed by absolute path and (mtime, size, inode)
+
+    Usage:
+        cache = get_template_cache()
+        data = cache.load(template_path("cto"))  # {"template": ..., "parameters": ...} or None
+        cache.subscribe(agent.on_template_changed)  # called with the absolute path
+        cache.start_watching(TEMPLATES_DIR)
+    """
+
+    def __init__(self, logger=None):
+        """Initialize an empty cache.
+
+        Args:
+            logger: Optional logger instance
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self._entries: Dict[str, Tuple[Tuple[int, int, int], Dict[str, Any]]] = {}
+        self._listeners: List[Any] = []
+        self._lock = threading.RLock()
+        self._watched: Dict[str, Dict[str, Optional[Tuple[int, int, int]]]] = {}
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"hits": 0, "reads": 0, "invalidations": 0}
+
+    def load(self, path: str) -> Optional[Dict[str, Any]]:
+        """Load a template file
+
+        Args:
+            path: Template file path
+
+        Returns:
+            A copy of the parsed file (callers may modify it), or None if it does not exist
+
+        Raises:
+            ValueError: If the file is not valid JSON
+        """
+        key = os.path.abspath(path)
+        signature = _signature(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if signature is None:
+                if entry is not None:
+                    self._invalidate(key)
+            elif entry is not None and entry[0] == signature:
+                self.stats["hits"] += 1
+                return copy.deepcopy(entry[1])
+            else:
+                with open(key, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.stats["reads"] += 1
+                self._entries[key] = (signature, data)
+        # A cached file that changed on disk: subscribers rebuild from the new version
+        if entry is not None:
+            self._notify(key)
+        return None if signature is None else copy.deepcopy(data)
+
+    def load_dir(self, directory: Optional[str] = None, suffix: str = TEMPLATE_SUFFIX) -> Dict[str, Dict[str, Any]]:
+        """Load every template file of a directory
+
+        Files that fail to parse are logged and skipped.
+
+        Args:
+            directory: Templates directory (default: config/templates)
+            suffix: File name suffix of template files
+
+        Returns:
+            Mapping of role to parsed file, in file name order
+        """
+        directory = directory or TEMPLATES_DIR
+        templates = {}
+        try:
+            names = sorted(os.listdir(directory))
+        except FileNotFoundError:
+            return templates
+        for name in names:
+            if not name.endswith(suffix):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                data = self.load(path)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Failed to load template from {path}: {str(e)}")
+                continue
+            if data is not None:
+                templates[name.split("_")[0]] = data
+        return templates
+
+    def write(self, path: str, data: Dict[str, Any]) -> None:
+        """Write a template file atomically and notify subscribers
+
+        Args:
+            path: Template file path
+            data: Template data ({"template": ..., "parameters": ...})
+        """
+        key = os.path.abspath(path)
+        atomic_write_text(key, json.dumps(data, ensure_ascii=False, indent=2))
+        with self._lock:
+            self._entries[key] = (_signature(key), copy.deepcopy(data))
+        self._notify(key)
+
+    def remove(self, path: str) -> bool:
+        """Delete a template file and notify subscribers
+
+        Returns:
+            True if the file existed
+        """
+        key = os.path.abspath(path)
+        try:
+            os.remove(key)
+        except FileNotFoundError:
+            return False
+        with self._lock:
+            self._entries.pop(key, None)
+        self._notify(key)
+        return True
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop one cached file (or all of them) so the next load re-reads it"""
+        with self._lock:
+            keys = [os.path.abspath(path)] if path else list(self._entries)
+            for key in keys:
+                self._invalidate(key)
+
+    def _invalidate(self, key: str) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.stats["invalidations"] += 1
+
+    def subscribe(self, callback: Callable[[str], None]) -> None:
+        """Call ``callback(path)`` whenever a template file changes
+
+        Bound methods are held weakly, so subscribing does not keep an agent alive.
+        """
+        reference = weakref.WeakMethod(callback) if hasattr(callback, "__self__") else (lambda: callback)
+        with self._lock:
+            self._listeners.append(reference)
+
+    def _notify(self, key: str) -> None:
+        """Tell subscribers that a template file changed"""
+        with self._lock:
+            listeners = [reference() for reference in self._listeners]
+            self._listeners = [reference for reference, listener in zip(self._listeners, listeners) if listener]
+        for listener in listeners:
+            if listener is None:
+                continue
+            try:
+                listener(key)
+            except Exception as e:
+                self.logger.error(f"Template change listener failed for {key}: {str(e)}")
+
+    def check(self) -> List[str]:
+        """Stat every cached and watched file; notify subscribers of changes
+
+        Returns:
+            Absolute paths of the files that changed, appeared or disappeared
+        """
+        changed = []
+        with self._lock:
+            for key, (signature, _) in list(self._entries.items()):
+                if _signature(key) != signature:
+                    self._invalidate(key)
+                    changed.append(key)
+            for directory, known in self._watched.items():
+                current = self._scan(directory)
+                for key in set(known) | set(current):
+                    if known.get(key) != current.get(key) and key not in changed:
+                        changed.append(key)
+                self._watched[directory] = current
+        for key in changed:
+            self._notify(key)
+        return changed
+
+    @staticmethod
+    def _scan(directory: str) -> Dict[str, Optional[Tuple[int, int, int]]]:
+        try:
+            names = os.listdir(directory)
+        except FileNotFoundError:
+            return {}
+        return {os.path.join(directory, name): _signature(os.path.join(directory, name))
+                for name in names if name.endswith(".json")}
+
+    def start_watching(self, directory: Optional[str] = None, interval: float = 1.0) -> None:
+        """Watch a templates directory for hot reload
+
+        A daemon thread calls ``check()`` every ``interval`` seconds, so
+        templates edited on disk reach running agents without a restart.
+
+        Args:
+            directory: Templates directory (default: config/templates)
+            interval: Seconds between checks
+        """
+        directory = os.path.abspath(directory or TEMPLATES_DIR)
+        with self._lock:
+            self._watched[directory] = self._scan(directory)
+            if self._watcher is not None and self._watcher.is_alive():
+                return
+            self._stop.clear()
+            self._watcher = threading.Thread(target=self._watch, args=(interval,), name="template-watcher",
+                                             daemon=True)
+            self._watcher.start()
+        self.logger.info(f"Watching templates in {directory}")
+
+    def stop_watching(self) -> None:
+        """Stop the watcher thread"""
+        self._stop.set()
+        watcher = self._watcher
+        if watcher is not None:
+            watcher.join()
+        with self._lock:
+            self._watcher = None
+            self._watched.clear()
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.check()
+            except Exception as e:
+                self.logger.error(f"Template watcher check failed: {str(e)}")
+
+
+_cache = TemplateCache()
+
+
+def get_template_cache() -> TemplateCache:
+    """The process-wide template cache"""
+    return _cache
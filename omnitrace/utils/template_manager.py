@@ -6,10 +6,20 @@ using Elon Musk's first-principles thinking approach.
 """
 
 import os
-import json
 import logging
 from typing import Dict, Any, Optional, List
 
+try:
+    from omnitrace.utils.template_cache import get_template_cache, template_path, compile_role_template, TEMPLATE_SUFFIX
+    from omnitrace.utils.template_versions import TemplateVersionStore, SHORT_HASH
+except ImportError:
+    try:
+        from utils.template_cache import get_template_cache, template_path, compile_role_template, TEMPLATE_SUFFIX
+        from utils.template_versions import TemplateVersionStore, SHORT_HASH
+    except ImportError:
+        from template_cache import get_template_cache, template_path, compile_role_template, TEMPLATE_SUFFIX
+        from template_versions import TemplateVersionStore, SHORT_HASH
+
 class TemplateManager:
     """Manages agent templates with first-principles thinking"""
     
@@ -26,6 +36,9 @@ class TemplateManager:
         # Ensure templates directory exists
         os.makedirs(self.templates_dir, exist_ok=True)
         
+        # Every saved version, keyed by content hash
+        self.versions = TemplateVersionStore(self.templates_dir, self.logger)
+        
         # Store loaded templates
         self.templates = {}
         self.default_templates = {}
@@ -258,27 +271,24 @@ class TemplateManager:
             self.logger.warning(f"Templates directory not found: {self.templates_dir}")
             return templates
         
-        # Load custom templates from files
-        for filename in os.listdir(self.templates_dir):
-            if filename.endswith("_template.json"):
-                role = filename.split("_")[0]
-                file_path = os.path.join(self.templates_dir, filename)
-                
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        template_data = json.load(f)
-                    
-                    # Ensure required fields are present
-                    if "template" not in template_data:
-                        template_data["template"] = self.default_templates.get(role, {}).get("template", "")
-                    
-                    if "parameters" not in template_data:
-                        template_data["parameters"] = self.default_templates.get(role, {}).get("parameters", {})
-                    
-                    templates[role] = template_data
-                    self.logger.info(f"Loaded custom template for {role} from {file_path}")
-                except Exception as e:
-                    self.logger.error(f"Failed to load template from {file_path}: {str(e)}")
+        # Load custom templates from files (parsed once per file version, process-wide)
+        for role, template_data in get_template_cache().load_dir(self.templates_dir, TEMPLATE_SUFFIX).items():
+            # Ensure required fields are present
+            if "template" not in template_data:
+                template_data["template"] = self.default_templates.get(role, {}).get("template", "")
+            
+            if "parameters" not in template_data:
+                template_data["parameters"] = self.default_templates.get(role, {}).get("parameters", {})
+            
+            # A template using variables its agent never fills keeps the default
+            try:
+                compile_role_template(role, template_data["template"])
+            except ValueError as e:
+                self.logger.error(f"Rejected custom template for {role}: {str(e)}")
+                continue
+            
+            templates[role] = template_data
+            self.logger.info(f"Loaded custom template for {role}")
         
         self.templates = templates
         return templates
@@ -341,8 +351,8 @@ class TemplateManager:
             True if successful, False otherwise
         """
         try:
-            # Ensure templates directory exists
-            os.makedirs(self.templates_dir, exist_ok=True)
+            # Reject unknown variables before the template can reach an LLM call
+            compile_role_template(role, template_text)
             
             # Create template data
             template_data = {
@@ -359,15 +369,15 @@ class TemplateManager:
                 else:
                     template_data["parameters"] = self.default_templates.get(role, {}).get("parameters", {})
             
-            # Save to file
-            file_path = os.path.join(self.templates_dir, f"{role}_template.json")
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(template_data, f, ensure_ascii=False, indent=2)
+            # Save to file; agents using this template rebuild their chains
+            file_path = template_path(role, self.templates_dir)
+            get_template_cache().write(file_path, template_data)
+            version = self.versions.put(role, template_text)
             
             # Update in-memory templates
             self.templates[role] = template_data
             
-            self.logger.info(f"Saved template for {role} to {file_path}")
+            self.logger.info(f"Saved template for {role} to {file_path} (version {version[:SHORT_HASH]})")
             return True
         except Exception as e:
             self.logger.error(f"Failed to save template for {role}: {str(e)}")
@@ -383,9 +393,8 @@ class TemplateManager:
             True if successful, False otherwise
         """
         try:
-            file_path = os.path.join(self.templates_dir, f"{role}_template.json")
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            file_path = template_path(role, self.templates_dir)
+            if get_template_cache().remove(file_path):
                 
                 # Revert to default in memory
                 if role in self.default_templates:
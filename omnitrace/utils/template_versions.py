@@ -0,0 +1,143 @@
+"""
+Template Versions - Content-hash versions of agent templates
+
+Saving a template overwrites its file, so a role name alone does not say
+which prompt produced a result. Every template version is identified by
+the SHA-256 of its text and kept in a small store next to the templates
+(``config/templates/.versions/<hash>.json``). Runs record the hashes they
+used, and the versions themselves inside the project they generated
+(``<project>/.omnitrace_templates/<hash>.json``): caches can key on exact
+template versions, and an old run can be repeated with the templates it
+was generated with. A version is the template text only; template
+parameters are kept with the template file, not with its versions.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    from omnitrace.utils.template_cache import TEMPLATES_DIR
+except ImportError:
+    try:
+        from utils.template_cache import TEMPLATES_DIR
+    except ImportError:
+        from template_cache import TEMPLATES_DIR
+
+try:
+    from omnitrace.utils.file_writer import atomic_write_text
+except ImportError:
+    try:
+        from utils.file_writer import atomic_write_text
+    except ImportError:
+        from file_writer import atomic_write_text
+
+# Directory of stored versions, inside the templates directory
+VERSIONS_DIR = ".versions"
+
+# Directory of the versions a project was generated with, inside the project
+PROJECT_VERSIONS_DIR = ".omnitrace_templates"
+
+# Hash prefix length shown to people (and accepted by ``get``)
+SHORT_HASH = 12
+
+
+def template_hash(template: str) -> str:
+    """Content hash identifying one version of a template"""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()
+
+
+class TemplateVersionStore:
+    """Immutable template versions keyed by content hash
+
+    Usage:
+        store = TemplateVersionStore()
+        digest = store.put("cto", template_text)
+        store.get(digest[:12])["template"] == template_text
+        store.history("cto")  # [{"hash": ..., "saved": ...}, ...] oldest first
+
+        # The versions a project was generated with
+        TemplateVersionStore.in_project("projects/my_project").get(digest)
+    """
+
+    def __init__(self, templates_dir: Optional[str] = None, logger=None):
+        """Initialize the store.
+
+        Args:
+            templates_dir: Templates directory (default: config/templates)
+            logger: Optional logger instance
+        """
+        self.logger = logger or logging.getLogger(__name__)
+        self.versions_dir = os.path.join(templates_dir or TEMPLATES_DIR, VERSIONS_DIR)
+
+    @classmethod
+    def in_project(cls, project_dir: str, logger=None) -> "TemplateVersionStore":
+        """Store of the template versions a project was generated with"""
+        store = cls(logger=logger)
+        store.versions_dir = os.path.join(project_dir, PROJECT_VERSIONS_DIR)
+        return store
+
+    def put(self, role: str, template: str) -> str:
+        """Store a template version unless it is already stored
+
+        Args:
+            role: Agent role
+            template: Template text
+
+        Returns:
+            The version's content hash
+        """
+        digest = template_hash(template)
+        path = os.path.join(self.versions_dir, f"{digest}.json")
+        if os.path.exists(path):
+            return digest
+        record = {
+            "role": role,
+            "template": template,
+            "saved": datetime.now().isoformat(timespec="seconds"),
+        }
+        atomic_write_text(path, json.dumps(record, ensure_ascii=False, indent=2))
+        self.logger.info(f"Stored {role} template version {digest[:SHORT_HASH]}")
+        return digest
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        """Load a stored version by hash or unique hash prefix
+
+        Returns:
+            The stored record (role, template, saved, hash), or None
+
+        Raises:
+            ValueError: If the prefix matches more than one version
+        """
+        path = os.path.join(self.versions_dir, f"{digest}.json")
+        if not os.path.exists(path):
+            matches = [name for name in self._names() if name.startswith(digest)]
+            if len(matches) > 1:
+                raise ValueError(f"Template version prefix {digest} is ambiguous")
+            if not matches:
+                return None
+            path = os.path.join(self.versions_dir, matches[0])
+        with open(path, "r", encoding="utf-8") as f:
+            record = json.load(f)
+        record["hash"] = os.path.basename(path)[:-len(".json")]
+        return record
+
+    def history(self, role: str) -> List[Dict[str, str]]:
+        """Stored versions of a role, oldest first"""
+        versions = []
+        for name in self._names():
+            with open(os.path.join(self.versions_dir, name), "r", encoding="utf-8") as f:
+                record = json.load(f)
+            if record.get("role") == role:
+                versions.append({"hash": name[:-len(".json")], "saved": record.get("saved", "")})
+        return sorted(versions, key=lambda version: version["saved"])
+
+    def _names(self) -> List[str]:
+        try:
+            return sorted(name for name in os.listdir(self.versions_dir)
+                          if name.endswith(".json") and not name.startswith("."))
+        except FileNotFoundError:
+            return []
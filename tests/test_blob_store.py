@@ -0,0 +1,90 @@
+"""
+Test cases for the content-addressed blob store
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.blob_store import BlobStore, MANIFEST_NAME
+from omnitrace.utils.staging import ProjectStaging, list_projects
+
+class TestBlobStore(unittest.TestCase):
+    """Test suite for deduplication and garbage collection"""
+
+    def setUp(self):
+        """Create two projects that share a README"""
+        self.projects_root = tempfile.mkdtemp()
+        for name in ("alpha", "beta"):
+            os.makedirs(os.path.join(self.projects_root, name, "src"))
+            self._write(name, "README.md", "# Shared\n" * 50)
+            self._write(name, os.path.join("src", "main.py"), f"NAME = '{name}'\n")
+            self._write(name, "empty.txt", "")
+
+    def tearDown(self):
+        """Clean up the projects root"""
+        shutil.rmtree(self.projects_root)
+
+    def _write(self, project, rel_path, content):
+        with open(os.path.join(self.projects_root, project, rel_path), "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_hardlink_dedup_and_gc(self):
+        """Test that shared content is stored once and unreferenced blobs are collected"""
+        store = BlobStore(self.projects_root, link_mode="hardlink")
+        first = store.ingest_tree(os.path.join(self.projects_root, "alpha"))
+        second = store.ingest_tree(os.path.join(self.projects_root, "beta"))
+        self.assertEqual((first["files"], first["linked"], first["new_blobs"]), (3, 2, 2))
+        self.assertEqual((second["linked"], second["new_blobs"], second["bytes_shared"]), (2, 1, 450))
+
+        readmes = [os.stat(os.path.join(self.projects_root, name, "README.md")) for name in ("alpha", "beta")]
+        self.assertEqual(readmes[0].st_ino, readmes[1].st_ino)
+        stats = store.stats()
+        self.assertEqual((stats["blobs"], stats["bytes_saved"]), (3, 450))
+        self.assertEqual(list_projects(self.projects_root), ["alpha", "beta"])
+        self.assertTrue(os.path.exists(os.path.join(self.projects_root, "beta", MANIFEST_NAME)))
+
+        shutil.rmtree(os.path.join(self.projects_root, "beta"))
+        self.assertEqual(store.gc(dry_run=True)["removed_blobs"], 1)
+        report = store.gc()
+        self.assertEqual((report["removed_blobs"], report["blobs"], report["bytes_saved"]), (1, 2, 0))
+        with open(os.path.join(self.projects_root, "alpha", "README.md"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "# Shared\n" * 50)
+
+    def test_hardlink_then_seed(self):
+        """Test that a seeded generation can rewrite files that share a read-only blob"""
+        store = BlobStore(self.projects_root, link_mode="hardlink")
+        store.ingest_tree(os.path.join(self.projects_root, "alpha"))
+        store.ingest_tree(os.path.join(self.projects_root, "beta"))
+        self.assertFalse(os.stat(os.path.join(self.projects_root, "alpha", "README.md")).st_mode & 0o200)
+
+        staging = ProjectStaging(self.projects_root, "alpha")
+        output_dir = staging.begin(seed=True)
+        readme = os.path.join(output_dir, "README.md")
+        self.assertTrue(os.stat(readme).st_mode & 0o200)
+        with open(readme, "w", encoding="utf-8") as f:
+            f.write("# Updated\n")
+        staging.commit()
+
+        with open(os.path.join(self.projects_root, "beta", "README.md"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "# Shared\n" * 50)
+
+    def test_reflink_fallback(self):
+        """Test that unsupported reflinks leave files and the store untouched"""
+        store = BlobStore(self.projects_root)
+        path = os.path.join(self.projects_root, "alpha", "README.md")
+        inode = os.stat(path).st_ino
+        report = store.ingest_tree(os.path.join(self.projects_root, "alpha"))
+        if store._reflink_supported:
+            self.assertEqual(report["linked"], 2)
+        else:
+            self.assertEqual((report["linked"], store.stats()["blobs"]), (0, 0))
+            self.assertEqual(os.stat(path).st_ino, inode)
+
+if __name__ == '__main__':
+    unittest.main()
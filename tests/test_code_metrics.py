@@ -0,0 +1,124 @@
+"""
+Test cases for the code metrics analyzer
+"""
+
+import sys
+import os
+import unittest
+import asyncio
+import tempfile
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.generation.code_metrics import (
+    CodeMetricsAnalyzer, analyze_python_source, count_lines, module_name_for_path
+)
+from omnitrace.generation.code_generator import RevolutionaryCodeGenerator
+
+SAMPLE_MODULE = '''
+import os
+from .models import User
+from ..shared import config
+
+class UserFactory:
+    def build(self, name):
+        if not name:
+            raise ValueError("name required")
+        for _ in range(3):
+            if name and os.sep:
+                pass
+        return User(name)
+
+async def fetch(ids):
+    return [i for i in ids if i > 0]
+'''
+
+class TestCodeMetrics(unittest.TestCase):
+    """Test suite for code metrics"""
+
+    def test_count_lines(self):
+        """Test line counting with and without a trailing newline"""
+        self.assertEqual(count_lines(""), 0)
+        self.assertEqual(count_lines("a"), 1)
+        self.assertEqual(count_lines("a\nb\n"), 2)
+        self.assertEqual(count_lines("a\nb"), 2)
+
+    def test_python_metrics(self):
+        """Test AST-based complexity, counts and import resolution"""
+        metrics = analyze_python_source("app/services/users.py", SAMPLE_MODULE)
+        self.assertIsNone(metrics["syntax_error"])
+        self.assertEqual(metrics["functions"], 2)
+        self.assertEqual(metrics["classes"], 1)
+        self.assertEqual(metrics["async_functions"], 1)
+        # build: 1 + if + for + if + and
+        self.assertEqual(metrics["function_complexities"]["build:7"], 5)
+        # fetch: 1 + comprehension + its if
+        self.assertEqual(metrics["function_complexities"]["fetch:15"], 3)
+        self.assertEqual(metrics["imports"], ["app.services.models.User", "app.shared.config", "os"])
+        self.assertIn("Factory pattern", metrics["conventional_patterns"])
+
+    def test_syntax_error(self):
+        """Test that unparseable files are reported instead of raising"""
+        metrics = analyze_python_source("broken.py", "def broken(:\n")
+        self.assertIsNotNone(metrics["syntax_error"])
+
+    def test_module_names(self):
+        """Test conversion from file paths to module names"""
+        self.assertEqual(module_name_for_path("pkg/sub/mod.py"), "pkg.sub.mod")
+        self.assertEqual(module_name_for_path("pkg/__init__.py"), "pkg")
+
+    def test_cache_and_import_graph(self):
+        """Test content-hash caching and the internal import graph"""
+        analyzer = CodeMetricsAnalyzer()
+        sources = {
+            "pkg/__init__.py": "",
+            "pkg/a.py": "from pkg import b\n",
+            "pkg/b.py": "import json\nfrom . import a\n",
+            "README.md": "# Title\n"
+        }
+        first = analyzer.analyze_sources(sources)
+        self.assertEqual(analyzer.cache_misses, 4)
+        second = analyzer.analyze_sources(sources)
+        self.assertEqual(analyzer.cache_hits, 4)
+        self.assertEqual(first, second)
+
+        summary = CodeMetricsAnalyzer.summarize(first)
+        self.assertEqual(summary["languages"], {"Python": 3, "Markdown": 1})
+        self.assertEqual(summary["import_graph"]["pkg.a"], ["pkg.b"])
+        self.assertEqual(summary["import_graph"]["pkg.b"], ["pkg.a"])
+        self.assertEqual(summary["external_imports"], {"json": 1})
+
+    def test_process_pool(self):
+        """Test that the process pool produces the same results as inline analysis"""
+        sources = {f"mod_{i}.py": f"def f{i}(x):\n    return x if x else {i}\n" for i in range(8)}
+        inline = CodeMetricsAnalyzer(parallel_threshold=100).analyze_sources(sources)
+        pooled = CodeMetricsAnalyzer(max_workers=2, parallel_threshold=1).analyze_sources(sources)
+        self.assertEqual(inline, pooled)
+
+    def test_analyze_paths(self):
+        """Test that files on disk share the cache with in-memory sources"""
+        analyzer = CodeMetricsAnalyzer()
+        with tempfile.TemporaryDirectory() as tmp:
+            with open(os.path.join(tmp, "mod.py"), "w", encoding="utf-8") as f:
+                f.write("def f():\n    return 1\n")
+            from_disk = analyzer.analyze_paths(tmp, ["mod.py", "missing.py"])
+        from_memory = analyzer.analyze_sources({"mod.py": "def f():\n    return 1\n"})
+        self.assertEqual(list(from_disk), ["mod.py"])
+        self.assertEqual(from_disk, from_memory)
+        self.assertEqual(analyzer.cache_hits, 1)
+
+    def test_generator_analysis(self):
+        """Test that the code generator reports real metrics"""
+        generator = RevolutionaryCodeGenerator(llm=None)
+        analysis = asyncio.run(generator.analyze_generated_code({
+            "main.py": "def main():\n    return 0\n",
+            "broken.py": "def broken(:\n"
+        }))
+        self.assertEqual(analysis["total_lines"], 3)
+        self.assertEqual(analysis["code_metrics"]["functions"], 1)
+        self.assertEqual(analysis["revolutionary_metrics"]["10x_improvement_score"], 0.5)
+        self.assertEqual(analysis["optimization_opportunities"][0]["type"], "syntax_error")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Test cases for generated code validation and the validate-and-repair loop
+"""
+
+import sys
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.generation.code_validator import CodeValidator, validate_content, is_validatable
+from omnitrace.generation.code_generator import RevolutionaryCodeGenerator
+
+VALID = {
+    "main.py": "def main():\n    return 1\n",
+    "config.json": '{"debug": true}',
+    "compose.yaml": "services:\n  web:\n    image: app\n---\nversion: 2\n",
+    "pyproject.toml": "[project]\nname = \"demo\"\n",
+}
+
+INVALID = {
+    "main.py": "def main(:\n    return 1\n",
+    "config.json": '{"debug": true,}',
+    "compose.yaml": "services: [web\n",
+    "pyproject.toml": "[project\nname = demo\n",
+}
+
+STRUCTURE = {"files": {name: {"type": "other", "description": name} for name in VALID}}
+
+class FakeGenerator:
+    """Regenerates files from a queue of responses per path and records the calls"""
+
+    def __init__(self, responses):
+        self.responses = {path: list(contents) for path, contents in responses.items()}
+        self.calls = []
+
+    async def generate_code(self, file_path, file_info, project_context, previous_error=None, interfaces=None):
+        self.calls.append((file_path, previous_error))
+        return self.responses[file_path].pop(0)
+
+class TestCodeValidator(unittest.TestCase):
+    """Test suite for CodeValidator"""
+
+    def test_validate_content(self):
+        """Test that each supported format passes when valid and fails when broken"""
+        for path in VALID:
+            self.assertIsNone(validate_content(path, VALID[path]), path)
+            self.assertIsNotNone(validate_content(path, INVALID[path]), path)
+        self.assertIn("SyntaxError", validate_content("main.py", INVALID["main.py"]))
+        self.assertIn("JSONDecodeError", validate_content("config.json", INVALID["config.json"]))
+        # Types without a parser are not validated
+        self.assertFalse(is_validatable("README.md"))
+        self.assertIsNone(validate_content("README.md", "{not parsed"))
+
+    def test_validate_sources_and_paths(self):
+        """Test that in-memory and on-disk validation report the same failures"""
+        sources = dict(VALID, **{"config.json": INVALID["config.json"], "README.md": "# Demo"})
+        validator = CodeValidator(parallel_threshold=2)
+        self.assertEqual(list(validator.validate_sources(sources)), ["config.json"])
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            for path, content in sources.items():
+                with open(os.path.join(temp_dir, path), "w", encoding="utf-8") as f:
+                    f.write(content)
+            failures = CodeValidator().validate_paths(temp_dir, list(sources) + ["missing.py"])
+            self.assertEqual(set(failures), {"config.json", "missing.py"})
+        finally:
+            shutil.rmtree(temp_dir)
+
+class TestValidateAndRepair(unittest.TestCase):
+    """Test suite for RevolutionaryCodeGenerator.validate_and_repair"""
+
+    def setUp(self):
+        """Create an output directory and a generator with a fake LLM"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.generator = RevolutionaryCodeGenerator(MagicMock())
+
+    def tearDown(self):
+        """Remove the output directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def repair(self, generated_files, responses, max_retries=2):
+        fake = FakeGenerator(responses)
+        self.generator.generate_code = fake.generate_code
+        report = asyncio.run(self.generator.validate_and_repair(
+            STRUCTURE, {}, self.temp_dir, generated_files=generated_files, max_retries=max_retries
+        ))
+        return report, fake.calls
+
+    def test_only_failing_files_regenerated(self):
+        """Test that valid files are left alone and repaired files are written"""
+        generated = dict(VALID, **{"main.py": INVALID["main.py"], "pyproject.toml": INVALID["pyproject.toml"]})
+        report, calls = self.repair(generated, {"main.py": [VALID["main.py"]],
+                                                "pyproject.toml": [VALID["pyproject.toml"]]})
+
+        self.assertEqual(sorted(path for path, _ in calls), ["main.py", "pyproject.toml"])
+        # The validation error is passed back to the model
+        self.assertTrue(all(error for _, error in calls))
+        self.assertEqual(generated, VALID)
+        with open(os.path.join(self.temp_dir, "main.py"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), VALID["main.py"])
+
+        self.assertEqual(report["validated_files"], 4)
+        self.assertEqual(set(report["initial_failures"]), {"main.py", "pyproject.toml"})
+        self.assertEqual(report["repaired"], ["main.py", "pyproject.toml"])
+        self.assertEqual(report["still_failing"], {})
+        self.assertEqual(report["attempts"], {"main.py": 1, "pyproject.toml": 1})
+        self.assertEqual(report["retries"], 2)
+        self.assertEqual(report["retry_bytes"], len(VALID["main.py"]) + len(VALID["pyproject.toml"]))
+
+    def test_retries_stop_at_max_retries(self):
+        """Test that a file that never validates is retried max_retries times"""
+        generated = dict(VALID, **{"config.json": INVALID["config.json"], "compose.yaml": INVALID["compose.yaml"]})
+        report, calls = self.repair(generated, {"config.json": [INVALID["config.json"]] * 5,
+                                                "compose.yaml": [INVALID["compose.yaml"], VALID["compose.yaml"]]},
+                                    max_retries=3)
+
+        self.assertEqual([path for path, _ in calls].count("config.json"), 3)
+        self.assertEqual([path for path, _ in calls].count("compose.yaml"), 2)
+        self.assertEqual(report["repaired"], ["compose.yaml"])
+        self.assertEqual(list(report["still_failing"]), ["config.json"])
+        self.assertEqual(report["attempts"], {"config.json": 3, "compose.yaml": 2})
+        self.assertEqual(report["retries"], 5)
+
+    def test_valid_project_needs_no_retries(self):
+        """Test that a valid project makes no LLM calls"""
+        report, calls = self.repair(dict(VALID), {}, max_retries=2)
+        self.assertEqual(calls, [])
+        self.assertEqual((report["retries"], report["retry_bytes"], report["retry_seconds"]), (0, 0, 0.0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Test cases for compiled templates and batched stub generation
+"""
+
+import sys
+import os
+import asyncio
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.compiled_template import CompiledTemplate, compile_template
+from omnitrace.agents.filesystem_agent import FilesystemAgent, _stub_values
+
+class TestCompiledTemplate(unittest.TestCase):
+    """Test suite for CompiledTemplate"""
+
+    def test_render_matches_format(self):
+        """Test that rendering is identical to str.format_map"""
+        values = {"name": "engine", "count": 3, "items": ["a", "b"]}
+        for source in ("# {name}\n{{literal}} {count}", "{count:03d} {name!r}", "{items[1]}", "plain"):
+            template = CompiledTemplate(source)
+            self.assertEqual(template.render(values), source.format_map(values))
+        self.assertEqual(CompiledTemplate("{a} {b.c} {d[0]} {{e}}").variables, {"a", "b", "d"})
+        with self.assertRaises(KeyError):
+            CompiledTemplate("{missing}").render({})
+        self.assertIs(compile_template("{name}"), compile_template("{name}"))
+
+    def test_batched_stubs(self):
+        """Test that batched stub rendering covers every file with its type's template"""
+        structure = {
+            "directories": {"app": {"description": "App", "files": {
+                f"module_{i}.py": {"type": "python_module", "description": f"Module {i}"} for i in range(10)
+            }}},
+            "files": {"test_engine.py": {"type": "test"}, "notes.txt": {"type": "unknown"}}
+        }
+        agent = FilesystemAgent(llm=None)
+        stubs = asyncio.run(agent.generate_code_stubs(structure, batch_size=3))
+        self.assertEqual(len(stubs), 12)
+        self.assertIn("Module 7", stubs[os.path.join("app", "module_7.py")])
+        self.assertIn("class RevolutionaryEngineTest(unittest.TestCase)", stubs["test_engine.py"])
+        self.assertEqual(stubs["notes.txt"],
+                         agent.stub_templates["other"].format_map(_stub_values("notes.txt", {"type": "unknown"})))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -97,6 +97,22 @@ class TestCTOAgent(unittest.TestCase):
         self.assertEqual(agent.parameters["strategy_level"], "low")
         self.assertEqual(agent.parameters["detail_level"], "high")
         self.assertEqual(agent.parameters["considerations"], ["Custom consideration"])
-        
+
+    def test_single_load_and_lazy_chain(self):
+        """Test that construction reads the template file once and defers the chain"""
+        with patch.object(CTOAgent, "_load_template_file", return_value={}) as load_template_file:
+            agent = CTOAgent(llm=self.mock_llm)
+
+        # Template and parameters come from one load; no chain until first use
+        load_template_file.assert_called_once()
+        self.assertIsNone(agent._chain)
+        self.assertIsNotNone(agent.chain)
+        self.assertIs(agent.chain, agent._chain)
+
+    def test_unknown_variable_rejected(self):
+        """Test that a template the agent cannot fill is rejected at construction"""
+        with self.assertRaises(ValueError):
+            CTOAgent(llm=self.mock_llm, template="Custom template with {task} and {designs}")
+
 if __name__ == '__main__':
     unittest.main()
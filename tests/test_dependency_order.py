@@ -0,0 +1,81 @@
+"""
+Test cases for dependency-ordered code generation
+"""
+
+import sys
+import os
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.generation.dependency_order import order_files, build_dependency_graph
+from omnitrace.generation.symbol_index import SymbolIndex, extract_public_symbols
+
+class TestDependencyOrder(unittest.TestCase):
+    """Test suite for generation ordering and the symbol index"""
+
+    def setUp(self):
+        """Set up a small structure in dict iteration order"""
+        self.files = [
+            ("main.py", {"description": "Entry point that starts the service"}),
+            ("README.md", {"type": "documentation"}),
+            ("app/__init__.py", {}),
+            ("app/service.py", {"description": "Business logic"}),
+            ("app/interfaces.py", {"description": "Protocols"}),
+            ("tests/test_service.py", {"type": "test"}),
+        ]
+
+    def test_graph(self):
+        """Test dependencies derived from names, tiers and tests"""
+        graph = build_dependency_graph(self.files)
+        self.assertEqual(graph["main.py"], ["app/service.py"])
+        self.assertEqual(graph["app/service.py"], ["app/interfaces.py"])
+        self.assertEqual(graph["app/__init__.py"], ["app/interfaces.py", "app/service.py"])
+        self.assertEqual(graph["tests/test_service.py"], ["app/service.py"])
+        self.assertEqual(graph["README.md"], [])
+
+    def test_order(self):
+        """Test that dependencies come first and documentation last"""
+        ordered, _ = order_files(self.files)
+        paths = [path for path, _ in ordered]
+        self.assertEqual(paths[0], "app/interfaces.py")
+        self.assertLess(paths.index("app/service.py"), paths.index("main.py"))
+        self.assertLess(paths.index("app/service.py"), paths.index("tests/test_service.py"))
+        self.assertEqual(paths[-1], "README.md")
+
+    def test_cycle(self):
+        """Test that dependency cycles do not drop files"""
+        files = [
+            ("a.py", {"description": "uses b"}),
+            ("b.py", {"description": "uses a"}),
+        ]
+        ordered, _ = order_files(files)
+        self.assertEqual([path for path, _ in ordered], ["a.py", "b.py"])
+
+    def test_symbol_index(self):
+        """Test signature extraction and rendering"""
+        source = (
+            "LIMIT = 3\n"
+            "class Store(Base):\n"
+            "    def __init__(self, path: str, *, cache=None): ...\n"
+            "    def _private(self): ...\n"
+            "    async def get(self, key) -> bytes: ...\n"
+            "def _hidden(): ...\n"
+            "def build(name, size=1, **options) -> 'Store': ...\n"
+        )
+        self.assertEqual(extract_public_symbols(source), [
+            "LIMIT = ...",
+            "class Store(Base)",
+            "    def __init__(self, path: str, *, cache=...)",
+            "    async def get(self, key) -> bytes",
+            "def build(name, size=..., **options) -> 'Store'",
+        ])
+        index = SymbolIndex()
+        index.add_source("pkg/store.py", source)
+        index.add_source("README.md", "# not python")
+        self.assertTrue(index.render(["pkg.store", "missing"]).startswith("# module pkg.store\nLIMIT"))
+        self.assertEqual(index.render(["missing"]), "")
+
+if __name__ == '__main__':
+    unittest.main()
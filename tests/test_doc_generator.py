@@ -0,0 +1,132 @@
+"""
+Test cases for concurrent documentation generation
+"""
+
+import sys
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+import threading
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.generation.doc_generator import DocumentationGenerator
+from omnitrace.utils.llm_limit import invoke_limited, set_llm_concurrency, DEFAULT_LLM_CONCURRENCY
+
+class SlowChain:
+    """Chain stand-in that sleeps and records how many calls overlap"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def invoke(self, context):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.seconds.get(context["doc_type"], 0.05))
+        with self.lock:
+            self.active -= 1
+        return f"# {context['doc_type']}\n"
+
+class TestDocumentationGenerator(unittest.TestCase):
+    """Test suite for DocumentationGenerator scheduling"""
+
+    def setUp(self):
+        """Create a temporary output directory"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up and restore the LLM limit"""
+        shutil.rmtree(self.temp_dir)
+        set_llm_concurrency(DEFAULT_LLM_CONCURRENCY)
+
+    def run_documentation(self, chain, project_context=None, reuse_stage_outputs=False):
+        """Generate the documentation set with the chain standing in for prompt | llm"""
+        generator = DocumentationGenerator(llm=None)
+
+        async def generate(doc_type, project_name, project_description, project_context):
+            result, timing = await invoke_limited(chain, {"doc_type": doc_type})
+            return result, timing
+
+        generator._generate_document_timed = generate
+        docs = asyncio.run(generator.generate_project_documentation(
+            "Demo", "A demo", project_context or {}, self.temp_dir, reuse_stage_outputs=reuse_stage_outputs
+        ))
+        return generator, docs
+
+    def test_concurrent_documents(self):
+        """Test that documents overlap, are all written and the report adds up"""
+        set_llm_concurrency(5)
+        chain = SlowChain({"architecture": 0.3})
+        generator, docs = self.run_documentation(chain)
+
+        self.assertEqual(list(docs), ["vision", "technical_strategy", "architecture", "implementation", "readme", "index"])
+        with open(docs["architecture"], encoding="utf-8") as f:
+            self.assertEqual(f.read(), "# architecture\n")
+        report = generator.timing_report
+        self.assertEqual(chain.peak, 5)
+        self.assertAlmostEqual(report["critical_path"], report["documents"]["architecture"]["llm_seconds"])
+        self.assertGreater(report["summed_latency"], report["wall_seconds"])
+        # Overlap is asserted from the limiter, not from wall-clock time
+        self.assertEqual(report["peak_concurrency"], 5)
+
+    def test_shared_limit(self):
+        """Test that the process-wide limit caps overlapping calls"""
+        set_llm_concurrency(2)
+        chain = SlowChain({})
+        generator, _ = self.run_documentation(chain)
+
+        self.assertEqual(chain.peak, 2)
+        self.assertEqual(generator.timing_report["peak_concurrency"], 2)
+        self.assertGreater(sum(timing["wait_seconds"] for timing in generator.timing_report["documents"].values()), 0)
+        with self.assertRaises(ValueError):
+            set_llm_concurrency(0)
+
+    def test_reuse_stage_outputs(self):
+        """Test that documents with a stage output cost no LLM call"""
+        chain = SlowChain({})
+        project_context = {"vision": "Go to Mars", "tech_strategy": "Rockets", "design": "Stages"}
+        generator, docs = self.run_documentation(chain, project_context, reuse_stage_outputs=True)
+
+        report = generator.pipeline_report
+        self.assertEqual(report["generated"], ["implementation"])
+        self.assertEqual((report["llm_calls"], report["llm_calls_saved"]), (1, 4))
+        self.assertEqual(chain.peak, 1)
+        with open(docs["vision"], encoding="utf-8") as f:
+            self.assertIn("Go to Mars", f.read())
+        with open(docs["implementation"], encoding="utf-8") as f:
+            self.assertEqual(f.read(), "# implementation\n")
+
+    def test_section_parallel(self):
+        """Test outline parsing, concurrent sections and stitching"""
+        class SectionChain:
+            def __init__(self, template):
+                self.template = template
+
+            def invoke(self, context):
+                if "required_sections" in context:
+                    return "# Outline\n## Alpha - the first part\n2. Beta: the second part\n- Gamma"
+                time.sleep(0.05)
+                return f"## {context['section_title']}\nBody of {context['section_title']}"
+
+        set_llm_concurrency(3)
+        generator = DocumentationGenerator(llm=None)
+        generator._chain = SectionChain
+        generator.enable_section_parallel(True)
+        content, timing = asyncio.run(generator._generate_document_timed(
+            "architecture", "Demo", "A demo", {"vision": "Go to Mars"}
+        ))
+
+        self.assertIn("## Alpha\n\nBody of Alpha\n\n## Beta\n\nBody of Beta\n\n## Gamma\n\nBody of Gamma", content)
+        self.assertEqual((timing["calls"], timing["sections"]), (4, 3))
+        self.assertLess(timing["llm_seconds"], timing["summed_llm_seconds"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Test cases for the document pipeline and deferred document rendering
+"""
+
+import sys
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.generation.doc_pipeline import (
+    DocumentPipeline, available_documents, materialize_document, save_document_inputs,
+    materialize_deferred_documents, document_links, render_readme,
+    structure_analysis_inputs, code_analysis_inputs, DOC_INPUTS_NAME
+)
+from omnitrace.utils.project_history import ProjectHistory, estimate_tokens
+
+META = {
+    "name": "Demo",
+    "description": "A demo",
+    "generated": "2026-01-01 00:00:00",
+    "revolution_level": "maximum",
+    "constraint_elimination": "aggressive",
+    "revolutionary_analysis": {"fundamental_truths": ["Physics"]},
+}
+
+STAGE_OUTPUTS = {"vision": "Go to Mars " * 400, "tech_strategy": "Rockets " * 400}
+
+def stage_history():
+    """Event log of a CEO and a CTO stage"""
+    history = ProjectHistory()
+    history.record("vision", history.start(), role="ceo", output=STAGE_OUTPUTS["vision"], doc="docs/vision.md")
+    history.record("tech_strategy", history.start(), role="cto", output=STAGE_OUTPUTS["tech_strategy"],
+                   doc="docs/technical_strategy.md")
+    return history.to_dict()
+
+def analysis_inputs():
+    """Compact inputs for all three analysis documents"""
+    return {
+        "structure_analysis": structure_analysis_inputs(
+            {"total_directories": 2, "total_files": 5, "revolutionary_metrics": {"complexity_score": 0.4}},
+            {"file_count": 5, "directory_count": 2, "files": ["a.py"] * 5, "preserved": ["b.py"]}
+        ),
+        "code_analysis": code_analysis_inputs(
+            {"total_files": 5, "code_metrics": {"syntax_errors": {"x.py": "bad"}, "functions": 3}},
+            {"validated_files": 5, "initial_failures": ["x.py"], "repaired": [], "still_failing": {"x.py": "bad"},
+             "retries": 1, "retry_bytes": 10, "retry_seconds": 0.1}
+        ),
+        "history": stage_history(),
+    }
+
+class TestDocumentPipeline(unittest.TestCase):
+    """Test suite for DocumentPipeline and lazy documents"""
+
+    def setUp(self):
+        """Create a temporary project directory"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up the temporary project directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_derive_without_llm(self):
+        """Test that stage outputs and analyses render without a generator"""
+        pipeline = DocumentPipeline()
+        paths = asyncio.run(pipeline.build(
+            ["vision", "readme", "code_analysis"], META, dict(analysis_inputs(), vision="Go to Mars"), self.temp_dir
+        ))
+
+        self.assertEqual(pipeline.report["derived"], ["vision", "readme", "code_analysis"])
+        # Only the vision had its stage output; the README was derived for lack of a generator
+        self.assertEqual((pipeline.report["llm_calls"], pipeline.report["llm_calls_saved"]), (0, 1))
+        with open(paths["code_analysis"], encoding="utf-8") as f:
+            content = f.read()
+        self.assertIn("- Files With Syntax Errors: 1", content)
+        self.assertIn("- Initially Failing: 1", content)
+
+    def test_readme_needs_vision_and_strategy(self):
+        """Test that the README is generated when there is nothing to summarize"""
+        class Generator:
+            async def _generate_document_timed(self, doc_type, name, description, outputs):
+                return f"# {doc_type}\n", {"wait_seconds": 0.0, "llm_seconds": 0.0}
+
+        pipeline = DocumentPipeline(Generator())
+        asyncio.run(pipeline.build(["readme"], META, {}, self.temp_dir))
+        self.assertEqual((pipeline.report["generated"], pipeline.report["llm_calls"]), (["readme"], 1))
+
+        asyncio.run(pipeline.build(["vision", "readme"], META, STAGE_OUTPUTS, self.temp_dir))
+        self.assertEqual(pipeline.report["derived"], ["vision", "readme"])
+        self.assertEqual(pipeline.report["llm_calls_saved"], 2)
+
+    def test_lazy_documents(self):
+        """Test that deferred documents render on first request exactly as eagerly"""
+        inputs = analysis_inputs()
+        doc_types = ["structure_analysis", "code_analysis", "history"]
+        eager_dir = os.path.join(self.temp_dir, "eager")
+        eager = asyncio.run(DocumentPipeline().build(doc_types, META, inputs, eager_dir))
+
+        lazy_dir = os.path.join(self.temp_dir, "lazy")
+        os.makedirs(lazy_dir)
+        save_document_inputs(lazy_dir, META, inputs, doc_types)
+        self.assertEqual(available_documents(lazy_dir), dict.fromkeys(doc_types, "deferred"))
+        self.assertFalse(os.path.exists(os.path.join(lazy_dir, "project_history.md")))
+
+        for doc_type in doc_types:
+            with open(eager[doc_type], encoding="utf-8") as f:
+                self.assertEqual(materialize_document(lazy_dir, doc_type), f.read())
+        self.assertEqual(available_documents(lazy_dir), dict.fromkeys(doc_types, "written"))
+        # The materialization list is not part of the stored inputs
+        self.assertLess(os.path.getsize(os.path.join(lazy_dir, DOC_INPUTS_NAME)), 1024)
+        with self.assertRaises(ValueError):
+            materialize_document(lazy_dir, "vision")
+
+    def test_history_event_log(self):
+        """Test that the history links stage documents instead of repeating them"""
+        save_document_inputs(self.temp_dir, META, analysis_inputs(), ["history"])
+        content = materialize_document(self.temp_dir, "history")
+
+        self.assertIn("| 1 | vision | CEO |", content)
+        self.assertIn("[docs/technical_strategy.md](docs/technical_strategy.md)", content)
+        self.assertIn(f"~{sum(map(estimate_tokens, STAGE_OUTPUTS.values()))} tokens", content)
+        self.assertNotIn("Go to Mars", content)
+        self.assertNotIn("Physics", content)
+        # The stored history is a small fraction of the running context it replaces
+        running_context = "".join(f"\n{role}: {text}" for role, text in zip(("CEO", "CTO"), STAGE_OUTPUTS.values()))
+        self.assertLess(os.path.getsize(os.path.join(self.temp_dir, DOC_INPUTS_NAME)), len(running_context) / 10)
+
+    def test_new_inputs_replace_rendered_documents(self):
+        """Test that a document rendered from earlier inputs is rendered again from new ones"""
+        inputs = analysis_inputs()
+        save_document_inputs(self.temp_dir, META, inputs, ["history"])
+        self.assertIn("| 2 | tech_strategy |", materialize_document(self.temp_dir, "history"))
+
+        history = ProjectHistory()
+        history.record("vision", history.start(), role="ceo", output="Go", doc="docs/vision.md")
+        save_document_inputs(self.temp_dir, META, dict(inputs, history=history.to_dict()), ["history"])
+        self.assertNotIn("| 2 | tech_strategy |", materialize_document(self.temp_dir, "history"))
+
+    def test_readme_links_written_documents(self):
+        """Test that the README links only documents that exist, and export renders the deferred ones"""
+        save_document_inputs(self.temp_dir, META, analysis_inputs(), ["structure_analysis", "history"])
+        readme = render_readme(dict(META, extra_docs=document_links(["code_analysis"])), {})
+        self.assertIn("- [Code Analysis](docs/code_analysis.md)", readme)
+        self.assertNotIn("project_history.md", readme)
+        self.assertNotIn("structure_analysis.md", readme)
+
+        self.assertEqual(materialize_deferred_documents(self.temp_dir), ["structure_analysis", "history"])
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "project_history.md")))
+        self.assertEqual(materialize_deferred_documents(self.temp_dir), [])
+
+if __name__ == '__main__':
+    unittest.main()
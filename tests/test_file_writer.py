@@ -0,0 +1,55 @@
+"""
+Test cases for atomic file output
+"""
+
+import sys
+import os
+import stat
+import shutil
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.file_writer import AtomicFileWriter, atomic_write_text, atomic_write_bytes
+
+class TestFileWriter(unittest.TestCase):
+    """Test suite for AtomicFileWriter"""
+
+    def setUp(self):
+        """Create a temporary directory"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_written_files_are_world_readable(self):
+        """Test that atomic writes do not leave files owner-only"""
+        path = os.path.join(self.temp_dir, "src", "main.py")
+        self.assertEqual(atomic_write_text(path, "print('hi')\n"), 12)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+
+    def test_failed_write_leaves_nothing(self):
+        """Test that an exception removes the temporary file and keeps the target"""
+        path = os.path.join(self.temp_dir, "main.py")
+        atomic_write_text(path, "old")
+        with self.assertRaises(RuntimeError):
+            with AtomicFileWriter(path) as writer:
+                writer.write("new")
+                raise RuntimeError("stop")
+        self.assertEqual(os.listdir(self.temp_dir), ["main.py"])
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "old")
+
+    def test_binary_write(self):
+        """Test that a writer without an encoding writes bytes unchanged"""
+        path = os.path.join(self.temp_dir, "data.gz")
+        self.assertEqual(atomic_write_bytes(path, b"\x1f\x8b\r\n"), 4)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"\x1f\x8b\r\n")
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+
+if __name__ == '__main__':
+    unittest.main()
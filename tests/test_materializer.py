@@ -0,0 +1,136 @@
+"""
+Test cases for batched project materialization
+"""
+
+import sys
+import os
+import shutil
+import asyncio
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.materializer import Materializer, directory_set, record_generated_hashes, load_generated_hashes
+from omnitrace.utils.stream_json import StructureNodeStream
+from omnitrace.agents.filesystem_agent import FilesystemAgent
+
+class TestMaterializer(unittest.TestCase):
+    """Test suite for the Materializer"""
+
+    def setUp(self):
+        """Create a temporary output directory"""
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up the temporary output directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_directory_set(self):
+        """Test that every ancestor is created once, parents first"""
+        dirs = directory_set([os.path.join("a", "b")], [os.path.join("a", "c", "f.py"), "root.md"])
+        self.assertEqual(dirs, ["a", os.path.join("a", "b"), os.path.join("a", "c")])
+
+    def test_materialize(self):
+        """Test batched writes, duplicate paths and the throughput report"""
+        files = [(os.path.join("pkg", f"m{i}.py"), f"value = {i}\n") for i in range(10)]
+        files.append((os.path.join("pkg", "m0.py"), "value = 'last'\n"))
+        materializer = Materializer(max_workers=3, batch_size=4)
+        report = asyncio.run(materializer.materialize(self.temp_dir, ["empty"], files))
+
+        self.assertEqual(report["file_count"], 10)
+        self.assertEqual(report["batches"], 3)
+        self.assertTrue(os.path.isdir(os.path.join(self.temp_dir, "empty")))
+        with open(os.path.join(self.temp_dir, "pkg", "m0.py"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "value = 'last'\n")
+        self.assertEqual(report["bytes_written"], sum(
+            os.path.getsize(path) for path in report["files"]
+        ))
+        self.assertGreater(report["files_per_second"], 0)
+
+    def test_rematerialize(self):
+        """Test that only changed nodes are touched and hand edits survive"""
+        previous = [("keep.py", "keep\n"), ("change.py", "old\n"), ("edited.py", "old\n"),
+                    (os.path.join("gone", "x.py"), "x\n"), ("gone_edited.py", "y\n")]
+        materializer = Materializer()
+        asyncio.run(materializer.materialize(self.temp_dir, ["gone"], previous))
+        for name in ("edited.py", "gone_edited.py"):
+            with open(os.path.join(self.temp_dir, name), "w", encoding="utf-8") as f:
+                f.write("hand edit\n")
+        keep_mtime = os.stat(os.path.join(self.temp_dir, "keep.py")).st_mtime_ns
+
+        files = [("keep.py", "keep\n"), ("change.py", "new\n"), ("edited.py", "new\n"),
+                 (os.path.join("added", "a.py"), "a\n")]
+        report = asyncio.run(materializer.rematerialize(self.temp_dir, [], files, ["gone"], previous))
+
+        self.assertEqual(sorted(os.path.relpath(path, self.temp_dir) for path in report["files"]),
+                         sorted(["change.py", os.path.join("added", "a.py")]))
+        self.assertEqual((report["bytes_written"], report["files_skipped"], report["bytes_skipped"]), (6, 1, 5))
+        self.assertEqual((report["files_deleted"], report["directories_removed"]), (1, 1))
+        self.assertEqual(sorted(report["preserved"]), ["edited.py", "gone_edited.py"])
+        self.assertEqual(os.stat(os.path.join(self.temp_dir, "keep.py")).st_mtime_ns, keep_mtime)
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "gone")))
+        with open(os.path.join(self.temp_dir, "edited.py"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "hand edit\n")
+
+    def test_streamed_nodes(self):
+        """Test that nodes written while streaming are completed and corrected by the final structure"""
+        agent = FilesystemAgent(llm=None)
+        on_node, streamed = agent.node_writer(self.temp_dir)
+        text = ('{"directories": {"src": {"description": "Source", "files": {"a.py": {"description": "A"}, '
+                '"old.py": {"description": "Old"}}}}, "files": {"setup.py": {"description": "Setup"}}}')
+        stream = StructureNodeStream()
+
+        async def feed():
+            for i in range(0, len(text), 7):
+                for node in stream.feed(text[i:i + 7]):
+                    await on_node(node)
+            for node in stream.close()[1]:
+                await on_node(node)
+
+        asyncio.run(feed())
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "src", "old.py")))
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "src", "README.md")))
+
+        # A retried response dropped old.py and renamed the directory's description
+        structure = {"directories": {"src": {"description": "Sources", "files": {"a.py": {"description": "A"}}}},
+                     "files": {"setup.py": {"description": "Setup"}}}
+        asyncio.run(agent.create_structure(self.temp_dir, structure, streamed=streamed))
+        report = agent.last_materialization
+
+        self.assertFalse(os.path.exists(os.path.join(self.temp_dir, "src", "old.py")))
+        # a.py and setup.py were already on disk; the README and structure file were not
+        self.assertEqual((report["file_count"], report["files_streamed"]), (4, 2))
+        with open(os.path.join(self.temp_dir, "src", "README.md"), encoding="utf-8") as f:
+            self.assertIn("Sources", f.read())
+
+    def test_generated_code_baseline(self):
+        """Test that generated code is neither mistaken for a hand edit nor regenerated when unchanged"""
+        agent = FilesystemAgent(llm=None)
+        structure = {"files": {"same.py": {"description": "Same"}, "changed.py": {"description": "Old"},
+                               "edited.py": {"description": "Old"}, "gone.py": {"description": "Gone"}}}
+        asyncio.run(agent.create_structure(self.temp_dir, structure))
+        # Code generation overwrites every stub, then one file is edited by hand
+        for name in structure["files"]:
+            with open(os.path.join(self.temp_dir, name), "w", encoding="utf-8") as f:
+                f.write(f"# generated {name}\n")
+        record_generated_hashes(self.temp_dir, list(structure["files"]))
+        with open(os.path.join(self.temp_dir, "edited.py"), "a", encoding="utf-8") as f:
+            f.write("# hand edit\n")
+
+        structure = {"files": {"same.py": {"description": "Same"}, "changed.py": {"description": "New"},
+                               "edited.py": {"description": "New"}, "added.py": {"description": "Added"}}}
+        asyncio.run(agent.create_structure(self.temp_dir, structure, incremental=True))
+        report = agent.last_materialization
+
+        written = sorted(os.path.relpath(path, self.temp_dir) for path in report["files"])
+        self.assertEqual(written, [".omnitrace_structure.json", "added.py", "changed.py"])
+        self.assertEqual(report["files_deleted"], 1)
+        self.assertEqual(report["preserved"], ["edited.py"])
+        # Code generation skips the hand edit and the unchanged generated file
+        self.assertEqual(report["kept"], ["edited.py", "same.py"])
+        self.assertEqual(sorted(load_generated_hashes(self.temp_dir)), ["edited.py", "same.py"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Test cases for streaming project archive export
+"""
+
+import sys
+import os
+import io
+import shutil
+import tarfile
+import zipfile
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.project_export import ProjectExport
+from omnitrace.utils.blob_store import MANIFEST_NAME
+
+class TestProjectExport(unittest.TestCase):
+    """Test suite for ProjectExport"""
+
+    def setUp(self):
+        """Create a small project with duplicate and hard-linked files"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project = os.path.join(self.temp_dir, "demo")
+        os.makedirs(os.path.join(self.project, "pkg", "empty"))
+        self.files = {
+            "README.md": b"# Demo\n",
+            os.path.join("pkg", "__init__.py"): b"",
+            os.path.join("pkg", "a.py"): b"value = 1\n",
+            os.path.join("pkg", "b.py"): b"value = 1\n",
+            os.path.join("pkg", "c.py"): b"value = 2\n",
+        }
+        for rel_path, content in self.files.items():
+            with open(os.path.join(self.project, rel_path), "wb") as f:
+                f.write(content)
+        os.link(os.path.join(self.project, "pkg", "c.py"), os.path.join(self.project, "pkg", "d.py"))
+        self.files[os.path.join("pkg", "d.py")] = b"value = 2\n"
+        with open(os.path.join(self.project, MANIFEST_NAME), "w") as f:
+            f.write("{}")
+
+    def tearDown(self):
+        """Clean up the temporary directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def assertExtracted(self, root):
+        """Check that an extracted archive reproduces the project"""
+        self.assertTrue(os.path.isdir(os.path.join(root, "demo", "pkg", "empty")))
+        self.assertFalse(os.path.exists(os.path.join(root, "demo", MANIFEST_NAME)))
+        for rel_path, content in self.files.items():
+            with open(os.path.join(root, "demo", rel_path), "rb") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_tar_dedup(self):
+        """Test that duplicates become link entries and the archive round-trips"""
+        export = ProjectExport(self.project, "tar.gz", dedup=True)
+        data = b"".join(export.iter_chunks(max_pending=1))
+        report = export.report
+
+        self.assertEqual(report["files"], 6)
+        self.assertEqual(report["duplicates"], 2)
+        self.assertEqual(report["bytes_deduplicated"], 20)
+        self.assertEqual(report["bytes_out"], len(data))
+        self.assertGreater(report["mb_per_second"], 0)
+        with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+            links = {member.name: member.linkname for member in tar if member.islnk()}
+            self.assertEqual(links, {"demo/pkg/b.py": "demo/pkg/a.py", "demo/pkg/d.py": "demo/pkg/c.py"})
+            tar.extractall(os.path.join(self.temp_dir, "out"), filter="data")
+        self.assertExtracted(os.path.join(self.temp_dir, "out"))
+
+    def test_zip_to_unseekable_stream(self):
+        """Test zip output through a write-only file object"""
+        class WriteOnly:
+            def __init__(self):
+                self.buffer = io.BytesIO()
+
+            def write(self, data):
+                return self.buffer.write(data)
+
+        target = WriteOnly()
+        report = ProjectExport(self.project, "zip").write_to(target)
+
+        self.assertEqual((report["files"], report["directories"]), (6, 2))
+        with zipfile.ZipFile(io.BytesIO(target.buffer.getvalue())) as archive:
+            self.assertIsNone(archive.testzip())
+            archive.extractall(os.path.join(self.temp_dir, "out"))
+        self.assertExtracted(os.path.join(self.temp_dir, "out"))
+        with self.assertRaises(ValueError):
+            ProjectExport(self.project, "zip", dedup=True)
+
+    def test_early_close(self):
+        """Test that abandoning the stream stops the writer thread"""
+        export = ProjectExport(self.project, "tar", chunk_size=512)
+        chunks = export.iter_chunks(max_pending=1)
+        self.assertTrue(next(chunks))
+        chunks.close()
+
+if __name__ == '__main__':
+    unittest.main()
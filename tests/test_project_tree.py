@@ -0,0 +1,81 @@
+"""
+Test cases for the shared project tree model
+"""
+
+import sys
+import os
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.project_tree import ProjectTree, KIND_DIRECTORY
+
+class TestProjectTree(unittest.TestCase):
+    """Test suite for ProjectTree loaders and traversal"""
+
+    def setUp(self):
+        """Set up the same project in both schemas"""
+        self.filesystem_schema = {
+            "directories": {
+                "app": {
+                    "description": "Application",
+                    "directories": {"core": {"description": "Core", "files": {"engine.py": {"type": "python_module"}}}},
+                    "files": {"main.py": {"type": "python_module"}}
+                }
+            },
+            "files": {"README.md": {"type": "documentation"}},
+            "metadata": {"revolution_level": "maximum"}
+        }
+        self.structure_schema = {
+            "project": "demo",
+            "structure": {
+                "directories": [{
+                    "name": "app",
+                    "purpose": "Application",
+                    "subdirectories": [{"name": "core", "purpose": "Core", "files": [{"name": "engine.py", "content_type": "code"}]}],
+                    "files": [{"name": "main.py", "content_type": "code"}, {"purpose": "missing name"}]
+                }],
+                "files": [{"name": "README.md", "content_type": "documentation"}]
+            }
+        }
+        self.expected_paths = [
+            "README.md",
+            "app",
+            os.path.join("app", "main.py"),
+            os.path.join("app", "core"),
+            os.path.join("app", "core", "engine.py"),
+        ]
+
+    def test_filesystem_schema(self):
+        """Test loading the FilesystemAgent schema"""
+        tree = ProjectTree.from_filesystem_schema(self.filesystem_schema)
+        self.assertEqual([path for _, path in tree.iter_nodes()], self.expected_paths)
+        self.assertEqual((tree.directory_count, tree.file_count, tree.max_directory_depth), (2, 3, 2))
+        self.assertEqual(tree.count_file_types(), {"documentation": 1, "python_module": 2})
+        self.assertEqual(dict(tree.iter_directories())["app"]["description"], "Application")
+
+    def test_structure_schema(self):
+        """Test loading the StructureGenerator schema, skipping unnamed entries"""
+        tree = ProjectTree.from_structure_schema(self.structure_schema)
+        self.assertEqual([path for _, path in tree.iter_nodes()], self.expected_paths)
+        self.assertEqual(len(tree), 5)
+        self.assertEqual(tree.max_depth, 3)
+        self.assertEqual(tree.description(2), "Application")
+        self.assertEqual(tree.count_file_types(), {"documentation": 1, "code": 2})
+
+    def test_detection_and_invariants(self):
+        """Test schema detection, preorder parents and name interning"""
+        for structure in (self.filesystem_schema, self.structure_schema):
+            tree = ProjectTree.from_structure(structure)
+            self.assertEqual([path for _, path in tree.iter_nodes()], self.expected_paths)
+            for index in range(1, len(tree) + 1):
+                self.assertLess(tree.parents[index], index)
+                self.assertEqual(tree.kinds[tree.parents[index]], KIND_DIRECTORY)
+        tree = ProjectTree()
+        first = tree.add_node(0, "pkg", KIND_DIRECTORY)
+        tree.add_node(first, "pkg", KIND_DIRECTORY)
+        self.assertEqual(len(tree.names), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Test cases for prompt compaction and first-principles prompt enhancement
+"""
+
+import sys
+import os
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.prompt_compaction import compact_prompt, contains_block, prompt_token_report
+from omnitrace.utils.compiled_template import compile_template
+from omnitrace.utils.first_principles import PromptEnhancer, apply_first_principles_to_template
+from omnitrace.utils.template_cache import TemplateCache
+from omnitrace.utils.template_manager import TemplateManager
+
+class TestPromptCompaction(unittest.TestCase):
+    """Test suite for compact_prompt and PromptEnhancer"""
+
+    def setUp(self):
+        """Collect the default and shipped templates"""
+        self.defaults = {role: data["template"]
+                         for role, data in TemplateManager(tempfile.mkdtemp()).default_templates.items()}
+        templates_dir = os.path.join(os.path.dirname(__file__), '..', 'config', 'templates')
+        self.shipped = {role: data["template"] for role, data in TemplateCache().load_dir(templates_dir).items()}
+
+    def test_repeated_blocks_dropped(self):
+        """Test that repeated blocks are dropped and indentation removed"""
+        prompt = """
+            Task: {task}
+
+            First-Principles Analysis:
+              1. Why?
+
+            Context: {context}
+            
+              First-Principles Analysis:
+            1.   Why?
+            """
+        self.assertEqual(compact_prompt(prompt), "Task: {task}\n\nFirst-Principles Analysis:\n  1. Why?\n\nContext: {context}")
+        self.assertTrue(contains_block(prompt, "First-Principles Analysis:\n1. Why?"))
+        self.assertFalse(contains_block(prompt, "Vision: {vision}"))
+
+    def test_only_identical_blocks_dropped(self):
+        """Test that a block is kept when its lines only reappear in another order or from other blocks"""
+        prompt = "Focus on:\n- speed\n- cost\n\nAvoid:\n- waste\n\nFocus on:\n- cost\n- speed\n\n- speed\nAvoid:"
+        self.assertEqual(compact_prompt(prompt), prompt)
+        self.assertFalse(contains_block(prompt, "- waste\n- speed"))
+        self.assertTrue(contains_block(prompt, "- cost\n\nAvoid:"))
+
+    def test_templates_keep_their_variables(self):
+        """Test that compaction never changes what a template needs to be filled"""
+        for role, template in list(self.defaults.items()) + list(self.shipped.items()):
+            compacted = compact_prompt(template)
+            self.assertEqual(compile_template(compacted).variables, compile_template(template).variables, role)
+            self.assertEqual(compact_prompt(compacted), compacted)
+        report = prompt_token_report(self.defaults)
+        self.assertTrue(all(tokens["after"] < tokens["before"] for tokens in report.values()))
+
+    def test_first_principles_inserted_once(self):
+        """Test that templates with the analysis are not enhanced a second time"""
+        enhancer = PromptEnhancer()
+        for role, block in enhancer.first_principles_prompts.items():
+            for template in (self.defaults[role], self.shipped[role]):
+                self.assertEqual(enhancer.enhance_prompt(role, template), template)
+                self.assertEqual(apply_first_principles_to_template(role, template), compact_prompt(template))
+
+        # A template without the analysis gets it once, and enhancing again changes nothing
+        enhanced = apply_first_principles_to_template("cto", "You are the CTO.\n\nTask: {task}")
+        self.assertEqual(enhanced.count("First-Principles Analysis:"), 1)
+        self.assertEqual(apply_first_principles_to_template("cto", enhanced), enhanced)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Scale tests for materializing very large and very deep generated structures
+"""
+
+import sys
+import os
+import time
+import asyncio
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.agents.filesystem_agent import FilesystemAgent
+from omnitrace.utils.staging import remove_tree, copy_tree
+
+# Generous budget so slow CI disks pass; a local run takes a few seconds
+TIME_BUDGET_SECONDS = 60.0
+
+class TestScale(unittest.TestCase):
+    """Test suite for large structures through the full materialization path"""
+
+    def setUp(self):
+        """Create an agent and a temporary output directory"""
+        self.agent = FilesystemAgent(llm=None)
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up the temporary output directory"""
+        remove_tree(self.temp_dir)
+
+    def test_50k_files(self):
+        """Test that a 50k-file structure is materialized within the time budget"""
+        structure = {"directories": {}, "files": {}}
+        for i in range(50):
+            package = {"description": f"Package {i}", "directories": {}, "files": {}}
+            for j in range(10):
+                package["directories"][f"module_{j}"] = {
+                    "description": f"Module {j}",
+                    "files": {f"part_{k}.py": {"type": "python_module", "description": f"Part {k}"} for k in range(100)}
+                }
+            structure["directories"][f"package_{i}"] = package
+
+        started = time.perf_counter()
+        asyncio.run(self.agent.create_structure(self.temp_dir, structure))
+        seconds = time.perf_counter() - started
+
+        report = self.agent.last_materialization
+        # 50,000 modules, one README per directory and the structure file
+        self.assertEqual(report["file_count"], 50000 + 550 + 1)
+        self.assertEqual(report["directory_count"], 550)
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, "package_49", "module_9", "part_99.py")))
+        self.assertLess(seconds, TIME_BUDGET_SECONDS)
+
+    def test_deep_structure(self):
+        """Test that nesting far beyond the recursion limit is materialized"""
+        depth = sys.getrecursionlimit() + 200
+        structure = {"directories": {}, "files": {}}
+        node = structure
+        for _ in range(depth):
+            child = {"description": "Level", "directories": {}, "files": {"f.py": {"type": "python_module"}}}
+            node["directories"]["d"] = child
+            node = child
+
+        asyncio.run(self.agent.create_structure(self.temp_dir, structure))
+        self.assertEqual(self.agent.last_materialization["directory_count"], depth)
+        deepest = os.path.join(os.sep.join(["d"] * depth), "f.py")
+        self.assertTrue(os.path.isfile(os.path.join(self.temp_dir, deepest)))
+
+        # Staging copies and removes trees of the same depth
+        copy = os.path.join(self.temp_dir, "copy")
+        copy_tree(os.path.join(self.temp_dir, "d"), copy)
+        self.assertTrue(os.path.isfile(os.path.join(copy, deepest[2:])))
+        remove_tree(copy)
+        self.assertFalse(os.path.exists(copy))
+
+if __name__ == '__main__':
+    unittest.main()
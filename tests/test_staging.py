@@ -0,0 +1,102 @@
+"""
+Test cases for staged, atomic project output
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.staging import ProjectStaging, list_projects, STAGING_DIR
+
+class TestProjectStaging(unittest.TestCase):
+    """Test suite for ProjectStaging"""
+
+    def setUp(self):
+        """Create a temporary projects root"""
+        self.projects_root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Clean up the temporary projects root"""
+        shutil.rmtree(self.projects_root)
+
+    def _write(self, output_dir, tag, count=20):
+        for i in range(count):
+            with open(os.path.join(output_dir, f"file_{i}.txt"), "w", encoding="utf-8") as f:
+                f.write(tag)
+
+    def test_staged_until_commit(self):
+        """Test that a project is invisible until it is committed"""
+        staging = ProjectStaging(self.projects_root, "demo")
+        output_dir = staging.begin()
+        self._write(output_dir, "v1")
+        self.assertEqual(list_projects(self.projects_root), [])
+
+        final_dir = staging.commit()
+        self.assertEqual(list_projects(self.projects_root), ["demo"])
+        self.assertEqual(staging.final_path(os.path.join(output_dir, "file_0.txt")),
+                         os.path.join(final_dir, "file_0.txt"))
+        self.assertEqual(os.listdir(os.path.join(self.projects_root, STAGING_DIR)), [])
+
+    def test_abort(self):
+        """Test that a failed generation leaves nothing behind"""
+        staging = ProjectStaging(self.projects_root, "demo")
+        self._write(staging.begin(), "partial")
+        staging.abort()
+        self.assertEqual(list_projects(self.projects_root), [])
+        self.assertEqual(os.listdir(os.path.join(self.projects_root, STAGING_DIR)), [])
+
+    def test_failed_commit_restores_previous(self):
+        """Test that the previous project is put back when the staged one cannot be renamed into place"""
+        staging = ProjectStaging(self.projects_root, "demo")
+        self._write(staging.begin(), "v1")
+        final_dir = staging.commit()
+
+        staging = ProjectStaging(self.projects_root, "demo")
+        self._write(staging.begin(), "v2")
+        rename = os.rename
+        calls = []
+
+        def failing_rename(src, dst):
+            calls.append((src, dst))
+            if len(calls) == 2:
+                raise OSError("rename failed")
+            rename(src, dst)
+
+        with patch("os.rename", side_effect=failing_rename):
+            with self.assertRaises(OSError):
+                staging.commit()
+        self.assertFalse(staging.committed)
+        with open(os.path.join(final_dir, "file_0.txt"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "v1")
+
+    def test_concurrent_generations(self):
+        """Test that concurrent generations of one name replace the project as a whole"""
+        stagings = [ProjectStaging(self.projects_root, "demo") for _ in range(4)]
+        output_dirs = [staging.begin() for staging in stagings]
+        threads = []
+        for i, (staging, output_dir) in enumerate(zip(stagings, output_dirs)):
+            self._write(output_dir, f"v{i}")
+            threads.append(threading.Thread(target=staging.commit))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        final_dir = os.path.join(self.projects_root, "demo")
+        contents = set()
+        for name in os.listdir(final_dir):
+            with open(os.path.join(final_dir, name), encoding="utf-8") as f:
+                contents.add(f.read())
+        self.assertEqual(len(contents), 1)
+        self.assertEqual(len(os.listdir(final_dir)), 20)
+        self.assertEqual(list_projects(self.projects_root), ["demo"])
+
+if __name__ == '__main__':
+    unittest.main()
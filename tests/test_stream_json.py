@@ -0,0 +1,130 @@
+"""
+Test cases for incremental, tolerant structure parsing
+"""
+
+import sys
+import os
+import json
+import asyncio
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.stream_json import (
+    parse_json_tolerant, StructureNodeStream, stream_structure, StructureParseError,
+    dumps_deep, loads_deep, _dumps_iterative
+)
+
+class FakeChain:
+    """Chain stand-in that streams a fixed response in small chunks"""
+
+    def __init__(self, text, chunk_size=5):
+        self.text = text
+        self.chunk_size = chunk_size
+
+    def stream(self, context):
+        for i in range(0, len(self.text), self.chunk_size):
+            yield self.text[i:i + self.chunk_size]
+
+class TestStreamJSON(unittest.TestCase):
+    """Test suite for the streaming JSON parser"""
+
+    def test_valid_json(self):
+        """Test that valid JSON parses unchanged without repairs"""
+        value = {"a": [1, 2.5, "x\né"], "b": {"c": None, "d": True}}
+        self.assertEqual(parse_json_tolerant(json.dumps(value)), (value, {}))
+
+    def test_repairs(self):
+        """Test repair of common LLM JSON defects"""
+        text = (
+            "<think>maybe {draft}</think>Here you go:\n```json\n"
+            "{'a': True, b: None, // comment\n \"c\": [1 2,], \"d\": \"x\" \"e\": {},}\n```\nDone!"
+        )
+        value, repairs = parse_json_tolerant(text)
+        self.assertEqual(value, {"a": True, "b": None, "c": [1, 2], "d": "x", "e": {}})
+        for repair in ("single_quotes", "python_literal", "unquoted_key", "comment",
+                       "missing_comma", "trailing_comma", "trailing_text"):
+            self.assertIn(repair, repairs)
+
+    def test_prose_brackets_superseded(self):
+        """Test that brackets in the preamble do not hide the fenced structure"""
+        structure = {"files": {"a.py": {"type": "python_module"}}}
+        text = f"Here is the structure [v1]: ```json\n{json.dumps(structure)}\n```"
+        value, repairs = parse_json_tolerant(text)
+        self.assertEqual(value, structure)
+        self.assertEqual(repairs, {"superseded_value": 1, "trailing_text": 1})
+
+        # A later object replaces a non-object, but not a fenced value
+        self.assertEqual(parse_json_tolerant("Steps [1, 2] then {\"a\": 1}")[0], {"a": 1})
+        self.assertEqual(parse_json_tolerant("```json\n[1]\n``` see {\"a\": 1}")[0], [1])
+        self.assertEqual(parse_json_tolerant("{\"a\": 1} and [2]")[0], {"a": 1})
+
+        stream = StructureNodeStream()
+        nodes = [node for i in range(0, len(text), 4) for node in stream.feed(text[i:i + 4])]
+        self.assertEqual([node["path"] for node in nodes], ["a.py"])
+        self.assertEqual(stream.close()[0], structure)
+
+    def test_truncated(self):
+        """Test that truncated output is closed instead of failing"""
+        value, repairs = parse_json_tolerant('{"files": {"a.py": {"description": "cut off')
+        self.assertEqual(value, {"files": {"a.py": {"description": "cut off"}}})
+        self.assertIn("truncated", repairs)
+        with self.assertRaises(ValueError):
+            parse_json_tolerant("no json here")
+
+    def test_nodes_filesystem_schema(self):
+        """Test that files and directories are emitted as soon as they close"""
+        text = json.dumps({
+            "directories": {"app": {"description": "App", "files": {"main.py": {"type": "python_module"}}}},
+            "files": {"README.md": {"type": "documentation"}}
+        })
+        stream = StructureNodeStream()
+        first_file_at = None
+        for i in range(0, len(text), 4):
+            if stream.feed(text[i:i + 4]) and first_file_at is None:
+                first_file_at = i
+        structure, _ = stream.close()
+        self.assertLess(first_file_at, text.index("README.md"))
+        self.assertEqual([(node["kind"], node["path"]) for node in stream.nodes], [
+            ("file", os.path.join("app", "main.py")), ("directory", "app"), ("file", "README.md")
+        ])
+        self.assertEqual(structure, json.loads(text))
+
+    def test_stream_structure_schema(self):
+        """Test streaming the list schema, including names that follow their children"""
+        text = json.dumps({"project": "p", "structure": {
+            "directories": [{"subdirectories": [], "files": [{"name": "x.py"}], "name": "app"}],
+            "files": [{"name": "r.md"}]
+        }})
+        nodes = []
+
+        async def on_node(node):
+            nodes.append(node["path"])
+
+        structure, repairs, raw = asyncio.run(stream_structure(FakeChain(text), {}, on_node))
+        self.assertEqual(nodes, [os.path.join("app", "x.py"), "app", "r.md"])
+        self.assertEqual((structure, repairs, raw), (json.loads(text), {}, text))
+        with self.assertRaises(StructureParseError) as context:
+            asyncio.run(stream_structure(FakeChain("I cannot help with that."), {}))
+        self.assertEqual(context.exception.raw_text, "I cannot help with that.")
+
+    def test_deep_json(self):
+        """Test serialization beyond the recursion limit"""
+        value = {"a": [1, 2.5, {"b": None, "c": [], "d": {}}], "é": "x\n", "e": [[True]]}
+        for indent in (None, 2):
+            self.assertEqual(_dumps_iterative(value, indent), json.dumps(value, indent=indent))
+
+        deep = node = {}
+        for _ in range(sys.getrecursionlimit() + 100):
+            node["d"] = {}
+            node = node["d"]
+        loaded = loads_deep(dumps_deep(deep, indent=2))
+        depth = 0
+        while loaded:
+            loaded = loaded["d"]
+            depth += 1
+        self.assertEqual(depth, sys.getrecursionlimit() + 100)
+
+if __name__ == '__main__':
+    unittest.main()
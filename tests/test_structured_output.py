@@ -0,0 +1,84 @@
+"""
+Test cases for schema-constrained structure generation
+"""
+
+import sys
+import os
+import json
+import asyncio
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.structured_output import (
+    validate_structure, generate_validated_structure, constrain_llm, output_format,
+    FILESYSTEM_STRUCTURE_SCHEMA, PROJECT_STRUCTURE_SCHEMA
+)
+
+class ScriptedChain:
+    """Chain stand-in that returns one scripted response per call"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.bound = {}
+
+    def bind(self, **options):
+        self.bound.update(options)
+        return self
+
+    def stream(self, context):
+        yield self.responses.pop(0)
+
+class TestStructuredOutput(unittest.TestCase):
+    """Test suite for schema validation and retries"""
+
+    def setUp(self):
+        """Set up a valid structure in the FilesystemAgent schema"""
+        self.structure = {
+            "directories": {"app": {"description": "App", "directories": {}, "files": {
+                "main.py": {"description": "Entry point", "type": "python_module"}
+            }}},
+            "files": {}
+        }
+
+    def test_validate_structure(self):
+        """Test that violations are reported with their paths"""
+        self.assertEqual(validate_structure(self.structure, FILESYSTEM_STRUCTURE_SCHEMA), [])
+        self.structure["directories"]["app"]["files"]["main.py"] = "Entry point"
+        del self.structure["files"]
+        errors = validate_structure(self.structure, FILESYSTEM_STRUCTURE_SCHEMA)
+        self.assertIn("$: missing required property 'files'", errors)
+        self.assertIn("$.directories.app.files.main.py: expected object, got str", errors)
+        self.assertEqual(
+            validate_structure({"project": "p", "structure": {"directories": [{}], "files": []}}, PROJECT_STRUCTURE_SCHEMA),
+            ["$.structure.directories[0]: missing required property 'name'"]
+        )
+
+    def test_retries(self):
+        """Test that unparseable and invalid responses are retried"""
+        chain = ScriptedChain(["No JSON, sorry.", json.dumps({"files": {}}), json.dumps(self.structure)])
+        structure, report = asyncio.run(generate_validated_structure(
+            chain, {}, FILESYSTEM_STRUCTURE_SCHEMA, max_retries=2
+        ))
+        self.assertEqual(structure, self.structure)
+        self.assertEqual((report["attempts"], report["retries"]), (3, 2))
+        self.assertEqual((report["parse_failures"], report["schema_failures"]), (1, 1))
+        self.assertNotIn("error", report)
+
+        structure, report = asyncio.run(generate_validated_structure(
+            ScriptedChain(["No JSON, sorry."]), {}, FILESYSTEM_STRUCTURE_SCHEMA
+        ))
+        self.assertIsNone(structure)
+        self.assertEqual(report["raw_text"], "No JSON, sorry.")
+
+    def test_constrain_llm(self):
+        """Test that the response format is bound to the LLM"""
+        chain = constrain_llm(ScriptedChain([]), FILESYSTEM_STRUCTURE_SCHEMA)
+        self.assertIs(chain.bound["format"], FILESYSTEM_STRUCTURE_SCHEMA)
+        self.assertEqual(output_format(FILESYSTEM_STRUCTURE_SCHEMA, "json"), "json")
+        with self.assertRaises(ValueError):
+            output_format(FILESYSTEM_STRUCTURE_SCHEMA, "xml")
+
+if __name__ == '__main__':
+    unittest.main()
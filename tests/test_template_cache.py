@@ -0,0 +1,139 @@
+"""
+Test cases for the process-wide template cache
+"""
+
+import sys
+import os
+import json
+import time
+import shutil
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.template_cache import (
+    TemplateCache, get_template_cache, template_path, compile_role_template, ROLE_VARIABLES
+)
+from omnitrace.utils.template_manager import TemplateManager
+
+class Consumer:
+    """Records the template files it was told about"""
+
+    def __init__(self):
+        self.changed = []
+
+    def on_template_changed(self, path):
+        self.changed.append(path)
+
+class TestTemplateCache(unittest.TestCase):
+    """Test suite for TemplateCache"""
+
+    def setUp(self):
+        """Create a templates directory with one template"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = template_path("cto", self.temp_dir)
+        self.write_external({"template": "v1 {task}", "parameters": {"revolution_level": "high"}})
+        self.cache = TemplateCache()
+
+    def tearDown(self):
+        """Stop watching and remove the directory"""
+        self.cache.stop_watching()
+        shutil.rmtree(self.temp_dir)
+
+    def write_external(self, data):
+        """Replace the file the way an editor or another process would"""
+        with open(self.path + ".new", "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(self.path + ".new", self.path)
+
+    def test_parsed_once_per_version(self):
+        """Test that unchanged files are served from memory and changed ones re-read"""
+        consumer = Consumer()
+        self.cache.subscribe(consumer.on_template_changed)
+        first = self.cache.load(self.path)
+        first["parameters"]["revolution_level"] = "maximum"
+        self.assertEqual(self.cache.load(self.path)["parameters"]["revolution_level"], "high")
+        self.assertEqual((self.cache.stats["reads"], self.cache.stats["hits"]), (1, 1))
+
+        self.write_external({"template": "v2 {task}"})
+        self.assertEqual(self.cache.load(self.path)["template"], "v2 {task}")
+        self.assertEqual(consumer.changed, [os.path.abspath(self.path)])
+
+        os.remove(self.path)
+        self.assertIsNone(self.cache.load(self.path))
+
+    def test_write_and_remove_notify(self):
+        """Test that saving through the cache notifies without re-reading"""
+        consumer = Consumer()
+        self.cache.subscribe(consumer.on_template_changed)
+        self.cache.write(self.path, {"template": "saved {task}"})
+        self.assertEqual(self.cache.load(self.path)["template"], "saved {task}")
+        self.assertEqual(self.cache.stats["reads"], 0)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o644)
+        self.assertTrue(self.cache.remove(self.path))
+        self.assertEqual(len(consumer.changed), 2)
+
+        # Subscribers are held weakly
+        del consumer
+        self.cache.write(self.path, {"template": "again {task}"})
+        self.assertEqual(self.cache._listeners, [])
+
+    def test_watcher(self):
+        """Test that the watcher reports files edited and added on disk"""
+        consumer = Consumer()
+        self.cache.subscribe(consumer.on_template_changed)
+        self.cache.load(self.path)
+        self.cache.start_watching(self.temp_dir, interval=0.02)
+        self.write_external({"template": "edited {task}"})
+        added = template_path("ceo", self.temp_dir)
+        with open(added, "w", encoding="utf-8") as f:
+            json.dump({"template": "new {task}"}, f)
+
+        deadline = time.time() + 2
+        while len(set(consumer.changed)) < 2 and time.time() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(set(consumer.changed), {os.path.abspath(self.path), os.path.abspath(added)})
+
+    def test_template_manager_reads_through_cache(self):
+        """Test that TemplateManager loads and saves through the shared cache"""
+        reads = get_template_cache().stats["reads"]
+        TemplateManager(self.temp_dir)
+        manager = TemplateManager(self.temp_dir)
+        self.assertEqual(get_template_cache().stats["reads"], reads + 1)
+        self.assertEqual(manager.get_template_text("cto"), "v1 {task}")
+
+        manager.save_template("cto", "saved {task}")
+        self.assertEqual(TemplateManager(self.temp_dir).get_template_parameters("cto"), {"revolution_level": "high"})
+        self.assertTrue(manager.delete_template("cto"))
+        self.assertIsNone(get_template_cache().load(self.path))
+
+    def test_variables_checked_at_load_and_save(self):
+        """Test that templates with unknown variables never reach an LLM call"""
+        self.assertEqual(compile_role_template("cto", "v1 {task} {vision}").variables, {"task", "vision"})
+        with self.assertRaisesRegex(ValueError, "'visoin'"):
+            compile_role_template("cto", "{task} {visoin}")
+        with self.assertRaises(ValueError):
+            compile_role_template("cto", "{task} {")
+
+        # A broken file keeps the default; a broken save is refused
+        self.write_external({"template": "{task} {visoin}"})
+        manager = TemplateManager(self.temp_dir)
+        self.assertEqual(manager.get_template_text("cto"), manager.default_templates["cto"]["template"])
+        self.assertFalse(manager.save_template("cto", "{task} {visoin}"))
+        self.assertTrue(manager.save_template("cto", "{task} {vision}"))
+        # Saves are checked against what the role's specialized agent fills
+        self.assertFalse(manager.save_template("ceo", "{task} {vision}"))
+        self.assertTrue(manager.save_template("ceo", "{task} {decisions}"))
+
+    def test_shipped_templates_valid(self):
+        """Test that the templates in config/templates pass the variable check"""
+        templates_dir = os.path.join(os.path.dirname(__file__), '..', 'config', 'templates')
+        templates = TemplateCache().load_dir(templates_dir)
+        self.assertEqual(set(templates), set(ROLE_VARIABLES))
+        for role, data in templates.items():
+            compile_role_template(role, data["template"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Test cases for content-hash template versions
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.utils.template_versions import TemplateVersionStore, template_hash, SHORT_HASH, PROJECT_VERSIONS_DIR
+from omnitrace.utils.template_manager import TemplateManager
+from omnitrace.utils.project_history import ProjectHistory
+from omnitrace.generation.doc_pipeline import save_document_inputs, materialize_document, project_template_versions
+
+class TestTemplateVersions(unittest.TestCase):
+    """Test suite for TemplateVersionStore"""
+
+    def setUp(self):
+        """Create an empty templates directory"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.store = TemplateVersionStore(self.temp_dir)
+
+    def tearDown(self):
+        """Remove the directory"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_put_and_get(self):
+        """Test that versions are keyed by content and stored once"""
+        first = self.store.put("cto", "v1 {task}")
+        self.assertEqual(first, template_hash("v1 {task}"))
+        self.assertEqual(self.store.put("cto", "v1 {task}"), first)
+        second = self.store.put("cto", "v2 {task}")
+        self.assertNotEqual(first, second)
+
+        record = self.store.get(first[:SHORT_HASH])
+        self.assertEqual((record["role"], record["template"], record["hash"]), ("cto", "v1 {task}", first))
+        # A version is the template text alone; parameters stay with the template file
+        self.assertNotIn("parameters", record)
+        self.assertIsNone(self.store.get("0" * 64))
+        self.assertEqual({version["hash"] for version in self.store.history("cto")}, {first, second})
+        self.assertEqual(self.store.history("ceo"), [])
+
+    def test_project_store(self):
+        """Test that a project keeps its versions inside its own directory"""
+        project_dir = os.path.join(self.temp_dir, "projects", "demo")
+        digest = TemplateVersionStore.in_project(project_dir).put("ceo", "{task}")
+
+        path = os.path.join(project_dir, PROJECT_VERSIONS_DIR, f"{digest}.json")
+        self.assertTrue(os.path.isfile(path))
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o644)
+        self.assertEqual(TemplateVersionStore.in_project(project_dir).get(digest)["template"], "{task}")
+        self.assertIsNone(self.store.get(digest))
+
+    def test_template_manager_records_versions(self):
+        """Test that every saved template is kept as a version"""
+        manager = TemplateManager(self.temp_dir)
+        self.assertTrue(manager.save_template("cto", "first {task}"))
+        self.assertTrue(manager.save_template("cto", "second {task}"))
+        self.assertFalse(manager.save_template("cto", "{task} {visoin}"))
+
+        versions = manager.versions.history("cto")
+        self.assertEqual(len(versions), 2)
+        self.assertEqual(self.store.get(template_hash("first {task}"))["template"], "first {task}")
+        # The versions directory is not mistaken for a template
+        self.assertNotIn(".versions", TemplateManager(self.temp_dir).list_custom_templates())
+
+    def test_run_records_template_versions(self):
+        """Test that a project's history keeps the template hashes it was generated with"""
+        history = ProjectHistory()
+        history.templates = {"ceo": self.store.put("ceo", "{task}"), "cto": self.store.put("cto", "{vision}")}
+        meta = {"name": "Demo", "generated": "2026-01-01 00:00:00"}
+        save_document_inputs(self.temp_dir, meta, {"history": history.to_dict()}, ["history"])
+
+        self.assertEqual(project_template_versions(self.temp_dir), history.templates)
+        self.assertIn(f"- CTO: `{template_hash('{vision}')[:SHORT_HASH]}`", materialize_document(self.temp_dir, "history"))
+        # A history written eagerly still keeps its versions in the stored inputs
+        save_document_inputs(self.temp_dir, meta, {"history": history.to_dict()}, [])
+        self.assertEqual(project_template_versions(self.temp_dir), history.templates)
+        # Projects from before version recording have none
+        os.remove(os.path.join(self.temp_dir, ".omnitrace_docs.json.gz"))
+        self.assertEqual(project_template_versions(self.temp_dir), {})
+
+if __name__ == '__main__':
+    unittest.main()
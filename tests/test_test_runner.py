@@ -0,0 +1,164 @@
+"""
+Test cases for running generated test files
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+
+# Add project root to path for imports
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from omnitrace.generation.test_runner import GeneratedTestRunner, is_test_file
+
+class TestGeneratedTestRunner(unittest.TestCase):
+    """Test suite for the generated test runner"""
+
+    def setUp(self):
+        """Create a small generated project with passing and failing tests"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.project_dir = os.path.join(self.temp_dir, "project")
+        self.cache_path = os.path.join(self.temp_dir, "cache", "test_results.json")
+        files = {
+            "calc.py": "def add(a, b):\n    return a + b\n",
+            "tests/test_calc.py": (
+                "import unittest\nfrom calc import add\n\n"
+                "class TestCalc(unittest.TestCase):\n"
+                "    def test_add(self):\n        self.assertEqual(add(1, 2), 3)\n"
+            ),
+            "tests/test_broken.py": (
+                "import unittest\n\n"
+                "class TestBroken(unittest.TestCase):\n"
+                "    def test_fail(self):\n        self.assertTrue(False)\n"
+            ),
+        }
+        for rel_path, content in files.items():
+            path = os.path.join(self.project_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+        self.rel_paths = list(files)
+
+    def tearDown(self):
+        """Clean up the temporary project"""
+        shutil.rmtree(self.temp_dir)
+
+    def test_is_test_file(self):
+        """Test detection of generated test files"""
+        self.assertTrue(is_test_file("tests/test_calc.py"))
+        self.assertTrue(is_test_file("calc_test.py"))
+        self.assertFalse(is_test_file("calc.py"))
+        self.assertFalse(is_test_file("test_data.json"))
+
+    def test_run_and_cache(self):
+        """Test pass/fail results and that unchanged tests are served from the cache"""
+        runner = GeneratedTestRunner(max_workers=2, cache_path=self.cache_path)
+        report = runner.run(self.project_dir, self.rel_paths)
+        self.assertEqual(report["total"], 2)
+        self.assertEqual(report["executed"], 2)
+        self.assertEqual(report["results"]["tests/test_calc.py"]["status"], "passed")
+        self.assertEqual(report["results"]["tests/test_broken.py"]["status"], "failed")
+
+        # A fresh runner reuses the persisted cache
+        runner = GeneratedTestRunner(max_workers=2, cache_path=self.cache_path)
+        report = runner.run(self.project_dir, self.rel_paths)
+        self.assertEqual(report["cached"], 2)
+
+        # Changing the code under test invalidates only the dependent test
+        with open(os.path.join(self.project_dir, "calc.py"), "w", encoding="utf-8") as f:
+            f.write("def add(a, b):\n    return a - b\n")
+        report = runner.run(self.project_dir, self.rel_paths)
+        self.assertEqual(report["executed"], 1)
+        self.assertEqual(report["results"]["tests/test_calc.py"]["status"], "failed")
+        self.assertTrue(report["results"]["tests/test_broken.py"]["cached"])
+
+    def write(self, rel_path, content):
+        """Write a project file"""
+        path = os.path.join(self.project_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+    def test_indirect_imports_invalidate(self):
+        """Test that editing a module a test imports through another module re-runs it"""
+        self.write("calc.py", "from ops import plus\n\ndef add(a, b):\n    return plus(a, b)\n")
+        self.write("ops.py", "def plus(a, b):\n    return a + b\n")
+        rel_paths = self.rel_paths + ["ops.py"]
+        runner = GeneratedTestRunner(max_workers=2, cache_path=self.cache_path)
+        graph = runner.import_graph(self.project_dir, [path for path in rel_paths if path.endswith(".py")])
+        self.assertEqual(graph["tests/test_calc.py"], ["calc.py"])
+        self.assertEqual(graph["calc.py"], ["ops.py"])
+        self.assertEqual(runner.run(self.project_dir, rel_paths)["counts"]["passed"], 1)
+
+        self.write("ops.py", "def plus(a, b):\n    return a * b\n")
+        report = runner.run(self.project_dir, rel_paths)
+        self.assertEqual(report["executed"], 1)
+        self.assertEqual(report["results"]["tests/test_calc.py"]["status"], "failed")
+
+        # A test whose imports cannot be parsed depends on every module
+        self.write("tests/test_broken.py", "import (\n")
+        graph = runner.import_graph(self.project_dir, ["calc.py", "ops.py", "tests/test_broken.py"])
+        self.assertIsNone(graph["tests/test_broken.py"])
+        self.assertEqual(runner._code_under_test("tests/test_broken.py", ["calc.py", "ops.py", "tests/test_broken.py"],
+                                                 graph), ["calc.py", "ops.py"])
+
+    def test_src_layout_imports(self):
+        """Test that imports resolved through src/ and unknown imports invalidate cached results"""
+        self.write("src/mypkg/__init__.py", "")
+        self.write("src/mypkg/core.py", "def f():\n    return 1\n")
+        self.write("tests/test_core.py", (
+            "import unittest\nfrom mypkg.core import f\n\n"
+            "class TestCore(unittest.TestCase):\n"
+            "    def test_f(self):\n        self.assertEqual(f(), 1)\n"
+        ))
+        rel_paths = ["src/mypkg/__init__.py", "src/mypkg/core.py", "tests/test_core.py"]
+        runner = GeneratedTestRunner(max_workers=2, cache_path=self.cache_path)
+        graph = runner.import_graph(self.project_dir, rel_paths)
+        self.assertEqual(graph["tests/test_core.py"], ["src/mypkg/core.py"])
+        self.assertEqual(runner.run(self.project_dir, rel_paths)["counts"]["passed"], 1)
+
+        self.write("src/mypkg/core.py", "def f():\n    return 2\n")
+        report = runner.run(self.project_dir, rel_paths)
+        self.assertEqual(report["executed"], 1)
+        self.assertEqual(report["results"]["tests/test_core.py"]["status"], "failed")
+
+        # An import that is neither generated nor installed leaves the dependencies unknown
+        self.write("tests/test_core.py", "from notgenerated_pkg_xyz import f\n")
+        graph = runner.import_graph(self.project_dir, rel_paths)
+        self.assertIsNone(graph["tests/test_core.py"])
+        self.assertEqual(runner._code_under_test("tests/test_core.py", rel_paths, graph),
+                         ["src/mypkg/__init__.py", "src/mypkg/core.py"])
+
+    def test_cache_pruned(self):
+        """Test that the cache keeps one result per existing test file"""
+        runner = GeneratedTestRunner(max_workers=2, cache_path=self.cache_path)
+        runner.run(self.project_dir, self.rel_paths)
+        self.write("calc.py", "def add(a, b):\n    return a - b\n")
+        runner.run(self.project_dir, self.rel_paths)
+        self.assertEqual(len(runner._cache), 2)
+
+        # Tests removed from the project, and projects deleted, leave the cache
+        runner.run(self.project_dir, ["calc.py", "tests/test_calc.py"])
+        self.assertEqual(len(runner._cache), 1)
+        other_dir = os.path.join(self.temp_dir, "other")
+        shutil.copytree(self.project_dir, other_dir)
+        self.write("calc.py", "def add(a, b):\n    return a + b\n")
+        runner.run(self.project_dir, ["calc.py", "tests/test_calc.py"])
+        shutil.rmtree(self.project_dir)
+        runner.run(other_dir, ["calc.py", "tests/test_broken.py"])
+        self.assertEqual({result["project"] for result in runner._cache.values()}, {other_dir})
+
+    def test_timeout(self):
+        """Test that a hanging test is stopped and not cached"""
+        with open(os.path.join(self.project_dir, "tests", "test_broken.py"), "w", encoding="utf-8") as f:
+            f.write("import time\ntime.sleep(30)\n")
+        runner = GeneratedTestRunner(timeout=1, cache_path=self.cache_path)
+        report = runner.run(self.project_dir, ["tests/test_broken.py"])
+        self.assertEqual(report["counts"]["timeout"], 1)
+        report = runner.run(self.project_dir, ["tests/test_broken.py"])
+        self.assertEqual(report["executed"], 1)
+
+if __name__ == '__main__':
+    unittest.main()